@@ -7,6 +7,7 @@ let cart = [];
 let products = [];
 let customers = [];
 let orders = [];
+let adminProducts = []; // the admin panel's list in API mode, inactive products included
 
 // Sample Data from JSON
 const sampleData = {
@@ -85,45 +86,612 @@ const sampleData = {
 };
 
 // Initialize Application
+let appReady = null;
+
 document.addEventListener('DOMContentLoaded', function() {
-    initializeData();
     setupEventListeners();
-    loadCart();
+    // The mark is what backend/bench/storefrontTTI.js waits for
+    appReady = initializeData().then(() => {
+        if (performance.mark) performance.mark('dripnest-ready');
+    });
+    registerServiceWorker();
+});
+
+// Load what the home page needs first: the signed-in user, the cart and the
+// featured products. The rest of the catalog follows in the background;
+// customers and orders are loaded by the pages that use them.
+async function initializeData() {
+    // Check for logged in user
+    const savedUser = localStorage.getItem('dripnest-current-user');
+    if (savedUser) {
+        currentUser = JSON.parse(savedUser);
+        updateAuthUI();
+    }
+    
+    if (apiEnabled()) {
+        await Promise.all([loadCollection('cart'), loadProducts()]);
+        updateCartCount();
+        showPage('home');
+        return;
+    }
+    
+    const [, featured] = await Promise.all([
+        loadCollection('cart'),
+        loadFirstRecords('products', FEATURED_PRODUCT_COUNT)
+    ]);
     updateCartCount();
+    
+    // Unless a page already asked for the whole catalog
+    if (!storage.loaded.has('products')) {
+        products = featured;
+        buildCatalogIndex();
+    }
     showPage('home');
-});
+    
+    loadCollection('products');
+}
+
+// Storage
+// Products, customers, orders and the cart live in IndexedDB, one object
+// store per collection keyed by record id. A change queues only the records
+// it touched; queued changes are written together in one transaction
+// STORAGE_FLUSH_DELAY_MS later, or when the page is hidden. The first open
+// migrates the dripnest-* localStorage arrays. Without IndexedDB the same
+// calls fall back to those localStorage keys, still written behind. The
+// signed-in user stays in localStorage because startup reads it
+// synchronously.
+const STORAGE_DB_NAME = 'dripnest';
+const STORAGE_DB_VERSION = 1;
+const STORAGE_FLUSH_DELAY_MS = 250;
+const COLLECTIONS = ['products', 'customers', 'orders', 'cart'];
+
+const storage = {
+    db: null, // null until open, and for good without IndexedDB
+    ready: false,
+    opening: null,
+    loads: new Map(), // collection -> Promise of its records
+    loaded: new Set(),
+    pending: new Map(), // collection -> { clear, records: Map(id -> record, or null to delete) }
+    flushTimer: null
+};
+
+function openStorage() {
+    if (storage.opening) return storage.opening;
+    
+    storage.opening = new Promise(resolve => {
+        const done = function(db) {
+            storage.db = db;
+            storage.ready = true;
+            resolve(db);
+        };
+        if (!window.indexedDB) {
+            done(null);
+            return;
+        }
+        
+        const request = window.indexedDB.open(STORAGE_DB_NAME, STORAGE_DB_VERSION);
+        let migrated = false;
+        request.onupgradeneeded = function(event) {
+            const db = request.result;
+            COLLECTIONS.forEach(name => {
+                if (!db.objectStoreNames.contains(name)) {
+                    db.createObjectStore(name, { keyPath: 'id' });
+                }
+            });
+            if (event.oldVersion === 0) {
+                migrateLocalStorage(request.transaction);
+                migrated = true;
+            }
+        };
+        request.onsuccess = function() {
+            // The migration committed with the upgrade, so the old copies can go
+            if (migrated) {
+                COLLECTIONS.forEach(name => localStorage.removeItem(`dripnest-${name}`));
+            }
+            done(request.result);
+        };
+        request.onerror = function() {
+            console.error('IndexedDB unavailable, using localStorage:', request.error);
+            done(null);
+        };
+    });
+    return storage.opening;
+}
+
+// One-time copy of the arrays the storefront used to keep in localStorage;
+// a first visit gets the sample catalog and customer, as before
+function migrateLocalStorage(transaction) {
+    COLLECTIONS.forEach(name => {
+        const store = transaction.objectStore(name);
+        readLocalCollection(name).forEach(record => {
+            if (record && record.id !== undefined) {
+                store.put(record);
+            }
+        });
+    });
+}
+
+function readLocalCollection(name) {
+    const saved = localStorage.getItem(`dripnest-${name}`);
+    if (saved) return JSON.parse(saved);
+    if (name === 'products') return sampleData.sampleProducts;
+    if (name === 'customers') return sampleData.sampleCustomers;
+    return [];
+}
+
+// A whole collection, read once and installed into the app state
+function loadCollection(name) {
+    if (!storage.loads.has(name)) {
+        storage.loads.set(name, openStorage()
+            .then(db => db ? readStore(db, name) : readLocalCollection(name))
+            .then(records => {
+                setCollection(name, records);
+                storage.loaded.add(name);
+                return records;
+            }));
+    }
+    return storage.loads.get(name);
+}
+
+// The first `count` records in id order, without reading the rest
+function loadFirstRecords(name, count) {
+    return openStorage().then(db => db ? readStore(db, name, count) : readLocalCollection(name).slice(0, count));
+}
+
+function readStore(db, name, count) {
+    return new Promise((resolve, reject) => {
+        const request = db.transaction(name).objectStore(name).getAll(null, count);
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+function getCollection(name) {
+    switch (name) {
+        case 'products': return products;
+        case 'customers': return customers;
+        case 'orders': return orders;
+        case 'cart': return cart;
+    }
+}
+
+function setCollection(name, records) {
+    switch (name) {
+        case 'products':
+            products = records;
+            buildCatalogIndex();
+            break;
+        case 'customers':
+            customers = records;
+            break;
+        case 'orders':
+            orders = records;
+            break;
+        case 'cart':
+            cart = records;
+            break;
+    }
+}
+
+function pendingChanges(name) {
+    let changes = storage.pending.get(name);
+    if (!changes) {
+        changes = { clear: false, records: new Map() };
+        storage.pending.set(name, changes);
+    }
+    return changes;
+}
+
+// Records are cloned when the batch is written, so later edits to the same
+// object before then are saved too
+function saveRecord(name, record) {
+    // The backend owns the catalog in API mode
+    if (name === 'products' && apiEnabled()) return;
+    pendingChanges(name).records.set(record.id, record);
+    scheduleFlush();
+}
+
+function deleteRecord(name, id) {
+    if (name === 'products' && apiEnabled()) return;
+    pendingChanges(name).records.set(id, null);
+    scheduleFlush();
+}
+
+function clearCollection(name) {
+    const changes = pendingChanges(name);
+    changes.clear = true;
+    changes.records.clear();
+    scheduleFlush();
+}
+
+function scheduleFlush() {
+    if (storage.flushTimer) return;
+    storage.flushTimer = setTimeout(flushStorage, STORAGE_FLUSH_DELAY_MS);
+}
+
+function flushStorage() {
+    clearTimeout(storage.flushTimer);
+    storage.flushTimer = null;
+    if (storage.pending.size === 0) return;
+    if (!storage.ready) {
+        openStorage().then(flushStorage);
+        return;
+    }
+    
+    const pending = storage.pending;
+    storage.pending = new Map();
+    
+    if (!storage.db) {
+        pending.forEach((changes, name) => {
+            const records = storage.loaded.has(name) ? getCollection(name) : mergeChanges(readLocalCollection(name), changes);
+            localStorage.setItem(`dripnest-${name}`, JSON.stringify(records));
+        });
+        return;
+    }
+    
+    const transaction = storage.db.transaction([...pending.keys()], 'readwrite');
+    pending.forEach((changes, name) => {
+        const store = transaction.objectStore(name);
+        if (changes.clear) {
+            store.clear();
+        }
+        changes.records.forEach((record, id) => {
+            if (record) {
+                store.put(record);
+            } else {
+                store.delete(id);
+            }
+        });
+    });
+    transaction.onerror = function() {
+        console.error('Storage write failed:', transaction.error);
+    };
+}
+
+// Queued changes applied to a collection that isn't in memory yet; writing
+// the partly loaded array instead would overwrite the saved one
+function mergeChanges(records, changes) {
+    const byId = new Map(changes.clear ? [] : records.map(record => [record.id, record]));
+    changes.records.forEach((record, id) => {
+        if (record) {
+            byId.set(id, record);
+        } else {
+            byId.delete(id);
+        }
+    });
+    return [...byId.values()];
+}
+
+// API Client
+// Set <meta name="dripnest-api" content="http://localhost:3000/api"> in
+// index.html to run the storefront against the backend; left empty, it
+// keeps using the local data above. GETs for the same URL share one request
+// while it is in flight and are cached by URL. A cached response is returned
+// at once and revalidated in the background with If-None-Match (the catalog
+// routes send ETags), so views the user has seen never wait on the network;
+// when the backend has something newer the caller's onUpdate gets it.
+const API_BASE_URL = (document.querySelector('meta[name="dripnest-api"]') || {}).content || '';
+
+const API_SETTINGS = {
+    cacheEntries: 200,
+    revalidateAfterMs: 5000, // younger responses are served without asking
+    pageSize: 24,
+    cartValidationDelayMs: 50,
+    cartValidationBatch: 100 // limit of /products/check-availability/batch
+};
+
+const apiCache = new Map(); // key -> { etag, data, fetchedAt }, least recently used first
+const apiInFlight = new Map(); // key -> Promise of a cache entry
+
+function apiEnabled() {
+    return API_BASE_URL !== '';
+}
+
+function apiHeaders(extra) {
+    const headers = { Accept: 'application/json', ...extra };
+    if (currentUser && currentUser.token) {
+        headers.Authorization = `Bearer ${currentUser.token}`;
+    }
+    return headers;
+}
+
+// Per signed-in user, so one user's responses are never served to another
+function apiCacheKey(url) {
+    return `${currentUser && currentUser.token ? currentUser.id : ''} ${url}`;
+}
+
+async function readApiResponse(response) {
+    const body = await response.json().catch(() => ({}));
+    if (!response.ok) {
+        const message = body.error || (body.errors && body.errors[0] && body.errors[0].msg) ||
+            `Request failed (${response.status})`;
+        const error = new Error(message);
+        error.status = response.status;
+        throw error;
+    }
+    return body;
+}
+
+// options.reload skips every cache, the service worker's included, for
+// reads that must see a write the page just made
+function apiGet(path, options = {}) {
+    const url = API_BASE_URL + path;
+    const key = apiCacheKey(url);
+    const cached = apiCache.get(key);
+    if (!cached || options.reload) {
+        return fetchIntoCache(url, key, options.reload).then(entry => entry.data);
+    }
+    
+    apiCache.delete(key);
+    apiCache.set(key, cached);
+    if (Date.now() - cached.fetchedAt > API_SETTINGS.revalidateAfterMs) {
+        fetchIntoCache(url, key)
+            .then(entry => {
+                if (entry !== cached && options.onUpdate) {
+                    options.onUpdate(entry.data);
+                }
+            })
+            .catch(error => console.error('Revalidation failed:', url, error));
+    }
+    return Promise.resolve(cached.data);
+}
 
-// Initialize data from localStorage or use sample data
-function initializeData() {
-    // Load products
-    const savedProducts = localStorage.getItem('dripnest-products');
-    if (savedProducts) {
-        products = JSON.parse(savedProducts);
+// Warm the cache for a view the user is likely to open next
+function prefetchApi(path) {
+    const run = () => apiGet(path).catch(() => {});
+    if (window.requestIdleCallback) {
+        window.requestIdleCallback(run);
     } else {
-        products = sampleData.sampleProducts;
-        localStorage.setItem('dripnest-products', JSON.stringify(products));
+        setTimeout(run, 0);
+    }
+}
+
+function fetchIntoCache(url, key, reload) {
+    if (apiInFlight.has(key) && !reload) {
+        return apiInFlight.get(key);
     }
     
-    // Load customers
-    const savedCustomers = localStorage.getItem('dripnest-customers');
-    if (savedCustomers) {
-        customers = JSON.parse(savedCustomers);
+    const cached = apiCache.get(key);
+    const request = fetch(url, {
+        headers: apiHeaders(cached && cached.etag ? { 'If-None-Match': cached.etag } : {}),
+        cache: reload ? 'reload' : 'default'
+    })
+        .then(async response => {
+            if (response.status === 304 && cached) {
+                cached.fetchedAt = Date.now();
+                return cached;
+            }
+            const entry = { etag: response.headers.get('ETag'), data: await readApiResponse(response), fetchedAt: Date.now() };
+            apiCache.delete(key);
+            apiCache.set(key, entry);
+            if (apiCache.size > API_SETTINGS.cacheEntries) {
+                apiCache.delete(apiCache.keys().next().value);
+            }
+            return entry;
+        })
+        .finally(() => {
+            if (apiInFlight.get(key) === request) apiInFlight.delete(key);
+        });
+    apiInFlight.set(key, request);
+    return request;
+}
+
+function apiPost(path, body) {
+    return apiSend('POST', path, body || {});
+}
+
+function apiSend(method, path, body, headers) {
+    return fetch(API_BASE_URL + path, {
+        method: method,
+        headers: apiHeaders({ 'Content-Type': 'application/json', ...headers }),
+        body: body === undefined ? undefined : JSON.stringify(body)
+    }).then(readApiResponse);
+}
+
+// Cart lines checked within cartValidationDelayMs of each other share one
+// request to the batch availability endpoint
+const cartValidation = { queue: [], timer: null };
+
+function validateCartLine(line) {
+    return new Promise((resolve, reject) => {
+        cartValidation.queue.push({ line: line, resolve: resolve, reject: reject });
+        if (!cartValidation.timer) {
+            cartValidation.timer = setTimeout(flushCartValidation, API_SETTINGS.cartValidationDelayMs);
+        }
+    });
+}
+
+function validateCart(lines) {
+    return Promise.all(lines.map(validateCartLine));
+}
+
+function flushCartValidation() {
+    const queued = cartValidation.queue;
+    cartValidation.queue = [];
+    cartValidation.timer = null;
+    
+    for (let i = 0; i < queued.length; i += API_SETTINGS.cartValidationBatch) {
+        const chunk = queued.slice(i, i + API_SETTINGS.cartValidationBatch);
+        apiPost('/products/check-availability/batch', {
+            items: chunk.map(({ line }) => ({ productId: cartProductId(line), size: line.size || undefined, quantity: line.quantity }))
+        })
+            .then(result => chunk.forEach((entry, index) => entry.resolve(result.items[index])))
+            .catch(error => chunk.forEach(entry => entry.reject(error)));
+    }
+}
+
+// Catalog from the API: `products` holds the pages of the current query
+// loaded so far. The next page is prefetched as soon as a page arrives and
+// appended when the grid scrolls near its end.
+const catalogQuery = {
+    search: '',
+    category: '',
+    generation: 0,
+    ready: null, // Promise of the first page
+    nextPath: null,
+    loadingMore: null
+};
+
+function productsPath(query, pagination) {
+    const params = new URLSearchParams({ limit: API_SETTINGS.pageSize, includeTotal: 'false' });
+    if (query.search) params.set('search', query.search);
+    if (query.category) params.set('category', query.category);
+    if (pagination && pagination.nextCursor) {
+        params.set('cursor', pagination.nextCursor);
+    } else if (pagination && pagination.currentPage) {
+        // Relevance-ranked searches page by number
+        params.set('page', pagination.currentPage + 1);
+    }
+    return `/products?${params}`;
+}
+
+// Backend product documents in the shape the storefront renders
+function fromApiProduct(product) {
+    const mapped = {
+        id: product._id,
+        slug: product.slug,
+        name: product.name,
+        price: product.price,
+        description: product.description || '',
+        category: product.category,
+        stock: product.availableStock,
+        inStock: product.inStock,
+        image: product.images && product.images.length > 0 ? product.images[0].url : '',
+        isActive: product.isActive
+    };
+    // Listing cards leave variants out; a merged card keeps the ones the
+    // detail view loaded
+    if (product.variants) mapped.variants = product.variants;
+    return mapped;
+}
+
+// Local collection or the API's first page, whichever the storefront runs on
+function loadProducts() {
+    if (!apiEnabled()) return loadCollection('products');
+    return catalogQuery.ready || loadCatalog('', '');
+}
+
+function loadCatalog(search, category, reload) {
+    const generation = ++catalogQuery.generation;
+    Object.assign(catalogQuery, { search: search, category: category, nextPath: null, loadingMore: null });
+    
+    const isCurrent = () => generation === catalogQuery.generation;
+    catalogQuery.ready = apiGet(productsPath(catalogQuery), {
+        reload: reload,
+        // A changed first page is merged into whatever has been loaded since
+        onUpdate: page => { if (isCurrent()) applyCatalogPage(page, true); }
+    })
+        .then(page => { if (isCurrent()) applyCatalogPage(page, false); })
+        .catch(error => {
+            console.error('Failed to load products:', error);
+            showError('Could not load products. Please try again.');
+        });
+    return catalogQuery.ready;
+}
+
+function applyCatalogPage(page, merge) {
+    const incoming = page.products.map(fromApiProduct);
+    if (merge) {
+        incoming.forEach(product => {
+            // Updated in place, so its slot in `products` and any open
+            // detail view see the new fields
+            const existing = findProduct(product.id);
+            if (existing) {
+                Object.assign(existing, product);
+                indexProduct(existing);
+            } else {
+                products.push(product);
+                indexProduct(product);
+            }
+        });
     } else {
-        customers = sampleData.sampleCustomers;
-        localStorage.setItem('dripnest-customers', JSON.stringify(customers));
+        products = incoming;
+        buildCatalogIndex();
     }
     
-    // Load orders
-    const savedOrders = localStorage.getItem('dripnest-orders');
-    if (savedOrders) {
-        orders = JSON.parse(savedOrders);
+    // Only advance from the newest page; a revalidated first page keeps it
+    if (!merge || !catalogQuery.nextPath) {
+        catalogQuery.nextPath = page.pagination.hasNextPage ? productsPath(catalogQuery, page.pagination) : null;
+    }
+    if (catalogQuery.nextPath) {
+        prefetchApi(catalogQuery.nextPath);
     }
     
-    // Check for logged in user
-    const savedUser = localStorage.getItem('dripnest-current-user');
-    if (savedUser) {
-        currentUser = JSON.parse(savedUser);
-        updateAuthUI();
+    if (currentPage === 'home') renderFeaturedProducts();
+    if (currentPage === 'products') renderAllProducts();
+    maybeLoadMoreProducts();
+}
+
+// Append the next page once the end of the grid is within two screens
+function maybeLoadMoreProducts() {
+    if (!apiEnabled() || !catalogQuery.nextPath || catalogQuery.loadingMore) return;
+    const grid = document.getElementById('all-products-grid');
+    if (!grid || grid.offsetParent === null) return;
+    if (grid.getBoundingClientRect().bottom > window.innerHeight * 2) return;
+    
+    const generation = catalogQuery.generation;
+    const path = catalogQuery.nextPath;
+    const loading = apiGet(path)
+        .then(page => {
+            if (generation === catalogQuery.generation && path === catalogQuery.nextPath) {
+                catalogQuery.nextPath = null;
+                applyCatalogPage(page, true);
+            }
+        })
+        .catch(error => console.error('Failed to load more products:', error))
+        .finally(() => {
+            if (catalogQuery.loadingMore === loading) {
+                catalogQuery.loadingMore = null;
+            }
+        });
+    catalogQuery.loadingMore = loading;
+}
+
+// Service Worker
+// sw.js precaches the app shell, caches catalog responses and images, and
+// queues order submissions made while offline. It is told the API base URL
+// so it knows which requests are catalog reads and which are checkouts.
+// Queued orders are stored without the token; the worker asks the page for
+// the current one when it sends them.
+function registerServiceWorker() {
+    if (!('serviceWorker' in navigator) || location.protocol === 'file:') return;
+    
+    // After the page has loaded, so installing never competes with it
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register(`sw.js?api=${encodeURIComponent(API_BASE_URL)}`)
+            .catch(error => console.error('Service worker registration failed:', error));
+        replayQueuedCheckouts();
+    });
+    
+    navigator.serviceWorker.addEventListener('message', event => {
+        if (!event.data) return;
+        if (event.data.type === 'token-request') {
+            event.ports[0].postMessage({ token: currentUser && currentUser.token ? currentUser.token : null });
+            return;
+        }
+        if (event.data.type !== 'checkout-replayed') return;
+        if (event.data.ok) {
+            showSuccess('Your order from while you were offline has been placed.');
+        } else {
+            showError(`Your order from while you were offline could not be placed: ${event.data.result.error || event.data.status}`);
+        }
+    });
+    
+    // Browsers without Background Sync replay queued checkouts from here
+    window.addEventListener('online', replayQueuedCheckouts);
+}
+
+function purgeCachedCatalog() {
+    if ('serviceWorker' in navigator && navigator.serviceWorker.controller) {
+        navigator.serviceWorker.controller.postMessage({ type: 'purge-catalog' });
+    }
+}
+
+// Also after a sign-in: orders queued by this user, or left by an expired
+// token, can go out now
+function replayQueuedCheckouts() {
+    if ('serviceWorker' in navigator && navigator.serviceWorker.controller) {
+        navigator.serviceWorker.controller.postMessage({ type: 'replay-checkouts' });
     }
 }
 
@@ -224,16 +792,39 @@ function setupEventListeners() {
         });
     });
     
-    // Product search and filter
+    // Product search and filter - typing is debounced, the category applies at once
     const searchInput = document.getElementById('search-products');
     if (searchInput) {
-        searchInput.addEventListener('input', filterProducts);
+        searchInput.addEventListener('input', debounce(filterProducts, GRID_SETTINGS.filterDebounceMs));
     }
     
     const categoryFilter = document.getElementById('category-filter');
     if (categoryFilter) {
         categoryFilter.addEventListener('change', filterProducts);
     }
+    
+    // One click listener per product grid instead of one per card
+    ['featured-products-grid', 'all-products-grid'].forEach(gridId => {
+        const grid = document.getElementById(gridId);
+        if (grid) {
+            grid.addEventListener('click', handleProductGridClick);
+        }
+    });
+    
+    // Write queued changes before the page goes away
+    document.addEventListener('visibilitychange', function() {
+        if (document.visibilityState === 'hidden') {
+            flushStorage();
+        }
+    });
+    window.addEventListener('pagehide', flushStorage);
+    
+    // Virtualized grids follow the viewport
+    window.addEventListener('scroll', scheduleGridWindowUpdate, { passive: true });
+    window.addEventListener('resize', function() {
+        productGrids.forEach(state => { state.measured = false; });
+        scheduleGridWindowUpdate();
+    });
 }
 
 // Page Navigation System - Fixed
@@ -267,7 +858,7 @@ function showPage(pageName) {
                 renderFeaturedProducts();
                 break;
             case 'products':
-                renderAllProducts();
+                loadProducts().then(() => renderAllProducts());
                 break;
             case 'admin-dashboard':
                 if (currentUser && currentUser.role === 'admin') {
@@ -290,11 +881,17 @@ function showPage(pageName) {
 }
 
 // Authentication Functions
-function handleCustomerLogin(e) {
+async function handleCustomerLogin(e) {
     e.preventDefault();
     const email = document.getElementById('login-email').value;
     const password = document.getElementById('login-password').value;
     
+    if (apiEnabled()) {
+        signInWithApi('/auth/login/customer', { username: email, password: password }, 'home', 'Login successful!');
+        return;
+    }
+    
+    await loadCollection('customers');
     const customer = customers.find(c => c.email === email && c.password === password);
     
     if (customer) {
@@ -308,7 +905,14 @@ function handleCustomerLogin(e) {
     }
 }
 
-function handleCustomerRegister(e) {
+// The API caps usernames at 30 characters and customers sign in with their
+// email, so derive one from the local part plus a suffix to keep it unique
+function usernameFromEmail(email) {
+    const local = email.split('@')[0].toLowerCase().replace(/[^a-z0-9._-]/g, '') || 'customer';
+    return `${local.slice(0, 24)}-${Math.random().toString(36).slice(2, 7).padEnd(5, '0')}`;
+}
+
+async function handleCustomerRegister(e) {
     e.preventDefault();
     const name = document.getElementById('register-name').value;
     const email = document.getElementById('register-email').value;
@@ -320,6 +924,13 @@ function handleCustomerRegister(e) {
         return;
     }
     
+    if (apiEnabled()) {
+        signInWithApi('/auth/register', { username: usernameFromEmail(email), email: email, password: password, name: name },
+            'home', 'Account created successfully!');
+        return;
+    }
+    
+    await loadCollection('customers');
     if (customers.find(c => c.email === email)) {
         showError('Email already exists');
         return;
@@ -335,7 +946,7 @@ function handleCustomerRegister(e) {
     };
     
     customers.push(newCustomer);
-    localStorage.setItem('dripnest-customers', JSON.stringify(customers));
+    saveRecord('customers', newCustomer);
     
     currentUser = newCustomer;
     localStorage.setItem('dripnest-current-user', JSON.stringify(currentUser));
@@ -349,6 +960,12 @@ function handleAdminLogin(e) {
     const username = document.getElementById('admin-username').value;
     const password = document.getElementById('admin-password').value;
     
+    if (apiEnabled()) {
+        signInWithApi('/auth/login/admin', { username: username, password: password },
+            'admin-dashboard', 'Admin login successful!');
+        return;
+    }
+    
     if (username === sampleData.adminUser.username && password === sampleData.adminUser.password) {
         currentUser = sampleData.adminUser;
         localStorage.setItem('dripnest-current-user', JSON.stringify(currentUser));
@@ -360,6 +977,20 @@ function handleAdminLogin(e) {
     }
 }
 
+// The backend returns { token, user }; the token rides along in currentUser
+function signInWithApi(path, credentials, page, message) {
+    apiPost(path, credentials)
+        .then(result => {
+            currentUser = { ...result.user, name: credentials.name || result.user.username, token: result.token };
+            localStorage.setItem('dripnest-current-user', JSON.stringify(currentUser));
+            updateAuthUI();
+            showPage(page);
+            showSuccess(message);
+            replayQueuedCheckouts();
+        })
+        .catch(error => showError(error.message));
+}
+
 function logout() {
     currentUser = null;
     localStorage.removeItem('dripnest-current-user');
@@ -384,43 +1015,222 @@ function updateAuthUI() {
 }
 
 // Product Rendering Functions - Fixed
+const FEATURED_PRODUCT_COUNT = 3;
+
 function renderFeaturedProducts() {
-    const grid = document.getElementById('featured-products-grid');
+    renderProductGrid('featured-products-grid', products.slice(0, FEATURED_PRODUCT_COUNT));
+}
+
+function renderAllProducts() {
+    renderProductGrid('all-products-grid', products);
+}
+
+// Product Grid Rendering
+// Cards are keyed by product id and reused between renders, so a filter
+// change only touches the cards that appear, disappear or changed. Grids
+// longer than virtualizeAbove keep just the rows around the viewport in
+// the DOM; padding on the grid stands in for the rows above and below.
+const GRID_SETTINGS = {
+    virtualizeAbove: 60,
+    overscanRows: 2,
+    minCardWidth: 300, // minmax() in .products__grid
+    estimatedRowHeight: 400, // until a card has been measured
+    cardCacheSize: 300, // detached cards kept for reuse, per grid
+    filterDebounceMs: 150
+};
+
+const productGrids = new Map();
+let gridUpdateScheduled = false;
+
+function getGridState(grid) {
+    let state = productGrids.get(grid.id);
+    if (!state || state.grid !== grid) {
+        state = {
+            grid: grid,
+            items: [],
+            cards: new Map(), // product id -> { node, product, signature }
+            range: null,
+            columns: 1,
+            rowHeight: GRID_SETTINGS.estimatedRowHeight,
+            measured: false
+        };
+        productGrids.set(grid.id, state);
+    }
+    return state;
+}
+
+function renderProductGrid(gridId, items) {
+    const grid = document.getElementById(gridId);
     if (!grid) return;
     
-    grid.innerHTML = '';
+    const state = getGridState(grid);
+    state.items = items;
+    state.range = null;
+    updateGridWindow(state);
+}
+
+function isVirtualized(state) {
+    return state.items.length > GRID_SETTINGS.virtualizeAbove;
+}
+
+function measureGrid(state) {
+    const grid = state.grid;
+    const style = window.getComputedStyle(grid);
+    const columnGap = parseFloat(style.columnGap) || 0;
+    const rowGap = parseFloat(style.rowGap) || 0;
+    const card = grid.querySelector('.product-card');
+    
+    state.columns = Math.max(1, Math.floor((grid.clientWidth + columnGap) / (GRID_SETTINGS.minCardWidth + columnGap)));
+    if (card && card.offsetHeight > 0) {
+        state.rowHeight = card.offsetHeight + rowGap;
+        state.measured = true;
+    }
+}
+
+function updateGridWindow(state) {
+    const items = state.items;
+    const virtualized = isVirtualized(state);
+    let start = 0;
+    let end = items.length;
+    
+    if (virtualized) {
+        if (!state.measured) measureGrid(state);
+        const top = state.grid.getBoundingClientRect().top;
+        const firstRow = Math.max(0, Math.floor(-top / state.rowHeight) - GRID_SETTINGS.overscanRows);
+        const lastRow = Math.max(firstRow, Math.ceil((window.innerHeight - top) / state.rowHeight) + GRID_SETTINGS.overscanRows);
+        start = Math.min(items.length, firstRow * state.columns);
+        end = Math.min(items.length, lastRow * state.columns);
+    }
     
-    // Show first 3 products
-    const featuredProducts = products.slice(0, 3);
+    if (state.range && state.range.start === start && state.range.end === end) return;
+    state.range = { start: start, end: end };
     
-    featuredProducts.forEach(product => {
-        const productCard = createProductCard(product);
-        grid.appendChild(productCard);
-    });
+    syncGridCards(state, items.slice(start, end));
+    
+    if (virtualized) {
+        const totalRows = Math.ceil(items.length / state.columns);
+        const rowsAbove = Math.floor(start / state.columns);
+        const rowsBelow = totalRows - Math.ceil(end / state.columns);
+        state.grid.style.paddingTop = `${rowsAbove * state.rowHeight}px`;
+        state.grid.style.paddingBottom = `${rowsBelow * state.rowHeight}px`;
+        
+        // The first real measurement can change how many rows fit
+        if (!state.measured) {
+            measureGrid(state);
+            if (state.measured) {
+                state.range = null;
+                updateGridWindow(state);
+            }
+        }
+    } else {
+        state.grid.style.paddingTop = '';
+        state.grid.style.paddingBottom = '';
+    }
 }
 
-function renderAllProducts() {
-    const grid = document.getElementById('all-products-grid');
-    if (!grid) return;
+// Make the grid's children exactly `visible`, in order, reusing cards
+function syncGridCards(state, visible) {
+    const grid = state.grid;
+    const wanted = new Set(visible.map(product => String(product.id)));
+    
+    // Remove first: what remains keeps its relative order, so a narrowing
+    // filter needs no moves at all
+    Array.from(grid.children).forEach(child => {
+        if (!wanted.has(child.dataset.productId)) {
+            child.remove();
+        }
+    });
     
-    grid.innerHTML = '';
+    let cursor = grid.firstElementChild;
+    visible.forEach(product => {
+        const card = getProductCard(state, product);
+        if (card === cursor) {
+            cursor = cursor.nextElementSibling;
+        } else {
+            grid.insertBefore(card, cursor);
+        }
+    });
     
-    products.forEach(product => {
-        const productCard = createProductCard(product);
-        grid.appendChild(productCard);
+    trimCardCache(state);
+}
+
+function getProductCard(state, product) {
+    const key = String(product.id);
+    const signature = productCardSignature(product);
+    let entry = state.cards.get(key);
+    
+    if (entry) {
+        // Re-inserted so the Map stays in least-recently-used order
+        state.cards.delete(key);
+        if (entry.signature !== signature) {
+            entry.node.innerHTML = productCardMarkup(product);
+            entry.signature = signature;
+        }
+    } else {
+        entry = { node: createProductCard(product), signature: signature };
+    }
+    
+    entry.product = product;
+    state.cards.set(key, entry);
+    return entry.node;
+}
+
+function trimCardCache(state) {
+    let excess = state.cards.size - GRID_SETTINGS.cardCacheSize;
+    if (excess <= 0) return;
+    
+    for (const [key, entry] of state.cards) {
+        if (excess <= 0) break;
+        if (!entry.node.isConnected) {
+            state.cards.delete(key);
+            excess--;
+        }
+    }
+}
+
+function scheduleGridWindowUpdate() {
+    if (gridUpdateScheduled) return;
+    gridUpdateScheduled = true;
+    
+    window.requestAnimationFrame(function() {
+        gridUpdateScheduled = false;
+        productGrids.forEach(state => {
+            // Skip grids on hidden pages
+            if (isVirtualized(state) && state.grid.offsetParent !== null) {
+                updateGridWindow(state);
+            }
+        });
+        maybeLoadMoreProducts();
     });
 }
 
+function handleProductGridClick(e) {
+    const card = e.target.closest('.product-card');
+    const state = productGrids.get(this.id);
+    if (!card || !state) return;
+    
+    const entry = state.cards.get(card.dataset.productId);
+    if (entry) {
+        openProductDetail(entry.product.id);
+    }
+}
+
+// Everything the card shows; a card is only re-rendered when this changes
+function productCardSignature(product) {
+    return `${product.name}|${product.category}|${product.price}|${product.inStock}|${product.stock}`;
+}
+
 function createProductCard(product) {
     const card = document.createElement('div');
     card.className = 'product-card';
+    card.dataset.productId = product.id;
+    card.innerHTML = productCardMarkup(product);
     
-    // Fixed: Properly bind the product ID to avoid closure issues
-    card.addEventListener('click', function() {
-        openProductDetail(product.id);
-    });
-    
-    card.innerHTML = `
+    return card;
+}
+
+function productCardMarkup(product) {
+    return `
         <div class="product-card__image">
             ${product.name}
         </div>
@@ -433,24 +1243,53 @@ function createProductCard(product) {
             </div>
         </div>
     `;
-    
-    return card;
 }
 
 function openProductDetail(productId) {
     console.log('Opening product detail for ID:', productId); // Debug log
-    const product = products.find(p => p.id === productId);
+    const product = findProduct(productId);
     if (!product) {
         console.error('Product not found:', productId);
         return;
     }
     
+    renderProductDetail(product);
+    openModal('product-modal');
+    
+    // Listing cards carry no description; show the card at once and fill in
+    // the full product when it arrives
+    if (apiEnabled()) {
+        const refresh = detail => {
+            Object.assign(product, fromApiProduct(detail));
+            // Sold without a size
+            if (!product.variants) product.variants = [];
+            const productDetail = document.getElementById('product-detail');
+            if (productDetail && productDetail.dataset.productId === String(product.id)) {
+                renderProductDetail(product);
+            }
+        };
+        apiGet(`/products/${encodeURIComponent(product.slug || product.id)}`, { onUpdate: refresh })
+            .then(refresh)
+            .catch(error => console.error('Failed to load product:', error));
+    }
+}
+
+function renderProductDetail(product) {
     const productDetail = document.getElementById('product-detail');
     if (!productDetail) {
         console.error('Product detail container not found');
         return;
     }
     
+    // API listing cards carry no variants; the sizes come with the full product
+    const sizesPending = apiEnabled() && product.variants === undefined;
+    let action = `<button class="btn btn--primary btn--lg" onclick="addToCart(${idArg(product.id)})">Add to Cart</button>`;
+    if (!product.inStock) {
+        action = '<button class="btn btn--outline btn--lg" disabled>Out of Stock</button>';
+    } else if (sizesPending) {
+        action = '<button class="btn btn--primary btn--lg" disabled>Loading sizes…</button>';
+    }
+    
     productDetail.innerHTML = `
         <div class="product-detail__image">
             ${product.name} - Image
@@ -459,52 +1298,64 @@ function openProductDetail(productId) {
         <div class="product-detail__category">Category: ${product.category}</div>
         <div class="product-detail__price">$${product.price.toFixed(2)}</div>
         <p class="product-detail__description">${product.description}</p>
+        ${product.inStock && hasSizes(product) ? `
+            <div class="form-group">
+                <label class="form-label" for="product-size">Size</label>
+                <select id="product-size" class="form-control">
+                    <option value="">Select Size</option>
+                    ${product.variants.map(variant => variant.stock > 0 ?
+                        `<option value="${variant.size}">${variant.size}</option>` :
+                        `<option value="${variant.size}" disabled>${variant.size} (sold out)</option>`
+                    ).join('')}
+                </select>
+            </div>
+        ` : ''}
         <div class="product-detail__actions">
-            ${product.inStock ? 
-                `<button class="btn btn--primary btn--lg" onclick="addToCart(${product.id})">Add to Cart</button>` :
-                `<button class="btn btn--outline btn--lg" disabled>Out of Stock</button>`
-            }
+            ${action}
             <button class="btn btn--outline btn--lg" onclick="closeModal('product-modal')">Continue Shopping</button>
         </div>
     `;
-    
-    openModal('product-modal');
+    productDetail.dataset.productId = product.id;
 }
 
 // Cart Management - Fixed
-function loadCart() {
-    const savedCart = localStorage.getItem('dripnest-cart');
-    if (savedCart) {
-        cart = JSON.parse(savedCart);
-    }
-}
-
-function saveCart() {
-    localStorage.setItem('dripnest-cart', JSON.stringify(cart));
-}
-
 function addToCart(productId) {
     console.log('Adding to cart:', productId); // Debug log
-    const product = products.find(p => p.id === productId);
+    const product = findProduct(productId);
     if (!product || !product.inStock) {
         showError('Product is not available');
         return;
     }
     
-    const existingItem = cart.find(item => item.id === productId);
+    // Each size of a product is its own cart line
+    let size = '';
+    if (hasSizes(product)) {
+        const sizeSelect = document.getElementById('product-size');
+        size = sizeSelect ? sizeSelect.value : '';
+        if (!size) {
+            showError('Please select a size');
+            return;
+        }
+    }
+    const lineId = size ? `${product.id}:${size}` : product.id;
     
-    if (existingItem) {
-        existingItem.quantity += 1;
+    let item = cart.find(item => item.id === lineId);
+    
+    if (item) {
+        item.quantity += 1;
     } else {
-        cart.push({
-            id: product.id,
+        item = {
+            id: lineId,
+            productId: product.id,
             name: product.name,
             price: product.price,
             quantity: 1
-        });
+        };
+        if (size) item.size = size;
+        cart.push(item);
     }
     
-    saveCart();
+    saveRecord('cart', item);
     updateCartCount();
     showSuccess('Product added to cart!');
     closeModal('product-modal');
@@ -519,7 +1370,7 @@ function updateCartQuantity(productId, change) {
     if (item.quantity <= 0) {
         removeFromCart(productId);
     } else {
-        saveCart();
+        saveRecord('cart', item);
         updateCartCount();
         renderCart();
     }
@@ -527,11 +1378,20 @@ function updateCartQuantity(productId, change) {
 
 function removeFromCart(productId) {
     cart = cart.filter(item => item.id !== productId);
-    saveCart();
+    deleteRecord('cart', productId);
     updateCartCount();
     renderCart();
 }
 
+// Lines saved before sizes were tracked carry only the product id
+function cartProductId(item) {
+    return item.productId || item.id;
+}
+
+function cartLineName(item) {
+    return item.size ? `${item.name} (${item.size})` : item.name;
+}
+
 function updateCartCount() {
     const cartCount = document.getElementById('cart-count');
     if (!cartCount) return;
@@ -565,15 +1425,15 @@ function renderCart() {
         cartItem.innerHTML = `
             <div class="cart-item__image">${item.name}</div>
             <div class="cart-item__details">
-                <div class="cart-item__title">${item.name}</div>
+                <div class="cart-item__title">${cartLineName(item)}</div>
                 <div class="cart-item__price">$${item.price.toFixed(2)}</div>
                 <div class="cart-item__quantity">
-                    <button class="quantity-btn" onclick="updateCartQuantity(${item.id}, -1)">−</button>
+                    <button class="quantity-btn" onclick="updateCartQuantity(${idArg(item.id)}, -1)">−</button>
                     <span>${item.quantity}</span>
-                    <button class="quantity-btn" onclick="updateCartQuantity(${item.id}, 1)">+</button>
+                    <button class="quantity-btn" onclick="updateCartQuantity(${idArg(item.id)}, 1)">+</button>
                 </div>
             </div>
-            <button class="cart-item__remove" onclick="removeFromCart(${item.id})">
+            <button class="cart-item__remove" onclick="removeFromCart(${idArg(item.id)})">
                 <svg width="20" height="20" viewBox="0 0 20 20" fill="none">
                     <path d="M15 5L5 15M5 5L15 15" stroke="currentColor" stroke-width="2" stroke-linecap="round"/>
                 </svg>
@@ -586,7 +1446,7 @@ function renderCart() {
     cartTotal.textContent = total.toFixed(2);
 }
 
-function proceedToCheckout() {
+async function proceedToCheckout() {
     if (cart.length === 0) {
         showError('Your cart is empty!');
         return;
@@ -599,6 +1459,20 @@ function proceedToCheckout() {
         return;
     }
     
+    if (apiEnabled()) {
+        try {
+            const results = await validateCart(cart);
+            const unavailable = cart.filter((item, index) => !results[index].available);
+            if (unavailable.length > 0) {
+                showError(`Not available in the requested quantity: ${unavailable.map(cartLineName).join(', ')}`);
+                return;
+            }
+        } catch (error) {
+            showError(error.message);
+            return;
+        }
+    }
+    
     renderCheckout();
     closeModal('cart-modal');
     openModal('checkout-modal');
@@ -628,7 +1502,7 @@ function renderCheckout() {
         const checkoutItem = document.createElement('div');
         checkoutItem.className = 'checkout-item';
         checkoutItem.innerHTML = `
-            <span>${item.name} × ${item.quantity}</span>
+            <span>${cartLineName(item)} × ${item.quantity}</span>
             <span>$${itemTotal.toFixed(2)}</span>
         `;
         
@@ -638,37 +1512,93 @@ function renderCheckout() {
     checkoutTotal.textContent = total.toFixed(2);
 }
 
-function handleCheckout(e) {
+async function handleCheckout(e) {
     e.preventDefault();
     
-    const orderData = {
-        id: Date.now(),
-        customerId: currentUser.id,
-        customerName: document.getElementById('checkout-name').value,
-        customerEmail: document.getElementById('checkout-email').value,
-        shippingAddress: document.getElementById('checkout-address').value,
-        items: [...cart],
-        total: cart.reduce((sum, item) => sum + (item.price * item.quantity), 0),
-        date: new Date().toISOString(),
-        status: 'Pending'
+    const address = {
+        street: document.getElementById('checkout-address').value.trim(),
+        city: document.getElementById('checkout-city').value.trim(),
+        zipCode: document.getElementById('checkout-zip').value.trim()
     };
     
-    orders.push(orderData);
-    localStorage.setItem('dripnest-orders', JSON.stringify(orders));
+    if (apiEnabled()) {
+        const placed = await placeApiOrder(address);
+        if (!placed) return;
+    } else {
+        const orderData = {
+            id: Date.now(),
+            customerId: currentUser.id,
+            customerName: document.getElementById('checkout-name').value,
+            customerEmail: document.getElementById('checkout-email').value,
+            shippingAddress: `${address.street}, ${address.city} ${address.zipCode}`,
+            items: [...cart],
+            total: cart.reduce((sum, item) => sum + (item.price * item.quantity), 0),
+            date: new Date().toISOString(),
+            status: 'Pending'
+        };
+        
+        await loadCollection('orders');
+        orders.push(orderData);
+        saveRecord('orders', orderData);
+        showSuccess('Order placed successfully!');
+    }
     
     // Clear cart
     cart = [];
-    saveCart();
+    clearCollection('cart');
     updateCartCount();
     
     closeModal('checkout-modal');
-    showSuccess('Order placed successfully!');
     
     // Reset form
     const form = document.getElementById('checkout-form');
     if (form) form.reset();
 }
 
+// The Idempotency-Key is kept for a resubmission of the same order after a
+// network failure, so a request that did reach the server can't place a
+// second order. Once the server has answered, the next submission is new.
+let checkoutAttempt = null; // { body, key }
+
+// POST /orders; resolves to whether the order was placed
+async function placeApiOrder(address) {
+    const names = document.getElementById('checkout-name').value.trim().split(/\s+/);
+    if (names.length < 2) {
+        showError('Please enter your first and last name');
+        return false;
+    }
+    
+    const order = {
+        items: cart.map(item => ({ productId: cartProductId(item), size: item.size || undefined, quantity: item.quantity })),
+        shippingAddress: { firstName: names[0], lastName: names.slice(1).join(' '), ...address },
+        // The card fields are a placeholder; the backend records card payments as Stripe
+        paymentMethod: 'stripe'
+    };
+    const body = JSON.stringify(order);
+    if (!checkoutAttempt || checkoutAttempt.body !== body) {
+        checkoutAttempt = { body: body, key: newIdempotencyKey() };
+    }
+    
+    try {
+        const result = await apiSend('POST', '/orders', order, { 'Idempotency-Key': checkoutAttempt.key });
+        checkoutAttempt = null;
+        // 202: offline, and the service worker has queued the order
+        showSuccess(result.queued ? result.message : `Order ${result.order.orderNumber} placed successfully!`);
+        return true;
+    } catch (error) {
+        if (error.status) checkoutAttempt = null;
+        showError(error.message);
+        return false;
+    }
+}
+
+function newIdempotencyKey() {
+    if (window.crypto && window.crypto.randomUUID) {
+        return window.crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
 // Admin Functions
 function renderAdminDashboard() {
     showAdminSection('products');
@@ -688,22 +1618,55 @@ function showAdminSection(sectionName) {
         // Load section-specific content
         switch(sectionName) {
             case 'products':
-                renderProductsTable();
+                loadAdminProducts().then(() => renderProductsTable());
                 break;
             case 'orders':
-                renderOrdersList();
+                loadOrders(renderOrdersList);
                 break;
         }
     }
 }
 
+// In API mode the admin panel reads and writes through /admin/products;
+// locally it edits the products collection
+function loadAdminProducts() {
+    if (!apiEnabled()) return loadCollection('products');
+    return apiGet('/admin/products?limit=100&includeTotal=false')
+        .then(page => { adminProducts = page.products.map(fromApiProduct); })
+        .catch(error => showError(error.message));
+}
+
+function getAdminProducts() {
+    return apiEnabled() ? adminProducts : products;
+}
+
+function findAdminProduct(productId) {
+    if (!apiEnabled()) return findProduct(productId);
+    return adminProducts.find(product => String(product.id) === String(productId));
+}
+
+function hasSizes(product) {
+    return Boolean(product.variants && product.variants.length > 0);
+}
+
+// Cached admin and catalog responses predate the write, here and in the
+// service worker's runtime cache; the current listing is read past both
+function afterAdminWrite(message) {
+    apiCache.clear();
+    purgeCachedCatalog();
+    loadAdminProducts().then(() => renderProductsTable());
+    loadCatalog(catalogQuery.search, catalogQuery.category, true);
+    showSuccess(message);
+}
+
 function renderProductsTable() {
     const tbody = document.getElementById('products-table-body');
     if (!tbody) return;
     
     tbody.innerHTML = '';
     
-    products.forEach(product => {
+    getAdminProducts().forEach(product => {
+        const deleted = product.isActive === false;
         const row = document.createElement('tr');
         row.innerHTML = `
             <td>${product.id}</td>
@@ -712,18 +1675,18 @@ function renderProductsTable() {
             <td>$${product.price.toFixed(2)}</td>
             <td>${product.stock}</td>
             <td>
-                <span class="status ${product.inStock ? 'status--success' : 'status--error'}">
-                    ${product.inStock ? 'In Stock' : 'Out of Stock'}
+                <span class="status ${product.inStock && !deleted ? 'status--success' : 'status--error'}">
+                    ${deleted ? 'Deleted' : product.inStock ? 'In Stock' : 'Out of Stock'}
                 </span>
             </td>
             <td>
                 <div class="table-actions">
-                    <button class="btn btn--sm btn--outline" onclick="editProduct(${product.id})">Edit</button>
+                    <button class="btn btn--sm btn--outline" onclick="editProduct(${idArg(product.id)})">Edit</button>
                     <button class="btn btn--sm ${product.inStock ? 'btn--danger' : 'btn--success'}" 
-                            onclick="toggleProductStock(${product.id})">
+                            onclick="toggleProductStock(${idArg(product.id)})">
                         ${product.inStock ? 'Mark Out of Stock' : 'Mark In Stock'}
                     </button>
-                    <button class="btn btn--sm btn--danger" onclick="deleteProduct(${product.id})">Delete</button>
+                    <button class="btn btn--sm btn--danger" onclick="deleteProduct(${idArg(product.id)})" ${deleted ? 'disabled' : ''}>Delete</button>
                 </div>
             </td>
         `;
@@ -734,28 +1697,44 @@ function renderProductsTable() {
 function handleAddProduct(e) {
     e.preventDefault();
     
-    const newProduct = {
-        id: Date.now(),
+    const fields = {
         name: document.getElementById('product-name').value,
         category: document.getElementById('product-category').value,
         price: parseFloat(document.getElementById('product-price').value),
-        stock: parseInt(document.getElementById('product-stock').value),
-        description: document.getElementById('product-description').value,
-        inStock: parseInt(document.getElementById('product-stock').value) > 0,
+        description: document.getElementById('product-description').value
+    };
+    const stock = parseInt(document.getElementById('product-stock').value);
+    const form = document.getElementById('add-product-form');
+    
+    if (apiEnabled()) {
+        apiPost('/admin/products', { ...fields, totalStock: stock })
+            .then(() => {
+                if (form) form.reset();
+                afterAdminWrite('Product added successfully!');
+            })
+            .catch(error => showError(error.message));
+        return;
+    }
+    
+    const newProduct = {
+        id: Date.now(),
+        ...fields,
+        stock: stock,
+        inStock: stock > 0,
         image: 'placeholder.jpg'
     };
     
     products.push(newProduct);
-    localStorage.setItem('dripnest-products', JSON.stringify(products));
+    indexProduct(newProduct);
+    saveRecord('products', newProduct);
     
-    const form = document.getElementById('add-product-form');
     if (form) form.reset();
     renderProductsTable();
     showSuccess('Product added successfully!');
 }
 
 function editProduct(productId) {
-    const product = products.find(p => p.id === productId);
+    const product = findAdminProduct(productId);
     if (!product) return;
     
     // Fill edit form
@@ -765,6 +1744,8 @@ function editProduct(productId) {
     document.getElementById('edit-product-price').value = product.price;
     document.getElementById('edit-product-stock').value = product.stock;
     document.getElementById('edit-product-description').value = product.description;
+    // Sized products are stocked per size, from Mark In/Out of Stock
+    document.getElementById('edit-product-stock').disabled = apiEnabled() && hasSizes(product);
     
     openModal('edit-product-modal');
 }
@@ -772,45 +1753,81 @@ function editProduct(productId) {
 function handleEditProduct(e) {
     e.preventDefault();
     
-    const productId = parseInt(document.getElementById('edit-product-id').value);
-    const productIndex = products.findIndex(p => p.id === productId);
-    
-    if (productIndex !== -1) {
-        products[productIndex] = {
-            ...products[productIndex],
-            name: document.getElementById('edit-product-name').value,
-            category: document.getElementById('edit-product-category').value,
-            price: parseFloat(document.getElementById('edit-product-price').value),
-            stock: parseInt(document.getElementById('edit-product-stock').value),
-            description: document.getElementById('edit-product-description').value,
-            inStock: parseInt(document.getElementById('edit-product-stock').value) > 0
-        };
-        
-        localStorage.setItem('dripnest-products', JSON.stringify(products));
-        closeModal('edit-product-modal');
-        renderProductsTable();
-        showSuccess('Product updated successfully!');
+    // Read back from the form as a string; local ids are numbers
+    const productId = document.getElementById('edit-product-id').value;
+    const product = findAdminProduct(productId);
+    if (!product) return;
+    
+    const fields = {
+        name: document.getElementById('edit-product-name').value,
+        category: document.getElementById('edit-product-category').value,
+        price: parseFloat(document.getElementById('edit-product-price').value),
+        description: document.getElementById('edit-product-description').value
+    };
+    const stock = parseInt(document.getElementById('edit-product-stock').value);
+    
+    if (apiEnabled()) {
+        const update = hasSizes(product) ? fields : { ...fields, totalStock: stock };
+        apiSend('PUT', `/admin/products/${product.id}`, update)
+            .then(() => {
+                closeModal('edit-product-modal');
+                afterAdminWrite('Product updated successfully!');
+            })
+            .catch(error => showError(error.message));
+        return;
     }
+    
+    Object.assign(product, fields, { stock: stock, inStock: stock > 0 });
+    indexProduct(product);
+    saveRecord('products', product);
+    
+    closeModal('edit-product-modal');
+    renderProductsTable();
+    showSuccess('Product updated successfully!');
 }
 
 function toggleProductStock(productId) {
-    const product = products.find(p => p.id === productId);
+    const product = findAdminProduct(productId);
     if (!product) return;
     
+    if (apiEnabled()) {
+        let stock = 0;
+        if (!product.inStock) {
+            stock = parseInt(prompt(hasSizes(product) ? 'Stock quantity for each size:' : 'Stock quantity:'));
+            if (!(stock > 0)) return;
+        }
+        // One update per size, in turn: each save recomputes the product's
+        // available stock from the document it loaded
+        const updates = hasSizes(product) ? product.variants.map(variant => ({ size: variant.size, stock: stock })) : [{ stock: stock }];
+        updates.reduce((previous, update) => previous.then(() => apiSend('PUT', `/admin/products/${product.id}/stock`, update)), Promise.resolve())
+            .then(() => afterAdminWrite(`Product marked ${stock > 0 ? 'in stock' : 'out of stock'}!`))
+            .catch(error => showError(error.message));
+        return;
+    }
+    
     product.inStock = !product.inStock;
     if (!product.inStock) {
         product.stock = 0;
     }
     
-    localStorage.setItem('dripnest-products', JSON.stringify(products));
+    saveRecord('products', product);
     renderProductsTable();
     showSuccess(`Product marked ${product.inStock ? 'in stock' : 'out of stock'}!`);
 }
 
 function deleteProduct(productId) {
     if (confirm('Are you sure you want to delete this product?')) {
+        if (apiEnabled()) {
+            // Soft delete: the product leaves the catalog but stays listed here
+            apiSend('DELETE', `/admin/products/${productId}`)
+                .then(() => afterAdminWrite('Product deleted successfully!'))
+                .catch(error => showError(error.message));
+            return;
+        }
+        
         products = products.filter(p => p.id !== productId);
-        localStorage.setItem('dripnest-products', JSON.stringify(products));
+        unindexProduct(productId);
+        deleteRecord('products', productId);
         renderProductsTable();
         showSuccess('Product deleted successfully!');
     }
@@ -840,7 +1857,7 @@ function renderOrdersList() {
                 <strong>Customer:</strong> ${order.customerName} (${order.customerEmail})
             </div>
             <div>
-                <strong>Items:</strong> ${order.items.map(item => `${item.name} (${item.quantity})`).join(', ')}
+                <strong>Items:</strong> ${order.items.map(item => `${cartLineName(item)} (${item.quantity})`).join(', ')}
             </div>
             <div>
                 <strong>Status:</strong> <span class="status status--info">${order.status}</span>
@@ -850,6 +1867,37 @@ function renderOrdersList() {
     });
 }
 
+// Local orders, or from the API the signed-in customer's orders (all
+// orders for an admin); `render` runs again if a revalidation brings newer ones
+function loadOrders(render) {
+    if (!apiEnabled()) return loadCollection('orders').then(render);
+    const path = currentUser.role === 'admin' ?
+        '/admin/orders?limit=100&includeTotal=false' :
+        '/orders/my-orders?limit=50&includeTotal=false';
+    const apply = page => {
+        orders = page.orders.map(fromApiOrder);
+        render();
+    };
+    return apiGet(path, { onUpdate: apply })
+        .then(apply)
+        .catch(error => showError(error.message));
+}
+
+// Backend orders in the shape the order lists render
+function fromApiOrder(order) {
+    const customer = order.customer || {};
+    return {
+        id: order.orderNumber,
+        customerId: customer._id || order.customer,
+        customerName: customer.username,
+        customerEmail: customer.email,
+        items: order.items.map(item => ({ name: item.name, size: item.size, quantity: item.quantity })),
+        total: order.total,
+        date: order.createdAt,
+        status: order.status
+    };
+}
+
 // Customer Account Functions
 function renderCustomerAccount() {
     showAccountSection('profile');
@@ -872,7 +1920,7 @@ function showAccountSection(sectionName) {
                 renderProfileInfo();
                 break;
             case 'orders':
-                renderOrderHistory();
+                loadOrders(renderOrderHistory);
                 break;
         }
     }
@@ -895,7 +1943,7 @@ function renderOrderHistory() {
     const orderHistory = document.getElementById('order-history');
     if (!orderHistory) return;
     
-    const customerOrders = orders.filter(order => order.customerId === currentUser.id);
+    const customerOrders = orders.filter(order => String(order.customerId) === String(currentUser.id));
     
     if (customerOrders.length === 0) {
         orderHistory.innerHTML = '<p>No orders found.</p>';
@@ -914,7 +1962,7 @@ function renderOrderHistory() {
                 <div class="order-total">$${order.total.toFixed(2)}</div>
             </div>
             <div>
-                <strong>Items:</strong> ${order.items.map(item => `${item.name} (${item.quantity})`).join(', ')}
+                <strong>Items:</strong> ${order.items.map(item => `${cartLineName(item)} (${item.quantity})`).join(', ')}
             </div>
             <div>
                 <strong>Status:</strong> <span class="status status--info">${order.status}</span>
@@ -931,35 +1979,213 @@ function filterProducts() {
     
     if (!searchInput || !categoryFilter) return;
     
-    const searchTerm = searchInput.value.toLowerCase();
-    const categoryFilterValue = categoryFilter.value;
-    
-    let filteredProducts = products;
-    
-    if (searchTerm) {
-        filteredProducts = filteredProducts.filter(product =>
-            product.name.toLowerCase().includes(searchTerm) ||
-            product.description.toLowerCase().includes(searchTerm)
-        );
+    // The backend searches the whole catalog, not just the loaded pages
+    if (apiEnabled()) {
+        loadCatalog(searchInput.value.trim(), categoryFilter.value);
+        return;
     }
     
-    if (categoryFilterValue) {
-        filteredProducts = filteredProducts.filter(product =>
-            product.category === categoryFilterValue
-        );
+    const filteredProducts = searchCatalog(searchInput.value.toLowerCase(), categoryFilter.value);
+    renderProductGrid('all-products-grid', filteredProducts);
+}
+
+// Catalog Index
+// Built from `products` and patched on every admin change, so filtering and
+// lookups never lowercase or scan the whole catalog. Each product gets a
+// sequence number in catalog order; category buckets and n-gram postings
+// are ascending arrays of those numbers, so results come out in the same
+// order as `products`. The n-gram postings cover every 1-3 character
+// substring of name and description and are only built on the first search.
+const catalogIndex = {
+    byId: new Map(), // String(id) -> entry
+    entries: [], // seq -> entry, undefined once deleted
+    byCategory: new Map(), // category -> [seq]
+    grams: null, // 1-3 character substring -> [seq], built lazily
+    nextSeq: 0
+};
+
+const MAX_GRAM = 3;
+
+function buildCatalogIndex() {
+    catalogIndex.byId.clear();
+    catalogIndex.entries = [];
+    catalogIndex.byCategory.clear();
+    catalogIndex.grams = null;
+    catalogIndex.nextSeq = 0;
+    products.forEach(indexProduct);
+    
+    // Have the search postings ready before the first keystroke without
+    // delaying the first render
+    if (window.requestIdleCallback) {
+        window.requestIdleCallback(function() {
+            if (!catalogIndex.grams) buildGramIndex();
+        });
+    }
+}
+
+// Add a product, or re-index an edited one in place
+function indexProduct(product) {
+    const key = String(product.id);
+    const previous = catalogIndex.byId.get(key);
+    if (previous) {
+        removeFromPostings(previous);
     }
     
-    const grid = document.getElementById('all-products-grid');
-    if (!grid) return;
+    const entry = {
+        product: product,
+        seq: previous ? previous.seq : catalogIndex.nextSeq++,
+        // What the postings were built from: edits assign new fields to
+        // `product` before re-indexing, so removal can't read them from it
+        category: product.category,
+        // NUL keeps substrings from spanning the two fields
+        text: `${product.name}\u0000${product.description || ''}`.toLowerCase()
+    };
+    catalogIndex.byId.set(key, entry);
+    catalogIndex.entries[entry.seq] = entry;
     
-    grid.innerHTML = '';
+    insertSorted(getPosting(catalogIndex.byCategory, entry.category), entry.seq);
+    if (catalogIndex.grams) {
+        textGrams(entry.text).forEach(gram => {
+            insertSorted(getPosting(catalogIndex.grams, gram), entry.seq);
+        });
+    }
+}
+
+function unindexProduct(productId) {
+    const key = String(productId);
+    const entry = catalogIndex.byId.get(key);
+    if (!entry) return;
+    
+    removeFromPostings(entry);
+    catalogIndex.byId.delete(key);
+    catalogIndex.entries[entry.seq] = undefined;
+}
+
+function findProduct(productId) {
+    const entry = catalogIndex.byId.get(String(productId));
+    return entry ? entry.product : undefined;
+}
+
+// Products whose name or description contains `term` (already lowercased)
+// and, when given, in `category`; in catalog order
+function searchCatalog(term, category) {
+    if (!term) {
+        return category ? postingProducts(catalogIndex.byCategory.get(category) || []) : products;
+    }
+    if (!catalogIndex.grams) {
+        buildGramIndex();
+    }
     
-    filteredProducts.forEach(product => {
-        const productCard = createProductCard(product);
-        grid.appendChild(productCard);
+    // Up to MAX_GRAM characters the posting is the exact answer; longer
+    // terms check the substring against the shortest posting of their
+    // trigrams, which holds every match
+    let candidates = null;
+    if (term.length <= MAX_GRAM) {
+        candidates = catalogIndex.grams.get(term) || [];
+    } else {
+        for (const gram of textGrams(term, MAX_GRAM)) {
+            const posting = catalogIndex.grams.get(gram);
+            if (!posting) return [];
+            if (!candidates || posting.length < candidates.length) {
+                candidates = posting;
+            }
+        }
+    }
+    
+    const results = [];
+    candidates.forEach(seq => {
+        const entry = catalogIndex.entries[seq];
+        if (category && entry.category !== category) return;
+        if (term.length > MAX_GRAM && !entry.text.includes(term)) return;
+        results.push(entry.product);
+    });
+    return results;
+}
+
+function postingProducts(posting) {
+    return posting.map(seq => catalogIndex.entries[seq].product);
+}
+
+function buildGramIndex() {
+    catalogIndex.grams = new Map();
+    catalogIndex.entries.forEach(entry => {
+        if (!entry) return;
+        textGrams(entry.text).forEach(gram => {
+            getPosting(catalogIndex.grams, gram).push(entry.seq);
+        });
+    });
+}
+
+// Distinct substrings of `text` of length `min` to MAX_GRAM
+function textGrams(text, min = 1) {
+    const grams = new Set();
+    for (let i = 0; i < text.length; i++) {
+        for (let length = min; length <= MAX_GRAM && i + length <= text.length; length++) {
+            const gram = text.slice(i, i + length);
+            if (gram.includes('\u0000')) break;
+            grams.add(gram);
+        }
+    }
+    return grams;
+}
+
+function removeFromPostings(entry) {
+    removeSorted(catalogIndex.byCategory.get(entry.category), entry.seq);
+    if (!catalogIndex.grams) return;
+    
+    textGrams(entry.text).forEach(gram => {
+        const posting = catalogIndex.grams.get(gram);
+        removeSorted(posting, entry.seq);
+        if (posting && posting.length === 0) {
+            catalogIndex.grams.delete(gram);
+        }
     });
 }
 
+function getPosting(map, key) {
+    let posting = map.get(key);
+    if (!posting) {
+        posting = [];
+        map.set(key, posting);
+    }
+    return posting;
+}
+
+// Index of the first element >= value in an ascending array
+function lowerBound(list, value) {
+    let low = 0;
+    let high = list.length;
+    while (low < high) {
+        const mid = (low + high) >> 1;
+        if (list[mid] < value) {
+            low = mid + 1;
+        } else {
+            high = mid;
+        }
+    }
+    return low;
+}
+
+function insertSorted(list, value) {
+    // Appends are the common case while building
+    if (list.length === 0 || list[list.length - 1] < value) {
+        list.push(value);
+        return;
+    }
+    const i = lowerBound(list, value);
+    if (list[i] !== value) {
+        list.splice(i, 0, value);
+    }
+}
+
+function removeSorted(list, value) {
+    if (!list) return;
+    const i = lowerBound(list, value);
+    if (list[i] === value) {
+        list.splice(i, 1);
+    }
+}
+
 // Auth Tab Switching
 function switchAuthTab(tabName) {
     // Update tab buttons
@@ -1009,6 +2235,21 @@ function showError(message) {
     alert(message); // Simple error display
 }
 
+// Product ids as inline handler arguments: local ids are numbers, backend
+// ids are ObjectId strings
+function idArg(id) {
+    return typeof id === 'number' ? id : `'${id}'`;
+}
+
+// Run fn once calls have stopped for `delay` ms
+function debounce(fn, delay) {
+    let timer = null;
+    return function(...args) {
+        clearTimeout(timer);
+        timer = setTimeout(() => fn.apply(this, args), delay);
+    };
+}
+
 // Global functions for onclick handlers
 window.addToCart = addToCart;
 window.updateCartQuantity = updateCartQuantity;
@@ -0,0 +1,101 @@
+// Cluster scaling benchmark: throughput of cluster.js with 1..N workers
+//
+// Usage: MONGODB_URI=mongodb://localhost:27017/dripnest-bench node bench/clusterScaling.js
+// Options (env): BENCH_WORKERS (default 1,2,4,... up to the CPU count),
+//                BENCH_PATH (default /api/products), BENCH_DURATION (seconds, default 15),
+//                BENCH_CONNECTIONS (default 100), BENCH_PORT (default 3100)
+//
+// Seed the target database first (the catalog is read, not modified). The
+// rate limiter is lifted for the benchmark run.
+
+const { spawn } = require('child_process');
+const os = require('os');
+const path = require('path');
+const http = require('http');
+const autocannon = require('autocannon');
+require('dotenv').config();
+
+const CPUS = os.cpus().length;
+const defaultWorkers = () => {
+  const counts = [];
+  for (let n = 1; n < CPUS; n *= 2) counts.push(n);
+  counts.push(CPUS);
+  return counts;
+};
+
+const WORKERS = process.env.BENCH_WORKERS ? process.env.BENCH_WORKERS.split(',').map(Number) : defaultWorkers();
+const BENCH_PATH = process.env.BENCH_PATH || '/api/products';
+const DURATION = parseInt(process.env.BENCH_DURATION) || 15;
+const CONNECTIONS = parseInt(process.env.BENCH_CONNECTIONS) || 100;
+const PORT = parseInt(process.env.BENCH_PORT) || 3100;
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+const getHealth = () => new Promise(resolve => {
+  http.get(`http://localhost:${PORT}/api/health`, res => {
+    let body = '';
+    res.on('data', chunk => { body += chunk; });
+    res.on('end', () => {
+      try {
+        resolve(JSON.parse(body));
+      } catch (error) {
+        resolve(null);
+      }
+    });
+  }).on('error', () => resolve(null));
+});
+
+// Wait until every worker has sent a heartbeat
+const waitForWorkers = async (count) => {
+  for (let i = 0; i < 120; i++) {
+    const health = await getHealth();
+    if (health && health.process.workers && health.process.workers.length === count) return;
+    await sleep(500);
+  }
+  throw new Error(`cluster with ${count} workers did not come up`);
+};
+
+const startCluster = (count) => spawn(process.execPath, [path.join(__dirname, '..', 'cluster.js')], {
+  env: {
+    ...process.env,
+    PORT: String(PORT),
+    WEB_CONCURRENCY: String(count),
+    CLUSTER_HEARTBEAT_MS: '500',
+    RATE_LIMIT_ENABLED: 'false'
+  },
+  stdio: 'ignore'
+});
+
+const stopCluster = (child) => new Promise(resolve => {
+  child.once('exit', resolve);
+  child.kill('SIGTERM');
+});
+
+const main = async () => {
+  console.log(`path=${BENCH_PATH} duration=${DURATION}s connections=${CONNECTIONS} cpus=${CPUS}`);
+  let baseline = null;
+
+  for (const count of WORKERS) {
+    const child = startCluster(count);
+    try {
+      await waitForWorkers(count);
+      const result = await autocannon({
+        url: `http://localhost:${PORT}${BENCH_PATH}`,
+        connections: CONNECTIONS,
+        duration: DURATION
+      });
+      const rps = result.requests.average;
+      baseline = baseline || rps;
+      console.log(`workers=${String(count).padStart(2)} ${rps.toFixed(0).padStart(8)} req/s  ` +
+        `p50=${result.latency.p50}ms p99=${result.latency.p99}ms  ` +
+        `speedup=${(rps / baseline).toFixed(2)}x  errors=${result.errors + result.non2xx}`);
+    } finally {
+      await stopCluster(child);
+    }
+  }
+};
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
@@ -0,0 +1,96 @@
+// Listing throughput benchmark: hydrated documents vs. lean projections
+//
+// Usage: MONGODB_URI=mongodb://localhost:27017/dripnest-bench node bench/listingThroughput.js
+// Options (env): BENCH_PRODUCTS (default 5000), BENCH_PAGES (default 2000),
+//                BENCH_PAGE_SIZE (default 48), BENCH_CONCURRENCY (default 20)
+//
+// The benchmark drops the Product collection of the target database, so
+// never point it at real data.
+
+const mongoose = require('mongoose');
+require('dotenv').config();
+
+const Product = require('../models/Product');
+
+const MONGODB_URI = process.env.MONGODB_URI || 'mongodb://localhost:27017/dripnest-bench';
+const PRODUCTS = parseInt(process.env.BENCH_PRODUCTS) || 5000;
+const PAGES = parseInt(process.env.BENCH_PAGES) || 2000;
+const PAGE_SIZE = parseInt(process.env.BENCH_PAGE_SIZE) || 48;
+const CONCURRENCY = parseInt(process.env.BENCH_CONCURRENCY) || 20;
+const SIZES = ['XS', 'S', 'M', 'L', 'XL', 'XXL'];
+
+const seed = async () => {
+  await Product.deleteMany({});
+  await Product.syncIndexes();
+  const docs = [];
+  for (let i = 0; i < PRODUCTS; i++) {
+    docs.push({
+      name: `Listing Bench ${i}`,
+      slug: `listing-bench-${i}`,
+      description: 'A fairly long product description. '.repeat(20),
+      category: 'T-Shirts',
+      price: 10 + (i % 50),
+      images: [{ url: `/uploads/${i}.jpg`, alt: 'front', isPrimary: true }],
+      tags: ['bench', 'tee'],
+      variants: SIZES.map(size => ({ size, stock: i % 4, sku: `L${i}-${size}` })),
+      sales: i % 300
+    });
+  }
+  await Product.insertMany(docs);
+  await Product.syncStockFields({});
+};
+
+// What the listing route did before: full documents, toJSON with virtuals
+const hydratedPage = async () => {
+  const products = await Product.find({ isActive: true })
+    .sort({ createdAt: -1, _id: -1 })
+    .limit(PAGE_SIZE)
+    .select('-__v');
+  return JSON.stringify(products);
+};
+
+const leanPage = async () => {
+  const products = await Product.find({ isActive: true })
+    .sort({ createdAt: -1, _id: -1 })
+    .limit(PAGE_SIZE)
+    .select(Product.projections.card)
+    .lean();
+  return JSON.stringify(products);
+};
+
+const run = async (label, page) => {
+  let next = 0;
+  let bytes = 0;
+  const worker = async () => {
+    while (next < PAGES) {
+      next++;
+      bytes += (await page()).length;
+    }
+  };
+
+  const heapBefore = process.memoryUsage().heapUsed;
+  const started = process.hrtime.bigint();
+  await Promise.all(Array.from({ length: CONCURRENCY }, worker));
+  const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+
+  console.log(`${label.padEnd(10)} ${(PAGES / seconds).toFixed(1).padStart(8)} pages/sec  ` +
+    `${(bytes / PAGES / 1024).toFixed(1)} KiB/page  ` +
+    `heap +${((process.memoryUsage().heapUsed - heapBefore) / 1048576).toFixed(1)} MiB`);
+};
+
+const main = async () => {
+  await mongoose.connect(MONGODB_URI);
+  await seed();
+  console.log(`products=${PRODUCTS} pages=${PAGES} pageSize=${PAGE_SIZE} concurrency=${CONCURRENCY}`);
+
+  await run('hydrated', hydratedPage);
+  await run('lean', leanPage);
+
+  await Product.deleteMany({});
+  await mongoose.disconnect();
+};
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
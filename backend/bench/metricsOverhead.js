@@ -0,0 +1,103 @@
+// Metrics overhead benchmark: throughput with and without instrumentation
+//
+// Usage: node bench/metricsOverhead.js
+// Options (env): BENCH_DURATION (seconds per run, default 10), BENCH_ROUNDS (default 3),
+//                BENCH_CONNECTIONS (default 50), BENCH_MAX_OVERHEAD (percent, default 2)
+//
+// Serves a catalog-sized JSON response from two otherwise identical Express
+// apps, one with the request histogram middleware and a per-request query
+// timing, and alternates autocannon runs against them. No database is
+// needed. Exits non-zero when the median overhead exceeds the budget.
+
+const express = require('express');
+const autocannon = require('autocannon');
+const metrics = require('../services/metrics');
+
+const DURATION = parseInt(process.env.BENCH_DURATION) || 10;
+const ROUNDS = parseInt(process.env.BENCH_ROUNDS) || 3;
+const CONNECTIONS = parseInt(process.env.BENCH_CONNECTIONS) || 50;
+const MAX_OVERHEAD = parseFloat(process.env.BENCH_MAX_OVERHEAD) || 2;
+
+const payload = {
+  products: Array.from({ length: 12 }, (_, i) => ({
+    _id: `64b000000000000000000${String(i).padStart(3, '0')}`,
+    name: `Bench Product ${i}`,
+    slug: `bench-product-${i}`,
+    category: 'T-Shirts',
+    price: 25 + i,
+    images: [{ url: `/uploads/bench-${i}.jpg`, alt: `Bench Product ${i}` }],
+    tags: ['bench', 'cotton'],
+    inStock: true,
+    availableStock: 40
+  })),
+  pagination: { limit: 12, hasNextPage: true, nextCursor: 'eyJrIjoiY3JlYXRlZEF0In0' }
+};
+
+// Stand-in for the query hooks: one timed "operation" per request
+const hooks = [];
+metrics.queryMetrics({
+  pre: (name, fn) => hooks.push({ kind: 'pre', name, fn }),
+  post: (name, fn) => hooks.push({ kind: 'post', name, fn })
+}, { model: 'Product' });
+// The plugin registers the query pre hook and its success post hook first
+const [queryStart, queryEnd] = hooks;
+
+const createApp = (instrumented) => {
+  const app = express();
+  if (instrumented) app.use(metrics.httpMetrics);
+  app.get('/api/products/:identifier', (req, res) => {
+    if (instrumented) {
+      const query = { op: 'findOne' };
+      queryStart.fn.call(query);
+      queryEnd.fn.call(query);
+    }
+    res.json(payload);
+  });
+  app.get('/metrics', metrics.endpoint);
+  return app;
+};
+
+const listen = (app) => new Promise(resolve => {
+  const server = app.listen(0, () => resolve(server));
+});
+
+const measure = async (server) => {
+  const result = await autocannon({
+    url: `http://localhost:${server.address().port}/api/products/bench-product-1`,
+    connections: CONNECTIONS,
+    duration: DURATION
+  });
+  return result.requests.average;
+};
+
+const median = (values) => [...values].sort((a, b) => a - b)[Math.floor(values.length / 2)];
+
+const main = async () => {
+  const plain = await listen(createApp(false));
+  const instrumented = await listen(createApp(true));
+  const overheads = [];
+
+  console.log(`duration=${DURATION}s rounds=${ROUNDS} connections=${CONNECTIONS}`);
+  for (let round = 1; round <= ROUNDS; round++) {
+    const base = await measure(plain);
+    const withMetrics = await measure(instrumented);
+    const overhead = (1 - withMetrics / base) * 100;
+    overheads.push(overhead);
+    console.log(`round ${round}: plain=${base.toFixed(0)} req/s  instrumented=${withMetrics.toFixed(0)} req/s  ` +
+      `overhead=${overhead.toFixed(2)}%`);
+  }
+
+  const result = median(overheads);
+  console.log(`median overhead ${result.toFixed(2)}% (budget ${MAX_OVERHEAD}%)`);
+  plain.close();
+  instrumented.close();
+
+  if (result > MAX_OVERHEAD) {
+    process.exit(1);
+  }
+};
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
@@ -0,0 +1,128 @@
+// Order item resolution benchmark: per-line findById vs. one batched $in
+//
+// Usage: MONGODB_URI=mongodb://localhost:27017/dripnest-bench node bench/orderItems.js
+// Options (env): BENCH_CART_SIZES (default 1,10,50), BENCH_ROUNDS (default 300)
+//
+// The benchmark drops the Product, User and Order collections of the target
+// database, so never point it at real data.
+
+const mongoose = require('mongoose');
+require('dotenv').config();
+
+const User = require('../models/User');
+const Product = require('../models/Product');
+const Order = require('../models/Order');
+const orderItems = require('../services/orderItems');
+const stockRules = require('../services/stockRules');
+
+const MONGODB_URI = process.env.MONGODB_URI || 'mongodb://localhost:27017/dripnest-bench';
+const CART_SIZES = (process.env.BENCH_CART_SIZES || '1,10,50').split(',').map(Number);
+const ROUNDS = parseInt(process.env.BENCH_ROUNDS) || 300;
+const PRODUCTS = 200;
+const SIZES = ['S', 'M', 'L'];
+
+const seed = async () => {
+  await Promise.all([User.deleteMany({}), Product.deleteMany({}), Order.deleteMany({})]);
+  const customer = await User.create({
+    username: 'bench-customer',
+    email: 'bench-customer@example.com',
+    password: 'not-a-real-hash'
+  });
+  const products = await Product.insertMany(Array.from({ length: PRODUCTS }, (_, i) => ({
+    name: `Cart Bench ${i}`,
+    slug: `cart-bench-${i}`,
+    description: 'Benchmark product',
+    category: 'T-Shirts',
+    price: 20 + (i % 30),
+    variants: SIZES.map(size => ({ size, stock: 1e6, sku: `C${i}-${size}` }))
+  })));
+  return { customer, products };
+};
+
+const randomCart = (products, lines) => Array.from({ length: lines }, () => ({
+  productId: String(products[Math.floor(Math.random() * products.length)]._id),
+  size: SIZES[Math.floor(Math.random() * SIZES.length)],
+  quantity: 1
+}));
+
+const buildOrder = (customer, items, subtotal) => new Order({
+  orderNumber: `BENCH${new mongoose.Types.ObjectId()}`,
+  customer: customer._id,
+  items,
+  subtotal,
+  total: subtotal,
+  shippingAddress: { firstName: 'B', lastName: 'B', street: 'x', city: 'x', zipCode: '0' },
+  paymentMethod: 'cod'
+});
+
+// The previous handler: one awaited findById per line, save, then two populates
+const legacyCheckout = async (customer, cart) => {
+  let subtotal = 0;
+  const items = [];
+  for (const line of cart) {
+    const product = await Product.findById(line.productId);
+    const result = stockRules.checkLine(product, line);
+    if (!result.available) throw new Error('unexpected stock failure');
+    subtotal += product.price * line.quantity;
+    items.push({
+      product: product._id,
+      name: product.name,
+      price: product.price,
+      quantity: line.quantity,
+      size: line.size,
+      sku: result.variant.sku
+    });
+  }
+  const order = buildOrder(customer, items, subtotal);
+  await order.save();
+  await order.populate('customer', 'username email');
+  await order.populate('items.product', 'name price');
+  return order.toObject();
+};
+
+// The current handler: one $in lookup, save, response from loaded data
+const batchedCheckout = async (customer, cart) => {
+  const { items, subtotal, productsById } = await orderItems.resolve(cart);
+  const order = buildOrder(customer, items, subtotal);
+  await order.save();
+  const response = order.toObject();
+  response.customer = { _id: customer._id, username: customer.username, email: customer.email };
+  response.items.forEach(item => {
+    const product = productsById.get(String(item.product));
+    item.product = { _id: product._id, name: product.name, price: product.price };
+  });
+  return response;
+};
+
+const percentile = (sorted, p) => sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+
+const measure = async (label, lines, run) => {
+  const timings = [];
+  for (let i = 0; i < ROUNDS; i++) {
+    const started = process.hrtime.bigint();
+    await run(lines);
+    timings.push(Number(process.hrtime.bigint() - started) / 1e6);
+  }
+  timings.sort((a, b) => a - b);
+  console.log(`  ${label.padEnd(8)} p50=${percentile(timings, 0.5).toFixed(2)}ms ` +
+    `p95=${percentile(timings, 0.95).toFixed(2)}ms p99=${percentile(timings, 0.99).toFixed(2)}ms`);
+};
+
+const main = async () => {
+  await mongoose.connect(MONGODB_URI);
+  const { customer, products } = await seed();
+
+  for (const lines of CART_SIZES) {
+    console.log(`lines=${lines}`);
+    await measure('legacy', lines, n => legacyCheckout(customer, randomCart(products, n)));
+    await measure('batched', lines, n => batchedCheckout(customer, randomCart(products, n)));
+  }
+
+  await Promise.all([User.deleteMany({}), Product.deleteMany({}), Order.deleteMany({})]);
+  await mongoose.disconnect();
+};
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
@@ -0,0 +1,128 @@
+// Checkout throughput benchmark: per-item findById/save vs. conditional reservation
+//
+// Usage: MONGODB_URI=mongodb://localhost:27017/dripnest-bench node bench/orderThroughput.js
+// Options (env): BENCH_ORDERS (default 2000), BENCH_CONCURRENCY (default 50),
+//                BENCH_ITEMS (lines per order, default 3), BENCH_PRODUCTS (default 20)
+//
+// The benchmark drops the Product collection of the target database, so
+// never point it at real data.
+
+const mongoose = require('mongoose');
+require('dotenv').config();
+
+const Product = require('../models/Product');
+const stockReservation = require('../services/stockReservation');
+
+const MONGODB_URI = process.env.MONGODB_URI || 'mongodb://localhost:27017/dripnest-bench';
+const ORDERS = parseInt(process.env.BENCH_ORDERS) || 2000;
+const CONCURRENCY = parseInt(process.env.BENCH_CONCURRENCY) || 50;
+const ITEMS = parseInt(process.env.BENCH_ITEMS) || 3;
+const PRODUCTS = parseInt(process.env.BENCH_PRODUCTS) || 20;
+const SIZES = ['S', 'M', 'L'];
+const STOCK_PER_VARIANT = 1000;
+
+const seed = async () => {
+  await Product.deleteMany({});
+  const docs = [];
+  for (let i = 0; i < PRODUCTS; i++) {
+    docs.push({
+      name: `Bench Tee ${i}`,
+      slug: `bench-tee-${i}`,
+      description: 'Benchmark product',
+      category: 'T-Shirts',
+      price: 20 + i,
+      variants: SIZES.map(size => ({ size, stock: STOCK_PER_VARIANT, sku: `B${i}-${size}` }))
+    });
+  }
+  return Product.insertMany(docs);
+};
+
+const randomLines = (products) => {
+  const lines = [];
+  for (let i = 0; i < ITEMS; i++) {
+    const product = products[Math.floor(Math.random() * products.length)];
+    lines.push({
+      productId: product._id,
+      name: product.name,
+      size: SIZES[Math.floor(Math.random() * SIZES.length)],
+      quantity: 1
+    });
+  }
+  return lines;
+};
+
+// Mirrors the previous order route: validate every line with findById,
+// then re-read and save each product to decrement stock
+const legacyCheckout = async (lines) => {
+  for (const line of lines) {
+    const product = await Product.findById(line.productId);
+    const variant = product.variants.find(v => v.size === line.size);
+    if (!variant || variant.stock < line.quantity) return false;
+  }
+  for (const line of lines) {
+    const product = await Product.findById(line.productId);
+    const variant = product.variants.find(v => v.size === line.size);
+    variant.stock -= line.quantity;
+    product.sales += line.quantity;
+    await product.save();
+  }
+  return true;
+};
+
+const reservationCheckout = async (lines) => {
+  try {
+    await stockReservation.reserve(lines);
+    return true;
+  } catch (error) {
+    if (error instanceof stockReservation.StockReservationError) return false;
+    throw error;
+  }
+};
+
+const run = async (label, checkout) => {
+  const products = await seed();
+  let next = 0;
+  let completed = 0;
+  let failed = 0;
+
+  const worker = async () => {
+    while (next < ORDERS) {
+      next++;
+      const ok = await checkout(randomLines(products));
+      if (ok) completed++; else failed++;
+    }
+  };
+
+  const started = process.hrtime.bigint();
+  await Promise.all(Array.from({ length: CONCURRENCY }, worker));
+  const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+
+  // Stock + sales must add back up to the seeded stock if nothing was lost
+  const after = await Product.find({}).lean();
+  let unitsSold = 0;
+  let stockLeft = 0;
+  after.forEach(product => {
+    unitsSold += product.sales;
+    product.variants.forEach(variant => { stockLeft += variant.stock; });
+  });
+  const drift = PRODUCTS * SIZES.length * STOCK_PER_VARIANT - stockLeft - unitsSold;
+
+  console.log(`${label.padEnd(12)} ${(completed / seconds).toFixed(1).padStart(8)} orders/sec  ` +
+    `completed=${completed} rejected=${failed} lostUpdates=${drift}`);
+};
+
+const main = async () => {
+  await mongoose.connect(MONGODB_URI);
+  console.log(`orders=${ORDERS} concurrency=${CONCURRENCY} lines/order=${ITEMS} products=${PRODUCTS}`);
+
+  await run('legacy', legacyCheckout);
+  await run('reservation', reservationCheckout);
+
+  await Product.deleteMany({});
+  await mongoose.disconnect();
+};
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
@@ -0,0 +1,86 @@
+// Micro-benchmark of GET /api/products/:identifier resolution
+//
+// Usage: MONGODB_URI=mongodb://localhost:27017/dripnest-bench node bench/productResolve.js
+// Options (env): BENCH_PRODUCTS (default 5000), BENCH_LOOKUPS (default 5000)
+//
+// The benchmark drops the Product collection of the target database, so
+// never point it at real data.
+
+const mongoose = require('mongoose');
+require('dotenv').config();
+
+const Product = require('../models/Product');
+const productResolver = require('../services/productResolver');
+
+const MONGODB_URI = process.env.MONGODB_URI || 'mongodb://localhost:27017/dripnest-bench';
+const PRODUCTS = parseInt(process.env.BENCH_PRODUCTS) || 5000;
+const LOOKUPS = parseInt(process.env.BENCH_LOOKUPS) || 5000;
+
+// The previous route: findById first (throws CastError for slugs), then slug
+const legacyResolve = async (identifier) => {
+  let product = null;
+  try {
+    product = await Product.findById(identifier).select('-__v');
+  } catch (error) {
+    if (error.name !== 'CastError') throw error;
+  }
+  if (!product) {
+    product = await Product.findOne({ slug: identifier, isActive: true }).select('-__v');
+  }
+  return product;
+};
+
+const seed = async () => {
+  await Product.deleteMany({});
+  await Product.syncIndexes();
+  const docs = [];
+  for (let i = 0; i < PRODUCTS; i++) {
+    docs.push({
+      name: `Resolve Bench ${i}`,
+      slug: `resolve-bench-${i}`,
+      description: 'Benchmark product',
+      category: 'Accessories',
+      price: 10,
+      totalStock: 5
+    });
+  }
+  return Product.insertMany(docs);
+};
+
+const measure = async (label, identifiers, resolve) => {
+  const started = process.hrtime.bigint();
+  let found = 0;
+  for (const identifier of identifiers) {
+    if (await resolve(identifier)) found++;
+  }
+  const ms = Number(process.hrtime.bigint() - started) / 1e6;
+  console.log(`${label.padEnd(24)} ${(ms * 1000 / identifiers.length).toFixed(1).padStart(8)} µs/lookup  found=${found}`);
+};
+
+const main = async () => {
+  await mongoose.connect(MONGODB_URI);
+  const products = await seed();
+
+  const pick = () => products[Math.floor(Math.random() * products.length)];
+  const ids = Array.from({ length: LOOKUPS }, () => String(pick()._id));
+  const slugs = Array.from({ length: LOOKUPS }, () => pick().slug);
+
+  // Discriminator cost on its own
+  const started = process.hrtime.bigint();
+  for (let i = 0; i < 1e6; i++) productResolver.isObjectId(i % 2 ? ids[i % LOOKUPS] : slugs[i % LOOKUPS]);
+  console.log(`isObjectId: ${(Number(process.hrtime.bigint() - started) / 1e6).toFixed(1)} ns/call`);
+
+  await measure('legacy by id', ids, legacyResolve);
+  await measure('resolver by id', ids, productResolver.resolve);
+  await measure('legacy by slug', slugs, legacyResolve);
+  await measure('resolver by slug (cold)', slugs, productResolver.resolve);
+  await measure('resolver by slug (warm)', slugs, productResolver.resolve);
+
+  await Product.deleteMany({});
+  await mongoose.disconnect();
+};
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
@@ -0,0 +1,70 @@
+// Rate limiter overhead benchmark: cost per request of the limiter middleware
+//
+// Usage: node bench/rateLimitOverhead.js
+// Options (env): BENCH_REQUESTS (default 200000), BENCH_CLIENTS (distinct IPs, default 10000)
+//                REDIS_URL also measures the shared Redis store
+//
+// Runs the middleware directly with stub req/res objects, so no server or
+// database is needed. Budgets are set high enough that nothing is limited.
+
+require('dotenv').config();
+
+const rateLimit = require('../middleware/rateLimit');
+const { createMemoryStore, createRedisStore } = require('../utils/rateLimitStores');
+
+const REQUESTS = parseInt(process.env.BENCH_REQUESTS) || 200000;
+const CLIENTS = parseInt(process.env.BENCH_CLIENTS) || 10000;
+const PATHS = [
+  { method: 'GET', path: '/products' },
+  { method: 'GET', path: '/products/classic-tee' },
+  { method: 'POST', path: '/orders' },
+  { method: 'POST', path: '/auth/login/customer' },
+  { method: 'GET', path: '/orders/my-orders' },
+  { method: 'GET', path: '/health' }
+];
+
+const unlimited = Object.fromEntries(Object.keys(rateLimit.TIERS).map(tier => [tier, { capacity: 1e9, refillPerMs: 1e6 }]));
+
+const response = {
+  set: () => {},
+  status() { return this; },
+  json: () => {}
+};
+
+const run = async (label, middleware, requests = REQUESTS) => {
+  let passed = 0;
+  const next = () => { passed++; };
+
+  const started = process.hrtime.bigint();
+  for (let i = 0; i < requests; i++) {
+    const route = PATHS[i % PATHS.length];
+    await middleware({ ...route, ip: `10.0.${(i % CLIENTS) >> 8}.${(i % CLIENTS) & 255}` }, response, next);
+  }
+  const ns = Number(process.hrtime.bigint() - started) / requests;
+
+  console.log(`${label.padEnd(16)} ${(ns / 1000).toFixed(2).padStart(8)} µs/request  passed=${passed}/${requests}`);
+  return ns;
+};
+
+const main = async () => {
+  console.log(`requests=${REQUESTS} clients=${CLIENTS}`);
+
+  const baseline = await run('no limiter', async (req, res, next) => next());
+  const memory = rateLimit({ store: createMemoryStore(), tiers: unlimited, enabled: true });
+  const memoryNs = await run('memory store', memory);
+  console.log(`  overhead ${((memoryNs - baseline) / 1000).toFixed(2)} µs/request, ${memory.stats().buckets} buckets held`);
+
+  if (process.env.REDIS_URL) {
+    const Redis = require('ioredis');
+    const client = new Redis(process.env.REDIS_URL);
+    const redis = rateLimit({ store: createRedisStore(client, { prefix: 'dripnest:bench:ratelimit:' }), tiers: unlimited, enabled: true });
+    const redisNs = await run('redis store', redis, Math.min(REQUESTS, 20000));
+    console.log(`  overhead ${((redisNs - baseline) / 1000).toFixed(2)} µs/request (one round trip each)`);
+    await client.quit();
+  }
+};
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
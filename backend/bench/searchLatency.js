@@ -0,0 +1,99 @@
+// Search latency benchmark: text search and prefix suggestions vs. catalog size
+//
+// Usage: MONGODB_URI=mongodb://localhost:27017/dripnest-bench node bench/searchLatency.js
+// Options (env): BENCH_SIZES (default 1000,10000,100000), BENCH_QUERIES (default 500)
+//
+// The benchmark drops the Product collection of the target database, so
+// never point it at real data.
+
+const mongoose = require('mongoose');
+require('dotenv').config();
+
+const Product = require('../models/Product');
+const { escapeRegex, tokenize } = require('../utils/search');
+
+const MONGODB_URI = process.env.MONGODB_URI || 'mongodb://localhost:27017/dripnest-bench';
+const SIZES = (process.env.BENCH_SIZES || '1000,10000,100000').split(',').map(Number);
+const QUERIES = parseInt(process.env.BENCH_QUERIES) || 500;
+
+const CATEGORIES = ['T-Shirts', 'Hoodies', 'Jeans', 'Shoes', 'Accessories'];
+const ADJECTIVES = ['classic', 'premium', 'slim', 'relaxed', 'vintage', 'organic', 'oversized', 'washed', 'heavyweight', 'cropped'];
+const NOUNS = ['tee', 'hoodie', 'jeans', 'sneaker', 'wallet', 'cap', 'jacket', 'crewneck', 'chino', 'boot'];
+const COLORS = ['black', 'white', 'navy', 'olive', 'sand', 'grey', 'red', 'indigo'];
+
+const pick = (list) => list[Math.floor(Math.random() * list.length)];
+
+const seed = async (count) => {
+  await Product.deleteMany({});
+  await Product.syncIndexes();
+
+  const batch = [];
+  for (let i = 0; i < count; i++) {
+    const name = `${pick(ADJECTIVES)} ${pick(COLORS)} ${pick(NOUNS)} ${i}`;
+    const tags = [pick(COLORS), pick(ADJECTIVES)];
+    batch.push({
+      name,
+      slug: `bench-${i}`,
+      description: `A ${name} made for everyday wear`,
+      category: pick(CATEGORIES),
+      price: 10 + (i % 90),
+      tags,
+      searchTokens: tokenize(name, tags),
+      totalStock: 10,
+      sales: Math.floor(Math.random() * 1000)
+    });
+    if (batch.length === 5000) {
+      await Product.insertMany(batch.splice(0), { ordered: false });
+    }
+  }
+  if (batch.length > 0) {
+    await Product.insertMany(batch, { ordered: false });
+  }
+};
+
+const percentile = (sorted, p) => sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+
+const measure = async (label, runQuery) => {
+  const timings = [];
+  for (let i = 0; i < QUERIES; i++) {
+    const started = process.hrtime.bigint();
+    await runQuery();
+    timings.push(Number(process.hrtime.bigint() - started) / 1e6);
+  }
+  timings.sort((a, b) => a - b);
+  console.log(`  ${label.padEnd(8)} p50=${percentile(timings, 0.5).toFixed(2)}ms ` +
+    `p95=${percentile(timings, 0.95).toFixed(2)}ms p99=${percentile(timings, 0.99).toFixed(2)}ms`);
+};
+
+const main = async () => {
+  await mongoose.connect(MONGODB_URI);
+
+  for (const size of SIZES) {
+    await seed(size);
+    console.log(`catalog=${size}`);
+
+    await measure('search', () => Product.find(
+      { isActive: true, $text: { $search: `${pick(ADJECTIVES)} ${pick(NOUNS)}` } },
+      { score: { $meta: 'textScore' } }
+    )
+      .sort({ score: { $meta: 'textScore' }, _id: 1 })
+      .limit(12)
+      .lean());
+
+    await measure('suggest', () => Product.find({
+      isActive: true,
+      searchTokens: { $regex: `^${escapeRegex(pick(NOUNS).slice(0, 3))}` }
+    })
+      .select('name slug category price sales')
+      .limit(8)
+      .lean());
+  }
+
+  await Product.deleteMany({});
+  await mongoose.disconnect();
+};
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
@@ -0,0 +1,169 @@
+// Storefront grid benchmark: product grid render and filter time vs. catalog size
+//
+// Usage: node bench/storefrontRender.js
+// Options (env): BENCH_SIZES (default 100,1000,10000), BENCH_ROUNDS (default 5)
+//
+// Loads index.html and app.js into jsdom and times the first render of the
+// products page and a search typed one keystroke at a time, three ways:
+//   rebuild      the previous renderer: clear the grid, then a new card and
+//                click listener per product on every keystroke
+//   keyed        cards keyed by product id and reused, every match in the DOM
+//   virtualized  keyed cards, only the rows near the viewport in the DOM
+// jsdom has no layout, so the virtualized grid uses the estimated row
+// height and a single column. Treat the numbers as relative, not as
+// browser frame times. A second table times the search alone: the catalog
+// index against lowercasing and scanning every product.
+
+const fs = require('fs');
+const path = require('path');
+const { performance } = require('perf_hooks');
+const { JSDOM, VirtualConsole } = require('jsdom');
+
+const SIZES = (process.env.BENCH_SIZES || '100,1000,10000').split(',').map(Number);
+const ROUNDS = parseInt(process.env.BENCH_ROUNDS) || 5;
+const FRONTEND = path.join(__dirname, '..', '..');
+const KEYSTROKES = ['c', 'cl', 'cla', 'clas', 'class', 'classi', 'classic', 'classic b', 'classic', ''];
+
+const CATEGORIES = ['T-Shirts', 'Hoodies', 'Jeans', 'Shoes', 'Accessories'];
+const ADJECTIVES = ['classic', 'premium', 'slim', 'relaxed', 'vintage', 'organic', 'oversized', 'washed'];
+const COLORS = ['black', 'white', 'navy', 'olive', 'sand', 'grey', 'red', 'indigo'];
+const NOUNS = { 'T-Shirts': 'tee', Hoodies: 'hoodie', Jeans: 'jeans', Shoes: 'sneaker', Accessories: 'wallet' };
+
+// The previous grid code, for comparison
+const REBUILD_RENDERER = `
+function rebuildGrid(items) {
+    const grid = document.getElementById('all-products-grid');
+    grid.innerHTML = '';
+    items.forEach(product => {
+        const card = document.createElement('div');
+        card.className = 'product-card';
+        card.addEventListener('click', function() {
+            openProductDetail(product.id);
+        });
+        card.innerHTML = productCardMarkup(product);
+        grid.appendChild(card);
+    });
+}
+
+function rebuildFilter() {
+    const searchTerm = document.getElementById('search-products').value.toLowerCase();
+    let filteredProducts = products;
+    if (searchTerm) {
+        filteredProducts = filteredProducts.filter(product =>
+            product.name.toLowerCase().includes(searchTerm) ||
+            product.description.toLowerCase().includes(searchTerm)
+        );
+    }
+    rebuildGrid(filteredProducts);
+}
+`;
+
+const MODES = {
+  rebuild: { render: 'rebuildGrid(products)', filter: 'rebuildFilter()' },
+  keyed: { setup: 'GRID_SETTINGS.virtualizeAbove = Infinity', render: 'renderAllProducts()', filter: 'filterProducts()' },
+  virtualized: { render: 'renderAllProducts()', filter: 'filterProducts()' }
+};
+
+const createCatalog = (size) => Array.from({ length: size }, (_, i) => {
+  const category = CATEGORIES[i % CATEGORIES.length];
+  const name = `${ADJECTIVES[i % ADJECTIVES.length]} ${COLORS[(i * 7) % COLORS.length]} ${NOUNS[category]} ${i}`;
+  return {
+    id: i + 1,
+    name,
+    price: 10 + (i % 90) + 0.99,
+    description: `A ${name} made for everyday wear`,
+    category,
+    stock: i % 13 === 0 ? 0 : (i % 50) + 1,
+    inStock: i % 13 !== 0,
+    image: 'placeholder.jpg'
+  };
+});
+
+const loadStorefront = async (catalog) => {
+  const dom = new JSDOM(fs.readFileSync(path.join(FRONTEND, 'index.html'), 'utf8'), {
+    url: 'http://localhost/',
+    runScripts: 'outside-only',
+    pretendToBeVisual: true,
+    virtualConsole: new VirtualConsole()
+  });
+  const { window } = dom;
+  window.eval(fs.readFileSync(path.join(FRONTEND, 'app.js'), 'utf8'));
+  window.eval(REBUILD_RENDERER);
+  if (window.document.readyState !== 'complete') {
+    await new Promise(resolve => window.addEventListener('load', resolve));
+  }
+  await window.eval('appReady');
+  await window.eval('loadCollection("products")');
+  // After app.js has loaded its own catalog, so the sample data is replaced
+  window.benchCatalog = catalog;
+  window.eval('products = window.benchCatalog; buildCatalogIndex()');
+  return window;
+};
+
+const time = (fn) => {
+  const started = performance.now();
+  fn();
+  return performance.now() - started;
+};
+
+const median = (values) => [...values].sort((a, b) => a - b)[Math.floor(values.length / 2)];
+
+const run = async (size, mode) => {
+  const window = await loadStorefront(createCatalog(size));
+  const { setup, render, filter } = MODES[mode];
+  const search = window.document.getElementById('search-products');
+  const grid = window.document.getElementById('all-products-grid');
+  if (setup) window.eval(setup);
+
+  const firstRender = time(() => window.eval(render));
+  const cards = grid.children.length;
+  const perKeystroke = [];
+  for (let round = 0; round < ROUNDS; round++) {
+    const total = KEYSTROKES.reduce((sum, term) => {
+      search.value = term;
+      return sum + time(() => window.eval(filter));
+    }, 0);
+    perKeystroke.push(total / KEYSTROKES.length);
+  }
+
+  window.close();
+  return { firstRender, keystroke: median(perKeystroke), cards };
+};
+
+const searchOnly = async (size) => {
+  const window = await loadStorefront(createCatalog(size));
+  const buildIndex = time(() => window.eval('buildGramIndex()'));
+  const timeQueries = (expression) => median(Array.from({ length: ROUNDS }, () =>
+    KEYSTROKES.reduce((sum, term) => sum + time(() => window.eval(expression.replace('TERM', JSON.stringify(term)))), 0) /
+      KEYSTROKES.length));
+  const scan = timeQueries(`products.filter(product =>
+    product.name.toLowerCase().includes(TERM) || product.description.toLowerCase().includes(TERM))`);
+  const index = timeQueries('searchCatalog(TERM, "")');
+  window.close();
+  return { buildIndex, scan, index };
+};
+
+const main = async () => {
+  console.log(`rounds=${ROUNDS} keystrokes=${KEYSTROKES.length}`);
+  console.log('products  mode          first render   per keystroke   cards in DOM');
+  for (const size of SIZES) {
+    for (const mode of Object.keys(MODES)) {
+      const result = await run(size, mode);
+      console.log(`${String(size).padStart(8)}  ${mode.padEnd(12)} ${result.firstRender.toFixed(2).padStart(10)} ms ` +
+        `${result.keystroke.toFixed(2).padStart(12)} ms ${String(result.cards).padStart(14)}`);
+    }
+  }
+
+  console.log('\nsearch only');
+  console.log('products  index build    scan / query   index / query');
+  for (const size of SIZES) {
+    const result = await searchOnly(size);
+    console.log(`${String(size).padStart(8)} ${result.buildIndex.toFixed(2).padStart(9)} ms ` +
+      `${result.scan.toFixed(3).padStart(12)} ms ${result.index.toFixed(3).padStart(12)} ms`);
+  }
+};
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
@@ -0,0 +1,153 @@
+// Storefront repeat-visit benchmark: time to interactive with and without the service worker
+//
+// Usage: node bench/storefrontTTI.js
+// Options (env): BENCH_RUNS (repeat visits per mode, default 5), BENCH_PORT (default 3300),
+//                BENCH_QUIET_MS (long-task-free window that ends TTI, default 5000),
+//                BENCH_THROTTLE (mobile or none, default mobile)
+//
+// Builds the storefront (scripts/buildStorefront.js), serves it the way a
+// production static host would (hashed files immutable, index.html and
+// sw.js revalidated) and loads it in headless Chrome through puppeteer. Each
+// mode makes one first visit, then BENCH_RUNS repeat visits that are timed:
+//   http-cache  service workers bypassed; repeat visits rely on the HTTP cache
+//   sw          the service worker answers from its precache
+// TTI follows Lighthouse's definition, simplified: the first moment after
+// first contentful paint, and after the storefront's `dripnest-ready` mark,
+// followed by BENCH_QUIET_MS without a long task (> 50 ms). The mobile
+// throttle matches Lighthouse's defaults (150 ms RTT, 1.6 Mbps down, 4x CPU).
+// Network-quiet detection is left out, so numbers are comparable with each
+// other rather than with a Lighthouse report.
+
+const fs = require('fs');
+const http = require('http');
+const os = require('os');
+const path = require('path');
+const puppeteer = require('puppeteer');
+const { build } = require('../scripts/buildStorefront');
+
+const RUNS = parseInt(process.env.BENCH_RUNS) || 5;
+const PORT = parseInt(process.env.BENCH_PORT) || 3300;
+const QUIET_MS = parseInt(process.env.BENCH_QUIET_MS) || 5000;
+const THROTTLE = process.env.BENCH_THROTTLE || 'mobile';
+
+const THROTTLING = {
+  mobile: {
+    network: { offline: false, latency: 150, downloadThroughput: 1.6 * 1024 * 1024 / 8, uploadThroughput: 750 * 1024 / 8 },
+    cpu: 4
+  },
+  none: null
+};
+
+const CONTENT_TYPES = {
+  '.html': 'text/html; charset=utf-8',
+  '.css': 'text/css; charset=utf-8',
+  '.js': 'application/javascript; charset=utf-8'
+};
+
+const serve = (dist) => http.createServer((req, res) => {
+  const pathname = new URL(req.url, 'http://localhost').pathname;
+  const file = path.join(dist, pathname === '/' ? 'index.html' : path.normalize(pathname).slice(1));
+  if (!file.startsWith(dist) || !fs.existsSync(file)) {
+    res.writeHead(404);
+    return res.end();
+  }
+  const hashed = /\.[0-9a-f]{10}\.(css|js)$/.test(file);
+  res.writeHead(200, {
+    'Content-Type': CONTENT_TYPES[path.extname(file)] || 'application/octet-stream',
+    'Cache-Control': hashed ? 'public, max-age=31536000, immutable' : 'no-cache'
+  });
+  fs.createReadStream(file).pipe(res);
+}).listen(PORT);
+
+// Runs in the page before app.js: record FCP and long tasks
+const OBSERVE_TIMINGS = () => {
+  window.__timings = { fcp: null, longTasks: [] };
+  new PerformanceObserver(list => list.getEntries().forEach(entry => {
+    if (entry.name === 'first-contentful-paint') window.__timings.fcp = entry.startTime;
+  })).observe({ type: 'paint', buffered: true });
+  new PerformanceObserver(list => list.getEntries().forEach(entry => {
+    window.__timings.longTasks.push([entry.startTime, entry.startTime + entry.duration]);
+  })).observe({ type: 'longtask', buffered: true });
+};
+
+const interactiveAt = ({ fcp, ready, longTasks }) => {
+  let tti = Math.max(fcp, ready);
+  for (const [start, end] of longTasks.sort((a, b) => a[0] - b[0])) {
+    if (end <= tti) continue;
+    if (start >= tti + QUIET_MS) break;
+    tti = end;
+  }
+  return tti;
+};
+
+const visit = async (page, url) => {
+  await page.goto(url, { waitUntil: 'load' });
+  await page.waitForFunction(() => performance.getEntriesByName('dripnest-ready').length > 0);
+  await new Promise(resolve => setTimeout(resolve, QUIET_MS));
+  const timings = await page.evaluate(() => ({
+    ...window.__timings,
+    ready: performance.getEntriesByName('dripnest-ready')[0].startTime,
+    // Bytes that came over the network; cache and service worker hits count as 0
+    transferred: [...performance.getEntriesByType('navigation'), ...performance.getEntriesByType('resource')]
+      .reduce((sum, entry) => sum + entry.transferSize, 0)
+  }));
+  return { fcp: timings.fcp, ready: timings.ready, tti: interactiveAt(timings), transferred: timings.transferred };
+};
+
+const run = async (browser, url, mode) => {
+  const context = await browser.createBrowserContext();
+  const page = await context.newPage();
+  await page.setBypassServiceWorker(mode === 'http-cache');
+  await page.evaluateOnNewDocument(OBSERVE_TIMINGS);
+  const throttling = THROTTLING[THROTTLE];
+  if (throttling) {
+    const session = await page.createCDPSession();
+    await session.send('Network.emulateNetworkConditions', throttling.network);
+    await session.send('Emulation.setCPUThrottlingRate', { rate: throttling.cpu });
+  }
+
+  await visit(page, url);
+  if (mode === 'sw') {
+    // The worker installs after load; later visits must be controlled by it
+    await page.evaluate(() => navigator.serviceWorker.ready);
+    await page.reload({ waitUntil: 'load' });
+    await page.waitForFunction(() => navigator.serviceWorker.controller !== null);
+  }
+
+  const visits = [];
+  for (let i = 0; i < RUNS; i++) {
+    visits.push(await visit(page, url));
+  }
+  await context.close();
+  return visits;
+};
+
+const median = (values) => [...values].sort((a, b) => a - b)[Math.floor(values.length / 2)];
+
+const main = async () => {
+  const dist = fs.mkdtempSync(path.join(os.tmpdir(), 'dripnest-storefront-'));
+  const { version } = build({ dist });
+  const server = serve(dist);
+  const browser = await puppeteer.launch({ headless: true });
+  const url = `http://localhost:${PORT}/`;
+
+  try {
+    console.log(`storefront ${version} runs=${RUNS} throttle=${THROTTLE} quiet=${QUIET_MS}ms`);
+    console.log('mode              FCP       ready         TTI   transferred');
+    for (const mode of ['http-cache', 'sw']) {
+      const visits = await run(browser, url, mode);
+      const pick = (key) => median(visits.map(result => result[key]));
+      console.log(`${mode.padEnd(12)} ${pick('fcp').toFixed(0).padStart(6)} ms ${pick('ready').toFixed(0).padStart(8)} ms ` +
+        `${pick('tti').toFixed(0).padStart(8)} ms ${String(pick('transferred')).padStart(10)} B`);
+    }
+  } finally {
+    await browser.close();
+    server.close();
+    fs.rmSync(dist, { recursive: true, force: true });
+  }
+};
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
@@ -0,0 +1,110 @@
+const cluster = require('cluster');
+const os = require('os');
+require('dotenv').config();
+
+// Production launcher: forks WEB_CONCURRENCY workers (default: one per CPU)
+// that each run server.js behind the primary's shared listening socket.
+//
+//   SIGHUP / SIGUSR2  rolling restart - one worker at a time is replaced, and
+//                     the old one is only told to drain once its replacement
+//                     is listening, so the port never goes dark
+//   SIGTERM / SIGINT  drain every worker and exit
+//
+// Workers that die unexpectedly are replaced. Caches, the checkout queue and
+// buffered view counts are per worker; see "Cluster mode" in the setup guide.
+
+const WORKERS = parseInt(process.env.WEB_CONCURRENCY) || os.cpus().length;
+const SHUTDOWN_TIMEOUT_MS = parseInt(process.env.CLUSTER_SHUTDOWN_TIMEOUT_MS) || 30 * 1000;
+
+// Last heartbeat per live worker, broadcast back so any worker can report
+// the whole cluster from /api/health
+const heartbeats = new Map();
+let stopping = false;
+let reloading = false;
+
+const broadcastStatus = () => {
+  const workers = [...heartbeats.values()];
+  Object.values(cluster.workers).forEach(worker => {
+    if (worker.isConnected()) {
+      worker.send({ type: 'cluster-status', workers });
+    }
+  });
+};
+
+const fork = () => {
+  const worker = cluster.fork();
+  worker.on('message', (message) => {
+    if (message && message.type === 'heartbeat') {
+      heartbeats.set(worker.id, message.worker);
+      broadcastStatus();
+    }
+  });
+  return worker;
+};
+
+// Ask a worker to stop taking connections and exit once in-flight requests
+// finish; kill it if it hasn't gone within the timeout
+const drain = (worker) => new Promise(resolve => {
+  if (worker.isDead()) return resolve();
+  const timer = setTimeout(() => worker.process.kill('SIGKILL'), SHUTDOWN_TIMEOUT_MS);
+  worker.once('exit', () => {
+    clearTimeout(timer);
+    resolve();
+  });
+  worker.$draining = true;
+  worker.send({ type: 'shutdown' });
+});
+
+const waitForListening = (worker) => new Promise((resolve, reject) => {
+  worker.once('listening', resolve);
+  worker.once('exit', code => reject(new Error(`worker ${worker.id} exited with code ${code} before listening`)));
+});
+
+const rollingRestart = async () => {
+  if (reloading || stopping) return;
+  reloading = true;
+  console.log(`Rolling restart of ${Object.keys(cluster.workers).length} workers`);
+
+  try {
+    for (const worker of Object.values(cluster.workers)) {
+      const replacement = fork();
+      await waitForListening(replacement);
+      await drain(worker);
+      console.log(`Worker ${worker.id} (pid ${worker.process.pid}) replaced by ${replacement.id} (pid ${replacement.process.pid})`);
+    }
+    console.log('Rolling restart complete');
+  } catch (error) {
+    console.error('Rolling restart aborted:', error);
+  } finally {
+    reloading = false;
+  }
+};
+
+const shutdown = async (signal) => {
+  if (stopping) return;
+  stopping = true;
+  console.log(`${signal} received, draining ${Object.keys(cluster.workers).length} workers`);
+  await Promise.all(Object.values(cluster.workers).map(drain));
+  process.exit(0);
+};
+
+if (cluster.isWorker) {
+  require('./server');
+} else {
+  cluster.on('exit', (worker, code, signal) => {
+    heartbeats.delete(worker.id);
+    if (stopping || worker.$draining) return;
+    console.error(`Worker ${worker.id} (pid ${worker.process.pid}) died (${signal || code}), starting a new one`);
+    fork();
+  });
+
+  console.log(`Primary ${process.pid} starting ${WORKERS} workers`);
+  for (let i = 0; i < WORKERS; i++) {
+    fork();
+  }
+
+  process.on('SIGHUP', rollingRestart);
+  process.on('SIGUSR2', rollingRestart);
+  process.on('SIGTERM', () => shutdown('SIGTERM'));
+  process.on('SIGINT', () => shutdown('SIGINT'));
+}
\ No newline at end of file
@@ -0,0 +1,190 @@
+// API load test: seed, start the server, run every scenario, compare
+// against the stored baseline.
+//
+// Usage: npm run test:load                  compare against loadtest/baseline.json
+//        npm run test:load -- --update-baseline   record a new baseline
+//        npm run test:load -- --scenario detail   run one scenario
+//
+// Starts a throwaway mongod via mongodb-memory-server unless
+// LOADTEST_MONGODB_URI points at a local mongod (its users, products, orders
+// and counters collections are dropped).
+// Options (env): LOADTEST_DURATION (seconds per scenario, default 20),
+//                LOADTEST_CONNECTIONS (default 50), LOADTEST_PORT (default 3200),
+//                LOADTEST_TOLERANCE (allowed regression, default 0.15 = 15%),
+//                LOADTEST_BASELINE (baseline file), plus the seed sizes in seed.js
+//
+// A run fails when any scenario's throughput drops, or its p95 rises, by
+// more than the tolerance, or when it returns errors. Baselines are only
+// comparable on the same machine; the file records where it was taken.
+
+const { spawn } = require('child_process');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const http = require('http');
+const jwt = require('jsonwebtoken');
+const mongoose = require('mongoose');
+const autocannon = require('autocannon');
+
+const { seed, createRandom, SIZES, SEED } = require('./seed');
+const scenarios = require('./scenarios');
+
+const DURATION = parseInt(process.env.LOADTEST_DURATION) || 20;
+const CONNECTIONS = parseInt(process.env.LOADTEST_CONNECTIONS) || 50;
+const PORT = parseInt(process.env.LOADTEST_PORT) || 3200;
+const TOLERANCE = parseFloat(process.env.LOADTEST_TOLERANCE) || 0.15;
+const BASELINE_PATH = process.env.LOADTEST_BASELINE || path.join(__dirname, 'baseline.json');
+const JWT_SECRET = 'loadtest-secret';
+
+const args = process.argv.slice(2);
+const updateBaseline = args.includes('--update-baseline');
+const only = args.includes('--scenario') ? args[args.indexOf('--scenario') + 1] : null;
+
+const startDatabase = async () => {
+  if (process.env.LOADTEST_MONGODB_URI) {
+    return { uri: process.env.LOADTEST_MONGODB_URI, stop: async () => {} };
+  }
+  const { MongoMemoryServer } = require('mongodb-memory-server');
+  const server = await MongoMemoryServer.create();
+  return { uri: server.getUri('dripnest-loadtest'), stop: () => server.stop() };
+};
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+const isReady = () => new Promise(resolve => {
+  http.get(`http://localhost:${PORT}/api/ready`, res => {
+    res.resume();
+    resolve(res.statusCode === 200);
+  }).on('error', () => resolve(false));
+});
+
+const startServer = async (uri) => {
+  const child = spawn(process.execPath, [path.join(__dirname, '..', 'server.js')], {
+    env: {
+      ...process.env,
+      NODE_ENV: 'production',
+      PORT: String(PORT),
+      MONGODB_URI: uri,
+      JWT_SECRET,
+      RATE_LIMIT_ENABLED: 'false',
+      CACHE_STORE: 'memory'
+    },
+    stdio: ['ignore', 'ignore', 'inherit']
+  });
+  for (let i = 0; i < 120; i++) {
+    if (await isReady()) return child;
+    await sleep(500);
+  }
+  child.kill();
+  throw new Error('server did not become ready');
+};
+
+const percentile = (sorted, p) => sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))] || 0;
+
+const runScenario = async (name, fixtures) => {
+  const latencies = [];
+  const instance = autocannon({
+    url: `http://localhost:${PORT}`,
+    connections: CONNECTIONS,
+    duration: DURATION,
+    requests: scenarios[name](fixtures)
+  });
+  instance.on('response', (client, statusCode, bytes, responseTime) => latencies.push(responseTime));
+  const result = await instance;
+
+  latencies.sort((a, b) => a - b);
+  return {
+    rps: Math.round(result.requests.average),
+    p50: percentile(latencies, 0.5),
+    p95: percentile(latencies, 0.95),
+    p99: percentile(latencies, 0.99),
+    errors: result.errors + result.timeouts + result.non2xx
+  };
+};
+
+const compare = (current, baseline) => {
+  const problems = [];
+  if (current.errors > 0) problems.push(`${current.errors} failed requests`);
+  if (!baseline) return problems;
+  if (current.rps < baseline.rps * (1 - TOLERANCE)) {
+    problems.push(`throughput ${current.rps} < ${baseline.rps} req/s`);
+  }
+  if (current.p95 > baseline.p95 * (1 + TOLERANCE)) {
+    problems.push(`p95 ${current.p95.toFixed(1)} > ${baseline.p95.toFixed(1)} ms`);
+  }
+  return problems;
+};
+
+const main = async () => {
+  const names = only ? [only] : Object.keys(scenarios);
+  if (names.some(name => !scenarios[name])) {
+    throw new Error(`unknown scenario ${only}; choose from ${Object.keys(scenarios).join(', ')}`);
+  }
+
+  const baseline = fs.existsSync(BASELINE_PATH) ? JSON.parse(fs.readFileSync(BASELINE_PATH, 'utf8')) : null;
+  const database = await startDatabase();
+  let server = null;
+  const results = {};
+  let failed = false;
+
+  try {
+    await mongoose.connect(database.uri);
+    console.log(`seeding products=${SIZES.products} customers=${SIZES.customers} orders=${SIZES.orders} seed=${SEED}`);
+    const { admin, customers, products } = await seed();
+    await mongoose.disconnect();
+
+    const sign = (user) => jwt.sign({ userId: user._id, role: user.role }, JWT_SECRET, { expiresIn: '1h' });
+    const fixtures = {
+      random: createRandom(SEED),
+      products: products.map(product => ({
+        _id: product._id,
+        slug: product.slug,
+        variants: product.variants.map(({ size }) => ({ size }))
+      })),
+      customerTokens: customers.slice(0, 200).map(sign),
+      adminToken: sign(admin)
+    };
+
+    server = await startServer(database.uri);
+    console.log(`duration=${DURATION}s connections=${CONNECTIONS} tolerance=${TOLERANCE * 100}%`);
+    console.log('scenario       req/s      p50      p95      p99  baseline req/s / p95');
+
+    for (const name of names) {
+      const current = await runScenario(name, fixtures);
+      const previous = baseline && baseline.scenarios[name];
+      results[name] = current;
+
+      const problems = updateBaseline ? [] : compare(current, previous);
+      failed = failed || problems.length > 0;
+      console.log(`${name.padEnd(12)} ${String(current.rps).padStart(7)} ${current.p50.toFixed(1).padStart(8)} ` +
+        `${current.p95.toFixed(1).padStart(8)} ${current.p99.toFixed(1).padStart(8)}  ` +
+        `${previous ? `${previous.rps} / ${previous.p95.toFixed(1)}` : '-'}` +
+        `${problems.length > 0 ? `  REGRESSION: ${problems.join('; ')}` : ''}`);
+    }
+  } finally {
+    if (server) server.kill('SIGTERM');
+    await mongoose.disconnect();
+    await database.stop();
+  }
+
+  if (updateBaseline || !baseline) {
+    const scenariosToKeep = { ...(baseline ? baseline.scenarios : {}), ...results };
+    fs.writeFileSync(BASELINE_PATH, JSON.stringify({
+      recordedAt: new Date().toISOString(),
+      machine: { cpus: os.cpus().length, cpu: os.cpus()[0].model, node: process.version },
+      settings: { duration: DURATION, connections: CONNECTIONS, seed: SEED, sizes: SIZES },
+      scenarios: scenariosToKeep
+    }, null, 2) + '\n');
+    console.log(`baseline written to ${path.relative(process.cwd(), BASELINE_PATH)}`);
+  }
+
+  if (failed) {
+    console.error('Load test regressed against the baseline');
+    process.exit(1);
+  }
+};
+
+main().catch(error => {
+  console.error('Load test failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
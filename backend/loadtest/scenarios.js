@@ -0,0 +1,74 @@
+// Load test scenarios. Each one is a list of autocannon requests whose
+// setupRequest picks its target from the seeded fixtures, so every run
+// walks the same mix of pages, searches and carts for a given seed.
+
+const CATEGORIES = ['T-Shirts', 'Hoodies', 'Jeans', 'Shoes', 'Accessories'];
+const SORTS = ['createdAt', 'price', 'sales', 'name'];
+const SEARCH_TERMS = ['tee', 'hoodie', 'black', 'vintage', 'slim jeans', 'sneaker', 'organic', 'navy cap'];
+const PREFIXES = ['te', 'hoo', 'bla', 'vin', 'sne', 'cro', 'oli'];
+
+const json = (body) => JSON.stringify(body);
+
+const scenarios = {
+  // Category pages with every sort order
+  browse: ({ random }) => [{
+    method: 'GET',
+    setupRequest: (req) => ({
+      ...req,
+      path: `/api/products?category=${encodeURIComponent(random.pick(CATEGORIES))}` +
+        `&sortBy=${random.pick(SORTS)}&sortOrder=${random.pick(['asc', 'desc'])}&limit=12`
+    })
+  }],
+
+  // Full-text search plus autocomplete
+  search: ({ random }) => [
+    {
+      method: 'GET',
+      setupRequest: (req) => ({ ...req, path: `/api/products?search=${encodeURIComponent(random.pick(SEARCH_TERMS))}` })
+    },
+    {
+      method: 'GET',
+      setupRequest: (req) => ({ ...req, path: `/api/products/meta/suggest?q=${random.pick(PREFIXES)}` })
+    }
+  ],
+
+  // Product pages, skewed towards popular products
+  detail: ({ random, products }) => [{
+    method: 'GET',
+    setupRequest: (req) => ({ ...req, path: `/api/products/${products[random.skewed(products.length)].slug}` })
+  }],
+
+  // Authenticated checkout of 1-3 lines
+  checkout: ({ random, products, customerTokens }) => [{
+    method: 'POST',
+    path: '/api/orders',
+    setupRequest: (req) => {
+      const items = Array.from({ length: random.int(1, 3) }, () => {
+        const product = products[random.skewed(products.length)];
+        const variant = product.variants.length > 0 ? random.pick(product.variants) : null;
+        return { productId: String(product._id), size: variant ? variant.size : undefined, quantity: 1 };
+      });
+      return {
+        ...req,
+        headers: {
+          'content-type': 'application/json',
+          authorization: `Bearer ${random.pick(customerTokens)}`
+        },
+        body: json({
+          items,
+          shippingAddress: { firstName: 'Load', lastName: 'Test', street: '1 Bench St', city: 'Benchville', zipCode: '00000' },
+          paymentMethod: 'cod'
+        })
+      };
+    }
+  }],
+
+  // Admin dashboard
+  dashboard: ({ adminToken }) => [{
+    method: 'GET',
+    path: '/api/admin/dashboard',
+    headers: { authorization: `Bearer ${adminToken}` }
+  }]
+};
+
+module.exports = scenarios;
\ No newline at end of file
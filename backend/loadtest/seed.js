@@ -0,0 +1,144 @@
+// Deterministic seed data for the load tests: a catalog with size variants,
+// customers, an admin and an order history skewed towards popular products.
+//
+// Sizes (env): LOADTEST_PRODUCTS (default 5000), LOADTEST_CUSTOMERS (default 2000),
+//              LOADTEST_ORDERS (default 20000), LOADTEST_SEED (default 42)
+
+const User = require('../models/User');
+const Product = require('../models/Product');
+const Order = require('../models/Order');
+const Counter = require('../models/Counter');
+const orderNumbers = require('../services/orderNumbers');
+const { tokenize } = require('../utils/search');
+
+const SIZES = {
+  products: parseInt(process.env.LOADTEST_PRODUCTS) || 5000,
+  customers: parseInt(process.env.LOADTEST_CUSTOMERS) || 2000,
+  orders: parseInt(process.env.LOADTEST_ORDERS) || 20000
+};
+const SEED = parseInt(process.env.LOADTEST_SEED) || 42;
+const BATCH = 1000;
+
+const CATEGORIES = {
+  'T-Shirts': ['XS', 'S', 'M', 'L', 'XL', 'XXL'],
+  Hoodies: ['S', 'M', 'L', 'XL'],
+  Jeans: ['28', '30', '32', '34', '36'],
+  Shoes: ['38', '40', '42'],
+  Accessories: []
+};
+const ADJECTIVES = ['classic', 'premium', 'slim', 'relaxed', 'vintage', 'organic', 'oversized', 'washed', 'heavyweight', 'cropped'];
+const COLORS = ['black', 'white', 'navy', 'olive', 'sand', 'grey', 'red', 'indigo'];
+const NOUNS = {
+  'T-Shirts': ['tee', 'crewneck', 'pocket tee'],
+  Hoodies: ['hoodie', 'zip hoodie', 'sweatshirt'],
+  Jeans: ['jeans', 'denim', 'chino'],
+  Shoes: ['sneaker', 'runner', 'boot'],
+  Accessories: ['cap', 'wallet', 'tote', 'beanie']
+};
+const STATUSES = ['pending', 'processing', 'shipped', 'delivered', 'delivered', 'delivered', 'cancelled'];
+
+// mulberry32: small, fast and reproducible across Node versions
+const createRandom = (seed) => {
+  let state = seed >>> 0;
+  const random = () => {
+    state = (state + 0x6D2B79F5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+  random.pick = (list) => list[Math.floor(random() * list.length)];
+  random.int = (min, max) => min + Math.floor(random() * (max - min + 1));
+  // Index in [0, n) with popularity falling off roughly as 1/rank
+  random.skewed = (n) => Math.min(n - 1, Math.floor(Math.exp(random() * Math.log(n + 1)) - 1));
+  return random;
+};
+
+const insertBatched = async (Model, count, build) => {
+  const inserted = [];
+  for (let start = 0; start < count; start += BATCH) {
+    const docs = [];
+    for (let i = start; i < Math.min(count, start + BATCH); i++) docs.push(build(i));
+    inserted.push(...await Model.insertMany(docs, { ordered: false }));
+  }
+  return inserted;
+};
+
+const seed = async () => {
+  const random = createRandom(SEED);
+  await Promise.all([User.deleteMany({}), Product.deleteMany({}), Order.deleteMany({}), Counter.deleteMany({})]);
+  await Promise.all([User.syncIndexes(), Product.syncIndexes(), Order.syncIndexes()]);
+
+  const admin = await User.create({
+    username: 'loadtest-admin',
+    email: 'loadtest-admin@example.com',
+    password: 'not-a-real-hash',
+    role: 'admin'
+  });
+
+  const customers = await insertBatched(User, SIZES.customers, i => ({
+    username: `loadtest${i}`,
+    email: `loadtest${i}@example.com`,
+    password: 'not-a-real-hash',
+    role: 'customer'
+  }));
+
+  const products = await insertBatched(Product, SIZES.products, i => {
+    const category = random.pick(Object.keys(CATEGORIES));
+    const name = `${random.pick(ADJECTIVES)} ${random.pick(COLORS)} ${random.pick(NOUNS[category])} ${i}`;
+    const tags = [random.pick(COLORS), random.pick(ADJECTIVES)];
+    return {
+      name,
+      slug: name.replace(/\s+/g, '-'),
+      description: `A ${name} made for everyday wear`,
+      category,
+      price: random.int(15, 150),
+      tags,
+      searchTokens: tokenize(name, tags),
+      variants: CATEGORIES[category].map(size => ({ size, stock: 100000, sku: `LT${i}-${size}` })),
+      totalStock: CATEGORIES[category].length === 0 ? 100000 : 0,
+      sales: 0
+    };
+  });
+  await Product.syncStockFields({});
+
+  const orders = await insertBatched(Order, SIZES.orders, i => {
+    const lines = random.int(1, 4);
+    const items = [];
+    for (let l = 0; l < lines; l++) {
+      const product = products[random.skewed(products.length)];
+      const variant = product.variants.length > 0 ? random.pick(product.variants) : null;
+      items.push({
+        product: product._id,
+        name: product.name,
+        price: product.price,
+        quantity: random.int(1, 2),
+        size: variant ? variant.size : null,
+        sku: variant ? variant.sku : null
+      });
+    }
+    const subtotal = items.reduce((sum, item) => sum + item.price * item.quantity, 0);
+    return {
+      orderNumber: orderNumbers.format(i + 1),
+      customer: customers[random.skewed(customers.length)]._id,
+      items,
+      subtotal,
+      tax: subtotal * 0.08,
+      total: subtotal * 1.08,
+      status: random.pick(STATUSES),
+      paymentMethod: random.pick(['stripe', 'paypal', 'cod']),
+      createdAt: new Date(Date.now() - random.int(0, 365) * 24 * 60 * 60 * 1000)
+    };
+  });
+  // New orders continue after the seeded history
+  await Counter.updateOne({ _id: 'orderNumber' }, { $max: { seq: SIZES.orders } }, { upsert: true });
+
+  return { admin, customers, products, orders: orders.length };
+};
+
+module.exports = {
+  seed,
+  createRandom,
+  SIZES,
+  SEED
+};
\ No newline at end of file
@@ -1,5 +1,6 @@
 const jwt = require('jsonwebtoken');
 const User = require('../models/User');
+const principalCache = require('../services/principalCache');
 
 const auth = async (req, res, next) => {
   try {
@@ -14,19 +15,28 @@ const auth = async (req, res, next) => {
     // Verify token
     const decoded = jwt.verify(token, process.env.JWT_SECRET);
 
-    // Check if user still exists and is active
-    const user = await User.findById(decoded.userId).select('-password');
-    if (!user || !user.isActive) {
-      return res.status(401).json({ error: 'Invalid token - user not found' });
+    // Reuse a recently verified principal before going to the database
+    let principal = principalCache.get(decoded.userId);
+    if (!principal) {
+      // Check if user still exists and is active
+      const user = await User.findById(decoded.userId)
+        .select('username email role isActive')
+        .lean();
+      if (!user || !user.isActive) {
+        return res.status(401).json({ error: 'Invalid token - user not found' });
+      }
+
+      principal = {
+        userId: user._id,
+        username: user.username,
+        email: user.email,
+        role: user.role
+      };
+      principalCache.set(decoded.userId, principal);
     }
 
     // Add user info to request
-    req.user = {
-      userId: user._id,
-      username: user.username,
-      email: user.email,
-      role: user.role
-    };
+    req.user = { ...principal };
 
     next();
   } catch (error) {
@@ -0,0 +1,73 @@
+const crypto = require('crypto');
+const { createStoreFromEnv } = require('../services/idempotencyStore');
+
+// Idempotency-Key support for non-repeatable writes (order submission).
+//
+// The first request with a key claims it and its response is stored; a retry
+// with the same key and body gets that stored response back without running
+// the handler again. Keys are scoped to the authenticated user, so this must
+// run after the auth middleware. Server errors release the key so the client
+// can retry for real.
+
+const MAX_KEY_LENGTH = 255;
+
+const fingerprintOf = (req) => crypto
+  .createHash('sha256')
+  .update(`${req.method} ${req.baseUrl}${req.path} ${JSON.stringify(req.body || {})}`)
+  .digest('hex');
+
+const idempotency = ({ store = createStoreFromEnv(), ttlMs } = {}) => async (req, res, next) => {
+  const key = req.get('Idempotency-Key');
+  if (!key) {
+    return next();
+  }
+  if (key.length > MAX_KEY_LENGTH) {
+    return res.status(400).json({ error: `Idempotency-Key must be at most ${MAX_KEY_LENGTH} characters` });
+  }
+
+  const id = `${req.user.userId}:${key}`;
+  const fingerprint = fingerprintOf(req);
+
+  try {
+    const existing = await store.claim(id, fingerprint);
+
+    if (existing) {
+      if (existing.fingerprint !== fingerprint) {
+        return res.status(422).json({ error: 'Idempotency-Key was already used for a different request' });
+      }
+      if (existing.status !== 'completed') {
+        return res.status(409).json({ error: 'A request with this Idempotency-Key is still being processed' });
+      }
+      res.set('Idempotent-Replayed', 'true');
+      return res.status(existing.responseStatus).json(existing.responseBody);
+    }
+  } catch (error) {
+    console.error('Idempotency check error:', error);
+    return res.status(500).json({ error: 'Failed to process request' });
+  }
+
+  let settled = false;
+  const settle = (action) => {
+    settled = true;
+    action.catch(error => console.error('Idempotency store error:', error));
+  };
+
+  const json = res.json.bind(res);
+  res.json = (body) => {
+    if (!settled) {
+      settle(res.statusCode >= 500
+        ? store.abandon(id)
+        : store.complete(id, res.statusCode, JSON.parse(JSON.stringify(body)), ttlMs));
+    }
+    return json(body);
+  };
+
+  // Handler ended without a JSON response (client gone, crash): free the key
+  res.on('close', () => {
+    if (!settled) settle(store.abandon(id));
+  });
+
+  next();
+};
+
+module.exports = idempotency;
\ No newline at end of file
@@ -0,0 +1,82 @@
+const { createStoreFromEnv } = require('../utils/rateLimitStores');
+
+// Tiered token-bucket rate limiting for /api.
+//
+// Every request is matched to a tier with its own budget, written as
+// "capacity/seconds": a client may burst up to `capacity` requests, and the
+// bucket refills evenly over `seconds`. Buckets are keyed by tier and client
+// IP (set TRUST_PROXY behind a load balancer so req.ip is the real client).
+// Health and readiness probes and the Stripe webhook are never limited.
+
+const parseBudget = (value) => {
+  const [capacity, seconds] = String(value).split('/').map(Number);
+  return { capacity, refillPerMs: capacity / (seconds * 1000) };
+};
+
+const TIERS = {
+  // Login and registration attempts
+  auth: parseBudget(process.env.RATE_LIMIT_AUTH || '10/900'),
+  // Order placement and payment calls
+  checkout: parseBudget(process.env.RATE_LIMIT_CHECKOUT || '20/60'),
+  // Catalog browsing
+  catalog: parseBudget(process.env.RATE_LIMIT_CATALOG || '300/60'),
+  // Everything else under /api
+  api: parseBudget(process.env.RATE_LIMIT_API || '100/60')
+};
+
+const EXEMPT = new Set(['/health', '/ready', '/payment/stripe-webhook']);
+
+// Paths are relative to the /api mount point
+const tierFor = (req) => {
+  const path = req.path.replace(/\/+$/, '') || '/';
+  if (EXEMPT.has(path)) return null;
+
+  if (req.method === 'POST' && path.startsWith('/auth/') && path !== '/auth/logout') return 'auth';
+  if (req.method === 'POST' && (path === '/orders' || path.startsWith('/payment/'))) return 'checkout';
+  if (req.method === 'GET' && path.startsWith('/products')) return 'catalog';
+  return 'api';
+};
+
+const rateLimit = ({
+  store = createStoreFromEnv(),
+  tiers = TIERS,
+  enabled = process.env.RATE_LIMIT_ENABLED !== 'false'
+} = {}) => {
+  const counters = { allowed: 0, limited: 0, storeErrors: 0 };
+
+  const middleware = async (req, res, next) => {
+    const tier = enabled ? tierFor(req) : null;
+    if (!tier) {
+      return next();
+    }
+
+    const budget = tiers[tier];
+    let result;
+    try {
+      result = await store.take(`${tier}:${req.ip}`, budget);
+    } catch (error) {
+      // Fail open: an unreachable shared store shouldn't take the API down
+      counters.storeErrors++;
+      console.error('Rate limit store error:', error);
+      return next();
+    }
+
+    res.set('RateLimit-Limit', String(budget.capacity));
+    res.set('RateLimit-Remaining', String(result.remaining));
+    if (!result.allowed) {
+      counters.limited++;
+      res.set('Retry-After', String(Math.ceil(result.retryAfterMs / 1000)));
+      return res.status(429).json({ error: 'Too many requests, please try again later' });
+    }
+
+    counters.allowed++;
+    next();
+  };
+
+  middleware.stats = () => ({ store: store.name, ...counters, ...store.stats() });
+  return middleware;
+};
+
+module.exports = rateLimit;
+module.exports.TIERS = TIERS;
+module.exports.tierFor = tierFor;
\ No newline at end of file
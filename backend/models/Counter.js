@@ -0,0 +1,17 @@
+const mongoose = require('mongoose');
+
+// Named monotonic counters. Processes reserve whole blocks of values with
+// one atomic $inc (see services/orderNumbers.js).
+const counterSchema = new mongoose.Schema({
+  _id: {
+    type: String
+  },
+  seq: {
+    type: Number,
+    default: 0
+  }
+}, {
+  versionKey: false
+});
+
+module.exports = mongoose.model('Counter', counterSchema);
\ No newline at end of file
@@ -0,0 +1,33 @@
+const mongoose = require('mongoose');
+
+// Single materialized document behind the admin dashboard. Counters are
+// bumped as orders, products and users change, and rebuilt from scratch
+// by the periodic refresh in services/dashboardStats.js.
+const dashboardStatsSchema = new mongoose.Schema({
+  _id: {
+    type: String,
+    default: 'global'
+  },
+  totalProducts: {
+    type: Number,
+    default: 0
+  },
+  totalOrders: {
+    type: Number,
+    default: 0
+  },
+  totalCustomers: {
+    type: Number,
+    default: 0
+  },
+  totalRevenue: {
+    type: Number,
+    default: 0
+  },
+  // Last full recomputation
+  generatedAt: Date,
+  // Last incremental update
+  updatedAt: Date
+});
+
+module.exports = mongoose.model('DashboardStats', dashboardStatsSchema);
\ No newline at end of file
@@ -0,0 +1,32 @@
+const mongoose = require('mongoose');
+
+// Outcome of a request sent with an Idempotency-Key header. The _id is
+// scoped to the caller (`<userId>:<key>`), and the TTL index drops records
+// once retries are no longer expected.
+const idempotencyKeySchema = new mongoose.Schema({
+  _id: {
+    type: String
+  },
+  // Hash of method, path and body, so a key can't be reused for another request
+  fingerprint: {
+    type: String,
+    required: true
+  },
+  status: {
+    type: String,
+    enum: ['pending', 'completed'],
+    default: 'pending'
+  },
+  responseStatus: Number,
+  responseBody: mongoose.Schema.Types.Mixed,
+  expiresAt: {
+    type: Date,
+    required: true
+  }
+}, {
+  timestamps: true
+});
+
+idempotencyKeySchema.index({ expiresAt: 1 }, { expireAfterSeconds: 0 });
+
+module.exports = mongoose.model('IdempotencyKey', idempotencyKeySchema);
\ No newline at end of file
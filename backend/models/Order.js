@@ -1,4 +1,7 @@
 const mongoose = require('mongoose');
+const dashboardStats = require('../services/dashboardStats');
+const orderNumbers = require('../services/orderNumbers');
+const { queryMetrics } = require('../services/metrics');
 
 const orderSchema = new mongoose.Schema({
   orderNumber: {
@@ -94,14 +97,78 @@ const orderSchema = new mongoose.Schema({
   }
 });
 
-// Generate order number
-orderSchema.pre('save', async function(next) {
+// Keyset pagination for customer order history and the admin order list
+orderSchema.index({ customer: 1, createdAt: -1, _id: -1 });
+orderSchema.index({ status: 1, createdAt: -1, _id: -1 });
+orderSchema.index({ createdAt: -1, _id: -1 });
+
+// Stripe callbacks look orders up by payment intent
+orderSchema.index({ 'paymentDetails.paymentIntentId': 1 }, { sparse: true });
+
+// Generate order number before validation, so `required` sees it
+orderSchema.pre('validate', async function() {
   if (!this.orderNumber) {
-    const timestamp = Date.now().toString();
-    this.orderNumber = 'DN' + timestamp.slice(-8);
+    this.orderNumber = await orderNumbers.next();
   }
+});
+
+orderSchema.pre('save', async function(next) {
   this.updatedAt = Date.now();
+  this.$locals.wasNew = this.isNew;
   next();
 });
 
+// Keep the materialized dashboard counters in step with order writes
+orderSchema.post('init', function() {
+  this.$locals.savedStatus = this.status;
+});
+
+orderSchema.post('save', function(doc) {
+  if (doc.$locals.wasNew) {
+    dashboardStats.increment({
+      totalOrders: 1,
+      totalRevenue: dashboardStats.revenueOf(doc.status, doc.total)
+    });
+  } else if (doc.$locals.savedStatus !== doc.status) {
+    dashboardStats.increment({
+      totalRevenue: dashboardStats.revenueOf(doc.status, doc.total) -
+        dashboardStats.revenueOf(doc.$locals.savedStatus, doc.total)
+    });
+  }
+  doc.$locals.savedStatus = doc.status;
+});
+
+// Payment callbacks change status with findOneAndUpdate. The revenue delta
+// depends on the status being replaced, so the update is made conditional
+// on it: callers pin it in the filter ({ _id, status: 'pending' }), or it
+// is read here and added to the filter. Of two concurrent transitions from
+// the same status only one matches, and only a matched update is counted.
+orderSchema.pre('findOneAndUpdate', async function() {
+  const update = this.getUpdate() || {};
+  const status = update.status !== undefined ? update.status : update.$set && update.$set.status;
+  if (status === undefined) return;
+
+  let from = this.getQuery().status;
+  if (typeof from !== 'string') {
+    const before = await this.model.findOne(this.getQuery()).select('status').lean();
+    if (!before) return;
+    from = before.status;
+    this.and([{ status: from }]);
+  }
+  this._statusChange = { status, from };
+});
+
+orderSchema.post('findOneAndUpdate', function(doc) {
+  const change = this._statusChange;
+  if (!doc || !change) return;
+
+  dashboardStats.increment({
+    totalRevenue: dashboardStats.revenueOf(change.status, doc.total) -
+      dashboardStats.revenueOf(change.from, doc.total)
+  });
+});
+
+// Operation timings for /metrics
+orderSchema.plugin(queryMetrics, { model: 'Order' });
+
 module.exports = mongoose.model('Order', orderSchema);
\ No newline at end of file
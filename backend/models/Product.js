@@ -1,4 +1,8 @@
 const mongoose = require('mongoose');
+const { tokenize } = require('../utils/search');
+const dashboardStats = require('../services/dashboardStats');
+const slugCache = require('../services/slugCache');
+const { queryMetrics } = require('../services/metrics');
 
 const productSchema = new mongoose.Schema({
   name: {
@@ -50,16 +54,37 @@ const productSchema = new mongoose.Schema({
     type: Number,
     default: 0
   },
+  // Derived from variants/totalStock on every stock change so listings
+  // don't have to reduce over variants per document
+  availableStock: {
+    type: Number,
+    default: 0
+  },
+  inStock: {
+    type: Boolean,
+    default: false
+  },
   isActive: {
     type: Boolean,
     default: true
   },
+  // Tokens of stock reservations being applied (services/stockReservation.js)
+  reservationTokens: {
+    type: [String],
+    default: undefined,
+    select: false
+  },
   // SEO and metadata
   slug: {
     type: String,
     unique: true
   },
   tags: [String],
+  // Lowercased word tokens from name, tags and brand for prefix lookups
+  searchTokens: {
+    type: [String],
+    select: false
+  },
   brand: String,
   material: String,
   careInstructions: String,
@@ -101,27 +126,110 @@ const productSchema = new mongoose.Schema({
 });
 
 // Calculate total stock from variants
-productSchema.virtual('inStock').get(function() {
-  if (this.variants && this.variants.length > 0) {
-    return this.variants.reduce((total, variant) => total + variant.stock, 0) > 0;
+const sumStock = (product) => {
+  if (product.variants && product.variants.length > 0) {
+    return product.variants.reduce((total, variant) => total + variant.stock, 0);
   }
-  return this.totalStock > 0;
+  return product.totalStock || 0;
+};
+
+// Same rule as sumStock, as an update pipeline for writes that bypass save()
+const STOCK_FIELDS_PIPELINE = [
+  {
+    $set: {
+      availableStock: {
+        $cond: [
+          { $gt: [{ $size: { $ifNull: ['$variants', []] } }, 0] },
+          { $sum: '$variants.stock' },
+          { $ifNull: ['$totalStock', 0] }
+        ]
+      }
+    }
+  },
+  { $set: { inStock: { $gt: ['$availableStock', 0] } } }
+];
+
+// clearTokens: reservation tokens to drop in the same update
+productSchema.statics.syncStockFields = function(filter, clearTokens) {
+  if (!clearTokens || clearTokens.length === 0) {
+    return this.updateMany(filter, STOCK_FIELDS_PIPELINE);
+  }
+  return this.updateMany(filter, [
+    ...STOCK_FIELDS_PIPELINE,
+    { $set: { reservationTokens: { $setDifference: [{ $ifNull: ['$reservationTokens', []] }, clearTokens] } } }
+  ]);
+};
+
+// Field sets for the read-only views, used with lean()
+productSchema.statics.projections = {
+  card: 'name slug category price images tags brand rating inStock availableStock sales createdAt',
+  detail: '-__v',
+  adminRow: 'name slug description category price variants totalStock availableStock inStock isActive sales views createdAt updatedAt'
+};
+
+// Keyset pagination: storefront listing for every sortBy option, with and
+// without a category filter, plus the admin listing by createdAt
+['createdAt', 'price', 'sales', 'name'].forEach(sortKey => {
+  productSchema.index({ isActive: 1, [sortKey]: 1, _id: 1 });
+  productSchema.index({ isActive: 1, category: 1, [sortKey]: 1, _id: 1 });
 });
+productSchema.index({ createdAt: -1, _id: -1 });
+productSchema.index({ category: 1, createdAt: -1, _id: -1 });
+
+// Low-stock alerts: one index per $or branch
+productSchema.index({ isActive: 1, totalStock: 1 });
+productSchema.index({ isActive: 1, 'variants.stock': 1 });
+
+// Relevance-ranked full text search, name matches count most
+productSchema.index(
+  { name: 'text', tags: 'text', description: 'text' },
+  { name: 'product_text_search', weights: { name: 10, tags: 5, description: 1 } }
+);
+
+// Autocomplete: anchored prefix scans over the token array; sales rides
+// along so the top-sellers sort reads it from the index
+productSchema.index({ searchTokens: 1, sales: -1 });
 
 // Generate slug from name
 productSchema.pre('save', function(next) {
   if (this.isModified('name')) {
+    if (this.slug) {
+      slugCache.invalidate(this.slug);
+    }
     this.slug = this.name
       .toLowerCase()
       .replace(/[^a-z0-9]/g, '-')
       .replace(/-+/g, '-')
       .replace(/^-|-$/g, '');
   }
+  if (this.isNew || this.isModified('name') || this.isModified('tags') || this.isModified('brand')) {
+    this.searchTokens = tokenize(this.name, this.tags, this.brand);
+  }
+  if (this.isNew || this.isModified('variants') || this.isModified('totalStock')) {
+    this.availableStock = sumStock(this);
+    this.inStock = this.availableStock > 0;
+  }
   this.updatedAt = Date.now();
+  if (this.isNew) {
+    this.$locals.activeDelta = this.isActive ? 1 : 0;
+  } else if (this.isModified('isActive')) {
+    this.$locals.activeDelta = this.isActive ? 1 : -1;
+  }
   next();
 });
 
+// Keep the dashboard's active product count current
+productSchema.post('save', function(doc) {
+  if (doc.$locals.activeDelta) {
+    dashboardStats.increment({ totalProducts: doc.$locals.activeDelta });
+    doc.$locals.activeDelta = 0;
+  }
+});
+
 // Ensure virtual fields are serialized
 productSchema.set('toJSON', { virtuals: true });
 
+// Operation timings for /metrics
+productSchema.plugin(queryMetrics, { model: 'Product' });
+
 module.exports = mongoose.model('Product', productSchema);
\ No newline at end of file
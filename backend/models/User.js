@@ -1,5 +1,8 @@
 const mongoose = require('mongoose');
 const bcrypt = require('bcryptjs');
+const principalCache = require('../services/principalCache');
+const dashboardStats = require('../services/dashboardStats');
+const { queryMetrics } = require('../services/metrics');
 
 const userSchema = new mongoose.Schema({
   username: {
@@ -59,6 +62,9 @@ const userSchema = new mongoose.Schema({
   }
 });
 
+// Customer counts on the admin dashboard
+userSchema.index({ role: 1, isActive: 1 });
+
 // Hash password before saving
 userSchema.pre('save', async function(next) {
   if (!this.isModified('password')) return next();
@@ -80,7 +86,43 @@ userSchema.methods.comparePassword = async function(candidatePassword) {
 // Update timestamp on save
 userSchema.pre('save', function(next) {
   this.updatedAt = Date.now();
+  this.$locals.principalChanged = !this.isNew &&
+    ['username', 'email', 'role', 'isActive'].some(path => this.isModified(path));
+  if (this.isNew) {
+    this.$locals.customerDelta = this.role === 'customer' ? 1 : 0;
+  } else if (this.isModified('role')) {
+    this.$locals.customerDelta = this.role === 'customer' ? 1 : -1;
+  }
   next();
 });
 
+// Keep the dashboard's customer count current
+userSchema.post('save', function(doc) {
+  if (doc.$locals.customerDelta) {
+    dashboardStats.increment({ totalCustomers: doc.$locals.customerDelta });
+    doc.$locals.customerDelta = 0;
+  }
+});
+
+// Drop cached auth principals when a user's identity, role or status changes
+userSchema.post('save', function(doc) {
+  if (doc.$locals.principalChanged) {
+    principalCache.invalidate(doc._id);
+  }
+});
+
+userSchema.post(['findOneAndUpdate', 'findOneAndDelete', 'findOneAndReplace'], function(doc) {
+  if (doc) {
+    principalCache.invalidate(doc._id);
+  }
+});
+
+// Bulk updates don't tell us which users changed
+userSchema.post(['updateOne', 'updateMany', 'deleteOne', 'deleteMany', 'replaceOne'], function() {
+  principalCache.clear();
+});
+
+// Operation timings for /metrics
+userSchema.plugin(queryMetrics, { model: 'User' });
+
 module.exports = mongoose.model('User', userSchema);
\ No newline at end of file
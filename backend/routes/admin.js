@@ -5,6 +5,9 @@ const Order = require('../models/Order');
 const User = require('../models/User');
 const auth = require('../middleware/auth');
 const adminAuth = require('../middleware/adminAuth');
+const { paginate, PaginationError } = require('../utils/pagination');
+const dashboardStats = require('../services/dashboardStats');
+const catalogCache = require('../services/catalogCache');
 
 const router = express.Router();
 
@@ -15,34 +18,36 @@ router.use(adminAuth);
 // Dashboard statistics
 router.get('/dashboard', async (req, res) => {
   try {
-    const totalProducts = await Product.countDocuments({ isActive: true });
-    const totalOrders = await Order.countDocuments();
-    const totalCustomers = await User.countDocuments({ role: 'customer' });
-    const totalRevenue = await Order.aggregate([
-      { $match: { status: { $in: ['processing', 'shipped', 'delivered'] } } },
-      { $group: { _id: null, total: { $sum: '$total' } } }
+    // Counters come from the materialized stats document; the two lists
+    // still need live queries, so everything runs concurrently
+    const [stats, recentOrders, lowStockProducts] = await Promise.all([
+      req.query.refresh === 'true' ? dashboardStats.refresh() : dashboardStats.get(),
+      Order.find()
+        .populate('customer', 'username email')
+        .sort({ createdAt: -1 })
+        .limit(10)
+        .lean(),
+      Product.find({
+        isActive: true,
+        $or: [
+          { totalStock: { $lte: 5 } },
+          { 'variants.stock': { $lte: 5 } }
+        ]
+      })
+        .select(Product.projections.adminRow)
+        .limit(10)
+        .lean()
     ]);
 
-    const recentOrders = await Order.find()
-      .populate('customer', 'username email')
-      .sort({ createdAt: -1 })
-      .limit(10);
-
-    const lowStockProducts = await Product.find({
-      isActive: true,
-      $or: [
-        { totalStock: { $lte: 5 } },
-        { 'variants.stock': { $lte: 5 } }
-      ]
-    }).limit(10);
-
     res.json({
       statistics: {
-        totalProducts,
-        totalOrders,
-        totalCustomers,
-        totalRevenue: totalRevenue[0]?.total || 0
+        totalProducts: stats.totalProducts,
+        totalOrders: stats.totalOrders,
+        totalCustomers: stats.totalCustomers,
+        totalRevenue: stats.totalRevenue
       },
+      generatedAt: stats.generatedAt,
+      updatedAt: stats.updatedAt,
       recentOrders,
       lowStockProducts
     });
@@ -56,31 +61,33 @@ router.get('/dashboard', async (req, res) => {
 // Get all products (admin view with inactive products)
 router.get('/products', async (req, res) => {
   try {
-    const page = parseInt(req.query.page) || 1;
-    const limit = parseInt(req.query.limit) || 20;
-    const skip = (page - 1) * limit;
+    const limit = Math.min(parseInt(req.query.limit) || 20, 100);
 
     const filter = {};
     if (req.query.category) filter.category = req.query.category;
     if (req.query.status) filter.isActive = req.query.status === 'active';
 
-    const products = await Product.find(filter)
-      .sort({ createdAt: -1 })
-      .skip(skip)
-      .limit(limit);
-
-    const total = await Product.countDocuments(filter);
+    const { items: products, pagination } = await paginate(Product, {
+      filter,
+      sortKey: 'createdAt',
+      sortOrder: -1,
+      limit,
+      cursor: req.query.cursor,
+      page: parseInt(req.query.page) || undefined,
+      includeTotal: req.query.includeTotal !== 'false',
+      build: query => query.select(Product.projections.adminRow).lean()
+    });
 
+    const { total, ...rest } = pagination;
     res.json({
       products,
-      pagination: {
-        currentPage: page,
-        totalPages: Math.ceil(total / limit),
-        totalProducts: total
-      }
+      pagination: { ...rest, totalProducts: total }
     });
 
   } catch (error) {
+    if (error instanceof PaginationError) {
+      return res.status(400).json({ error: error.message });
+    }
     console.error('Admin products fetch error:', error);
     res.status(500).json({ error: 'Failed to fetch products' });
   }
@@ -112,6 +119,7 @@ router.post('/products', [
 
     const product = new Product(productData);
     await product.save();
+    await catalogCache.invalidate();
 
     res.status(201).json({
       message: 'Product created successfully',
@@ -152,6 +160,7 @@ router.put('/products/:id', [
     });
 
     await product.save();
+    await catalogCache.invalidate();
 
     res.json({
       message: 'Product updated successfully',
@@ -174,6 +183,7 @@ router.delete('/products/:id', async (req, res) => {
 
     product.isActive = false;
     await product.save();
+    await catalogCache.invalidate();
 
     res.json({ message: 'Product deleted successfully' });
 
@@ -214,6 +224,7 @@ router.put('/products/:id/stock', [
     }
 
     await product.save();
+    await catalogCache.invalidate();
 
     res.json({
       message: 'Stock updated successfully',
@@ -229,32 +240,35 @@ router.put('/products/:id/stock', [
 // Get all orders
 router.get('/orders', async (req, res) => {
   try {
-    const page = parseInt(req.query.page) || 1;
-    const limit = parseInt(req.query.limit) || 20;
-    const skip = (page - 1) * limit;
+    const limit = Math.min(parseInt(req.query.limit) || 20, 100);
 
     const filter = {};
     if (req.query.status) filter.status = req.query.status;
 
-    const orders = await Order.find(filter)
-      .populate('customer', 'username email')
-      .populate('items.product', 'name price')
-      .sort({ createdAt: -1 })
-      .skip(skip)
-      .limit(limit);
-
-    const total = await Order.countDocuments(filter);
+    const { items: orders, pagination } = await paginate(Order, {
+      filter,
+      sortKey: 'createdAt',
+      sortOrder: -1,
+      limit,
+      cursor: req.query.cursor,
+      page: parseInt(req.query.page) || undefined,
+      includeTotal: req.query.includeTotal !== 'false',
+      build: query => query
+        .populate('customer', 'username email')
+        .populate('items.product', 'name price')
+        .lean()
+    });
 
+    const { total, ...rest } = pagination;
     res.json({
       orders,
-      pagination: {
-        currentPage: page,
-        totalPages: Math.ceil(total / limit),
-        totalOrders: total
-      }
+      pagination: { ...rest, totalOrders: total }
     });
 
   } catch (error) {
+    if (error instanceof PaginationError) {
+      return res.status(400).json({ error: error.message });
+    }
     console.error('Orders fetch error:', error);
     res.status(500).json({ error: 'Failed to fetch orders' });
   }
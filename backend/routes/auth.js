@@ -8,7 +8,7 @@ const router = express.Router();
 
 // Register new customer
 router.post('/register', [
-  body('username').trim().isLength({ min: 3 }).withMessage('Username must be at least 3 characters'),
+  body('username').trim().isLength({ min: 3, max: 30 }).withMessage('Username must be 3 to 30 characters'),
   body('email').isEmail().normalizeEmail().withMessage('Please provide a valid email'),
   body('password').isLength({ min: 6 }).withMessage('Password must be at least 6 characters')
 ], async (req, res) => {
@@ -1,16 +1,21 @@
 const express = require('express');
 const { body, validationResult } = require('express-validator');
 const Order = require('../models/Order');
-const Product = require('../models/Product');
 const auth = require('../middleware/auth');
+const stockReservation = require('../services/stockReservation');
+const orderItems = require('../services/orderItems');
+const productQueue = require('../services/productQueue');
+const idempotency = require('../middleware/idempotency');
+const { paginate, PaginationError } = require('../utils/pagination');
 
 const router = express.Router();
 
 // Apply authentication to all routes
 router.use(auth);
 
-// Create new order
-router.post('/', [
+// Create new order. Clients may send an Idempotency-Key header so a retried
+// submission returns the original response instead of placing a second order.
+router.post('/', idempotency(), [
   body('items').isArray({ min: 1 }).withMessage('Order must contain at least one item'),
   body('items.*.productId').isMongoId().withMessage('Valid product ID required'),
   body('items.*.quantity').isInt({ min: 1 }).withMessage('Valid quantity required'),
@@ -30,94 +35,83 @@ router.post('/', [
 
     const { items, shippingAddress, billingAddress, paymentMethod } = req.body;
 
-    // Validate and calculate order total
-    let subtotal = 0;
-    const orderItems = [];
-
-    for (const item of items) {
-      const product = await Product.findById(item.productId);
-      if (!product || !product.isActive) {
-        return res.status(400).json({ error: `Product not found: ${item.productId}` });
-      }
-
-      // Check stock availability
-      let available = false;
-      if (product.category === 'T-Shirts' || item.size) {
-        if (!item.size) {
-          return res.status(400).json({ 
-            error: `Size is required for ${product.name}` 
-          });
-        }
-        const variant = product.variants.find(v => v.size === item.size);
-        if (variant && variant.stock >= item.quantity) {
-          available = true;
-        }
-      } else {
-        if (product.totalStock >= item.quantity) {
-          available = true;
-        }
+    // Validate and price every line from one batched product lookup
+    let resolved;
+    try {
+      resolved = await orderItems.resolve(items);
+    } catch (error) {
+      if (error instanceof orderItems.OrderItemError) {
+        return res.status(400).json({ error: error.message });
       }
-
-      if (!available) {
-        return res.status(400).json({ 
-          error: `Insufficient stock for ${product.name}${item.size ? ` (Size: ${item.size})` : ''}` 
-        });
-      }
-
-      const itemTotal = product.price * item.quantity;
-      subtotal += itemTotal;
-
-      orderItems.push({
-        product: product._id,
-        name: product.name,
-        price: product.price,
-        quantity: item.quantity,
-        size: item.size || null,
-        sku: item.size ? product.variants.find(v => v.size === item.size)?.sku : null
-      });
+      throw error;
     }
+    const { subtotal, productsById } = resolved;
 
     // Calculate totals (simplified - add tax/shipping logic as needed)
     const tax = subtotal * 0.08; // 8% tax
     const shipping = subtotal > 50 ? 0 : 9.99; // Free shipping over $50
     const total = subtotal + tax + shipping;
 
-    // Create order
-    const order = new Order({
-      customer: req.user.userId,
-      items: orderItems,
-      subtotal,
-      tax,
-      shipping,
-      total,
-      shippingAddress,
-      billingAddress: billingAddress || shippingAddress,
-      paymentMethod
-    });
-
-    await order.save();
+    // Reserve stock atomically before the order exists, so concurrent
+    // checkouts can't oversell a variant
+    const reservation = resolved.items.map(item => ({
+      productId: item.product,
+      name: item.name,
+      quantity: item.quantity,
+      size: item.size
+    }));
+
+    // Checkouts that share a product run one at a time in this process
+    // instead of contending for the same documents
+    let order;
+    try {
+      order = await productQueue.run(reservation.map(line => line.productId), async () => {
+        await stockReservation.reserve(reservation);
+
+        // Create order
+        const created = new Order({
+          customer: req.user.userId,
+          items: resolved.items,
+          subtotal,
+          tax,
+          shipping,
+          total,
+          shippingAddress,
+          billingAddress: billingAddress || shippingAddress,
+          paymentMethod
+        });
 
-    // Update product stock
-    for (const item of items) {
-      const product = await Product.findById(item.productId);
-      if (item.size) {
-        const variant = product.variants.find(v => v.size === item.size);
-        if (variant) {
-          variant.stock -= item.quantity;
+        try {
+          await created.save();
+        } catch (error) {
+          await stockReservation.release(reservation);
+          throw error;
         }
-      } else {
-        product.totalStock -= item.quantity;
+        return created;
+      });
+    } catch (error) {
+      if (error instanceof stockReservation.StockReservationError) {
+        return res.status(400).json({ error: error.message });
       }
-      product.sales += item.quantity;
-      await product.save();
+      throw error;
     }
 
-    await order.populate('customer', 'username email');
-    await order.populate('items.product', 'name price');
+    // Same shape the populated order used to have, built from data already
+    // in hand instead of two more queries
+    const response = order.toObject();
+    response.customer = {
+      _id: req.user.userId,
+      username: req.user.username,
+      email: req.user.email
+    };
+    response.items.forEach(item => {
+      const product = productsById.get(String(item.product));
+      item.product = { _id: product._id, name: product.name, price: product.price };
+    });
 
     res.status(201).json({
       message: 'Order created successfully',
-      order
+      order: response
     });
 
   } catch (error) {
@@ -129,28 +123,29 @@ router.post('/', [
 // Get user's orders
 router.get('/my-orders', async (req, res) => {
   try {
-    const page = parseInt(req.query.page) || 1;
-    const limit = parseInt(req.query.limit) || 10;
-    const skip = (page - 1) * limit;
-
-    const orders = await Order.find({ customer: req.user.userId })
-      .populate('items.product', 'name price images')
-      .sort({ createdAt: -1 })
-      .skip(skip)
-      .limit(limit);
-
-    const total = await Order.countDocuments({ customer: req.user.userId });
+    const limit = Math.min(parseInt(req.query.limit) || 10, 50);
+
+    const { items: orders, pagination } = await paginate(Order, {
+      filter: { customer: req.user.userId },
+      sortKey: 'createdAt',
+      sortOrder: -1,
+      limit,
+      cursor: req.query.cursor,
+      page: parseInt(req.query.page) || undefined,
+      includeTotal: req.query.includeTotal !== 'false',
+      build: query => query.populate('items.product', 'name price images').lean()
+    });
 
+    const { total, ...rest } = pagination;
     res.json({
       orders,
-      pagination: {
-        currentPage: page,
-        totalPages: Math.ceil(total / limit),
-        totalOrders: total
-      }
+      pagination: { ...rest, totalOrders: total }
     });
 
   } catch (error) {
+    if (error instanceof PaginationError) {
+      return res.status(400).json({ error: error.message });
+    }
     console.error('Orders fetch error:', error);
     res.status(500).json({ error: 'Failed to fetch orders' });
   }
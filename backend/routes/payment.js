@@ -55,21 +55,27 @@ router.post('/confirm-payment', auth, async (req, res) => {
     const paymentIntent = await stripe.paymentIntents.retrieve(paymentIntentId);
 
     if (paymentIntent.status === 'succeeded') {
-      // Update order payment status
-      const order = await Order.findOneAndUpdate(
-        { 
-          _id: orderId,
-          customer: req.user.userId,
-          'paymentDetails.paymentIntentId': paymentIntentId
-        },
-        {
-          paymentStatus: 'completed',
-          status: 'processing',
-          'paymentDetails.transactionId': paymentIntent.id,
-          'paymentDetails.receiptUrl': paymentIntent.charges.data[0]?.receipt_url
-        },
+      // Update order payment status. Only a pending order moves to
+      // processing, so this and the webhook can't both count its revenue.
+      const filter = {
+        _id: orderId,
+        customer: req.user.userId,
+        'paymentDetails.paymentIntentId': paymentIntentId
+      };
+      const payment = {
+        paymentStatus: 'completed',
+        'paymentDetails.transactionId': paymentIntent.id,
+        'paymentDetails.receiptUrl': paymentIntent.charges.data[0]?.receipt_url
+      };
+      let order = await Order.findOneAndUpdate(
+        { ...filter, status: 'pending' },
+        { ...payment, status: 'processing' },
         { new: true }
       );
+      if (!order) {
+        // Already moved on, e.g. by the webhook; record the payment details
+        order = await Order.findOneAndUpdate(filter, payment, { new: true });
+      }
 
       if (!order) {
         return res.status(404).json({ error: 'Order not found' });
@@ -109,11 +115,14 @@ router.post('/stripe-webhook', express.raw({ type: 'application/json' }), async
         const paymentIntent = event.data.object;
         const orderId = paymentIntent.metadata.orderId;
 
-        // Update order status
-        await Order.findByIdAndUpdate(orderId, {
+        // Update order status; confirm-payment may have got there first
+        const moved = await Order.findOneAndUpdate({ _id: orderId, status: 'pending' }, {
           paymentStatus: 'completed',
           status: 'processing'
         });
+        if (!moved) {
+          await Order.findByIdAndUpdate(orderId, { paymentStatus: 'completed' });
+        }
 
         console.log(`Payment succeeded for order: ${orderId}`);
         break;
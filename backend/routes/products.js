@@ -3,13 +3,22 @@ const { body, validationResult, query } = require('express-validator');
 const Product = require('../models/Product');
 const auth = require('../middleware/auth');
 const adminAuth = require('../middleware/adminAuth');
+const { escapeRegex, tokenize } = require('../utils/search');
+const { paginate, PaginationError } = require('../utils/pagination');
+const { cacheResponse } = require('../services/catalogCache');
+const viewCounter = require('../services/viewCounter');
+const productResolver = require('../services/productResolver');
+const stockRules = require('../services/stockRules');
+const database = require('../services/database');
 
 const router = express.Router();
 
 // Get all products with filtering and pagination
-router.get('/', [
+router.get('/', cacheResponse(), [
   query('page').optional().isInt({ min: 1 }),
+  query('cursor').optional().isString(),
   query('limit').optional().isInt({ min: 1, max: 50 }),
+  query('includeTotal').optional().isBoolean(),
   query('category').optional().trim(),
   query('search').optional().trim(),
   query('sortBy').optional().isIn(['name', 'price', 'createdAt', 'sales']),
@@ -21,9 +30,7 @@ router.get('/', [
       return res.status(400).json({ errors: errors.array() });
     }
 
-    const page = parseInt(req.query.page) || 1;
     const limit = parseInt(req.query.limit) || 12;
-    const skip = (page - 1) * limit;
 
     // Build filter query
     const filter = { isActive: true };
@@ -32,67 +39,72 @@ router.get('/', [
       filter.category = req.query.category;
     }
 
+    // Search goes through the weighted text index instead of a regex scan
+    const scoreProjection = {};
     if (req.query.search) {
-      filter.$or = [
-        { name: { $regex: req.query.search, $options: 'i' } },
-        { description: { $regex: req.query.search, $options: 'i' } },
-        { tags: { $in: [new RegExp(req.query.search, 'i')] } }
-      ];
+      filter.$text = { $search: req.query.search };
+      scoreProjection.score = { $meta: 'textScore' };
     }
 
-    // Build sort query
-    const sortBy = req.query.sortBy || 'createdAt';
+    // Text searches rank by relevance unless told otherwise; relevance
+    // ordering has no stable key, so those results page by offset
+    const sortKey = req.query.sortBy || 'createdAt';
     const sortOrder = req.query.sortOrder === 'asc' ? 1 : -1;
-    const sort = { [sortBy]: sortOrder };
+    const relevanceSort = req.query.search && !req.query.sortBy
+      ? { score: { $meta: 'textScore' }, _id: 1 }
+      : null;
 
-    const products = await Product.find(filter)
-      .sort(sort)
-      .skip(skip)
-      .limit(limit)
-      .select('-__v');
-
-    const total = await Product.countDocuments(filter);
-    const totalPages = Math.ceil(total / limit);
+    const { items: products, pagination } = await paginate(Product, {
+      filter,
+      sortKey,
+      sortOrder,
+      limit,
+      cursor: req.query.cursor,
+      page: parseInt(req.query.page) || undefined,
+      sort: relevanceSort,
+      includeTotal: req.query.includeTotal !== 'false',
+      readPreference: database.readPreference('catalog'),
+      build: query => query
+        .select(Product.projections.card)
+        .select(scoreProjection)
+        .lean()
+    });
 
+    const { total, ...rest } = pagination;
     res.json({
       products,
-      pagination: {
-        currentPage: page,
-        totalPages,
-        totalProducts: total,
-        hasNextPage: page < totalPages,
-        hasPrevPage: page > 1
-      }
+      pagination: { ...rest, totalProducts: total }
     });
 
   } catch (error) {
+    if (error instanceof PaginationError) {
+      return res.status(400).json({ error: error.message });
+    }
     console.error('Products fetch error:', error);
     res.status(500).json({ error: 'Failed to fetch products' });
   }
 });
 
+// Views served from the response cache still count
+const countCachedView = (req, entry) => {
+  if (entry.meta && entry.meta.productId) {
+    viewCounter.record(entry.meta.productId);
+  }
+};
+
 // Get single product by ID or slug
-router.get('/:identifier', async (req, res) => {
+router.get('/:identifier', cacheResponse({ onHit: countCachedView }), async (req, res) => {
   try {
-    const { identifier } = req.params;
-
-    // Try to find by ID first, then by slug
-    let product = await Product.findById(identifier).select('-__v');
-    if (!product) {
-      product = await Product.findOne({ 
-        slug: identifier, 
-        isActive: true 
-      }).select('-__v');
-    }
+    const product = await productResolver.resolve(req.params.identifier);
 
     if (!product) {
       return res.status(404).json({ error: 'Product not found' });
     }
 
-    // Increment view count
-    product.views += 1;
-    await product.save();
+    // Views are buffered and flushed in batches, not saved per request
+    viewCounter.record(product._id);
 
+    res.locals.cacheMeta = { productId: product._id };
     res.json(product);
 
   } catch (error) {
@@ -113,38 +125,24 @@ router.post('/check-availability', [
       return res.status(400).json({ errors: errors.array() });
     }
 
-    const { productId, size, quantity } = req.body;
+    const { productId, size } = req.body;
+    const quantity = parseInt(req.body.quantity);
 
-    const product = await Product.findById(productId);
-    if (!product || !product.isActive) {
+    const product = await Product.findById(productId)
+      .select(stockRules.AVAILABILITY_PROJECTION)
+      .lean();
+
+    const result = stockRules.checkLine(product, { size, quantity });
+    if (result.reason === stockRules.REASONS.NOT_FOUND) {
       return res.status(404).json({ error: 'Product not found' });
     }
-
-    let available = false;
-    let availableStock = 0;
-
-    // For T-shirts and sized items, check specific size
-    if (product.category === 'T-Shirts' || (size && product.variants.length > 0)) {
-      if (!size) {
-        return res.status(400).json({ error: 'Size selection is required for this product' });
-      }
-
-      const variant = product.variants.find(v => v.size === size);
-      if (variant && variant.stock >= quantity) {
-        available = true;
-        availableStock = variant.stock;
-      }
-    } else {
-      // For non-sized items
-      if (product.totalStock >= quantity) {
-        available = true;
-        availableStock = product.totalStock;
-      }
+    if (result.reason === stockRules.REASONS.SIZE_REQUIRED) {
+      return res.status(400).json({ error: 'Size selection is required for this product' });
     }
 
     res.json({
-      available,
-      availableStock,
+      available: result.available,
+      availableStock: result.availableStock,
       requestedQuantity: quantity,
       size: size || null
     });
@@ -155,10 +153,104 @@ router.post('/check-availability', [
   }
 });
 
+// Check availability for a whole cart in one request
+router.post('/check-availability/batch', [
+  body('items').isArray({ min: 1, max: 100 }).withMessage('Between 1 and 100 cart lines required'),
+  body('items.*.productId').isMongoId().withMessage('Valid product ID required'),
+  body('items.*.size').optional().trim(),
+  body('items.*.quantity').isInt({ min: 1 }).withMessage('Quantity must be at least 1')
+], async (req, res) => {
+  try {
+    const errors = validationResult(req);
+    if (!errors.isEmpty()) {
+      return res.status(400).json({ errors: errors.array() });
+    }
+
+    const lines = req.body.items.map(item => ({
+      productId: item.productId,
+      size: item.size || null,
+      quantity: parseInt(item.quantity)
+    }));
+
+    // One $in query for the whole cart, projected to what the rules need
+    const ids = [...new Set(lines.map(line => line.productId))];
+    const products = await Product.find({ _id: { $in: ids } })
+      .select(stockRules.AVAILABILITY_PROJECTION)
+      .lean();
+    const productsById = new Map(products.map(product => [String(product._id), product]));
+
+    const results = stockRules.checkCart(lines, productsById);
+
+    res.json({
+      available: results.every(result => result.available),
+      items: lines.map((line, index) => ({
+        productId: line.productId,
+        size: line.size,
+        requestedQuantity: line.quantity,
+        available: results[index].available,
+        availableStock: results[index].availableStock,
+        reason: results[index].reason
+      }))
+    });
+
+  } catch (error) {
+    console.error('Batch availability check error:', error);
+    res.status(500).json({ error: 'Failed to check availability' });
+  }
+});
+
+// Autocomplete suggestions by word prefix
+router.get('/meta/suggest', [
+  query('q').trim().isLength({ min: 1, max: 50 }).withMessage('Search prefix required'),
+  query('limit').optional().isInt({ min: 1, max: 20 })
+], async (req, res) => {
+  try {
+    const errors = validationResult(req);
+    if (!errors.isEmpty()) {
+      return res.status(400).json({ errors: errors.array() });
+    }
+
+    const limit = parseInt(req.query.limit) || 8;
+    const tokens = tokenize(req.query.q);
+    if (tokens.length === 0) {
+      return res.json([]);
+    }
+
+    // Earlier words must match whole tokens, the last one is a prefix.
+    // The anchored, case-sensitive regex on lowercased tokens is answered
+    // from the { searchTokens, sales } index, and the best sellers among
+    // the matches are picked before the limit applies.
+    const prefix = tokens.pop();
+    const filter = {
+      isActive: true,
+      searchTokens: { $regex: `^${escapeRegex(prefix)}` }
+    };
+    if (tokens.length > 0) {
+      filter.$and = tokens.map(token => ({ searchTokens: token }));
+    }
+
+    const suggestions = await Product.find(filter)
+      .select('name slug category price')
+      .sort({ sales: -1, _id: 1 })
+      .limit(limit)
+      .read(database.readPreference('catalog'))
+      .lean();
+
+    res.json(suggestions.map(({ _id, name, slug, category, price }) => ({
+      _id, name, slug, category, price
+    })));
+
+  } catch (error) {
+    console.error('Suggestions fetch error:', error);
+    res.status(500).json({ error: 'Failed to fetch suggestions' });
+  }
+});
+
 // Get product categories
-router.get('/meta/categories', async (req, res) => {
+router.get('/meta/categories', cacheResponse({ ttlMs: 10 * 60 * 1000 }), async (req, res) => {
   try {
-    const categories = await Product.distinct('category', { isActive: true });
+    const categories = await Product.distinct('category', { isActive: true })
+      .read(database.readPreference('catalog'));
     res.json(categories);
   } catch (error) {
     console.error('Categories fetch error:', error);
@@ -0,0 +1,22 @@
+// Recompute the stored availableStock/inStock fields for every product.
+// Run once after deploying the stored fields, or any time the data was
+// edited outside the app.
+//
+// Usage: npm run migrate:stock-fields
+
+const mongoose = require('mongoose');
+require('dotenv').config();
+
+const Product = require('../models/Product');
+
+const main = async () => {
+  await mongoose.connect(process.env.MONGODB_URI || 'mongodb://localhost:27017/dripnest');
+  const result = await Product.syncStockFields({});
+  console.log(`Updated stock fields on ${result.modifiedCount} of ${result.matchedCount} products`);
+  await mongoose.disconnect();
+};
+
+main().catch(error => {
+  console.error('Stock field backfill failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
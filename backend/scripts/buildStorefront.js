@@ -0,0 +1,74 @@
+// Storefront build: content-hashed asset names for long-lived caching
+//
+// Usage: npm run build:storefront
+// Options (env): STOREFRONT_DIST (output directory, default ../dist next to index.html),
+//                STOREFRONT_API_URL (fills the dripnest-api meta tag, e.g. http://localhost:3000/api)
+//
+// Copies style.css and app.js to style.<hash>.css and app.<hash>.js,
+// points index.html at them and writes sw.js with the hashed shell list and
+// a shell version derived from it. Hashed files never change, so serve them
+// with `Cache-Control: public, max-age=31536000, immutable`; index.html and
+// sw.js should be revalidated on every load (`no-cache`).
+
+const crypto = require('crypto');
+const fs = require('fs');
+const path = require('path');
+
+const FRONTEND = path.join(__dirname, '..', '..');
+const DIST = process.env.STOREFRONT_DIST || path.join(FRONTEND, 'dist');
+const ASSETS = ['style.css', 'app.js'];
+
+const hashOf = (content) => crypto.createHash('sha256').update(content).digest('hex').slice(0, 10);
+
+const replaceOnce = (source, search, replacement, file) => {
+  if (!source.includes(search)) {
+    throw new Error(`${file}: expected to find ${search}`);
+  }
+  return source.replace(search, replacement);
+};
+
+const build = ({ dist = DIST, apiUrl = process.env.STOREFRONT_API_URL || '' } = {}) => {
+  const read = (file) => fs.readFileSync(path.join(FRONTEND, file), 'utf8');
+  fs.rmSync(dist, { recursive: true, force: true });
+  fs.mkdirSync(dist, { recursive: true });
+
+  let html = read('index.html');
+  const files = {};
+  for (const asset of ASSETS) {
+    const content = read(asset);
+    const extension = path.extname(asset);
+    const hashed = `${path.basename(asset, extension)}.${hashOf(content)}${extension}`;
+    fs.writeFileSync(path.join(dist, hashed), content);
+    const attribute = extension === '.css' ? 'href' : 'src';
+    html = replaceOnce(html, `${attribute}="${asset}"`, `${attribute}="${hashed}"`, 'index.html');
+    files[asset] = hashed;
+  }
+  if (apiUrl) {
+    html = replaceOnce(html, '<meta name="dripnest-api" content="">',
+      `<meta name="dripnest-api" content="${apiUrl}">`, 'index.html');
+  }
+  fs.writeFileSync(path.join(dist, 'index.html'), html);
+
+  const shellFiles = ['index.html', ...ASSETS.map(asset => files[asset])];
+  let worker = read('sw.js');
+  const version = hashOf(html + worker);
+  worker = replaceOnce(worker, "const SHELL_VERSION = 'dev';", `const SHELL_VERSION = '${version}';`, 'sw.js');
+  worker = replaceOnce(worker, "const SHELL_FILES = ['index.html', 'style.css', 'app.js'];",
+    `const SHELL_FILES = ${JSON.stringify(shellFiles).replace(/"/g, "'").replace(/,/g, ', ')};`, 'sw.js');
+  fs.writeFileSync(path.join(dist, 'sw.js'), worker);
+
+  return { dist, version, files };
+};
+
+if (require.main === module) {
+  try {
+    const { dist, version, files } = build();
+    console.log(`storefront ${version} written to ${path.relative(process.cwd(), dist)}`);
+    Object.entries(files).forEach(([source, hashed]) => console.log(`  ${source} -> ${hashed}`));
+  } catch (error) {
+    console.error('Storefront build failed:', error.message);
+    process.exit(1);
+  }
+}
+
+module.exports = { build };
\ No newline at end of file
@@ -0,0 +1,75 @@
+// Storefront catalog index check
+//
+// Loads index.html and app.js into jsdom on the local sample catalog, edits
+// products the two ways the storefront does (the admin edit form, and the
+// Object.assign merge of a revalidated API page) and checks that category
+// filters, with and without a search term, follow the new category.
+//
+// Usage: npm run test:catalog-index
+
+const fs = require('fs');
+const path = require('path');
+const { JSDOM, VirtualConsole } = require('jsdom');
+
+const FRONTEND = path.join(__dirname, '..', '..');
+
+const loadStorefront = async () => {
+  const dom = new JSDOM(fs.readFileSync(path.join(FRONTEND, 'index.html'), 'utf8'), {
+    url: 'http://localhost/',
+    runScripts: 'outside-only',
+    pretendToBeVisual: true,
+    virtualConsole: new VirtualConsole()
+  });
+  const { window } = dom;
+  window.alert = () => {};
+  window.eval(fs.readFileSync(path.join(FRONTEND, 'app.js'), 'utf8'));
+  if (window.document.readyState !== 'complete') {
+    await new Promise(resolve => window.addEventListener('load', resolve));
+  }
+  await window.eval('appReady');
+  await window.eval('loadCollection("products")');
+  return window;
+};
+
+const ids = (window, term, category) =>
+  Array.from(window.eval(`searchCatalog(${JSON.stringify(term)}, ${JSON.stringify(category)})`), product => product.id);
+
+const main = async () => {
+  const window = await loadStorefront();
+  const { document } = window;
+  let failures = 0;
+  const expect = (name, actual, expected) => {
+    const ok = JSON.stringify(actual) === JSON.stringify(expected);
+    if (!ok) failures++;
+    console.log(`${ok ? 'ok  ' : 'FAIL'} ${name}: ${JSON.stringify(actual)}${ok ? '' : ` (expected ${JSON.stringify(expected)})`}`);
+  };
+
+  const [tee, hoodie] = window.eval('products.slice(0, 2)');
+  const teeName = tee.name.toLowerCase();
+
+  // Admin edit form: T-Shirts -> Hoodies
+  window.eval(`editProduct(${tee.id})`);
+  document.getElementById('edit-product-category').value = 'Hoodies';
+  window.eval('handleEditProduct({ preventDefault() {} })');
+  expect('edited product left its old category', ids(window, '', 'T-Shirts').includes(tee.id), false);
+  expect('edited product is in its new category', ids(window, '', 'Hoodies').includes(tee.id), true);
+
+  // Merge path, with the search postings built
+  window.eval('buildGramIndex()');
+  window.eval(`Object.assign(findProduct(${hoodie.id}), { category: 'Jeans' }); indexProduct(findProduct(${hoodie.id}))`);
+  expect('merged product left its old category', ids(window, '', 'Hoodies').includes(hoodie.id), false);
+  expect('merged product is in its new category', ids(window, '', 'Jeans').includes(hoodie.id), true);
+  expect('search within the new category', ids(window, teeName, 'Hoodies'), [tee.id]);
+  expect('search within the old category', ids(window, teeName, 'T-Shirts'), []);
+
+  window.close();
+  if (failures > 0) {
+    console.error(`${failures} catalog index check(s) failed`);
+    process.exit(1);
+  }
+};
+
+main().catch(error => {
+  console.error('Catalog index check failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
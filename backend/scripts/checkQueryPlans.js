@@ -0,0 +1,190 @@
+// Query plan regression check
+//
+// Runs the query shape behind every hot route through explain() and fails
+// if a winning plan contains a COLLSCAN or a blocking in-memory SORT.
+//
+// Usage: npm run test:query-plans
+//   Starts a throwaway mongod via mongodb-memory-server. Set
+//   QUERY_PLAN_MONGODB_URI to use a local mongod instead (its users,
+//   products and orders collections are dropped).
+
+const mongoose = require('mongoose');
+
+const User = require('../models/User');
+const Product = require('../models/Product');
+const Order = require('../models/Order');
+
+const CATEGORIES = ['T-Shirts', 'Hoodies', 'Jeans', 'Shoes', 'Accessories'];
+const SORT_KEYS = ['createdAt', 'price', 'sales', 'name'];
+
+const startDatabase = async () => {
+  if (process.env.QUERY_PLAN_MONGODB_URI) {
+    return { uri: process.env.QUERY_PLAN_MONGODB_URI, stop: async () => {} };
+  }
+  const { MongoMemoryServer } = require('mongodb-memory-server');
+  const server = await MongoMemoryServer.create();
+  return { uri: server.getUri('dripnest-query-plans'), stop: () => server.stop() };
+};
+
+const seed = async () => {
+  await Promise.all([User.deleteMany({}), Product.deleteMany({}), Order.deleteMany({})]);
+  await Promise.all([User.syncIndexes(), Product.syncIndexes(), Order.syncIndexes()]);
+
+  const users = await User.insertMany(Array.from({ length: 50 }, (_, i) => ({
+    username: `user${i}`,
+    email: `user${i}@example.com`,
+    password: 'not-a-real-hash',
+    role: i === 0 ? 'admin' : 'customer'
+  })));
+
+  const products = await Product.insertMany(Array.from({ length: 500 }, (_, i) => ({
+    name: `Plan Product ${i}`,
+    slug: `plan-product-${i}`,
+    description: `Seed product ${i} for query plan checks`,
+    category: CATEGORIES[i % CATEGORIES.length],
+    price: (i % 97) + 5,
+    tags: ['seed', `tag${i % 10}`],
+    searchTokens: ['plan', 'product', String(i)],
+    variants: i % 2 === 0 ? [{ size: 'M', stock: i % 7 }] : [],
+    totalStock: i % 11,
+    isActive: i % 9 !== 0,
+    sales: i % 50
+  })));
+
+  await Order.insertMany(Array.from({ length: 500 }, (_, i) => ({
+    orderNumber: `PLAN${i}`,
+    customer: users[i % users.length]._id,
+    items: [{ product: products[i % products.length]._id, name: 'x', price: 10, quantity: 1 }],
+    subtotal: 10,
+    total: 10,
+    status: ['pending', 'processing', 'shipped', 'delivered'][i % 4],
+    paymentMethod: 'stripe',
+    paymentDetails: i % 3 === 0 ? { paymentIntentId: `pi_${i}` } : {}
+  })));
+
+  return { user: users[1], product: products[2] };
+};
+
+// Collect every stage name under any winningPlan in an explain document
+const winningStages = (explain) => {
+  const stages = [];
+  const walk = (node, inPlan) => {
+    if (!node || typeof node !== 'object') return;
+    if (Array.isArray(node)) {
+      node.forEach(child => walk(child, inPlan));
+      return;
+    }
+    if (inPlan && typeof node.stage === 'string') stages.push(node.stage);
+    Object.keys(node).forEach(key => {
+      if (key === 'rejectedPlans') return;
+      walk(node[key], inPlan || key === 'winningPlan');
+    });
+  };
+  walk(explain, false);
+  return stages;
+};
+
+const checks = ({ user, product }) => {
+  const list = [];
+  const find = (name, query, options = {}) => list.push({ name, explain: () => query.explain('queryPlanner'), ...options });
+  const aggregate = (name, model, pipeline, options = {}) =>
+    list.push({ name, explain: () => model.aggregate(pipeline).explain('queryPlanner'), ...options });
+  const count = (name, model, filter) => aggregate(name, model, [{ $match: filter }, { $group: { _id: 1, n: { $sum: 1 } } }]);
+
+  // GET /api/products - every sortBy, both directions, with and without category
+  SORT_KEYS.forEach(sortKey => {
+    [1, -1].forEach(order => {
+      find(`products sort=${sortKey}:${order}`,
+        Product.find({ isActive: true }).sort({ [sortKey]: order, _id: order }).limit(13));
+      find(`products category sort=${sortKey}:${order}`,
+        Product.find({ isActive: true, category: 'Hoodies' }).sort({ [sortKey]: order, _id: order }).limit(13));
+    });
+  });
+  find('products cursor page', Product.find({
+    isActive: true,
+    $and: [
+      { createdAt: { $lte: new Date() } },
+      { $or: [{ createdAt: { $lt: new Date() } }, { createdAt: new Date(), _id: { $lt: product._id } }] }
+    ]
+  }).sort({ createdAt: -1, _id: -1 }).limit(13));
+  count('products count', Product, { isActive: true, category: 'Hoodies' });
+  // Relevance ordering has to sort on textScore; only the scan is checked
+  find('products text search', Product.find(
+    { isActive: true, $text: { $search: 'product' } },
+    { score: { $meta: 'textScore' } }
+  ).sort({ score: { $meta: 'textScore' }, _id: 1 }).limit(13), { allowSort: true });
+  // A prefix is a range over searchTokens, so the top-sellers sort is a
+  // bounded top-k over the matches; only the scan is checked
+  find('products suggest', Product.find({ isActive: true, searchTokens: { $regex: '^pla' } })
+    .sort({ sales: -1, _id: 1 }).limit(8), { allowSort: true });
+
+  // GET /api/products/:identifier
+  find('product by slug', Product.findOne({ slug: product.slug, isActive: true }));
+  find('product by id', Product.findOne({ _id: product._id }));
+
+  // GET /api/admin/products and /api/admin/orders
+  find('admin products', Product.find({}).sort({ createdAt: -1, _id: -1 }).limit(21));
+  find('admin products category', Product.find({ category: 'Jeans' }).sort({ createdAt: -1, _id: -1 }).limit(21));
+  find('admin products status', Product.find({ isActive: false }).sort({ createdAt: -1, _id: -1 }).limit(21));
+  find('admin orders', Order.find({}).sort({ createdAt: -1, _id: -1 }).limit(21));
+  find('admin orders status', Order.find({ status: 'shipped' }).sort({ createdAt: -1, _id: -1 }).limit(21));
+
+  // GET /api/admin/dashboard
+  count('dashboard active products', Product, { isActive: true });
+  count('dashboard customers', User, { role: 'customer' });
+  aggregate('dashboard revenue', Order, [
+    { $match: { status: { $in: ['processing', 'shipped', 'delivered'] } } },
+    { $group: { _id: null, total: { $sum: '$total' } } }
+  ]);
+  find('dashboard low stock', Product.find({
+    isActive: true,
+    $or: [{ totalStock: { $lte: 5 } }, { 'variants.stock': { $lte: 5 } }]
+  }).limit(10));
+
+  // GET /api/orders/my-orders and /api/orders/:id
+  find('my orders', Order.find({ customer: user._id }).sort({ createdAt: -1, _id: -1 }).limit(11));
+  count('my orders count', Order, { customer: user._id });
+
+  // Payment lookups
+  find('payment intent lookup', Order.findOne({ 'paymentDetails.paymentIntentId': 'pi_3' }));
+
+  // Auth
+  find('login', User.findOne({ $or: [{ username: 'user1' }, { email: 'user1' }], role: 'customer', isActive: true }));
+  find('register duplicate check', User.findOne({ $or: [{ email: 'new@example.com' }, { username: 'new' }] }));
+
+  return list;
+};
+
+const main = async () => {
+  const database = await startDatabase();
+  let failures = 0;
+
+  try {
+    await mongoose.connect(database.uri);
+    const fixtures = await seed();
+
+    for (const check of checks(fixtures)) {
+      const stages = winningStages(await check.explain());
+      const problems = stages.filter(stage => stage === 'COLLSCAN' || (stage === 'SORT' && !check.allowSort));
+      if (problems.length > 0) {
+        failures++;
+        console.log(`FAIL ${check.name}: ${stages.join(' <- ')}`);
+      } else {
+        console.log(`ok   ${check.name}: ${stages.join(' <- ')}`);
+      }
+    }
+  } finally {
+    await mongoose.disconnect();
+    await database.stop();
+  }
+
+  if (failures > 0) {
+    console.error(`${failures} query plan(s) regressed`);
+    process.exit(1);
+  }
+};
+
+main().catch(error => {
+  console.error('Query plan check failed:', error);
+  process.exit(1);
+});
\ No newline at end of file
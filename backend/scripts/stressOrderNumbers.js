@@ -0,0 +1,130 @@
+// Order number stress test
+//
+// Forks several worker processes that save orders concurrently through the
+// normal Order model, then checks that every order got a distinct number and
+// that each process handed its numbers out in increasing order.
+//
+// Usage: npm run test:order-numbers
+//   Starts a throwaway mongod via mongodb-memory-server. Set
+//   STRESS_MONGODB_URI to use a local mongod instead (its orders and
+//   counters collections are dropped).
+// Options (env): STRESS_ORDERS (default 100000), STRESS_PROCESSES (default 4),
+//                STRESS_CONCURRENCY (in-flight saves per process, default 200)
+
+const { fork } = require('child_process');
+const mongoose = require('mongoose');
+
+const Order = require('../models/Order');
+const Counter = require('../models/Counter');
+const orderNumbers = require('../services/orderNumbers');
+
+const ORDERS = parseInt(process.env.STRESS_ORDERS) || 100000;
+const PROCESSES = parseInt(process.env.STRESS_PROCESSES) || 4;
+const CONCURRENCY = parseInt(process.env.STRESS_CONCURRENCY) || 200;
+
+const startDatabase = async () => {
+  if (process.env.STRESS_MONGODB_URI) {
+    return { uri: process.env.STRESS_MONGODB_URI, stop: async () => {} };
+  }
+  const { MongoMemoryServer } = require('mongodb-memory-server');
+  const server = await MongoMemoryServer.create();
+  return { uri: server.getUri('dripnest-order-numbers'), stop: () => server.stop() };
+};
+
+// Worker: save `count` orders with CONCURRENCY in flight and report whether
+// the numbers it was given came out in increasing order
+const runWorker = async (uri, count) => {
+  await mongoose.connect(uri);
+  const customer = new mongoose.Types.ObjectId();
+  const product = new mongoose.Types.ObjectId();
+  const issued = [];
+  let next = 0;
+  let failures = 0;
+
+  const worker = async () => {
+    while (next < count) {
+      next++;
+      // Same call the Order pre('validate') hook makes, taken here so the
+      // issue order can be checked
+      const orderNumber = await orderNumbers.next();
+      issued.push(orderNumber);
+      const order = new Order({
+        orderNumber,
+        customer,
+        items: [{ product, name: 'Stress item', price: 10, quantity: 1 }],
+        subtotal: 10,
+        total: 10,
+        paymentMethod: 'cod'
+      });
+      try {
+        await order.save();
+      } catch (error) {
+        failures++;
+        if (failures <= 5) console.error(`[worker ${process.pid}] save failed:`, error.message);
+      }
+    }
+  };
+
+  await Promise.all(Array.from({ length: CONCURRENCY }, worker));
+  await mongoose.disconnect();
+
+  const monotonic = issued.every((number, i) => i === 0 || number > issued[i - 1]);
+  process.send({ issued: issued.length, failures, monotonic });
+};
+
+const main = async () => {
+  const database = await startDatabase();
+  let ok = false;
+
+  try {
+    await mongoose.connect(database.uri);
+    await Promise.all([Order.deleteMany({}), Counter.deleteMany({})]);
+    await Order.syncIndexes();
+
+    const perProcess = Math.ceil(ORDERS / PROCESSES);
+    console.log(`orders=${ORDERS} processes=${PROCESSES} concurrency=${CONCURRENCY}`);
+
+    const started = process.hrtime.bigint();
+    const reports = await Promise.all(Array.from({ length: PROCESSES }, (_, i) => new Promise((resolve, reject) => {
+      const count = Math.min(perProcess, ORDERS - i * perProcess);
+      const child = fork(__filename, [], { env: { ...process.env, STRESS_WORKER_URI: database.uri, STRESS_WORKER_COUNT: String(count) } });
+      child.once('message', resolve);
+      child.once('exit', code => code && reject(new Error(`worker exited with code ${code}`)));
+    })));
+    const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+
+    const saved = await Order.countDocuments();
+    const [{ distinct } = { distinct: 0 }] = await Order.aggregate([
+      { $group: { _id: '$orderNumber' } },
+      { $count: 'distinct' }
+    ]);
+    const failures = reports.reduce((sum, report) => sum + report.failures, 0);
+    const monotonic = reports.every(report => report.monotonic);
+
+    console.log(`saved=${saved} distinct=${distinct} failures=${failures} duplicates=${saved - distinct} ` +
+      `monotonicPerProcess=${monotonic} ${(saved / seconds).toFixed(0)} orders/sec`);
+
+    ok = saved === ORDERS && distinct === saved && failures === 0 && monotonic;
+    await Promise.all([Order.deleteMany({}), Counter.deleteMany({})]);
+  } finally {
+    await mongoose.disconnect();
+    await database.stop();
+  }
+
+  if (!ok) {
+    console.error('Order number stress test failed');
+    process.exit(1);
+  }
+};
+
+if (process.env.STRESS_WORKER_URI) {
+  runWorker(process.env.STRESS_WORKER_URI, parseInt(process.env.STRESS_WORKER_COUNT)).catch(error => {
+    console.error('Stress worker failed:', error);
+    process.exit(1);
+  });
+} else {
+  main().catch(error => {
+    console.error('Order number stress test failed:', error);
+    process.exit(1);
+  });
+}
\ No newline at end of file
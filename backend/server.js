@@ -1,8 +1,6 @@
 const express = require('express');
-const mongoose = require('mongoose');
 const cors = require('cors');
 const helmet = require('helmet');
-const rateLimit = require('express-rate-limit');
 require('dotenv').config();
 
 // Import routes
@@ -11,24 +9,41 @@ const productRoutes = require('./routes/products');
 const orderRoutes = require('./routes/orders');
 const adminRoutes = require('./routes/admin');
 const paymentRoutes = require('./routes/payment');
+const principalCache = require('./services/principalCache');
+const dashboardStats = require('./services/dashboardStats');
+const catalogCache = require('./services/catalogCache');
+const viewCounter = require('./services/viewCounter');
+const productQueue = require('./services/productQueue');
+const clusterStatus = require('./services/clusterStatus');
+const rateLimit = require('./middleware/rateLimit');
+const database = require('./services/database');
+const metrics = require('./services/metrics');
 
 const app = express();
 const PORT = process.env.PORT || 3000;
 
+// Request latency histograms (served at /metrics)
+app.use(metrics.httpMetrics);
+
 // Security middleware
 app.use(helmet());
 
-// Rate limiting
-const limiter = rateLimit({
-  windowMs: 15 * 60 * 1000, // 15 minutes
-  max: 100 // limit each IP to 100 requests per windowMs
-});
-app.use(limiter);
+// Behind a load balancer, trust its X-Forwarded-For so limits apply per client
+if (process.env.TRUST_PROXY) {
+  const hops = parseInt(process.env.TRUST_PROXY);
+  app.set('trust proxy', Number.isNaN(hops) ? process.env.TRUST_PROXY : hops);
+}
+
+// Rate limiting (tiered per route, static files untouched)
+const limiter = rateLimit();
+app.use('/api', limiter);
 
 // CORS configuration  
 app.use(cors({
   origin: process.env.FRONTEND_URL || 'http://localhost:3001',
-  credentials: true
+  credentials: true,
+  // The storefront revalidates its cached catalog responses with If-None-Match
+  exposedHeaders: ['ETag']
 }));
 
 // Body parsing middleware
@@ -39,13 +54,34 @@ app.use(express.urlencoded({ extended: true, limit: '10mb' }));
 app.use('/uploads', express.static('uploads'));
 app.use(express.static('public'));
 
-// Database connection
-mongoose.connect(process.env.MONGODB_URI || 'mongodb://localhost:27017/dripnest', {
-  useNewUrlParser: true,
-  useUnifiedTopology: true,
-})
-.then(() => console.log('MongoDB connected successfully'))
-.catch(err => console.error('MongoDB connection error:', err));
+// Liveness and details; answered even while the database is down
+app.get('/api/health', (req, res) => {
+  res.json({ 
+    status: 'OK', 
+    timestamp: new Date().toISOString(),
+    service: 'Dripnest Backend API',
+    caches: {
+      principals: principalCache.stats(),
+      catalog: catalogCache.stats()
+    },
+    views: viewCounter.stats(),
+    checkoutQueue: productQueue.stats(),
+    rateLimit: limiter.stats(),
+    database: database.stats(),
+    process: clusterStatus.stats()
+  });
+});
+
+// Prometheus scrape endpoint
+app.get('/metrics', metrics.endpoint);
+
+// Readiness probe for load balancers and orchestrators
+app.get('/api/ready', (req, res) => {
+  res.status(database.isReady() ? 200 : 503).json({ ready: database.isReady() });
+});
+
+// Hold back API traffic while the database is unreachable
+app.use('/api', database.requireReady);
 
 // Routes
 app.use('/api/auth', authRoutes);
@@ -54,15 +90,6 @@ app.use('/api/orders', orderRoutes);
 app.use('/api/admin', adminRoutes);
 app.use('/api/payment', paymentRoutes);
 
-// Health check endpoint
-app.get('/api/health', (req, res) => {
-  res.json({ 
-    status: 'OK', 
-    timestamp: new Date().toISOString(),
-    service: 'Dripnest Backend API'
-  });
-});
-
 // Error handling middleware
 app.use((err, req, res, next) => {
   console.error(err.stack);
@@ -77,9 +104,49 @@ app.use('*', (req, res) => {
   res.status(404).json({ error: 'Route not found' });
 });
 
-app.listen(PORT, () => {
-  console.log(`Dripnest server running on port ${PORT}`);
-  console.log(`Environment: ${process.env.NODE_ENV || 'development'}`);
+// Only start listening once the database is reachable, so a new worker
+// never takes traffic it can't serve
+let server = null;
+database.connect().then(() => {
+  console.log('MongoDB connected successfully');
+  dashboardStats.startRefreshJob();
+  viewCounter.start();
+
+  server = app.listen(PORT, () => {
+    console.log(`Dripnest server running on port ${PORT} (pid ${process.pid})`);
+    console.log(`Environment: ${process.env.NODE_ENV || 'development'}`);
+    clusterStatus.start();
+  });
+});
+
+// Stop accepting connections, let in-flight requests finish, then flush
+// buffered writes before exiting
+let shuttingDown = false;
+const shutdown = async (signal) => {
+  if (shuttingDown) return;
+  shuttingDown = true;
+  console.log(`${signal} received, shutting down`);
+  clusterStatus.stop();
+  if (server) {
+    await new Promise(resolve => {
+      server.close(resolve);
+      server.closeIdleConnections();
+    });
+  }
+  try {
+    await viewCounter.stop();
+  } catch (error) {
+    console.error('Shutdown flush error:', error);
+  }
+  await database.disconnect();
+  process.exit(0);
+};
+
+process.on('SIGTERM', () => shutdown('SIGTERM'));
+process.on('SIGINT', () => shutdown('SIGINT'));
+// Sent by cluster.js when this worker is being replaced or stopped
+process.on('message', (message) => {
+  if (message && message.type === 'shutdown') shutdown('Cluster shutdown');
 });
 
 module.exports = app;
\ No newline at end of file
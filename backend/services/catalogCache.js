@@ -0,0 +1,119 @@
+const crypto = require('crypto');
+const { createStoreFromEnv } = require('../utils/cacheStores');
+
+// Response cache for the public catalog endpoints.
+//
+// Entries are keyed by route path plus a normalized query string and
+// carry a strong ETag, so clients can revalidate with If-None-Match and get
+// a 304 without a body. Admin product writes and stock reservations (which
+// change availableStock and inStock) call invalidate(), which bumps
+// a generation number that is part of every key; old entries are never read
+// again and age out of the store. With the in-process store the generation
+// is per process, so multi-process deployments should use the Redis store.
+
+const TTL_MS = parseInt(process.env.CATALOG_CACHE_TTL_MS) || 60 * 1000;
+const GENERATION_KEY = 'catalog:generation';
+
+const store = createStoreFromEnv({
+  maxBytes: parseInt(process.env.CATALOG_CACHE_MAX_BYTES) || 50 * 1024 * 1024
+});
+const counters = { hits: 0, misses: 0, notModified: 0 };
+let localGeneration = 0;
+
+const generation = async () => {
+  if (store.name === 'memory') return localGeneration;
+  return (await store.get(GENERATION_KEY)) || 0;
+};
+
+// Same parameters in any order map to the same key; empty values are dropped
+const normalizeQuery = (query) => {
+  const params = new URLSearchParams();
+  Object.keys(query)
+    .sort()
+    .forEach(name => {
+      [].concat(query[name])
+        .filter(value => value !== undefined && value !== '')
+        .map(String)
+        .sort()
+        .forEach(value => params.append(name, value));
+    });
+  return params.toString();
+};
+
+const etagFor = (body) => `"${crypto.createHash('sha1').update(body).digest('base64url')}"`;
+
+// If-None-Match uses weak comparison: any listed tag (proxies may add W/) or *
+const matchesEtag = (header, etag) => {
+  if (!header) return false;
+  return header.split(',').some(value => {
+    const tag = value.trim();
+    return tag === '*' || tag.replace(/^W\//, '') === etag;
+  });
+};
+
+const sendCached = (req, res, entry) => {
+  res.set('ETag', entry.etag);
+  res.set('Cache-Control', 'public, no-cache');
+  if (matchesEtag(req.get('If-None-Match'), entry.etag)) {
+    counters.notModified++;
+    return res.status(304).end();
+  }
+  res.type('application/json').send(entry.body);
+};
+
+// Express middleware. onHit(req, entry) runs for every request served from
+// the cache; the route can attach data for it via res.locals.cacheMeta.
+const cacheResponse = ({ ttlMs = TTL_MS, onHit } = {}) => async (req, res, next) => {
+  let key;
+  try {
+    key = `catalog:${await generation()}:${req.baseUrl}${req.path}?${normalizeQuery(req.query)}`;
+    const entry = await store.get(key);
+    if (entry) {
+      counters.hits++;
+      if (onHit) onHit(req, entry);
+      return sendCached(req, res, entry);
+    }
+  } catch (error) {
+    console.error('Catalog cache read error:', error);
+    return next();
+  }
+
+  counters.misses++;
+  const json = res.json.bind(res);
+  res.json = (payload) => {
+    if (res.statusCode !== 200) {
+      return json(payload);
+    }
+
+    const body = JSON.stringify(payload);
+    const entry = { etag: etagFor(body), body, meta: res.locals.cacheMeta || null };
+    store.set(key, entry, ttlMs).catch(error => console.error('Catalog cache write error:', error));
+    return sendCached(req, res, entry);
+  };
+  next();
+};
+
+// Drop every cached catalog response
+const invalidate = async () => {
+  localGeneration++;
+  if (store.name !== 'memory') {
+    await store.incr(GENERATION_KEY);
+  }
+};
+
+const stats = () => {
+  const lookups = counters.hits + counters.misses;
+  return {
+    store: store.name,
+    ...counters,
+    hitRatio: lookups === 0 ? 0 : counters.hits / lookups,
+    backend: store.stats()
+  };
+};
+
+module.exports = {
+  cacheResponse,
+  invalidate,
+  normalizeQuery,
+  stats
+};
\ No newline at end of file
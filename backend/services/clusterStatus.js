@@ -0,0 +1,59 @@
+const cluster = require('cluster');
+
+// Per-worker health when running under cluster.js.
+//
+// Each worker reports a heartbeat to the primary every
+// CLUSTER_HEARTBEAT_MS; the primary sends the collected heartbeats back to
+// every worker, so whichever worker answers /api/health can describe the
+// whole cluster. Outside cluster mode this reports the single process.
+
+const HEARTBEAT_MS = parseInt(process.env.CLUSTER_HEARTBEAT_MS) || 5 * 1000;
+
+let latest = [];
+let timer = null;
+
+const heartbeat = () => {
+  const memory = process.memoryUsage();
+  return {
+    id: cluster.isWorker ? cluster.worker.id : 0,
+    pid: process.pid,
+    uptime: Math.round(process.uptime()),
+    rss: memory.rss,
+    heapUsed: memory.heapUsed,
+    reportedAt: new Date().toISOString()
+  };
+};
+
+const start = () => {
+  if (!cluster.isWorker || timer) return;
+
+  process.on('message', (message) => {
+    if (message && message.type === 'cluster-status') {
+      latest = message.workers;
+    }
+  });
+
+  const send = () => process.send({ type: 'heartbeat', worker: heartbeat() });
+  send();
+  timer = setInterval(send, HEARTBEAT_MS);
+  timer.unref();
+};
+
+const stop = () => {
+  if (timer) clearInterval(timer);
+  timer = null;
+};
+
+const stats = () => {
+  if (!cluster.isWorker) {
+    return { mode: 'single', worker: heartbeat() };
+  }
+  return { mode: 'cluster', worker: heartbeat(), workers: latest };
+};
+
+module.exports = {
+  HEARTBEAT_MS,
+  start,
+  stop,
+  stats
+};
\ No newline at end of file
@@ -0,0 +1,82 @@
+const mongoose = require('mongoose');
+const DashboardStats = require('../models/DashboardStats');
+const database = require('./database');
+
+const STATS_ID = 'global';
+const REVENUE_STATUSES = ['processing', 'shipped', 'delivered'];
+const REFRESH_INTERVAL_MS = parseInt(process.env.DASHBOARD_STATS_REFRESH_MS) || 5 * 60 * 1000;
+
+// Revenue an order contributes in a given status
+const revenueOf = (status, total) => (REVENUE_STATUSES.includes(status) ? total || 0 : 0);
+
+// Models are looked up lazily because they report their own changes here
+const compute = async () => {
+  const Product = mongoose.model('Product');
+  const Order = mongoose.model('Order');
+  const User = mongoose.model('User');
+
+  const read = database.readPreference('analytics');
+
+  const [totalProducts, totalOrders, totalCustomers, revenue] = await Promise.all([
+    Product.countDocuments({ isActive: true }).read(read),
+    Order.estimatedDocumentCount().read(read),
+    User.countDocuments({ role: 'customer' }).read(read),
+    Order.aggregate([
+      { $match: { status: { $in: REVENUE_STATUSES } } },
+      { $group: { _id: null, total: { $sum: '$total' } } }
+    ]).read(read)
+  ]);
+
+  return {
+    totalProducts,
+    totalOrders,
+    totalCustomers,
+    totalRevenue: revenue[0]?.total || 0
+  };
+};
+
+// Recompute every counter and store the snapshot
+const refresh = async () => {
+  const stats = await compute();
+  const now = new Date();
+  return DashboardStats.findByIdAndUpdate(
+    STATS_ID,
+    { ...stats, generatedAt: now, updatedAt: now },
+    { upsert: true, new: true, lean: true }
+  );
+};
+
+// Point read; builds the snapshot on first use
+const get = async () => {
+  const stats = await DashboardStats.findById(STATS_ID).lean();
+  return stats || refresh();
+};
+
+// Apply counter deltas, e.g. { totalOrders: 1, totalRevenue: 42.5 }. This
+// never fails the caller; the next refresh repairs anything that was missed.
+const increment = (deltas) => {
+  const changes = Object.fromEntries(Object.entries(deltas).filter(([, value]) => value));
+  if (Object.keys(changes).length === 0) return Promise.resolve();
+
+  return DashboardStats.updateOne(
+    { _id: STATS_ID },
+    { $inc: changes, $set: { updatedAt: new Date() } }
+  ).catch(error => console.error('Dashboard stats update error:', error));
+};
+
+const startRefreshJob = (intervalMs = REFRESH_INTERVAL_MS) => {
+  const run = () => refresh().catch(error => console.error('Dashboard stats refresh error:', error));
+  run();
+  const timer = setInterval(run, intervalMs);
+  timer.unref();
+  return timer;
+};
+
+module.exports = {
+  REVENUE_STATUSES,
+  revenueOf,
+  get,
+  refresh,
+  increment,
+  startRefreshJob
+};
\ No newline at end of file
@@ -0,0 +1,152 @@
+const mongoose = require('mongoose');
+
+// MongoDB connection, readiness and pool metrics.
+//
+// Pool size and timeouts come from the environment. Until the first
+// connection succeeds, and while the driver is disconnected from the
+// deployment, the process reports not-ready, so server.js can hold back
+// traffic instead of letting requests queue behind a dead connection. A
+// primary stepping down does not change readyState: writes and primary
+// reads wait for the next election, up to serverSelectionTimeoutMS.
+//
+// Reads that tolerate a little replication lag (dashboard analytics) go
+// through readPreference() and are sent to a secondary when the deployment
+// has one. Catalog reads stay on the primary by default: they fill the
+// catalog cache right after invalidate(), and a lagging secondary would put
+// pre-write data under the new generation for the whole TTL. Everything
+// touching stock or orders, including product pages, reads the primary.
+
+const MONGODB_URI = process.env.MONGODB_URI || 'mongodb://localhost:27017/dripnest';
+const RETRY_DELAY_MS = parseInt(process.env.MONGO_CONNECT_RETRY_MS) || 5 * 1000;
+
+const connectionOptions = () => ({
+  maxPoolSize: parseInt(process.env.MONGO_MAX_POOL_SIZE) || 20,
+  minPoolSize: parseInt(process.env.MONGO_MIN_POOL_SIZE) || 0,
+  maxIdleTimeMS: parseInt(process.env.MONGO_MAX_IDLE_MS) || 60 * 1000,
+  waitQueueTimeoutMS: parseInt(process.env.MONGO_WAIT_QUEUE_TIMEOUT_MS) || 5 * 1000,
+  serverSelectionTimeoutMS: parseInt(process.env.MONGO_SERVER_SELECTION_TIMEOUT_MS) || 5 * 1000,
+  connectTimeoutMS: parseInt(process.env.MONGO_CONNECT_TIMEOUT_MS) || 10 * 1000,
+  socketTimeoutMS: parseInt(process.env.MONGO_SOCKET_TIMEOUT_MS) || 45 * 1000
+});
+
+const READ_PREFERENCES = {
+  catalog: process.env.MONGO_CATALOG_READ_PREFERENCE || 'primary',
+  analytics: process.env.MONGO_ANALYTICS_READ_PREFERENCE || 'secondaryPreferred'
+};
+
+// Read preference for a class of reads ('catalog' or 'analytics');
+// anything else ('stock', 'orders') reads from the primary
+const readPreference = (kind) => READ_PREFERENCES[kind] || 'primary';
+
+// Pool counters, fed by the driver's CMAP events
+const pool = {
+  open: 0,
+  inUse: 0,
+  waiting: 0,
+  created: 0,
+  closed: 0,
+  checkouts: 0,
+  checkoutFailures: 0,
+  waitTotalMs: 0,
+  waitMaxMs: 0
+};
+const waitStarts = [];
+
+const recordWait = (event) => {
+  // Newer drivers report the wait; otherwise pair with the oldest waiter,
+  // which is who the FIFO pool serves first
+  const started = waitStarts.shift();
+  const waitedMs = event.durationMS !== undefined
+    ? event.durationMS
+    : started !== undefined ? Date.now() - started : 0;
+  pool.waitTotalMs += waitedMs;
+  pool.waitMaxMs = Math.max(pool.waitMaxMs, waitedMs);
+};
+
+const watchPool = (client) => {
+  client.on('connectionCreated', () => { pool.open++; pool.created++; });
+  client.on('connectionClosed', () => { pool.open = Math.max(0, pool.open - 1); pool.closed++; });
+  client.on('connectionCheckOutStarted', () => {
+    pool.waiting++;
+    waitStarts.push(Date.now());
+  });
+  client.on('connectionCheckedOut', (event) => {
+    pool.waiting = Math.max(0, pool.waiting - 1);
+    pool.inUse++;
+    pool.checkouts++;
+    recordWait(event);
+  });
+  client.on('connectionCheckOutFailed', () => {
+    pool.waiting = Math.max(0, pool.waiting - 1);
+    pool.checkoutFailures++;
+    waitStarts.shift();
+  });
+  client.on('connectionCheckedIn', () => { pool.inUse = Math.max(0, pool.inUse - 1); });
+};
+
+let connecting = null;
+const events = { connects: 0, disconnects: 0, reconnects: 0, errors: 0 };
+
+const isReady = () => mongoose.connection.readyState === 1;
+
+mongoose.connection.on('connected', () => { events.connects++; });
+mongoose.connection.on('reconnected', () => { events.reconnects++; });
+mongoose.connection.on('disconnected', () => { events.disconnects++; });
+mongoose.connection.on('error', (error) => {
+  events.errors++;
+  console.error('MongoDB connection error:', error.message);
+});
+
+// Connect, retrying until the server is reachable. Resolves once ready.
+const connect = () => {
+  if (connecting) return connecting;
+
+  connecting = (async () => {
+    while (true) {
+      try {
+        await mongoose.connect(MONGODB_URI, connectionOptions());
+        watchPool(mongoose.connection.getClient());
+        return mongoose.connection;
+      } catch (error) {
+        console.error(`MongoDB connection failed, retrying in ${RETRY_DELAY_MS}ms:`, error.message);
+        await new Promise(resolve => setTimeout(resolve, RETRY_DELAY_MS));
+      }
+    }
+  })();
+  return connecting;
+};
+
+const disconnect = () => mongoose.disconnect();
+
+// Hold back API traffic while the database is unreachable
+const requireReady = (req, res, next) => {
+  if (isReady()) {
+    return next();
+  }
+  res.set('Retry-After', '5');
+  res.status(503).json({ error: 'Service temporarily unavailable' });
+};
+
+const stats = () => {
+  const options = connectionOptions();
+  return {
+    ready: isReady(),
+    state: mongoose.STATES[mongoose.connection.readyState],
+    ...events,
+    pool: {
+      ...pool,
+      maxPoolSize: options.maxPoolSize,
+      waitAvgMs: pool.checkouts === 0 ? 0 : pool.waitTotalMs / pool.checkouts
+    },
+    readPreferences: READ_PREFERENCES
+  };
+};
+
+module.exports = {
+  connect,
+  disconnect,
+  isReady,
+  requireReady,
+  readPreference,
+  stats
+};
\ No newline at end of file
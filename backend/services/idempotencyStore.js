@@ -0,0 +1,96 @@
+const IdempotencyKey = require('../models/IdempotencyKey');
+const createLruCache = require('../utils/lruCache');
+
+// Where idempotent request outcomes are kept. Both stores expose:
+//   claim(id, fingerprint) -> null when the caller now owns the key,
+//                             otherwise the existing record
+//   complete(id, responseStatus, responseBody, ttlMs)
+//   abandon(id)  (lets a retry run again after a failure)
+//
+// A claim is a short lease (IDEMPOTENCY_LEASE_MS). If the process dies
+// mid-request nothing abandons it, so once the lease runs out the next
+// retry takes the key over instead of getting 409 until the record
+// expires. complete() keeps the outcome for ttlMs (IDEMPOTENCY_TTL_MS).
+//
+// The Mongo store works across processes and expires records with a TTL
+// index. IDEMPOTENCY_STORE=memory keeps them in process for a single node,
+// in an LRU bounded by IDEMPOTENCY_MEMORY_MAX_KEYS.
+
+const TTL_MS = parseInt(process.env.IDEMPOTENCY_TTL_MS) || 24 * 60 * 60 * 1000;
+const LEASE_MS = parseInt(process.env.IDEMPOTENCY_LEASE_MS) || 60 * 1000;
+const MEMORY_MAX_KEYS = parseInt(process.env.IDEMPOTENCY_MEMORY_MAX_KEYS) || 10000;
+
+const createMongoStore = () => {
+  const claim = async (id, fingerprint) => {
+    const leaseUntil = new Date(Date.now() + LEASE_MS);
+    try {
+      await IdempotencyKey.create({ _id: id, fingerprint, expiresAt: leaseUntil });
+      return null;
+    } catch (error) {
+      if (error.code !== 11000) throw error;
+    }
+
+    // A lapsed lease, or an outcome the TTL monitor hasn't removed yet:
+    // take it over as a fresh claim
+    const takenOver = await IdempotencyKey.findOneAndUpdate(
+      { _id: id, expiresAt: { $lte: new Date() } },
+      {
+        $set: { fingerprint, status: 'pending', expiresAt: leaseUntil },
+        $unset: { responseStatus: 1, responseBody: 1 }
+      }
+    ).lean();
+    if (takenOver) return null;
+
+    const existing = await IdempotencyKey.findById(id).lean();
+    // Expired between the insert and the read: claim it again
+    return existing || claim(id, fingerprint);
+  };
+
+  return {
+    name: 'mongo',
+    claim,
+    complete: async (id, responseStatus, responseBody, ttlMs = TTL_MS) => {
+      await IdempotencyKey.updateOne(
+        { _id: id },
+        { $set: { status: 'completed', responseStatus, responseBody, expiresAt: new Date(Date.now() + ttlMs) } }
+      );
+    },
+    abandon: async (id) => {
+      await IdempotencyKey.deleteOne({ _id: id, status: 'pending' });
+    }
+  };
+};
+
+const createMemoryStore = ({ maxKeys = MEMORY_MAX_KEYS } = {}) => {
+  // Expired entries read as missing, so a lapsed lease is simply claimed again
+  const records = createLruCache({ maxEntries: maxKeys, ttlMs: LEASE_MS });
+
+  return {
+    name: 'memory',
+    claim: async (id, fingerprint) => {
+      const existing = records.get(id);
+      if (existing) {
+        return existing;
+      }
+      records.set(id, { _id: id, fingerprint, status: 'pending' }, LEASE_MS);
+      return null;
+    },
+    complete: async (id, responseStatus, responseBody, ttlMs = TTL_MS) => {
+      const record = records.get(id);
+      if (record) records.set(id, { ...record, status: 'completed', responseStatus, responseBody }, ttlMs);
+    },
+    abandon: async (id) => {
+      const record = records.get(id);
+      if (record && record.status === 'pending') records.delete(id);
+    }
+  };
+};
+
+const createStoreFromEnv = () =>
+  (process.env.IDEMPOTENCY_STORE === 'memory' ? createMemoryStore() : createMongoStore());
+
+module.exports = {
+  createMongoStore,
+  createMemoryStore,
+  createStoreFromEnv
+};
\ No newline at end of file
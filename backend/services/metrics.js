@@ -0,0 +1,190 @@
+const { monitorEventLoopDelay } = require('perf_hooks');
+const { createRegistry, CONTENT_TYPE } = require('../utils/metrics');
+const principalCache = require('./principalCache');
+const catalogCache = require('./catalogCache');
+const slugCache = require('./slugCache');
+const database = require('./database');
+
+// Process-wide instrumentation served at GET /metrics:
+//   - request latency per route, method and status (httpMetrics middleware)
+//   - MongoDB operation latency per model and operation (queryMetrics plugin)
+//   - event-loop delay, memory, cache hit ratios and connection pool state,
+//     read when /metrics is scraped
+// In cluster mode every worker keeps its own numbers; scrape each worker or
+// aggregate by the `pid` the process metrics carry.
+
+const registry = createRegistry();
+
+const httpDuration = registry.histogram({
+  name: 'http_request_duration_seconds',
+  help: 'HTTP request latency by route, method and status',
+  labelNames: ['method', 'route', 'status']
+});
+
+const mongoDuration = registry.histogram({
+  name: 'mongodb_operation_duration_seconds',
+  help: 'MongoDB operation latency by model and operation',
+  labelNames: ['model', 'operation', 'outcome'],
+  buckets: [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5]
+});
+
+// Sampled continuously; each scrape reports the interval since the last one
+const loopDelay = monitorEventLoopDelay({ resolution: 10 });
+loopDelay.enable();
+
+registry.gauge({
+  name: 'nodejs_eventloop_lag_seconds',
+  help: 'Event-loop delay since the previous scrape',
+  labelNames: ['quantile'],
+  collect: (gauge) => {
+    gauge.labels('0.5').set(loopDelay.percentile(50) / 1e9);
+    gauge.labels('0.99').set(loopDelay.percentile(99) / 1e9);
+    gauge.labels('max').set(loopDelay.max / 1e9);
+    loopDelay.reset();
+  }
+});
+
+registry.gauge({
+  name: 'nodejs_memory_bytes',
+  help: 'Process memory usage',
+  labelNames: ['pid', 'type'],
+  collect: (gauge) => {
+    const memory = process.memoryUsage();
+    ['rss', 'heapTotal', 'heapUsed', 'external'].forEach(type => gauge.labels(process.pid, type).set(memory[type]));
+  }
+});
+
+const caches = {
+  principals: principalCache.stats,
+  catalog: catalogCache.stats,
+  slugs: slugCache.stats
+};
+
+registry.gauge({
+  name: 'cache_hit_ratio',
+  help: 'Hits over lookups since start, per cache',
+  labelNames: ['cache'],
+  collect: (gauge) => {
+    Object.entries(caches).forEach(([name, stats]) => gauge.labels(name).set(stats().hitRatio));
+  }
+});
+
+registry.gauge({
+  name: 'cache_lookups_total',
+  help: 'Cache lookups since start, per cache and result',
+  labelNames: ['cache', 'result'],
+  collect: (gauge) => {
+    Object.entries(caches).forEach(([name, stats]) => {
+      const { hits, misses } = stats();
+      gauge.labels(name, 'hit').set(hits);
+      gauge.labels(name, 'miss').set(misses);
+    });
+  }
+});
+
+registry.gauge({
+  name: 'mongodb_pool_connections',
+  help: 'Connection pool state',
+  labelNames: ['state'],
+  collect: (gauge) => {
+    const { pool } = database.stats();
+    gauge.labels('open').set(pool.open);
+    gauge.labels('in_use').set(pool.inUse);
+    gauge.labels('waiting').set(pool.waiting);
+    gauge.labels('max').set(pool.maxPoolSize);
+  }
+});
+
+registry.gauge({
+  name: 'mongodb_pool_checkout_wait_seconds',
+  help: 'Connection checkout wait since start',
+  labelNames: ['stat'],
+  collect: (gauge) => {
+    const { pool } = database.stats();
+    gauge.labels('avg').set(pool.waitAvgMs / 1000);
+    gauge.labels('max').set(pool.waitMaxMs / 1000);
+    gauge.labels('total').set(pool.waitTotalMs / 1000);
+  }
+});
+
+registry.gauge({
+  name: 'mongodb_ready',
+  help: '1 when the database connection is usable',
+  collect: (gauge) => gauge.set(database.isReady() ? 1 : 0)
+});
+
+// Route template (e.g. /api/products/:identifier) rather than the raw URL,
+// so the number of series stays bounded
+const routeOf = (req, res) => {
+  if (req.route) return `${req.baseUrl}${req.route.path === '/' && req.baseUrl ? '' : req.route.path}`;
+  return res.statusCode === 404 ? '<unmatched>' : '<middleware>';
+};
+
+const httpMetrics = (req, res, next) => {
+  const started = process.hrtime.bigint();
+  res.once('finish', () => {
+    const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+    httpDuration.labels(req.method, routeOf(req, res), res.statusCode).observe(seconds);
+  });
+  next();
+};
+
+const QUERY_OPERATIONS = [
+  'find', 'findOne', 'countDocuments', 'estimatedDocumentCount', 'distinct',
+  'updateOne', 'updateMany', 'findOneAndUpdate', 'findOneAndDelete',
+  'deleteOne', 'deleteMany', 'replaceOne'
+];
+
+// Mongoose plugin: schema.plugin(queryMetrics, { model: 'Product' })
+const queryMetrics = (schema, { model }) => {
+  // Documents keep the start time in $locals; queries and aggregates on
+  // the object itself
+  const timings = (target) => target.$locals || target;
+  const start = function() {
+    timings(this).$metricsStart = process.hrtime.bigint();
+  };
+  const record = (target, operation, outcome) => {
+    const started = timings(target).$metricsStart;
+    if (!started) return;
+    const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+    mongoDuration.labels(model, operation, outcome).observe(seconds);
+  };
+
+  schema.pre(QUERY_OPERATIONS, start);
+  schema.post(QUERY_OPERATIONS, function() { record(this, this.op, 'ok'); });
+  schema.post(QUERY_OPERATIONS, function(error, result, next) {
+    record(this, this.op, 'error');
+    next(error);
+  });
+
+  schema.pre('aggregate', start);
+  schema.post('aggregate', function() { record(this, 'aggregate', 'ok'); });
+  schema.post('aggregate', function(error, result, next) {
+    record(this, 'aggregate', 'error');
+    next(error);
+  });
+
+  schema.pre('save', start);
+  schema.post('save', function() { record(this, 'save', 'ok'); });
+  schema.post('save', function(error, doc, next) {
+    record(this, 'save', 'error');
+    next(error);
+  });
+};
+
+// GET /metrics; set METRICS_TOKEN to require `Authorization: Bearer <token>`
+const endpoint = (req, res) => {
+  const token = process.env.METRICS_TOKEN;
+  if (token && req.get('Authorization') !== `Bearer ${token}`) {
+    return res.status(401).json({ error: 'Unauthorized' });
+  }
+  res.set('Content-Type', CONTENT_TYPE);
+  res.send(registry.render());
+};
+
+module.exports = {
+  registry,
+  httpMetrics,
+  queryMetrics,
+  endpoint
+};
\ No newline at end of file
@@ -0,0 +1,65 @@
+const Product = require('../models/Product');
+const stockRules = require('./stockRules');
+
+// Turn the cart lines of a new order into priced order items.
+//
+// Every product in the cart is loaded with a single projected $in query and
+// kept in a Map, then one pass checks stock and prices each line, so the cost
+// of a checkout no longer grows with the number of lines.
+
+const ORDER_ITEM_PROJECTION = `name price ${stockRules.AVAILABILITY_PROJECTION}`;
+
+class OrderItemError extends Error {
+  constructor(message, line) {
+    super(message);
+    this.name = 'OrderItemError';
+    this.line = line;
+  }
+}
+
+const loadProducts = async (lines) => {
+  const ids = [...new Set(lines.map(line => String(line.productId)))];
+  const products = await Product.find({ _id: { $in: ids } })
+    .select(ORDER_ITEM_PROJECTION)
+    .lean();
+  return new Map(products.map(product => [String(product._id), product]));
+};
+
+// Resolves to { items, subtotal, productsById }; throws OrderItemError on the
+// first line that can't be fulfilled
+const resolve = async (lines) => {
+  const cart = lines.map(line => ({
+    productId: line.productId,
+    size: line.size || null,
+    quantity: parseInt(line.quantity)
+  }));
+
+  const productsById = await loadProducts(cart);
+  const results = stockRules.checkCart(cart, productsById);
+
+  let subtotal = 0;
+  const items = cart.map((line, index) => {
+    const product = productsById.get(String(line.productId));
+    const result = results[index];
+    if (!result.available) {
+      throw new OrderItemError(stockRules.failureMessage(product, line, result.reason), line);
+    }
+
+    subtotal += product.price * line.quantity;
+    return {
+      product: product._id,
+      name: product.name,
+      price: product.price,
+      quantity: line.quantity,
+      size: result.sized ? line.size : null,
+      sku: result.sized ? result.variant.sku : null
+    };
+  });
+
+  return { items, subtotal, productsById };
+};
+
+module.exports = {
+  resolve,
+  OrderItemError
+};
\ No newline at end of file
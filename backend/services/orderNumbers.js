@@ -0,0 +1,55 @@
+const Counter = require('../models/Counter');
+
+// Order numbers from a block-allocating counter.
+//
+// Each process reserves ORDER_NUMBER_BLOCK_SIZE numbers at a time with one
+// atomic $inc on a Counter document and hands them out from memory, so
+// numbers are unique across any number of processes and increase within
+// each one. Numbers left in a block when a process exits are skipped.
+//
+// New numbers are `DN` + 10 digits; the older timestamp-based numbers were
+// `DN` + 8 digits, so the two formats can never collide.
+
+const PREFIX = 'DN';
+const DIGITS = 10;
+const BLOCK_SIZE = parseInt(process.env.ORDER_NUMBER_BLOCK_SIZE) || 100;
+
+const format = (seq) => PREFIX + String(seq).padStart(DIGITS, '0');
+
+const createGenerator = ({ counterId = 'orderNumber', blockSize = BLOCK_SIZE } = {}) => {
+  // Current block is [nextSeq, endSeq)
+  let nextSeq = 0;
+  let endSeq = 0;
+  let refill = null;
+
+  const allocate = async () => {
+    const counter = await Counter.findOneAndUpdate(
+      { _id: counterId },
+      { $inc: { seq: blockSize } },
+      { upsert: true, new: true, lean: true }
+    );
+    nextSeq = counter.seq - blockSize + 1;
+    endSeq = counter.seq + 1;
+  };
+
+  const next = async () => {
+    while (nextSeq >= endSeq) {
+      // Callers that run dry together share one block request
+      if (!refill) {
+        refill = allocate().finally(() => { refill = null; });
+      }
+      await refill;
+    }
+    return format(nextSeq++);
+  };
+
+  return { next };
+};
+
+const generator = createGenerator();
+
+module.exports = {
+  next: () => generator.next(),
+  createGenerator,
+  format
+};
\ No newline at end of file
@@ -0,0 +1,19 @@
+const createLruCache = require('../utils/lruCache');
+
+// Verified users keyed by userId, so authenticated requests don't need a
+// User lookup each time. The cache is per process: the User model drops an
+// entry when a saved user changes role or active state, and the TTL bounds
+// how long another process can serve a stale principal.
+
+const cache = createLruCache({
+  maxEntries: parseInt(process.env.AUTH_CACHE_MAX_ENTRIES) || 10000,
+  ttlMs: parseInt(process.env.AUTH_CACHE_TTL_MS) || 60 * 1000
+});
+
+module.exports = {
+  get: (userId) => cache.get(String(userId)),
+  set: (userId, principal) => cache.set(String(userId), principal),
+  invalidate: (userId) => cache.delete(String(userId)),
+  clear: () => cache.clear(),
+  stats: () => cache.stats()
+};
\ No newline at end of file
@@ -0,0 +1,12 @@
+const createKeyedQueue = require('../utils/keyedQueue');
+
+// Checkouts that touch the same product run one after another in this
+// process instead of racing each other on the product document. The stock
+// reservation itself stays atomic, so other processes remain safe.
+
+const queue = createKeyedQueue();
+
+module.exports = {
+  run: (productIds, task) => queue.run(productIds, task),
+  stats: () => queue.stats()
+};
\ No newline at end of file
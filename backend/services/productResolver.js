@@ -0,0 +1,52 @@
+const Product = require('../models/Product');
+const slugCache = require('./slugCache');
+const database = require('./database');
+
+// Resolve GET /api/products/:identifier to an active product with one query.
+//
+// A 24-character hex string is treated as an ObjectId; anything else is a
+// slug. Slugs go through the slug -> _id cache when warm, so the lookup is an
+// _id point read, and through the unique slug index when cold.
+
+const OBJECT_ID_PATTERN = /^[0-9a-fA-F]{24}$/;
+
+const isObjectId = (identifier) => OBJECT_ID_PATTERN.test(identifier);
+
+// Product pages show variant stock and inStock right before add-to-cart,
+// so they read from the primary like every other stock read
+const findActive = (filter, select) => Product.findOne({ ...filter, isActive: true })
+  .select(select)
+  .read(database.readPreference('stock'))
+  .lean();
+
+const bySlug = async (slug, select) => {
+  const cachedId = slugCache.get(slug);
+  if (cachedId) {
+    const product = await findActive({ _id: cachedId }, select);
+    if (product && product.slug === slug) {
+      return product;
+    }
+    // Renamed or deactivated elsewhere; fall through to the index
+    slugCache.invalidate(slug);
+  }
+
+  const product = await findActive({ slug }, select);
+  if (product) {
+    slugCache.set(slug, product._id);
+  }
+  return product;
+};
+
+const resolve = async (identifier, { select = Product.projections.detail } = {}) => {
+  if (isObjectId(identifier)) {
+    const product = await findActive({ _id: identifier }, select);
+    // A slug can look like an ObjectId; only then is a second query needed
+    return product || bySlug(identifier, select);
+  }
+  return bySlug(identifier, select);
+};
+
+module.exports = {
+  isObjectId,
+  resolve
+};
\ No newline at end of file
@@ -0,0 +1,17 @@
+const createLruCache = require('../utils/lruCache');
+
+// slug -> product _id, kept warm by the product resolver. The Product model
+// drops a slug when its pre('save') hook renames it; entries that went stale
+// in another process are caught by the resolver's slug check.
+
+const cache = createLruCache({
+  maxEntries: parseInt(process.env.SLUG_CACHE_MAX_ENTRIES) || 50000,
+  ttlMs: parseInt(process.env.SLUG_CACHE_TTL_MS) || 60 * 60 * 1000
+});
+
+module.exports = {
+  get: (slug) => cache.get(slug),
+  set: (slug, productId) => cache.set(slug, productId),
+  invalidate: (slug) => cache.delete(slug),
+  stats: () => cache.stats()
+};
\ No newline at end of file
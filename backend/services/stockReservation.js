@@ -0,0 +1,133 @@
+const crypto = require('crypto');
+const Product = require('../models/Product');
+const catalogCache = require('./catalogCache');
+
+// Reserve stock for a set of order lines.
+//
+// Every line becomes a conditional $inc that only matches while enough stock
+// is left, so two buyers racing for the last unit can never push a variant
+// below zero. All lines go out in one unordered bulkWrite; nothing is ever
+// inserted. When every line matched, one follow-up update recomputes the
+// derived stock fields. A bulkWrite only reports how many lines matched, so
+// each line also pushes a token onto its product: if some line came up
+// short, or a write failed, one read of those tokens shows which lines
+// applied and only those are given back. The follow-up update clears the
+// tokens. Reserving and releasing change what the catalog shows
+// (availableStock, inStock), so cached catalog responses are dropped
+// afterwards.
+
+class StockReservationError extends Error {
+  constructor(line) {
+    super(`Insufficient stock for ${line.name || line.productId}${line.size ? ` (Size: ${line.size})` : ''}`);
+    this.name = 'StockReservationError';
+    this.line = line;
+  }
+}
+
+const reserveOp = (line, token) => {
+  const [filter, inc] = line.size
+    ? [
+      { _id: line.productId, isActive: true, variants: { $elemMatch: { size: line.size, stock: { $gte: line.quantity } } } },
+      { 'variants.$.stock': -line.quantity, sales: line.quantity }
+    ]
+    : [
+      { _id: line.productId, isActive: true, totalStock: { $gte: line.quantity } },
+      { totalStock: -line.quantity, sales: line.quantity }
+    ];
+
+  return {
+    updateOne: {
+      filter,
+      update: { $inc: inc, $set: { updatedAt: new Date() }, $push: { reservationTokens: token } }
+    }
+  };
+};
+
+const releaseOp = (line) => {
+  if (line.size) {
+    return {
+      updateOne: {
+        filter: { _id: line.productId, 'variants.size': line.size },
+        update: { $inc: { 'variants.$.stock': line.quantity, sales: -line.quantity } }
+      }
+    };
+  }
+
+  return {
+    updateOne: {
+      filter: { _id: line.productId },
+      update: { $inc: { totalStock: line.quantity, sales: -line.quantity } }
+    }
+  };
+};
+
+const productIds = (lines) => [...new Set(lines.map(line => String(line.productId)))];
+
+// Positional $inc can't also recompute availableStock/inStock, so the
+// touched products get one follow-up pipeline update, which also drops
+// `tokens`. The stock itself has already changed either way: a failed sync
+// is logged, and the derived fields catch up on the product's next stock
+// write (or `npm run migrate:stock-fields`).
+const syncStockFields = async (lines, tokens) => {
+  try {
+    await Product.syncStockFields({ _id: { $in: productIds(lines) } }, tokens);
+  } catch (error) {
+    console.error('Stock field sync error:', error);
+  }
+  // A cache that can't be reached only means listings stay stale until
+  // their TTL
+  await catalogCache.invalidate().catch(error => console.error('Catalog cache invalidation error:', error));
+};
+
+// Give back stock for lines that were already reserved
+const release = async (lines, tokens) => {
+  if (lines.length === 0) return;
+  await Product.bulkWrite(lines.map(releaseOp), { ordered: false });
+  await syncStockFields(lines, tokens);
+};
+
+// Tokens among `tokens` that made it onto their products
+const appliedTokens = async (lines, tokens) => {
+  const products = await Product.find({ _id: { $in: productIds(lines) }, reservationTokens: { $in: tokens } })
+    .select('reservationTokens')
+    .lean();
+  return new Set(products.flatMap(product => product.reservationTokens));
+};
+
+// lines: [{ productId, quantity, size, name }]
+const reserve = async (lines) => {
+  if (lines.length === 0) return;
+
+  const tokens = lines.map(() => crypto.randomUUID());
+  let failure = null;
+  try {
+    const result = await Product.bulkWrite(lines.map((line, index) => reserveOp(line, tokens[index])), { ordered: false });
+    if (result.matchedCount === lines.length) {
+      await syncStockFields(lines, tokens);
+      return;
+    }
+  } catch (error) {
+    // A failed write (cast error, lost connection) is not a stock problem
+    failure = error;
+  }
+
+  let applied;
+  try {
+    applied = await appliedTokens(lines, tokens);
+  } catch (error) {
+    console.error('Stock reservation lookup error:', error);
+    throw failure || error;
+  }
+  await release(lines.filter((line, index) => applied.has(tokens[index])), tokens);
+
+  if (failure) {
+    throw failure;
+  }
+  throw new StockReservationError(lines.find((line, index) => !applied.has(tokens[index])));
+};
+
+module.exports = {
+  reserve,
+  release,
+  StockReservationError
+};
\ No newline at end of file
@@ -0,0 +1,87 @@
+// Stock rules shared by the availability checks and order creation, so the
+// storefront and checkout can't disagree about what is in stock.
+
+const REASONS = {
+  NOT_FOUND: 'not_found',
+  SIZE_REQUIRED: 'size_required',
+  UNKNOWN_SIZE: 'unknown_size',
+  INSUFFICIENT_STOCK: 'insufficient_stock'
+};
+
+// Only the fields the rules look at
+const AVAILABILITY_PROJECTION = 'variants totalStock category isActive';
+
+// T-shirts always need a size; other products only when they have variants
+// and the shopper picked one
+const requiresSize = (product, size) =>
+  product.category === 'T-Shirts' || (Boolean(size) && product.variants && product.variants.length > 0);
+
+// alreadyRequested: units of the same variant claimed by earlier cart lines
+const checkLine = (product, { size, quantity }, alreadyRequested = 0) => {
+  if (!product || !product.isActive) {
+    return { available: false, availableStock: 0, sized: false, reason: REASONS.NOT_FOUND };
+  }
+
+  if (requiresSize(product, size)) {
+    if (!size) {
+      return { available: false, availableStock: 0, sized: true, reason: REASONS.SIZE_REQUIRED };
+    }
+    const variant = product.variants.find(v => v.size === size);
+    if (!variant) {
+      return { available: false, availableStock: 0, sized: true, reason: REASONS.UNKNOWN_SIZE };
+    }
+    const available = variant.stock >= alreadyRequested + quantity;
+    return {
+      available,
+      availableStock: variant.stock,
+      sized: true,
+      variant,
+      reason: available ? null : REASONS.INSUFFICIENT_STOCK
+    };
+  }
+
+  const stock = product.totalStock || 0;
+  const available = stock >= alreadyRequested + quantity;
+  return {
+    available,
+    availableStock: stock,
+    sized: false,
+    reason: available ? null : REASONS.INSUFFICIENT_STOCK
+  };
+};
+
+// Check every cart line against already loaded products (Map of id ->
+// product). Lines for the same product and size share that stock.
+const checkCart = (lines, productsById) => {
+  const requested = new Map();
+  return lines.map(line => {
+    const product = productsById.get(String(line.productId));
+    const sized = Boolean(product) && requiresSize(product, line.size);
+    const key = `${line.productId}:${sized ? line.size : ''}`;
+    const result = checkLine(product, line, requested.get(key) || 0);
+    if (result.available) {
+      requested.set(key, (requested.get(key) || 0) + line.quantity);
+    }
+    return result;
+  });
+};
+
+const failureMessage = (product, line, reason) => {
+  switch (reason) {
+    case REASONS.NOT_FOUND:
+      return `Product not found: ${line.productId}`;
+    case REASONS.SIZE_REQUIRED:
+      return `Size is required for ${product.name}`;
+    default:
+      return `Insufficient stock for ${product.name}${line.size ? ` (Size: ${line.size})` : ''}`;
+  }
+};
+
+module.exports = {
+  REASONS,
+  AVAILABILITY_PROJECTION,
+  requiresSize,
+  checkLine,
+  checkCart,
+  failureMessage
+};
\ No newline at end of file
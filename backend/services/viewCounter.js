@@ -0,0 +1,92 @@
+const Product = require('../models/Product');
+
+// Buffered product view counter.
+//
+// Views are summed per product in memory and written as one unordered
+// bulkWrite of $inc updates, either every VIEW_FLUSH_INTERVAL_MS or as soon
+// as VIEW_FLUSH_THRESHOLD views are pending. A crash loses at most one
+// interval's worth (or one threshold's worth) of views; a clean shutdown
+// flushes what is left.
+
+const FLUSH_INTERVAL_MS = parseInt(process.env.VIEW_FLUSH_INTERVAL_MS) || 10 * 1000;
+const FLUSH_THRESHOLD = parseInt(process.env.VIEW_FLUSH_THRESHOLD) || 1000;
+
+let pending = new Map();
+let pendingViews = 0;
+let flushing = null;
+let timer = null;
+const counters = { recorded: 0, flushed: 0, flushes: 0, failedFlushes: 0 };
+
+const flush = async () => {
+  if (flushing) return flushing;
+  if (pending.size === 0) return;
+
+  const batch = pending;
+  const batchViews = pendingViews;
+  pending = new Map();
+  pendingViews = 0;
+
+  const ops = [...batch].map(([productId, views]) => ({
+    updateOne: {
+      filter: { _id: productId },
+      update: { $inc: { views } }
+    }
+  }));
+
+  flushing = Product.bulkWrite(ops, { ordered: false })
+    .then(() => {
+      counters.flushes++;
+      counters.flushed += batchViews;
+    })
+    .catch(error => {
+      // Put the views back so the next flush retries them
+      counters.failedFlushes++;
+      batch.forEach((views, productId) => {
+        pending.set(productId, (pending.get(productId) || 0) + views);
+      });
+      pendingViews += batchViews;
+      console.error('View counter flush error:', error);
+    })
+    .finally(() => {
+      flushing = null;
+    });
+
+  return flushing;
+};
+
+const record = (productId) => {
+  const key = String(productId);
+  pending.set(key, (pending.get(key) || 0) + 1);
+  pendingViews++;
+  counters.recorded++;
+  if (pendingViews >= FLUSH_THRESHOLD) {
+    flush();
+  }
+};
+
+const start = (intervalMs = FLUSH_INTERVAL_MS) => {
+  if (timer) return;
+  timer = setInterval(flush, intervalMs);
+  timer.unref();
+};
+
+const stop = async () => {
+  clearInterval(timer);
+  timer = null;
+  await flushing;
+  await flush();
+};
+
+const stats = () => ({
+  ...counters,
+  pendingViews,
+  pendingProducts: pending.size
+});
+
+module.exports = {
+  record,
+  flush,
+  start,
+  stop,
+  stats
+};
\ No newline at end of file
@@ -0,0 +1,77 @@
+const createLruCache = require('./lruCache');
+
+// Key/value stores behind the response caches. Both expose the same async
+// API, so anything speaking the Redis protocol (Redis, Valkey, KeyDB, a
+// local stand-in) can replace the in-process store:
+//   get(key) -> value | null
+//   set(key, value, ttlMs)
+//   incr(key) -> number
+//   stats() -> object
+
+const createMemoryStore = ({ maxBytes = 50 * 1024 * 1024, maxEntries = 10000 } = {}) => {
+  const cache = createLruCache({
+    maxEntries,
+    maxSize: maxBytes,
+    sizeOf: value => (typeof value === 'string' ? value.length : JSON.stringify(value).length)
+  });
+  const counters = new Map();
+
+  return {
+    name: 'memory',
+    get: async (key) => {
+      const value = cache.get(key);
+      return value === undefined ? null : value;
+    },
+    set: async (key, value, ttlMs) => cache.set(key, value, ttlMs),
+    incr: async (key) => {
+      const next = (counters.get(key) || 0) + 1;
+      counters.set(key, next);
+      return next;
+    },
+    stats: () => cache.stats()
+  };
+};
+
+// client: an ioredis-compatible client (promise API)
+const createRedisStore = (client, { prefix = 'dripnest:' } = {}) => ({
+  name: 'redis',
+  get: async (key) => {
+    const raw = await client.get(prefix + key);
+    return raw === null ? null : JSON.parse(raw);
+  },
+  set: async (key, value, ttlMs) => {
+    await client.set(prefix + key, JSON.stringify(value), 'PX', ttlMs);
+  },
+  incr: async (key) => client.incr(prefix + key),
+  stats: () => ({ status: client.status })
+});
+
+// One shared connection for every Redis-backed store in the process
+let redisClient = null;
+
+const getRedisClient = () => {
+  if (!redisClient) {
+    const Redis = require('ioredis');
+    redisClient = new Redis(process.env.REDIS_URL);
+  }
+  return redisClient;
+};
+
+const useRedis = () => process.env.CACHE_STORE === 'redis' && Boolean(process.env.REDIS_URL);
+
+// Pick a store from the environment. REDIS_URL with CACHE_STORE=redis uses
+// ioredis (an optional dependency); everything else stays in process.
+const createStoreFromEnv = ({ maxBytes } = {}) => {
+  if (useRedis()) {
+    return createRedisStore(getRedisClient());
+  }
+  return createMemoryStore({ maxBytes });
+};
+
+module.exports = {
+  createMemoryStore,
+  createRedisStore,
+  createStoreFromEnv,
+  getRedisClient,
+  useRedis
+};
\ No newline at end of file
@@ -0,0 +1,48 @@
+// Run async tasks one at a time per key.
+//
+// A task names every key it touches and starts once the previous task on
+// each of those keys has finished. All keys are taken in the same
+// synchronous step, so two tasks sharing several keys always queue in
+// arrival order and can't deadlock. Tasks on unrelated keys run in parallel.
+
+const createKeyedQueue = () => {
+  // key -> promise that settles when the last queued task on it finishes
+  const tails = new Map();
+  let running = 0;
+  let waiting = 0;
+
+  const run = async (keys, task) => {
+    const unique = [...new Set(keys.map(String))];
+    let release;
+    const done = new Promise(resolve => { release = resolve; });
+    const previous = unique.map(key => tails.get(key)).filter(Boolean);
+    unique.forEach(key => tails.set(key, done));
+
+    waiting++;
+    try {
+      await Promise.all(previous);
+      waiting--;
+      running++;
+      try {
+        return await task();
+      } finally {
+        running--;
+      }
+    } finally {
+      release();
+      unique.forEach(key => {
+        if (tails.get(key) === done) tails.delete(key);
+      });
+    }
+  };
+
+  const stats = () => ({
+    keys: tails.size,
+    running,
+    waiting
+  });
+
+  return { run, stats };
+};
+
+module.exports = createKeyedQueue;
\ No newline at end of file
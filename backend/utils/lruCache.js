@@ -0,0 +1,73 @@
+// Small in-process LRU cache with per-entry TTL and hit/miss counters.
+// A Map keeps insertion order, so re-inserting on read makes the first key
+// the least recently used one. Besides an entry count, the cache can be
+// bounded by total size when given a sizeOf(value) function.
+
+const createLruCache = ({
+  maxEntries = 1000,
+  maxSize = Infinity,
+  sizeOf = () => 0,
+  ttlMs = 60 * 1000
+} = {}) => {
+  const entries = new Map();
+  const counters = { hits: 0, misses: 0, evictions: 0 };
+  let totalSize = 0;
+
+  const remove = (key) => {
+    const entry = entries.get(key);
+    if (!entry) return false;
+    entries.delete(key);
+    totalSize -= entry.size;
+    return true;
+  };
+
+  const get = (key) => {
+    const entry = entries.get(key);
+    if (!entry) {
+      counters.misses++;
+      return undefined;
+    }
+    if (entry.expiresAt <= Date.now()) {
+      remove(key);
+      counters.misses++;
+      return undefined;
+    }
+    entries.delete(key);
+    entries.set(key, entry);
+    counters.hits++;
+    return entry.value;
+  };
+
+  const set = (key, value, entryTtlMs = ttlMs) => {
+    const size = sizeOf(value);
+    remove(key);
+    if (size > maxSize) return;
+
+    entries.set(key, { value, size, expiresAt: Date.now() + entryTtlMs });
+    totalSize += size;
+    while (entries.size > maxEntries || totalSize > maxSize) {
+      remove(entries.keys().next().value);
+      counters.evictions++;
+    }
+  };
+
+  const clear = () => {
+    entries.clear();
+    totalSize = 0;
+  };
+
+  const stats = () => {
+    const lookups = counters.hits + counters.misses;
+    return {
+      ...counters,
+      size: entries.size,
+      maxEntries,
+      ...(maxSize !== Infinity && { bytes: totalSize, maxBytes: maxSize }),
+      hitRatio: lookups === 0 ? 0 : counters.hits / lookups
+    };
+  };
+
+  return { get, set, delete: remove, clear, stats };
+};
+
+module.exports = createLruCache;
\ No newline at end of file
@@ -0,0 +1,137 @@
+// Minimal Prometheus-style metrics registry.
+//
+// Counters, gauges and histograms keyed by label values, rendered in the
+// Prometheus text exposition format. Recording is a Map lookup plus a few
+// additions, so it is cheap enough for every request and query. Gauges can
+// take a collect() callback that reads the current value at scrape time.
+
+const DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+const escapeLabel = (value) => String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+
+const formatLabels = (names, values, extra = '') => {
+  const pairs = names.map((name, i) => `${name}="${escapeLabel(values[i])}"`);
+  if (extra) pairs.push(extra);
+  return pairs.length === 0 ? '' : `{${pairs.join(',')}}`;
+};
+
+const formatValue = (value) => {
+  if (value === Infinity) return '+Inf';
+  if (value === -Infinity) return '-Inf';
+  return String(value);
+};
+
+const createRegistry = () => {
+  const metrics = [];
+
+  // Series are stored per joined label values; labels(...) returns a bound
+  // child so hot paths can skip the join
+  const register = (metric) => {
+    metrics.push(metric);
+    return metric;
+  };
+
+  const counter = ({ name, help, labelNames = [] }) => {
+    const series = new Map();
+    const child = (values) => {
+      const key = values.join('\u0000');
+      let entry = series.get(key);
+      if (!entry) {
+        entry = { values, value: 0 };
+        series.set(key, entry);
+      }
+      return { inc: (amount = 1) => { entry.value += amount; } };
+    };
+
+    return register({
+      name,
+      help,
+      type: 'counter',
+      labels: (...values) => child(values),
+      inc: (amount = 1) => child([]).inc(amount),
+      render: () => [...series.values()].map(entry =>
+        `${name}${formatLabels(labelNames, entry.values)} ${formatValue(entry.value)}`)
+    });
+  };
+
+  const gauge = ({ name, help, labelNames = [], collect }) => {
+    const series = new Map();
+    const set = (values, value) => {
+      series.set(values.join('\u0000'), { values, value });
+    };
+
+    const metric = register({
+      name,
+      help,
+      type: 'gauge',
+      set: (value) => set([], value),
+      labels: (...values) => ({ set: value => set(values, value) }),
+      render: () => {
+        if (collect) collect(metric);
+        return [...series.values()].map(entry =>
+          `${name}${formatLabels(labelNames, entry.values)} ${formatValue(entry.value)}`);
+      }
+    });
+    return metric;
+  };
+
+  const histogram = ({ name, help, labelNames = [], buckets = DEFAULT_BUCKETS }) => {
+    const series = new Map();
+    const child = (values) => {
+      const key = values.join('\u0000');
+      let entry = series.get(key);
+      if (!entry) {
+        entry = { values, counts: new Array(buckets.length).fill(0), sum: 0, count: 0 };
+        series.set(key, entry);
+      }
+      return {
+        observe: (value) => {
+          // Non-cumulative here; made cumulative when rendered
+          let i = 0;
+          while (i < buckets.length && value > buckets[i]) i++;
+          if (i < buckets.length) entry.counts[i]++;
+          entry.sum += value;
+          entry.count++;
+        }
+      };
+    };
+
+    return register({
+      name,
+      help,
+      type: 'histogram',
+      labels: (...values) => child(values),
+      observe: (value) => child([]).observe(value),
+      render: () => {
+        const lines = [];
+        series.forEach(entry => {
+          let cumulative = 0;
+          buckets.forEach((bound, i) => {
+            cumulative += entry.counts[i];
+            lines.push(`${name}_bucket${formatLabels(labelNames, entry.values, `le="${bound}"`)} ${cumulative}`);
+          });
+          lines.push(`${name}_bucket${formatLabels(labelNames, entry.values, 'le="+Inf"')} ${entry.count}`);
+          lines.push(`${name}_sum${formatLabels(labelNames, entry.values)} ${entry.sum}`);
+          lines.push(`${name}_count${formatLabels(labelNames, entry.values)} ${entry.count}`);
+        });
+        return lines;
+      }
+    });
+  };
+
+  const render = () => metrics
+    .map(metric => [
+      `# HELP ${metric.name} ${metric.help}`,
+      `# TYPE ${metric.name} ${metric.type}`,
+      ...metric.render()
+    ].join('\n'))
+    .join('\n') + '\n';
+
+  return { counter, gauge, histogram, render };
+};
+
+module.exports = {
+  createRegistry,
+  DEFAULT_BUCKETS,
+  CONTENT_TYPE: 'text/plain; version=0.0.4; charset=utf-8'
+};
\ No newline at end of file
@@ -0,0 +1,175 @@
+// Keyset (cursor) pagination shared by the listing routes
+//
+// Pages are addressed by an opaque cursor holding the last row's sort value,
+// its _id and the page number, so fetching page N costs the same as page 1.
+// Requests that still send ?page= are served with skip/limit for backwards
+// compatibility. Both modes report currentPage and hasPrevPage.
+
+const COUNT_TTL_MS = parseInt(process.env.PAGINATION_COUNT_TTL_MS) || 30 * 1000;
+const COUNT_CACHE_MAX = 500;
+
+class PaginationError extends Error {
+  constructor(message) {
+    super(message);
+    this.name = 'PaginationError';
+  }
+}
+
+// A row without a sort value (a document missing the field) gets v: null,
+// and the next page continues by _id among the rows without one
+const encodeCursor = (doc, sortKey, sortOrder, page) => {
+  const raw = doc[sortKey];
+  const value = raw instanceof Date ? raw.toISOString() : raw;
+  const payload = { k: sortKey, o: sortOrder, v: value === undefined ? null : value, id: String(doc._id), p: page };
+  return Buffer.from(JSON.stringify(payload)).toString('base64url');
+};
+
+const OBJECT_ID = /^[0-9a-f]{24}$/i;
+
+// The JSON shape encodeCursor writes for each schema type; the values go
+// into the query filter, so nothing else (operator objects, arrays) may
+// get through
+const CURSOR_VALUE_CHECKS = {
+  Date: value => typeof value === 'string' && !Number.isNaN(Date.parse(value)),
+  Number: value => typeof value === 'number' && Number.isFinite(value),
+  String: value => typeof value === 'string'
+};
+
+// valueType: schema type of the sort key ('Date', 'Number' or 'String')
+const decodeCursor = (token, sortKey, sortOrder, valueType) => {
+  let payload;
+  try {
+    payload = JSON.parse(Buffer.from(String(token), 'base64url').toString('utf8'));
+  } catch (error) {
+    throw new PaginationError('Invalid cursor');
+  }
+  if (!payload || typeof payload !== 'object') {
+    throw new PaginationError('Invalid cursor');
+  }
+  if (payload.k !== sortKey || payload.o !== sortOrder) {
+    throw new PaginationError('Cursor does not match the requested sort');
+  }
+  const checkValue = CURSOR_VALUE_CHECKS[valueType];
+  if (typeof payload.id !== 'string' || !OBJECT_ID.test(payload.id) || !checkValue ||
+      (payload.v !== null && !checkValue(payload.v)) || !Number.isInteger(payload.p) || payload.p < 1) {
+    throw new PaginationError('Invalid cursor');
+  }
+  return payload;
+};
+
+// Rows strictly after the cursor in (sortKey, _id) order. Mongoose casts the
+// JSON values back to Date/ObjectId from the schema. The outer inclusive
+// bound lets the planner use one index range instead of an OR plan. Rows
+// without a sort value sort before every value, so they come first
+// ascending and last descending.
+const afterCursor = (filter, cursor, sortKey, sortOrder) => {
+  const op = sortOrder === 1 ? '$gt' : '$lt';
+  if (cursor.v === null) {
+    const clause = sortOrder === 1
+      ? { $or: [{ [sortKey]: null, _id: { $gt: cursor.id } }, { [sortKey]: { $ne: null } }] }
+      : { [sortKey]: null, _id: { $lt: cursor.id } };
+    return { ...filter, $and: [...(filter.$and || []), clause] };
+  }
+  const clauses = [
+    { [sortKey]: { [`${op}e`]: cursor.v } },
+    {
+      $or: [
+        { [sortKey]: { [op]: cursor.v } },
+        { [sortKey]: cursor.v, _id: { [op]: cursor.id } }
+      ]
+    }
+  ];
+  return { ...filter, $and: [...(filter.$and || []), ...clauses] };
+};
+
+// Short-lived counts so every page doesn't pay for a countDocuments
+const countCache = new Map();
+
+const cachedCount = async (Model, filter, readPreference = 'primary') => {
+  if (Object.keys(filter).length === 0) {
+    return Model.estimatedDocumentCount().read(readPreference);
+  }
+
+  const key = `${Model.modelName}:${JSON.stringify(filter)}`;
+  const cached = countCache.get(key);
+  if (cached && cached.expiresAt > Date.now()) {
+    return cached.count;
+  }
+
+  const count = await Model.countDocuments(filter).read(readPreference);
+  if (countCache.size >= COUNT_CACHE_MAX) {
+    countCache.delete(countCache.keys().next().value);
+  }
+  countCache.set(key, { count, expiresAt: Date.now() + COUNT_TTL_MS });
+  return count;
+};
+
+// options: filter, sortKey, sortOrder, limit, cursor, page, includeTotal,
+//          sort (overrides the keyset sort, forces page mode),
+//          build (query => query) for select/populate,
+//          readPreference for both the page and the count (default primary)
+const paginate = async (Model, options) => {
+  const {
+    filter,
+    sortKey,
+    sortOrder,
+    limit,
+    cursor,
+    includeTotal = true,
+    readPreference = 'primary',
+    build = query => query
+  } = options;
+
+  const keyset = !options.sort && !options.page;
+  const pagination = { limit };
+  let items;
+
+  if (keyset) {
+    const sort = { [sortKey]: sortOrder, _id: sortOrder };
+    const after = cursor && decodeCursor(cursor, sortKey, sortOrder, Model.schema.path(sortKey).instance);
+    const pageFilter = after ? afterCursor(filter, after, sortKey, sortOrder) : filter;
+    const page = after ? after.p + 1 : 1;
+
+    items = await build(Model.find(pageFilter).sort(sort).limit(limit + 1).read(readPreference));
+    // Descending, rows without a sort value come after every value, where
+    // the cursor's range can't reach them; a short page continues into them
+    if (after && after.v !== null && sortOrder === -1 && items.length <= limit) {
+      const rest = { ...filter, $and: [...(filter.$and || []), { [sortKey]: null }] };
+      items = items.concat(await build(Model.find(rest).sort(sort).limit(limit + 1 - items.length).read(readPreference)));
+    }
+    pagination.currentPage = page;
+    pagination.hasNextPage = items.length > limit;
+    pagination.hasPrevPage = page > 1;
+    if (pagination.hasNextPage) {
+      items = items.slice(0, limit);
+    }
+    pagination.nextCursor = pagination.hasNextPage
+      ? encodeCursor(items[items.length - 1], sortKey, sortOrder, page)
+      : null;
+  } else {
+    const page = options.page || 1;
+    const sort = options.sort || { [sortKey]: sortOrder, _id: sortOrder };
+    items = await build(Model.find(filter).sort(sort).skip((page - 1) * limit).limit(limit + 1).read(readPreference));
+    pagination.currentPage = page;
+    pagination.hasNextPage = items.length > limit;
+    pagination.hasPrevPage = page > 1;
+    if (pagination.hasNextPage) {
+      items = items.slice(0, limit);
+    }
+  }
+
+  if (includeTotal) {
+    pagination.total = await cachedCount(Model, filter, readPreference);
+    pagination.totalPages = Math.ceil(pagination.total / limit);
+  }
+
+  return { items, pagination };
+};
+
+module.exports = {
+  paginate,
+  cachedCount,
+  encodeCursor,
+  decodeCursor,
+  PaginationError
+};
\ No newline at end of file
@@ -0,0 +1,103 @@
+const createLruCache = require('./lruCache');
+const { getRedisClient } = require('./cacheStores');
+
+// Token bucket stores for the rate limiter. Both expose:
+//   take(key, { capacity, refillPerMs }) -> { allowed, remaining, retryAfterMs }
+//   stats() -> object
+//
+// A bucket holds up to `capacity` tokens and refills continuously at
+// `refillPerMs`; each request takes one token. Only the token count and the
+// time of the last refill are stored per key.
+
+// How long a bucket needs to refill completely; after that it is
+// indistinguishable from a new one and can be dropped
+const fullAfterMs = (tokens, capacity, refillPerMs) => Math.ceil((capacity - tokens) / refillPerMs);
+
+const retryAfter = (tokens, refillPerMs) => Math.ceil((1 - tokens) / refillPerMs);
+
+// In-process buckets, bounded by an LRU so memory can't grow with the
+// number of distinct clients
+const createMemoryStore = ({ maxEntries = 100000 } = {}) => {
+  const buckets = createLruCache({ maxEntries });
+
+  return {
+    name: 'memory',
+    take: async (key, { capacity, refillPerMs }) => {
+      const now = Date.now();
+      const bucket = buckets.get(key);
+      let tokens = bucket
+        ? Math.min(capacity, bucket.tokens + (now - bucket.updatedAt) * refillPerMs)
+        : capacity;
+
+      const allowed = tokens >= 1;
+      if (allowed) tokens -= 1;
+      buckets.set(key, { tokens, updatedAt: now }, fullAfterMs(tokens, capacity, refillPerMs) + 1);
+
+      return {
+        allowed,
+        remaining: Math.floor(tokens),
+        retryAfterMs: allowed ? 0 : retryAfter(tokens, refillPerMs)
+      };
+    },
+    stats: () => {
+      const { size, maxEntries: max, evictions } = buckets.stats();
+      return { buckets: size, maxEntries: max, evictions };
+    }
+  };
+};
+
+// Shared buckets in Redis (or anything speaking its protocol with Lua
+// support). The refill and take run in one script, timed by the server
+// clock, so every process sees the same bucket.
+const TAKE_SCRIPT = `
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / refill) + 1000)
+return { allowed, tostring(tokens) }
+`;
+
+const createRedisStore = (client, { prefix = 'dripnest:ratelimit:' } = {}) => {
+  if (!client.dripnestTakeToken) {
+    client.defineCommand('dripnestTakeToken', { numberOfKeys: 1, lua: TAKE_SCRIPT });
+  }
+
+  return {
+    name: 'redis',
+    take: async (key, { capacity, refillPerMs }) => {
+      const [allowed, rawTokens] = await client.dripnestTakeToken(prefix + key, capacity, refillPerMs);
+      const tokens = parseFloat(rawTokens);
+      return {
+        allowed: allowed === 1,
+        remaining: Math.floor(tokens),
+        retryAfterMs: allowed === 1 ? 0 : retryAfter(tokens, refillPerMs)
+      };
+    },
+    stats: () => ({ status: client.status })
+  };
+};
+
+// RATE_LIMIT_STORE=redis with REDIS_URL shares buckets across processes
+const createStoreFromEnv = () => {
+  if (process.env.RATE_LIMIT_STORE === 'redis' && process.env.REDIS_URL) {
+    return createRedisStore(getRedisClient());
+  }
+  return createMemoryStore({ maxEntries: parseInt(process.env.RATE_LIMIT_MAX_KEYS) || 100000 });
+};
+
+module.exports = {
+  createMemoryStore,
+  createRedisStore,
+  createStoreFromEnv
+};
\ No newline at end of file
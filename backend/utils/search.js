@@ -0,0 +1,25 @@
+// Helpers shared by the Product model and the search routes
+
+// Escape user input before it goes anywhere near a RegExp
+const escapeRegex = (value) => String(value).replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+
+// Lowercased, de-duplicated word tokens used for prefix/autocomplete lookups
+const tokenize = (...values) => {
+  const tokens = new Set();
+  values
+    .flat()
+    .filter(Boolean)
+    .forEach(value => {
+      String(value)
+        .toLowerCase()
+        .split(/[^a-z0-9]+/)
+        .filter(token => token.length > 0)
+        .forEach(token => tokens.add(token));
+    });
+  return [...tokens];
+};
+
+module.exports = {
+  escapeRegex,
+  tokenize
+};
\ No newline at end of file
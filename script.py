@@ -8,7 +8,24 @@ package_json = '''{
   "main": "server.js",
   "scripts": {
     "start": "node server.js",
+    "start:cluster": "node cluster.js",
     "dev": "nodemon server.js",
+    "bench:orders": "node bench/orderThroughput.js",
+    "bench:search": "node bench/searchLatency.js",
+    "bench:resolve": "node bench/productResolve.js",
+    "bench:listing": "node bench/listingThroughput.js",
+    "bench:order-items": "node bench/orderItems.js",
+    "bench:cluster": "node bench/clusterScaling.js",
+    "bench:rate-limit": "node bench/rateLimitOverhead.js",
+    "bench:metrics": "node bench/metricsOverhead.js",
+    "bench:storefront": "node bench/storefrontRender.js",
+    "bench:storefront-tti": "node bench/storefrontTTI.js",
+    "build:storefront": "node scripts/buildStorefront.js",
+    "migrate:stock-fields": "node scripts/backfillStockFields.js",
+    "test:query-plans": "node scripts/checkQueryPlans.js",
+    "test:order-numbers": "node scripts/stressOrderNumbers.js",
+    "test:catalog-index": "node scripts/checkCatalogIndex.js",
+    "test:load": "node loadtest/run.js",
     "test": "echo \\"Error: no test specified\\" && exit 1"
   },
   "keywords": ["ecommerce", "nodejs", "express", "mongodb"],
@@ -25,20 +42,24 @@ package_json = '''{
     "stripe": "^13.3.0",
     "nodemailer": "^6.9.4",
     "express-validator": "^7.0.1",
-    "helmet": "^7.0.0",
-    "express-rate-limit": "^6.10.0"
+    "helmet": "^7.0.0"
+  },
+  "optionalDependencies": {
+    "ioredis": "^5.3.2"
   },
   "devDependencies": {
-    "nodemon": "^3.0.1"
+    "autocannon": "^7.12.0",
+    "jsdom": "^24.0.0",
+    "mongodb-memory-server": "^9.1.1",
+    "nodemon": "^3.0.1",
+    "puppeteer": "^22.0.0"
   }
 }'''
 
 # Create main server.js
 server_js = '''const express = require('express');
-const mongoose = require('mongoose');
 const cors = require('cors');
 const helmet = require('helmet');
-const rateLimit = require('express-rate-limit');
 require('dotenv').config();
 
 // Import routes
@@ -47,24 +68,41 @@ const productRoutes = require('./routes/products');
 const orderRoutes = require('./routes/orders');
 const adminRoutes = require('./routes/admin');
 const paymentRoutes = require('./routes/payment');
+const principalCache = require('./services/principalCache');
+const dashboardStats = require('./services/dashboardStats');
+const catalogCache = require('./services/catalogCache');
+const viewCounter = require('./services/viewCounter');
+const productQueue = require('./services/productQueue');
+const clusterStatus = require('./services/clusterStatus');
+const rateLimit = require('./middleware/rateLimit');
+const database = require('./services/database');
+const metrics = require('./services/metrics');
 
 const app = express();
 const PORT = process.env.PORT || 3000;
 
+// Request latency histograms (served at /metrics)
+app.use(metrics.httpMetrics);
+
 // Security middleware
 app.use(helmet());
 
-// Rate limiting
-const limiter = rateLimit({
-  windowMs: 15 * 60 * 1000, // 15 minutes
-  max: 100 // limit each IP to 100 requests per windowMs
-});
-app.use(limiter);
+// Behind a load balancer, trust its X-Forwarded-For so limits apply per client
+if (process.env.TRUST_PROXY) {
+  const hops = parseInt(process.env.TRUST_PROXY);
+  app.set('trust proxy', Number.isNaN(hops) ? process.env.TRUST_PROXY : hops);
+}
+
+// Rate limiting (tiered per route, static files untouched)
+const limiter = rateLimit();
+app.use('/api', limiter);
 
 // CORS configuration  
 app.use(cors({
   origin: process.env.FRONTEND_URL || 'http://localhost:3001',
-  credentials: true
+  credentials: true,
+  // The storefront revalidates its cached catalog responses with If-None-Match
+  exposedHeaders: ['ETag']
 }));
 
 // Body parsing middleware
@@ -75,13 +113,34 @@ app.use(express.urlencoded({ extended: true, limit: '10mb' }));
 app.use('/uploads', express.static('uploads'));
 app.use(express.static('public'));
 
-// Database connection
-mongoose.connect(process.env.MONGODB_URI || 'mongodb://localhost:27017/dripnest', {
-  useNewUrlParser: true,
-  useUnifiedTopology: true,
-})
-.then(() => console.log('MongoDB connected successfully'))
-.catch(err => console.error('MongoDB connection error:', err));
+// Liveness and details; answered even while the database is down
+app.get('/api/health', (req, res) => {
+  res.json({ 
+    status: 'OK', 
+    timestamp: new Date().toISOString(),
+    service: 'Dripnest Backend API',
+    caches: {
+      principals: principalCache.stats(),
+      catalog: catalogCache.stats()
+    },
+    views: viewCounter.stats(),
+    checkoutQueue: productQueue.stats(),
+    rateLimit: limiter.stats(),
+    database: database.stats(),
+    process: clusterStatus.stats()
+  });
+});
+
+// Prometheus scrape endpoint
+app.get('/metrics', metrics.endpoint);
+
+// Readiness probe for load balancers and orchestrators
+app.get('/api/ready', (req, res) => {
+  res.status(database.isReady() ? 200 : 503).json({ ready: database.isReady() });
+});
+
+// Hold back API traffic while the database is unreachable
+app.use('/api', database.requireReady);
 
 // Routes
 app.use('/api/auth', authRoutes);
@@ -90,15 +149,6 @@ app.use('/api/orders', orderRoutes);
 app.use('/api/admin', adminRoutes);
 app.use('/api/payment', paymentRoutes);
 
-// Health check endpoint
-app.get('/api/health', (req, res) => {
-  res.json({ 
-    status: 'OK', 
-    timestamp: new Date().toISOString(),
-    service: 'Dripnest Backend API'
-  });
-});
-
 // Error handling middleware
 app.use((err, req, res, next) => {
   console.error(err.stack);
@@ -113,9 +163,49 @@ app.use('*', (req, res) => {
   res.status(404).json({ error: 'Route not found' });
 });
 
-app.listen(PORT, () => {
-  console.log(`Dripnest server running on port ${PORT}`);
-  console.log(`Environment: ${process.env.NODE_ENV || 'development'}`);
+// Only start listening once the database is reachable, so a new worker
+// never takes traffic it can't serve
+let server = null;
+database.connect().then(() => {
+  console.log('MongoDB connected successfully');
+  dashboardStats.startRefreshJob();
+  viewCounter.start();
+
+  server = app.listen(PORT, () => {
+    console.log(`Dripnest server running on port ${PORT} (pid ${process.pid})`);
+    console.log(`Environment: ${process.env.NODE_ENV || 'development'}`);
+    clusterStatus.start();
+  });
+});
+
+// Stop accepting connections, let in-flight requests finish, then flush
+// buffered writes before exiting
+let shuttingDown = false;
+const shutdown = async (signal) => {
+  if (shuttingDown) return;
+  shuttingDown = true;
+  console.log(`${signal} received, shutting down`);
+  clusterStatus.stop();
+  if (server) {
+    await new Promise(resolve => {
+      server.close(resolve);
+      server.closeIdleConnections();
+    });
+  }
+  try {
+    await viewCounter.stop();
+  } catch (error) {
+    console.error('Shutdown flush error:', error);
+  }
+  await database.disconnect();
+  process.exit(0);
+};
+
+process.on('SIGTERM', () => shutdown('SIGTERM'));
+process.on('SIGINT', () => shutdown('SIGINT'));
+// Sent by cluster.js when this worker is being replaced or stopped
+process.on('message', (message) => {
+  if (message && message.type === 'shutdown') shutdown('Cluster shutdown');
 });
 
 module.exports = app;'''
@@ -125,12 +215,69 @@ env_template = '''# Environment Configuration
 NODE_ENV=development
 PORT=3000
 
+# Cluster mode (npm run start:cluster); WEB_CONCURRENCY defaults to the CPU count
+WEB_CONCURRENCY=4
+CLUSTER_SHUTDOWN_TIMEOUT_MS=30000
+CLUSTER_HEARTBEAT_MS=5000
+
 # Database
 MONGODB_URI=mongodb://localhost:27017/dripnest
+MONGO_MAX_POOL_SIZE=20
+MONGO_MIN_POOL_SIZE=0
+MONGO_MAX_IDLE_MS=60000
+MONGO_WAIT_QUEUE_TIMEOUT_MS=5000
+MONGO_SERVER_SELECTION_TIMEOUT_MS=5000
+MONGO_CONNECT_TIMEOUT_MS=10000
+MONGO_SOCKET_TIMEOUT_MS=45000
+MONGO_CONNECT_RETRY_MS=5000
+# Analytics reads may be served by a secondary. Catalog reads fill the
+# catalog cache, so only move them off the primary if stale listings are OK
+MONGO_CATALOG_READ_PREFERENCE=primary
+MONGO_ANALYTICS_READ_PREFERENCE=secondaryPreferred
 
 # JWT Secret (Change this in production!)
 JWT_SECRET=your-super-secret-jwt-key-change-this-in-production
 
+# Auth principal cache (per process)
+AUTH_CACHE_TTL_MS=60000
+AUTH_CACHE_MAX_ENTRIES=10000
+
+# Admin dashboard counters are fully recomputed on this interval
+DASHBOARD_STATS_REFRESH_MS=300000
+
+# Catalog response cache (memory, or redis to share it across processes)
+CACHE_STORE=memory
+REDIS_URL=redis://localhost:6379
+CATALOG_CACHE_TTL_MS=60000
+CATALOG_CACHE_MAX_BYTES=52428800
+
+# Product views are buffered and flushed in batches
+VIEW_FLUSH_INTERVAL_MS=10000
+VIEW_FLUSH_THRESHOLD=1000
+
+# Idempotency-Key records for order submission (mongo, or memory for a single node)
+IDEMPOTENCY_STORE=mongo
+IDEMPOTENCY_TTL_MS=86400000
+# A claim lapses after this long if the request never finishes (crashed worker)
+IDEMPOTENCY_LEASE_MS=60000
+IDEMPOTENCY_MEMORY_MAX_KEYS=10000
+
+# Order numbers are reserved from a shared counter this many at a time
+ORDER_NUMBER_BLOCK_SIZE=100
+
+# Rate limits per client IP as "burst/seconds" (memory, or redis to share buckets)
+RATE_LIMIT_STORE=memory
+RATE_LIMIT_MAX_KEYS=100000
+RATE_LIMIT_AUTH=10/900
+RATE_LIMIT_CHECKOUT=20/60
+RATE_LIMIT_CATALOG=300/60
+RATE_LIMIT_API=100/60
+# Set to the number of proxy hops when running behind a load balancer
+TRUST_PROXY=
+
+# Require `Authorization: Bearer <token>` on GET /metrics (open when empty)
+METRICS_TOKEN=
+
 # Frontend URL
 FRONTEND_URL=http://localhost:3001
 
@@ -149,6 +296,118 @@ EMAIL_PASS=your-app-password
 MAX_FILE_SIZE=5242880
 UPLOAD_PATH=./uploads/'''
 
+# Cluster launcher
+cluster_js = '''const cluster = require('cluster');
+const os = require('os');
+require('dotenv').config();
+
+// Production launcher: forks WEB_CONCURRENCY workers (default: one per CPU)
+// that each run server.js behind the primary's shared listening socket.
+//
+//   SIGHUP / SIGUSR2  rolling restart - one worker at a time is replaced, and
+//                     the old one is only told to drain once its replacement
+//                     is listening, so the port never goes dark
+//   SIGTERM / SIGINT  drain every worker and exit
+//
+// Workers that die unexpectedly are replaced. Caches, the checkout queue and
+// buffered view counts are per worker; see "Cluster mode" in the setup guide.
+
+const WORKERS = parseInt(process.env.WEB_CONCURRENCY) || os.cpus().length;
+const SHUTDOWN_TIMEOUT_MS = parseInt(process.env.CLUSTER_SHUTDOWN_TIMEOUT_MS) || 30 * 1000;
+
+// Last heartbeat per live worker, broadcast back so any worker can report
+// the whole cluster from /api/health
+const heartbeats = new Map();
+let stopping = false;
+let reloading = false;
+
+const broadcastStatus = () => {
+  const workers = [...heartbeats.values()];
+  Object.values(cluster.workers).forEach(worker => {
+    if (worker.isConnected()) {
+      worker.send({ type: 'cluster-status', workers });
+    }
+  });
+};
+
+const fork = () => {
+  const worker = cluster.fork();
+  worker.on('message', (message) => {
+    if (message && message.type === 'heartbeat') {
+      heartbeats.set(worker.id, message.worker);
+      broadcastStatus();
+    }
+  });
+  return worker;
+};
+
+// Ask a worker to stop taking connections and exit once in-flight requests
+// finish; kill it if it hasn't gone within the timeout
+const drain = (worker) => new Promise(resolve => {
+  if (worker.isDead()) return resolve();
+  const timer = setTimeout(() => worker.process.kill('SIGKILL'), SHUTDOWN_TIMEOUT_MS);
+  worker.once('exit', () => {
+    clearTimeout(timer);
+    resolve();
+  });
+  worker.$draining = true;
+  worker.send({ type: 'shutdown' });
+});
+
+const waitForListening = (worker) => new Promise((resolve, reject) => {
+  worker.once('listening', resolve);
+  worker.once('exit', code => reject(new Error(`worker ${worker.id} exited with code ${code} before listening`)));
+});
+
+const rollingRestart = async () => {
+  if (reloading || stopping) return;
+  reloading = true;
+  console.log(`Rolling restart of ${Object.keys(cluster.workers).length} workers`);
+
+  try {
+    for (const worker of Object.values(cluster.workers)) {
+      const replacement = fork();
+      await waitForListening(replacement);
+      await drain(worker);
+      console.log(`Worker ${worker.id} (pid ${worker.process.pid}) replaced by ${replacement.id} (pid ${replacement.process.pid})`);
+    }
+    console.log('Rolling restart complete');
+  } catch (error) {
+    console.error('Rolling restart aborted:', error);
+  } finally {
+    reloading = false;
+  }
+};
+
+const shutdown = async (signal) => {
+  if (stopping) return;
+  stopping = true;
+  console.log(`${signal} received, draining ${Object.keys(cluster.workers).length} workers`);
+  await Promise.all(Object.values(cluster.workers).map(drain));
+  process.exit(0);
+};
+
+if (cluster.isWorker) {
+  require('./server');
+} else {
+  cluster.on('exit', (worker, code, signal) => {
+    heartbeats.delete(worker.id);
+    if (stopping || worker.$draining) return;
+    console.error(`Worker ${worker.id} (pid ${worker.process.pid}) died (${signal || code}), starting a new one`);
+    fork();
+  });
+
+  console.log(`Primary ${process.pid} starting ${WORKERS} workers`);
+  for (let i = 0; i < WORKERS; i++) {
+    fork();
+  }
+
+  process.on('SIGHUP', rollingRestart);
+  process.on('SIGUSR2', rollingRestart);
+  process.on('SIGTERM', () => shutdown('SIGTERM'));
+  process.on('SIGINT', () => shutdown('SIGINT'));
+}'''
+
 # Save files
 with open('package.json', 'w') as f:
     f.write(package_json)
@@ -159,7 +418,11 @@ with open('server.js', 'w') as f:
 with open('.env.example', 'w') as f:
     f.write(env_template)
 
+with open('cluster.js', 'w') as f:
+    f.write(cluster_js)
+
 print("Created Node.js backend files:")
 print("✅ package.json")
 print("✅ server.js") 
-print("✅ .env.example")
\ No newline at end of file
+print("✅ .env.example")
+print("✅ cluster.js")
\ No newline at end of file
@@ -2,12 +2,21 @@
 
 import os
 
+# Create services directory
+os.makedirs('services', exist_ok=True)
+
+# Create utils directory
+os.makedirs('utils', exist_ok=True)
+
 # Create models directory
 os.makedirs('models', exist_ok=True)
 
 # User model
 user_model = '''const mongoose = require('mongoose');
 const bcrypt = require('bcryptjs');
+const principalCache = require('../services/principalCache');
+const dashboardStats = require('../services/dashboardStats');
+const { queryMetrics } = require('../services/metrics');
 
 const userSchema = new mongoose.Schema({
   username: {
@@ -67,10 +76,13 @@ const userSchema = new mongoose.Schema({
   }
 });
 
+// Customer counts on the admin dashboard
+userSchema.index({ role: 1, isActive: 1 });
+
 // Hash password before saving
 userSchema.pre('save', async function(next) {
   if (!this.isModified('password')) return next();
-  
+
   try {
     const salt = await bcrypt.genSalt(12);
     this.password = await bcrypt.hash(this.password, salt);
@@ -88,13 +100,53 @@ userSchema.methods.comparePassword = async function(candidatePassword) {
 // Update timestamp on save
 userSchema.pre('save', function(next) {
   this.updatedAt = Date.now();
+  this.$locals.principalChanged = !this.isNew &&
+    ['username', 'email', 'role', 'isActive'].some(path => this.isModified(path));
+  if (this.isNew) {
+    this.$locals.customerDelta = this.role === 'customer' ? 1 : 0;
+  } else if (this.isModified('role')) {
+    this.$locals.customerDelta = this.role === 'customer' ? 1 : -1;
+  }
   next();
 });
 
+// Keep the dashboard's customer count current
+userSchema.post('save', function(doc) {
+  if (doc.$locals.customerDelta) {
+    dashboardStats.increment({ totalCustomers: doc.$locals.customerDelta });
+    doc.$locals.customerDelta = 0;
+  }
+});
+
+// Drop cached auth principals when a user's identity, role or status changes
+userSchema.post('save', function(doc) {
+  if (doc.$locals.principalChanged) {
+    principalCache.invalidate(doc._id);
+  }
+});
+
+userSchema.post(['findOneAndUpdate', 'findOneAndDelete', 'findOneAndReplace'], function(doc) {
+  if (doc) {
+    principalCache.invalidate(doc._id);
+  }
+});
+
+// Bulk updates don't tell us which users changed
+userSchema.post(['updateOne', 'updateMany', 'deleteOne', 'deleteMany', 'replaceOne'], function() {
+  principalCache.clear();
+});
+
+// Operation timings for /metrics
+userSchema.plugin(queryMetrics, { model: 'User' });
+
 module.exports = mongoose.model('User', userSchema);'''
 
 # Product model with size and quantity options
 product_model = '''const mongoose = require('mongoose');
+const { tokenize } = require('../utils/search');
+const dashboardStats = require('../services/dashboardStats');
+const slugCache = require('../services/slugCache');
+const { queryMetrics } = require('../services/metrics');
 
 const productSchema = new mongoose.Schema({
   name: {
@@ -146,16 +198,37 @@ const productSchema = new mongoose.Schema({
     type: Number,
     default: 0
   },
+  // Derived from variants/totalStock on every stock change so listings
+  // don't have to reduce over variants per document
+  availableStock: {
+    type: Number,
+    default: 0
+  },
+  inStock: {
+    type: Boolean,
+    default: false
+  },
   isActive: {
     type: Boolean,
     default: true
   },
+  // Tokens of stock reservations being applied (services/stockReservation.js)
+  reservationTokens: {
+    type: [String],
+    default: undefined,
+    select: false
+  },
   // SEO and metadata
   slug: {
     type: String,
     unique: true
   },
   tags: [String],
+  // Lowercased word tokens from name, tags and brand for prefix lookups
+  searchTokens: {
+    type: [String],
+    select: false
+  },
   brand: String,
   material: String,
   careInstructions: String,
@@ -197,33 +270,119 @@ const productSchema = new mongoose.Schema({
 });
 
 // Calculate total stock from variants
-productSchema.virtual('inStock').get(function() {
-  if (this.variants && this.variants.length > 0) {
-    return this.variants.reduce((total, variant) => total + variant.stock, 0) > 0;
+const sumStock = (product) => {
+  if (product.variants && product.variants.length > 0) {
+    return product.variants.reduce((total, variant) => total + variant.stock, 0);
   }
-  return this.totalStock > 0;
+  return product.totalStock || 0;
+};
+
+// Same rule as sumStock, as an update pipeline for writes that bypass save()
+const STOCK_FIELDS_PIPELINE = [
+  {
+    $set: {
+      availableStock: {
+        $cond: [
+          { $gt: [{ $size: { $ifNull: ['$variants', []] } }, 0] },
+          { $sum: '$variants.stock' },
+          { $ifNull: ['$totalStock', 0] }
+        ]
+      }
+    }
+  },
+  { $set: { inStock: { $gt: ['$availableStock', 0] } } }
+];
+
+// clearTokens: reservation tokens to drop in the same update
+productSchema.statics.syncStockFields = function(filter, clearTokens) {
+  if (!clearTokens || clearTokens.length === 0) {
+    return this.updateMany(filter, STOCK_FIELDS_PIPELINE);
+  }
+  return this.updateMany(filter, [
+    ...STOCK_FIELDS_PIPELINE,
+    { $set: { reservationTokens: { $setDifference: [{ $ifNull: ['$reservationTokens', []] }, clearTokens] } } }
+  ]);
+};
+
+// Field sets for the read-only views, used with lean()
+productSchema.statics.projections = {
+  card: 'name slug category price images tags brand rating inStock availableStock sales createdAt',
+  detail: '-__v',
+  adminRow: 'name slug description category price variants totalStock availableStock inStock isActive sales views createdAt updatedAt'
+};
+
+// Keyset pagination: storefront listing for every sortBy option, with and
+// without a category filter, plus the admin listing by createdAt
+['createdAt', 'price', 'sales', 'name'].forEach(sortKey => {
+  productSchema.index({ isActive: 1, [sortKey]: 1, _id: 1 });
+  productSchema.index({ isActive: 1, category: 1, [sortKey]: 1, _id: 1 });
 });
+productSchema.index({ createdAt: -1, _id: -1 });
+productSchema.index({ category: 1, createdAt: -1, _id: -1 });
+
+// Low-stock alerts: one index per $or branch
+productSchema.index({ isActive: 1, totalStock: 1 });
+productSchema.index({ isActive: 1, 'variants.stock': 1 });
+
+// Relevance-ranked full text search, name matches count most
+productSchema.index(
+  { name: 'text', tags: 'text', description: 'text' },
+  { name: 'product_text_search', weights: { name: 10, tags: 5, description: 1 } }
+);
+
+// Autocomplete: anchored prefix scans over the token array; sales rides
+// along so the top-sellers sort reads it from the index
+productSchema.index({ searchTokens: 1, sales: -1 });
 
 // Generate slug from name
 productSchema.pre('save', function(next) {
   if (this.isModified('name')) {
+    if (this.slug) {
+      slugCache.invalidate(this.slug);
+    }
     this.slug = this.name
       .toLowerCase()
       .replace(/[^a-z0-9]/g, '-')
       .replace(/-+/g, '-')
       .replace(/^-|-$/g, '');
   }
+  if (this.isNew || this.isModified('name') || this.isModified('tags') || this.isModified('brand')) {
+    this.searchTokens = tokenize(this.name, this.tags, this.brand);
+  }
+  if (this.isNew || this.isModified('variants') || this.isModified('totalStock')) {
+    this.availableStock = sumStock(this);
+    this.inStock = this.availableStock > 0;
+  }
   this.updatedAt = Date.now();
+  if (this.isNew) {
+    this.$locals.activeDelta = this.isActive ? 1 : 0;
+  } else if (this.isModified('isActive')) {
+    this.$locals.activeDelta = this.isActive ? 1 : -1;
+  }
   next();
 });
 
+// Keep the dashboard's active product count current
+productSchema.post('save', function(doc) {
+  if (doc.$locals.activeDelta) {
+    dashboardStats.increment({ totalProducts: doc.$locals.activeDelta });
+    doc.$locals.activeDelta = 0;
+  }
+});
+
 // Ensure virtual fields are serialized
 productSchema.set('toJSON', { virtuals: true });
 
+// Operation timings for /metrics
+productSchema.plugin(queryMetrics, { model: 'Product' });
+
 module.exports = mongoose.model('Product', productSchema);'''
 
 # Order model
 order_model = '''const mongoose = require('mongoose');
+const dashboardStats = require('../services/dashboardStats');
+const orderNumbers = require('../services/orderNumbers');
+const { queryMetrics } = require('../services/metrics');
 
 const orderSchema = new mongoose.Schema({
   orderNumber: {
@@ -319,18 +478,453 @@ const orderSchema = new mongoose.Schema({
   }
 });
 
-// Generate order number
-orderSchema.pre('save', async function(next) {
+// Keyset pagination for customer order history and the admin order list
+orderSchema.index({ customer: 1, createdAt: -1, _id: -1 });
+orderSchema.index({ status: 1, createdAt: -1, _id: -1 });
+orderSchema.index({ createdAt: -1, _id: -1 });
+
+// Stripe callbacks look orders up by payment intent
+orderSchema.index({ 'paymentDetails.paymentIntentId': 1 }, { sparse: true });
+
+// Generate order number before validation, so `required` sees it
+orderSchema.pre('validate', async function() {
   if (!this.orderNumber) {
-    const timestamp = Date.now().toString();
-    this.orderNumber = 'DN' + timestamp.slice(-8);
+    this.orderNumber = await orderNumbers.next();
   }
+});
+
+orderSchema.pre('save', async function(next) {
   this.updatedAt = Date.now();
+  this.$locals.wasNew = this.isNew;
   next();
 });
 
+// Keep the materialized dashboard counters in step with order writes
+orderSchema.post('init', function() {
+  this.$locals.savedStatus = this.status;
+});
+
+orderSchema.post('save', function(doc) {
+  if (doc.$locals.wasNew) {
+    dashboardStats.increment({
+      totalOrders: 1,
+      totalRevenue: dashboardStats.revenueOf(doc.status, doc.total)
+    });
+  } else if (doc.$locals.savedStatus !== doc.status) {
+    dashboardStats.increment({
+      totalRevenue: dashboardStats.revenueOf(doc.status, doc.total) -
+        dashboardStats.revenueOf(doc.$locals.savedStatus, doc.total)
+    });
+  }
+  doc.$locals.savedStatus = doc.status;
+});
+
+// Payment callbacks change status with findOneAndUpdate. The revenue delta
+// depends on the status being replaced, so the update is made conditional
+// on it: callers pin it in the filter ({ _id, status: 'pending' }), or it
+// is read here and added to the filter. Of two concurrent transitions from
+// the same status only one matches, and only a matched update is counted.
+orderSchema.pre('findOneAndUpdate', async function() {
+  const update = this.getUpdate() || {};
+  const status = update.status !== undefined ? update.status : update.$set && update.$set.status;
+  if (status === undefined) return;
+
+  let from = this.getQuery().status;
+  if (typeof from !== 'string') {
+    const before = await this.model.findOne(this.getQuery()).select('status').lean();
+    if (!before) return;
+    from = before.status;
+    this.and([{ status: from }]);
+  }
+  this._statusChange = { status, from };
+});
+
+orderSchema.post('findOneAndUpdate', function(doc) {
+  const change = this._statusChange;
+  if (!doc || !change) return;
+
+  dashboardStats.increment({
+    totalRevenue: dashboardStats.revenueOf(change.status, doc.total) -
+      dashboardStats.revenueOf(change.from, doc.total)
+  });
+});
+
+// Operation timings for /metrics
+orderSchema.plugin(queryMetrics, { model: 'Order' });
+
 module.exports = mongoose.model('Order', orderSchema);'''
 
+# Search helpers shared by the Product model and routes
+search_utils = '''// Helpers shared by the Product model and the search routes
+
+// Escape user input before it goes anywhere near a RegExp
+const escapeRegex = (value) => String(value).replace(/[.*+?^${}()|[\\]\\\\]/g, '\\\\$&');
+
+// Lowercased, de-duplicated word tokens used for prefix/autocomplete lookups
+const tokenize = (...values) => {
+  const tokens = new Set();
+  values
+    .flat()
+    .filter(Boolean)
+    .forEach(value => {
+      String(value)
+        .toLowerCase()
+        .split(/[^a-z0-9]+/)
+        .filter(token => token.length > 0)
+        .forEach(token => tokens.add(token));
+    });
+  return [...tokens];
+};
+
+module.exports = {
+  escapeRegex,
+  tokenize
+};'''
+
+# In-process LRU/TTL cache
+lru_cache_utils = '''// Small in-process LRU cache with per-entry TTL and hit/miss counters.
+// A Map keeps insertion order, so re-inserting on read makes the first key
+// the least recently used one. Besides an entry count, the cache can be
+// bounded by total size when given a sizeOf(value) function.
+
+const createLruCache = ({
+  maxEntries = 1000,
+  maxSize = Infinity,
+  sizeOf = () => 0,
+  ttlMs = 60 * 1000
+} = {}) => {
+  const entries = new Map();
+  const counters = { hits: 0, misses: 0, evictions: 0 };
+  let totalSize = 0;
+
+  const remove = (key) => {
+    const entry = entries.get(key);
+    if (!entry) return false;
+    entries.delete(key);
+    totalSize -= entry.size;
+    return true;
+  };
+
+  const get = (key) => {
+    const entry = entries.get(key);
+    if (!entry) {
+      counters.misses++;
+      return undefined;
+    }
+    if (entry.expiresAt <= Date.now()) {
+      remove(key);
+      counters.misses++;
+      return undefined;
+    }
+    entries.delete(key);
+    entries.set(key, entry);
+    counters.hits++;
+    return entry.value;
+  };
+
+  const set = (key, value, entryTtlMs = ttlMs) => {
+    const size = sizeOf(value);
+    remove(key);
+    if (size > maxSize) return;
+
+    entries.set(key, { value, size, expiresAt: Date.now() + entryTtlMs });
+    totalSize += size;
+    while (entries.size > maxEntries || totalSize > maxSize) {
+      remove(entries.keys().next().value);
+      counters.evictions++;
+    }
+  };
+
+  const clear = () => {
+    entries.clear();
+    totalSize = 0;
+  };
+
+  const stats = () => {
+    const lookups = counters.hits + counters.misses;
+    return {
+      ...counters,
+      size: entries.size,
+      maxEntries,
+      ...(maxSize !== Infinity && { bytes: totalSize, maxBytes: maxSize }),
+      hitRatio: lookups === 0 ? 0 : counters.hits / lookups
+    };
+  };
+
+  return { get, set, delete: remove, clear, stats };
+};
+
+module.exports = createLruCache;'''
+
+# Verified auth principals, invalidated by the User model
+principal_cache_service = '''const createLruCache = require('../utils/lruCache');
+
+// Verified users keyed by userId, so authenticated requests don't need a
+// User lookup each time. The cache is per process: the User model drops an
+// entry when a saved user changes role or active state, and the TTL bounds
+// how long another process can serve a stale principal.
+
+const cache = createLruCache({
+  maxEntries: parseInt(process.env.AUTH_CACHE_MAX_ENTRIES) || 10000,
+  ttlMs: parseInt(process.env.AUTH_CACHE_TTL_MS) || 60 * 1000
+});
+
+module.exports = {
+  get: (userId) => cache.get(String(userId)),
+  set: (userId, principal) => cache.set(String(userId), principal),
+  invalidate: (userId) => cache.delete(String(userId)),
+  clear: () => cache.clear(),
+  stats: () => cache.stats()
+};'''
+
+# Materialized admin dashboard counters
+dashboard_stats_model = '''const mongoose = require('mongoose');
+
+// Single materialized document behind the admin dashboard. Counters are
+// bumped as orders, products and users change, and rebuilt from scratch
+// by the periodic refresh in services/dashboardStats.js.
+const dashboardStatsSchema = new mongoose.Schema({
+  _id: {
+    type: String,
+    default: 'global'
+  },
+  totalProducts: {
+    type: Number,
+    default: 0
+  },
+  totalOrders: {
+    type: Number,
+    default: 0
+  },
+  totalCustomers: {
+    type: Number,
+    default: 0
+  },
+  totalRevenue: {
+    type: Number,
+    default: 0
+  },
+  // Last full recomputation
+  generatedAt: Date,
+  // Last incremental update
+  updatedAt: Date
+});
+
+module.exports = mongoose.model('DashboardStats', dashboardStatsSchema);'''
+
+# Dashboard counter maintenance and refresh job
+dashboard_stats_service = '''const mongoose = require('mongoose');
+const DashboardStats = require('../models/DashboardStats');
+const database = require('./database');
+
+const STATS_ID = 'global';
+const REVENUE_STATUSES = ['processing', 'shipped', 'delivered'];
+const REFRESH_INTERVAL_MS = parseInt(process.env.DASHBOARD_STATS_REFRESH_MS) || 5 * 60 * 1000;
+
+// Revenue an order contributes in a given status
+const revenueOf = (status, total) => (REVENUE_STATUSES.includes(status) ? total || 0 : 0);
+
+// Models are looked up lazily because they report their own changes here
+const compute = async () => {
+  const Product = mongoose.model('Product');
+  const Order = mongoose.model('Order');
+  const User = mongoose.model('User');
+
+  const read = database.readPreference('analytics');
+
+  const [totalProducts, totalOrders, totalCustomers, revenue] = await Promise.all([
+    Product.countDocuments({ isActive: true }).read(read),
+    Order.estimatedDocumentCount().read(read),
+    User.countDocuments({ role: 'customer' }).read(read),
+    Order.aggregate([
+      { $match: { status: { $in: REVENUE_STATUSES } } },
+      { $group: { _id: null, total: { $sum: '$total' } } }
+    ]).read(read)
+  ]);
+
+  return {
+    totalProducts,
+    totalOrders,
+    totalCustomers,
+    totalRevenue: revenue[0]?.total || 0
+  };
+};
+
+// Recompute every counter and store the snapshot
+const refresh = async () => {
+  const stats = await compute();
+  const now = new Date();
+  return DashboardStats.findByIdAndUpdate(
+    STATS_ID,
+    { ...stats, generatedAt: now, updatedAt: now },
+    { upsert: true, new: true, lean: true }
+  );
+};
+
+// Point read; builds the snapshot on first use
+const get = async () => {
+  const stats = await DashboardStats.findById(STATS_ID).lean();
+  return stats || refresh();
+};
+
+// Apply counter deltas, e.g. { totalOrders: 1, totalRevenue: 42.5 }. This
+// never fails the caller; the next refresh repairs anything that was missed.
+const increment = (deltas) => {
+  const changes = Object.fromEntries(Object.entries(deltas).filter(([, value]) => value));
+  if (Object.keys(changes).length === 0) return Promise.resolve();
+
+  return DashboardStats.updateOne(
+    { _id: STATS_ID },
+    { $inc: changes, $set: { updatedAt: new Date() } }
+  ).catch(error => console.error('Dashboard stats update error:', error));
+};
+
+const startRefreshJob = (intervalMs = REFRESH_INTERVAL_MS) => {
+  const run = () => refresh().catch(error => console.error('Dashboard stats refresh error:', error));
+  run();
+  const timer = setInterval(run, intervalMs);
+  timer.unref();
+  return timer;
+};
+
+module.exports = {
+  REVENUE_STATUSES,
+  revenueOf,
+  get,
+  refresh,
+  increment,
+  startRefreshJob
+};'''
+
+# slug -> product id cache, invalidated by the Product model
+slug_cache_service = '''const createLruCache = require('../utils/lruCache');
+
+// slug -> product _id, kept warm by the product resolver. The Product model
+// drops a slug when its pre('save') hook renames it; entries that went stale
+// in another process are caught by the resolver's slug check.
+
+const cache = createLruCache({
+  maxEntries: parseInt(process.env.SLUG_CACHE_MAX_ENTRIES) || 50000,
+  ttlMs: parseInt(process.env.SLUG_CACHE_TTL_MS) || 60 * 60 * 1000
+});
+
+module.exports = {
+  get: (slug) => cache.get(slug),
+  set: (slug, productId) => cache.set(slug, productId),
+  invalidate: (slug) => cache.delete(slug),
+  stats: () => cache.stats()
+};'''
+
+# Idempotency key model
+idempotency_key_model = '''const mongoose = require('mongoose');
+
+// Outcome of a request sent with an Idempotency-Key header. The _id is
+// scoped to the caller (`<userId>:<key>`), and the TTL index drops records
+// once retries are no longer expected.
+const idempotencyKeySchema = new mongoose.Schema({
+  _id: {
+    type: String
+  },
+  // Hash of method, path and body, so a key can't be reused for another request
+  fingerprint: {
+    type: String,
+    required: true
+  },
+  status: {
+    type: String,
+    enum: ['pending', 'completed'],
+    default: 'pending'
+  },
+  responseStatus: Number,
+  responseBody: mongoose.Schema.Types.Mixed,
+  expiresAt: {
+    type: Date,
+    required: true
+  }
+}, {
+  timestamps: true
+});
+
+idempotencyKeySchema.index({ expiresAt: 1 }, { expireAfterSeconds: 0 });
+
+module.exports = mongoose.model('IdempotencyKey', idempotencyKeySchema);'''
+
+# Counter model
+counter_model = '''const mongoose = require('mongoose');
+
+// Named monotonic counters. Processes reserve whole blocks of values with
+// one atomic $inc (see services/orderNumbers.js).
+const counterSchema = new mongoose.Schema({
+  _id: {
+    type: String
+  },
+  seq: {
+    type: Number,
+    default: 0
+  }
+}, {
+  versionKey: false
+});
+
+module.exports = mongoose.model('Counter', counterSchema);'''
+
+# Order number generator
+order_numbers_service = '''const Counter = require('../models/Counter');
+
+// Order numbers from a block-allocating counter.
+//
+// Each process reserves ORDER_NUMBER_BLOCK_SIZE numbers at a time with one
+// atomic $inc on a Counter document and hands them out from memory, so
+// numbers are unique across any number of processes and increase within
+// each one. Numbers left in a block when a process exits are skipped.
+//
+// New numbers are `DN` + 10 digits; the older timestamp-based numbers were
+// `DN` + 8 digits, so the two formats can never collide.
+
+const PREFIX = 'DN';
+const DIGITS = 10;
+const BLOCK_SIZE = parseInt(process.env.ORDER_NUMBER_BLOCK_SIZE) || 100;
+
+const format = (seq) => PREFIX + String(seq).padStart(DIGITS, '0');
+
+const createGenerator = ({ counterId = 'orderNumber', blockSize = BLOCK_SIZE } = {}) => {
+  // Current block is [nextSeq, endSeq)
+  let nextSeq = 0;
+  let endSeq = 0;
+  let refill = null;
+
+  const allocate = async () => {
+    const counter = await Counter.findOneAndUpdate(
+      { _id: counterId },
+      { $inc: { seq: blockSize } },
+      { upsert: true, new: true, lean: true }
+    );
+    nextSeq = counter.seq - blockSize + 1;
+    endSeq = counter.seq + 1;
+  };
+
+  const next = async () => {
+    while (nextSeq >= endSeq) {
+      // Callers that run dry together share one block request
+      if (!refill) {
+        refill = allocate().finally(() => { refill = null; });
+      }
+      await refill;
+    }
+    return format(nextSeq++);
+  };
+
+  return { next };
+};
+
+const generator = createGenerator();
+
+module.exports = {
+  next: () => generator.next(),
+  createGenerator,
+  format
+};'''
+
 # Save model files
 with open('models/User.js', 'w') as f:
     f.write(user_model)
@@ -341,7 +935,43 @@ with open('models/Product.js', 'w') as f:
 with open('models/Order.js', 'w') as f:
     f.write(order_model)
 
+with open('utils/search.js', 'w') as f:
+    f.write(search_utils)
+
+with open('utils/lruCache.js', 'w') as f:
+    f.write(lru_cache_utils)
+
+with open('services/principalCache.js', 'w') as f:
+    f.write(principal_cache_service)
+
+with open('models/DashboardStats.js', 'w') as f:
+    f.write(dashboard_stats_model)
+
+with open('services/dashboardStats.js', 'w') as f:
+    f.write(dashboard_stats_service)
+
+with open('services/slugCache.js', 'w') as f:
+    f.write(slug_cache_service)
+
+with open('models/IdempotencyKey.js', 'w') as f:
+    f.write(idempotency_key_model)
+
+with open('models/Counter.js', 'w') as f:
+    f.write(counter_model)
+
+with open('services/orderNumbers.js', 'w') as f:
+    f.write(order_numbers_service)
+
 print("Created database models:")
 print("✅ models/User.js")
 print("✅ models/Product.js") 
-print("✅ models/Order.js")
\ No newline at end of file
+print("✅ models/Order.js")
+print("✅ utils/search.js")
+print("✅ utils/lruCache.js")
+print("✅ services/principalCache.js")
+print("✅ models/DashboardStats.js")
+print("✅ services/dashboardStats.js")
+print("✅ services/slugCache.js")
+print("✅ models/IdempotencyKey.js")
+print("✅ models/Counter.js")
+print("✅ services/orderNumbers.js")
\ No newline at end of file
@@ -2,6 +2,12 @@
 
 import os
 
+# Create services directory
+os.makedirs('services', exist_ok=True)
+
+# Create utils directory
+os.makedirs('utils', exist_ok=True)
+
 # Create routes directory
 os.makedirs('routes', exist_ok=True)
 
@@ -16,7 +22,7 @@ const router = express.Router();
 
 // Register new customer
 router.post('/register', [
-  body('username').trim().isLength({ min: 3 }).withMessage('Username must be at least 3 characters'),
+  body('username').trim().isLength({ min: 3, max: 30 }).withMessage('Username must be 3 to 30 characters'),
   body('email').isEmail().normalizeEmail().withMessage('Please provide a valid email'),
   body('password').isLength({ min: 6 }).withMessage('Password must be at least 6 characters')
 ], async (req, res) => {
@@ -196,7 +202,7 @@ router.get('/profile', auth, async (req, res) => {
     if (!user) {
       return res.status(404).json({ error: 'User not found' });
     }
-    
+
     res.json(user);
   } catch (error) {
     console.error('Profile fetch error:', error);
@@ -217,13 +223,22 @@ const { body, validationResult, query } = require('express-validator');
 const Product = require('../models/Product');
 const auth = require('../middleware/auth');
 const adminAuth = require('../middleware/adminAuth');
+const { escapeRegex, tokenize } = require('../utils/search');
+const { paginate, PaginationError } = require('../utils/pagination');
+const { cacheResponse } = require('../services/catalogCache');
+const viewCounter = require('../services/viewCounter');
+const productResolver = require('../services/productResolver');
+const stockRules = require('../services/stockRules');
+const database = require('../services/database');
 
 const router = express.Router();
 
 // Get all products with filtering and pagination
-router.get('/', [
+router.get('/', cacheResponse(), [
   query('page').optional().isInt({ min: 1 }),
+  query('cursor').optional().isString(),
   query('limit').optional().isInt({ min: 1, max: 50 }),
+  query('includeTotal').optional().isBoolean(),
   query('category').optional().trim(),
   query('search').optional().trim(),
   query('sortBy').optional().isIn(['name', 'price', 'createdAt', 'sales']),
@@ -235,78 +250,81 @@ router.get('/', [
       return res.status(400).json({ errors: errors.array() });
     }
 
-    const page = parseInt(req.query.page) || 1;
     const limit = parseInt(req.query.limit) || 12;
-    const skip = (page - 1) * limit;
 
     // Build filter query
     const filter = { isActive: true };
-    
+
     if (req.query.category) {
       filter.category = req.query.category;
     }
-    
+
+    // Search goes through the weighted text index instead of a regex scan
+    const scoreProjection = {};
     if (req.query.search) {
-      filter.$or = [
-        { name: { $regex: req.query.search, $options: 'i' } },
-        { description: { $regex: req.query.search, $options: 'i' } },
-        { tags: { $in: [new RegExp(req.query.search, 'i')] } }
-      ];
+      filter.$text = { $search: req.query.search };
+      scoreProjection.score = { $meta: 'textScore' };
     }
 
-    // Build sort query
-    const sortBy = req.query.sortBy || 'createdAt';
+    // Text searches rank by relevance unless told otherwise; relevance
+    // ordering has no stable key, so those results page by offset
+    const sortKey = req.query.sortBy || 'createdAt';
     const sortOrder = req.query.sortOrder === 'asc' ? 1 : -1;
-    const sort = { [sortBy]: sortOrder };
-
-    const products = await Product.find(filter)
-      .sort(sort)
-      .skip(skip)
-      .limit(limit)
-      .select('-__v');
+    const relevanceSort = req.query.search && !req.query.sortBy
+      ? { score: { $meta: 'textScore' }, _id: 1 }
+      : null;
 
-    const total = await Product.countDocuments(filter);
-    const totalPages = Math.ceil(total / limit);
+    const { items: products, pagination } = await paginate(Product, {
+      filter,
+      sortKey,
+      sortOrder,
+      limit,
+      cursor: req.query.cursor,
+      page: parseInt(req.query.page) || undefined,
+      sort: relevanceSort,
+      includeTotal: req.query.includeTotal !== 'false',
+      readPreference: database.readPreference('catalog'),
+      build: query => query
+        .select(Product.projections.card)
+        .select(scoreProjection)
+        .lean()
+    });
 
+    const { total, ...rest } = pagination;
     res.json({
       products,
-      pagination: {
-        currentPage: page,
-        totalPages,
-        totalProducts: total,
-        hasNextPage: page < totalPages,
-        hasPrevPage: page > 1
-      }
+      pagination: { ...rest, totalProducts: total }
     });
 
   } catch (error) {
+    if (error instanceof PaginationError) {
+      return res.status(400).json({ error: error.message });
+    }
     console.error('Products fetch error:', error);
     res.status(500).json({ error: 'Failed to fetch products' });
   }
 });
 
+// Views served from the response cache still count
+const countCachedView = (req, entry) => {
+  if (entry.meta && entry.meta.productId) {
+    viewCounter.record(entry.meta.productId);
+  }
+};
+
 // Get single product by ID or slug
-router.get('/:identifier', async (req, res) => {
+router.get('/:identifier', cacheResponse({ onHit: countCachedView }), async (req, res) => {
   try {
-    const { identifier } = req.params;
-    
-    // Try to find by ID first, then by slug
-    let product = await Product.findById(identifier).select('-__v');
-    if (!product) {
-      product = await Product.findOne({ 
-        slug: identifier, 
-        isActive: true 
-      }).select('-__v');
-    }
+    const product = await productResolver.resolve(req.params.identifier);
 
     if (!product) {
       return res.status(404).json({ error: 'Product not found' });
     }
 
-    // Increment view count
-    product.views += 1;
-    await product.save();
+    // Views are buffered and flushed in batches, not saved per request
+    viewCounter.record(product._id);
 
+    res.locals.cacheMeta = { productId: product._id };
     res.json(product);
 
   } catch (error) {
@@ -327,38 +345,24 @@ router.post('/check-availability', [
       return res.status(400).json({ errors: errors.array() });
     }
 
-    const { productId, size, quantity } = req.body;
+    const { productId, size } = req.body;
+    const quantity = parseInt(req.body.quantity);
+
+    const product = await Product.findById(productId)
+      .select(stockRules.AVAILABILITY_PROJECTION)
+      .lean();
 
-    const product = await Product.findById(productId);
-    if (!product || !product.isActive) {
+    const result = stockRules.checkLine(product, { size, quantity });
+    if (result.reason === stockRules.REASONS.NOT_FOUND) {
       return res.status(404).json({ error: 'Product not found' });
     }
-
-    let available = false;
-    let availableStock = 0;
-
-    // For T-shirts and sized items, check specific size
-    if (product.category === 'T-Shirts' || (size && product.variants.length > 0)) {
-      if (!size) {
-        return res.status(400).json({ error: 'Size selection is required for this product' });
-      }
-
-      const variant = product.variants.find(v => v.size === size);
-      if (variant && variant.stock >= quantity) {
-        available = true;
-        availableStock = variant.stock;
-      }
-    } else {
-      // For non-sized items
-      if (product.totalStock >= quantity) {
-        available = true;
-        availableStock = product.totalStock;
-      }
+    if (result.reason === stockRules.REASONS.SIZE_REQUIRED) {
+      return res.status(400).json({ error: 'Size selection is required for this product' });
     }
 
     res.json({
-      available,
-      availableStock,
+      available: result.available,
+      availableStock: result.availableStock,
       requestedQuantity: quantity,
       size: size || null
     });
@@ -369,10 +373,104 @@ router.post('/check-availability', [
   }
 });
 
+// Check availability for a whole cart in one request
+router.post('/check-availability/batch', [
+  body('items').isArray({ min: 1, max: 100 }).withMessage('Between 1 and 100 cart lines required'),
+  body('items.*.productId').isMongoId().withMessage('Valid product ID required'),
+  body('items.*.size').optional().trim(),
+  body('items.*.quantity').isInt({ min: 1 }).withMessage('Quantity must be at least 1')
+], async (req, res) => {
+  try {
+    const errors = validationResult(req);
+    if (!errors.isEmpty()) {
+      return res.status(400).json({ errors: errors.array() });
+    }
+
+    const lines = req.body.items.map(item => ({
+      productId: item.productId,
+      size: item.size || null,
+      quantity: parseInt(item.quantity)
+    }));
+
+    // One $in query for the whole cart, projected to what the rules need
+    const ids = [...new Set(lines.map(line => line.productId))];
+    const products = await Product.find({ _id: { $in: ids } })
+      .select(stockRules.AVAILABILITY_PROJECTION)
+      .lean();
+    const productsById = new Map(products.map(product => [String(product._id), product]));
+
+    const results = stockRules.checkCart(lines, productsById);
+
+    res.json({
+      available: results.every(result => result.available),
+      items: lines.map((line, index) => ({
+        productId: line.productId,
+        size: line.size,
+        requestedQuantity: line.quantity,
+        available: results[index].available,
+        availableStock: results[index].availableStock,
+        reason: results[index].reason
+      }))
+    });
+
+  } catch (error) {
+    console.error('Batch availability check error:', error);
+    res.status(500).json({ error: 'Failed to check availability' });
+  }
+});
+
+// Autocomplete suggestions by word prefix
+router.get('/meta/suggest', [
+  query('q').trim().isLength({ min: 1, max: 50 }).withMessage('Search prefix required'),
+  query('limit').optional().isInt({ min: 1, max: 20 })
+], async (req, res) => {
+  try {
+    const errors = validationResult(req);
+    if (!errors.isEmpty()) {
+      return res.status(400).json({ errors: errors.array() });
+    }
+
+    const limit = parseInt(req.query.limit) || 8;
+    const tokens = tokenize(req.query.q);
+    if (tokens.length === 0) {
+      return res.json([]);
+    }
+
+    // Earlier words must match whole tokens, the last one is a prefix.
+    // The anchored, case-sensitive regex on lowercased tokens is answered
+    // from the { searchTokens, sales } index, and the best sellers among
+    // the matches are picked before the limit applies.
+    const prefix = tokens.pop();
+    const filter = {
+      isActive: true,
+      searchTokens: { $regex: `^${escapeRegex(prefix)}` }
+    };
+    if (tokens.length > 0) {
+      filter.$and = tokens.map(token => ({ searchTokens: token }));
+    }
+
+    const suggestions = await Product.find(filter)
+      .select('name slug category price')
+      .sort({ sales: -1, _id: 1 })
+      .limit(limit)
+      .read(database.readPreference('catalog'))
+      .lean();
+
+    res.json(suggestions.map(({ _id, name, slug, category, price }) => ({
+      _id, name, slug, category, price
+    })));
+
+  } catch (error) {
+    console.error('Suggestions fetch error:', error);
+    res.status(500).json({ error: 'Failed to fetch suggestions' });
+  }
+});
+
 // Get product categories
-router.get('/meta/categories', async (req, res) => {
+router.get('/meta/categories', cacheResponse({ ttlMs: 10 * 60 * 1000 }), async (req, res) => {
   try {
-    const categories = await Product.distinct('category', { isActive: true });
+    const categories = await Product.distinct('category', { isActive: true })
+      .read(database.readPreference('catalog'));
     res.json(categories);
   } catch (error) {
     console.error('Categories fetch error:', error);
@@ -382,6 +480,620 @@ router.get('/meta/categories', async (req, res) => {
 
 module.exports = router;'''
 
+# Keyset pagination shared by the listing routes
+pagination_utils = '''// Keyset (cursor) pagination shared by the listing routes
+//
+// Pages are addressed by an opaque cursor holding the last row's sort value,
+// its _id and the page number, so fetching page N costs the same as page 1.
+// Requests that still send ?page= are served with skip/limit for backwards
+// compatibility. Both modes report currentPage and hasPrevPage.
+
+const COUNT_TTL_MS = parseInt(process.env.PAGINATION_COUNT_TTL_MS) || 30 * 1000;
+const COUNT_CACHE_MAX = 500;
+
+class PaginationError extends Error {
+  constructor(message) {
+    super(message);
+    this.name = 'PaginationError';
+  }
+}
+
+// A row without a sort value (a document missing the field) gets v: null,
+// and the next page continues by _id among the rows without one
+const encodeCursor = (doc, sortKey, sortOrder, page) => {
+  const raw = doc[sortKey];
+  const value = raw instanceof Date ? raw.toISOString() : raw;
+  const payload = { k: sortKey, o: sortOrder, v: value === undefined ? null : value, id: String(doc._id), p: page };
+  return Buffer.from(JSON.stringify(payload)).toString('base64url');
+};
+
+const OBJECT_ID = /^[0-9a-f]{24}$/i;
+
+// The JSON shape encodeCursor writes for each schema type; the values go
+// into the query filter, so nothing else (operator objects, arrays) may
+// get through
+const CURSOR_VALUE_CHECKS = {
+  Date: value => typeof value === 'string' && !Number.isNaN(Date.parse(value)),
+  Number: value => typeof value === 'number' && Number.isFinite(value),
+  String: value => typeof value === 'string'
+};
+
+// valueType: schema type of the sort key ('Date', 'Number' or 'String')
+const decodeCursor = (token, sortKey, sortOrder, valueType) => {
+  let payload;
+  try {
+    payload = JSON.parse(Buffer.from(String(token), 'base64url').toString('utf8'));
+  } catch (error) {
+    throw new PaginationError('Invalid cursor');
+  }
+  if (!payload || typeof payload !== 'object') {
+    throw new PaginationError('Invalid cursor');
+  }
+  if (payload.k !== sortKey || payload.o !== sortOrder) {
+    throw new PaginationError('Cursor does not match the requested sort');
+  }
+  const checkValue = CURSOR_VALUE_CHECKS[valueType];
+  if (typeof payload.id !== 'string' || !OBJECT_ID.test(payload.id) || !checkValue ||
+      (payload.v !== null && !checkValue(payload.v)) || !Number.isInteger(payload.p) || payload.p < 1) {
+    throw new PaginationError('Invalid cursor');
+  }
+  return payload;
+};
+
+// Rows strictly after the cursor in (sortKey, _id) order. Mongoose casts the
+// JSON values back to Date/ObjectId from the schema. The outer inclusive
+// bound lets the planner use one index range instead of an OR plan. Rows
+// without a sort value sort before every value, so they come first
+// ascending and last descending.
+const afterCursor = (filter, cursor, sortKey, sortOrder) => {
+  const op = sortOrder === 1 ? '$gt' : '$lt';
+  if (cursor.v === null) {
+    const clause = sortOrder === 1
+      ? { $or: [{ [sortKey]: null, _id: { $gt: cursor.id } }, { [sortKey]: { $ne: null } }] }
+      : { [sortKey]: null, _id: { $lt: cursor.id } };
+    return { ...filter, $and: [...(filter.$and || []), clause] };
+  }
+  const clauses = [
+    { [sortKey]: { [`${op}e`]: cursor.v } },
+    {
+      $or: [
+        { [sortKey]: { [op]: cursor.v } },
+        { [sortKey]: cursor.v, _id: { [op]: cursor.id } }
+      ]
+    }
+  ];
+  return { ...filter, $and: [...(filter.$and || []), ...clauses] };
+};
+
+// Short-lived counts so every page doesn't pay for a countDocuments
+const countCache = new Map();
+
+const cachedCount = async (Model, filter, readPreference = 'primary') => {
+  if (Object.keys(filter).length === 0) {
+    return Model.estimatedDocumentCount().read(readPreference);
+  }
+
+  const key = `${Model.modelName}:${JSON.stringify(filter)}`;
+  const cached = countCache.get(key);
+  if (cached && cached.expiresAt > Date.now()) {
+    return cached.count;
+  }
+
+  const count = await Model.countDocuments(filter).read(readPreference);
+  if (countCache.size >= COUNT_CACHE_MAX) {
+    countCache.delete(countCache.keys().next().value);
+  }
+  countCache.set(key, { count, expiresAt: Date.now() + COUNT_TTL_MS });
+  return count;
+};
+
+// options: filter, sortKey, sortOrder, limit, cursor, page, includeTotal,
+//          sort (overrides the keyset sort, forces page mode),
+//          build (query => query) for select/populate,
+//          readPreference for both the page and the count (default primary)
+const paginate = async (Model, options) => {
+  const {
+    filter,
+    sortKey,
+    sortOrder,
+    limit,
+    cursor,
+    includeTotal = true,
+    readPreference = 'primary',
+    build = query => query
+  } = options;
+
+  const keyset = !options.sort && !options.page;
+  const pagination = { limit };
+  let items;
+
+  if (keyset) {
+    const sort = { [sortKey]: sortOrder, _id: sortOrder };
+    const after = cursor && decodeCursor(cursor, sortKey, sortOrder, Model.schema.path(sortKey).instance);
+    const pageFilter = after ? afterCursor(filter, after, sortKey, sortOrder) : filter;
+    const page = after ? after.p + 1 : 1;
+
+    items = await build(Model.find(pageFilter).sort(sort).limit(limit + 1).read(readPreference));
+    // Descending, rows without a sort value come after every value, where
+    // the cursor's range can't reach them; a short page continues into them
+    if (after && after.v !== null && sortOrder === -1 && items.length <= limit) {
+      const rest = { ...filter, $and: [...(filter.$and || []), { [sortKey]: null }] };
+      items = items.concat(await build(Model.find(rest).sort(sort).limit(limit + 1 - items.length).read(readPreference)));
+    }
+    pagination.currentPage = page;
+    pagination.hasNextPage = items.length > limit;
+    pagination.hasPrevPage = page > 1;
+    if (pagination.hasNextPage) {
+      items = items.slice(0, limit);
+    }
+    pagination.nextCursor = pagination.hasNextPage
+      ? encodeCursor(items[items.length - 1], sortKey, sortOrder, page)
+      : null;
+  } else {
+    const page = options.page || 1;
+    const sort = options.sort || { [sortKey]: sortOrder, _id: sortOrder };
+    items = await build(Model.find(filter).sort(sort).skip((page - 1) * limit).limit(limit + 1).read(readPreference));
+    pagination.currentPage = page;
+    pagination.hasNextPage = items.length > limit;
+    pagination.hasPrevPage = page > 1;
+    if (pagination.hasNextPage) {
+      items = items.slice(0, limit);
+    }
+  }
+
+  if (includeTotal) {
+    pagination.total = await cachedCount(Model, filter, readPreference);
+    pagination.totalPages = Math.ceil(pagination.total / limit);
+  }
+
+  return { items, pagination };
+};
+
+module.exports = {
+  paginate,
+  cachedCount,
+  encodeCursor,
+  decodeCursor,
+  PaginationError
+};'''
+
+# Pluggable key/value stores for response caches
+cache_stores_utils = '''const createLruCache = require('./lruCache');
+
+// Key/value stores behind the response caches. Both expose the same async
+// API, so anything speaking the Redis protocol (Redis, Valkey, KeyDB, a
+// local stand-in) can replace the in-process store:
+//   get(key) -> value | null
+//   set(key, value, ttlMs)
+//   incr(key) -> number
+//   stats() -> object
+
+const createMemoryStore = ({ maxBytes = 50 * 1024 * 1024, maxEntries = 10000 } = {}) => {
+  const cache = createLruCache({
+    maxEntries,
+    maxSize: maxBytes,
+    sizeOf: value => (typeof value === 'string' ? value.length : JSON.stringify(value).length)
+  });
+  const counters = new Map();
+
+  return {
+    name: 'memory',
+    get: async (key) => {
+      const value = cache.get(key);
+      return value === undefined ? null : value;
+    },
+    set: async (key, value, ttlMs) => cache.set(key, value, ttlMs),
+    incr: async (key) => {
+      const next = (counters.get(key) || 0) + 1;
+      counters.set(key, next);
+      return next;
+    },
+    stats: () => cache.stats()
+  };
+};
+
+// client: an ioredis-compatible client (promise API)
+const createRedisStore = (client, { prefix = 'dripnest:' } = {}) => ({
+  name: 'redis',
+  get: async (key) => {
+    const raw = await client.get(prefix + key);
+    return raw === null ? null : JSON.parse(raw);
+  },
+  set: async (key, value, ttlMs) => {
+    await client.set(prefix + key, JSON.stringify(value), 'PX', ttlMs);
+  },
+  incr: async (key) => client.incr(prefix + key),
+  stats: () => ({ status: client.status })
+});
+
+// One shared connection for every Redis-backed store in the process
+let redisClient = null;
+
+const getRedisClient = () => {
+  if (!redisClient) {
+    const Redis = require('ioredis');
+    redisClient = new Redis(process.env.REDIS_URL);
+  }
+  return redisClient;
+};
+
+const useRedis = () => process.env.CACHE_STORE === 'redis' && Boolean(process.env.REDIS_URL);
+
+// Pick a store from the environment. REDIS_URL with CACHE_STORE=redis uses
+// ioredis (an optional dependency); everything else stays in process.
+const createStoreFromEnv = ({ maxBytes } = {}) => {
+  if (useRedis()) {
+    return createRedisStore(getRedisClient());
+  }
+  return createMemoryStore({ maxBytes });
+};
+
+module.exports = {
+  createMemoryStore,
+  createRedisStore,
+  createStoreFromEnv,
+  getRedisClient,
+  useRedis
+};'''
+
+# Catalog response cache with ETags
+catalog_cache_service = '''const crypto = require('crypto');
+const { createStoreFromEnv } = require('../utils/cacheStores');
+
+// Response cache for the public catalog endpoints.
+//
+// Entries are keyed by route path plus a normalized query string and
+// carry a strong ETag, so clients can revalidate with If-None-Match and get
+// a 304 without a body. Admin product writes and stock reservations (which
+// change availableStock and inStock) call invalidate(), which bumps
+// a generation number that is part of every key; old entries are never read
+// again and age out of the store. With the in-process store the generation
+// is per process, so multi-process deployments should use the Redis store.
+
+const TTL_MS = parseInt(process.env.CATALOG_CACHE_TTL_MS) || 60 * 1000;
+const GENERATION_KEY = 'catalog:generation';
+
+const store = createStoreFromEnv({
+  maxBytes: parseInt(process.env.CATALOG_CACHE_MAX_BYTES) || 50 * 1024 * 1024
+});
+const counters = { hits: 0, misses: 0, notModified: 0 };
+let localGeneration = 0;
+
+const generation = async () => {
+  if (store.name === 'memory') return localGeneration;
+  return (await store.get(GENERATION_KEY)) || 0;
+};
+
+// Same parameters in any order map to the same key; empty values are dropped
+const normalizeQuery = (query) => {
+  const params = new URLSearchParams();
+  Object.keys(query)
+    .sort()
+    .forEach(name => {
+      [].concat(query[name])
+        .filter(value => value !== undefined && value !== '')
+        .map(String)
+        .sort()
+        .forEach(value => params.append(name, value));
+    });
+  return params.toString();
+};
+
+const etagFor = (body) => `"${crypto.createHash('sha1').update(body).digest('base64url')}"`;
+
+// If-None-Match uses weak comparison: any listed tag (proxies may add W/) or *
+const matchesEtag = (header, etag) => {
+  if (!header) return false;
+  return header.split(',').some(value => {
+    const tag = value.trim();
+    return tag === '*' || tag.replace(/^W\\//, '') === etag;
+  });
+};
+
+const sendCached = (req, res, entry) => {
+  res.set('ETag', entry.etag);
+  res.set('Cache-Control', 'public, no-cache');
+  if (matchesEtag(req.get('If-None-Match'), entry.etag)) {
+    counters.notModified++;
+    return res.status(304).end();
+  }
+  res.type('application/json').send(entry.body);
+};
+
+// Express middleware. onHit(req, entry) runs for every request served from
+// the cache; the route can attach data for it via res.locals.cacheMeta.
+const cacheResponse = ({ ttlMs = TTL_MS, onHit } = {}) => async (req, res, next) => {
+  let key;
+  try {
+    key = `catalog:${await generation()}:${req.baseUrl}${req.path}?${normalizeQuery(req.query)}`;
+    const entry = await store.get(key);
+    if (entry) {
+      counters.hits++;
+      if (onHit) onHit(req, entry);
+      return sendCached(req, res, entry);
+    }
+  } catch (error) {
+    console.error('Catalog cache read error:', error);
+    return next();
+  }
+
+  counters.misses++;
+  const json = res.json.bind(res);
+  res.json = (payload) => {
+    if (res.statusCode !== 200) {
+      return json(payload);
+    }
+
+    const body = JSON.stringify(payload);
+    const entry = { etag: etagFor(body), body, meta: res.locals.cacheMeta || null };
+    store.set(key, entry, ttlMs).catch(error => console.error('Catalog cache write error:', error));
+    return sendCached(req, res, entry);
+  };
+  next();
+};
+
+// Drop every cached catalog response
+const invalidate = async () => {
+  localGeneration++;
+  if (store.name !== 'memory') {
+    await store.incr(GENERATION_KEY);
+  }
+};
+
+const stats = () => {
+  const lookups = counters.hits + counters.misses;
+  return {
+    store: store.name,
+    ...counters,
+    hitRatio: lookups === 0 ? 0 : counters.hits / lookups,
+    backend: store.stats()
+  };
+};
+
+module.exports = {
+  cacheResponse,
+  invalidate,
+  normalizeQuery,
+  stats
+};'''
+
+# Buffered product view counter
+view_counter_service = '''const Product = require('../models/Product');
+
+// Buffered product view counter.
+//
+// Views are summed per product in memory and written as one unordered
+// bulkWrite of $inc updates, either every VIEW_FLUSH_INTERVAL_MS or as soon
+// as VIEW_FLUSH_THRESHOLD views are pending. A crash loses at most one
+// interval's worth (or one threshold's worth) of views; a clean shutdown
+// flushes what is left.
+
+const FLUSH_INTERVAL_MS = parseInt(process.env.VIEW_FLUSH_INTERVAL_MS) || 10 * 1000;
+const FLUSH_THRESHOLD = parseInt(process.env.VIEW_FLUSH_THRESHOLD) || 1000;
+
+let pending = new Map();
+let pendingViews = 0;
+let flushing = null;
+let timer = null;
+const counters = { recorded: 0, flushed: 0, flushes: 0, failedFlushes: 0 };
+
+const flush = async () => {
+  if (flushing) return flushing;
+  if (pending.size === 0) return;
+
+  const batch = pending;
+  const batchViews = pendingViews;
+  pending = new Map();
+  pendingViews = 0;
+
+  const ops = [...batch].map(([productId, views]) => ({
+    updateOne: {
+      filter: { _id: productId },
+      update: { $inc: { views } }
+    }
+  }));
+
+  flushing = Product.bulkWrite(ops, { ordered: false })
+    .then(() => {
+      counters.flushes++;
+      counters.flushed += batchViews;
+    })
+    .catch(error => {
+      // Put the views back so the next flush retries them
+      counters.failedFlushes++;
+      batch.forEach((views, productId) => {
+        pending.set(productId, (pending.get(productId) || 0) + views);
+      });
+      pendingViews += batchViews;
+      console.error('View counter flush error:', error);
+    })
+    .finally(() => {
+      flushing = null;
+    });
+
+  return flushing;
+};
+
+const record = (productId) => {
+  const key = String(productId);
+  pending.set(key, (pending.get(key) || 0) + 1);
+  pendingViews++;
+  counters.recorded++;
+  if (pendingViews >= FLUSH_THRESHOLD) {
+    flush();
+  }
+};
+
+const start = (intervalMs = FLUSH_INTERVAL_MS) => {
+  if (timer) return;
+  timer = setInterval(flush, intervalMs);
+  timer.unref();
+};
+
+const stop = async () => {
+  clearInterval(timer);
+  timer = null;
+  await flushing;
+  await flush();
+};
+
+const stats = () => ({
+  ...counters,
+  pendingViews,
+  pendingProducts: pending.size
+});
+
+module.exports = {
+  record,
+  flush,
+  start,
+  stop,
+  stats
+};'''
+
+# Single-query product lookup by id or slug
+product_resolver_service = '''const Product = require('../models/Product');
+const slugCache = require('./slugCache');
+const database = require('./database');
+
+// Resolve GET /api/products/:identifier to an active product with one query.
+//
+// A 24-character hex string is treated as an ObjectId; anything else is a
+// slug. Slugs go through the slug -> _id cache when warm, so the lookup is an
+// _id point read, and through the unique slug index when cold.
+
+const OBJECT_ID_PATTERN = /^[0-9a-fA-F]{24}$/;
+
+const isObjectId = (identifier) => OBJECT_ID_PATTERN.test(identifier);
+
+// Product pages show variant stock and inStock right before add-to-cart,
+// so they read from the primary like every other stock read
+const findActive = (filter, select) => Product.findOne({ ...filter, isActive: true })
+  .select(select)
+  .read(database.readPreference('stock'))
+  .lean();
+
+const bySlug = async (slug, select) => {
+  const cachedId = slugCache.get(slug);
+  if (cachedId) {
+    const product = await findActive({ _id: cachedId }, select);
+    if (product && product.slug === slug) {
+      return product;
+    }
+    // Renamed or deactivated elsewhere; fall through to the index
+    slugCache.invalidate(slug);
+  }
+
+  const product = await findActive({ slug }, select);
+  if (product) {
+    slugCache.set(slug, product._id);
+  }
+  return product;
+};
+
+const resolve = async (identifier, { select = Product.projections.detail } = {}) => {
+  if (isObjectId(identifier)) {
+    const product = await findActive({ _id: identifier }, select);
+    // A slug can look like an ObjectId; only then is a second query needed
+    return product || bySlug(identifier, select);
+  }
+  return bySlug(identifier, select);
+};
+
+module.exports = {
+  isObjectId,
+  resolve
+};'''
+
+# Stock rules shared by availability checks and orders
+stock_rules_service = '''// Stock rules shared by the availability checks and order creation, so the
+// storefront and checkout can't disagree about what is in stock.
+
+const REASONS = {
+  NOT_FOUND: 'not_found',
+  SIZE_REQUIRED: 'size_required',
+  UNKNOWN_SIZE: 'unknown_size',
+  INSUFFICIENT_STOCK: 'insufficient_stock'
+};
+
+// Only the fields the rules look at
+const AVAILABILITY_PROJECTION = 'variants totalStock category isActive';
+
+// T-shirts always need a size; other products only when they have variants
+// and the shopper picked one
+const requiresSize = (product, size) =>
+  product.category === 'T-Shirts' || (Boolean(size) && product.variants && product.variants.length > 0);
+
+// alreadyRequested: units of the same variant claimed by earlier cart lines
+const checkLine = (product, { size, quantity }, alreadyRequested = 0) => {
+  if (!product || !product.isActive) {
+    return { available: false, availableStock: 0, sized: false, reason: REASONS.NOT_FOUND };
+  }
+
+  if (requiresSize(product, size)) {
+    if (!size) {
+      return { available: false, availableStock: 0, sized: true, reason: REASONS.SIZE_REQUIRED };
+    }
+    const variant = product.variants.find(v => v.size === size);
+    if (!variant) {
+      return { available: false, availableStock: 0, sized: true, reason: REASONS.UNKNOWN_SIZE };
+    }
+    const available = variant.stock >= alreadyRequested + quantity;
+    return {
+      available,
+      availableStock: variant.stock,
+      sized: true,
+      variant,
+      reason: available ? null : REASONS.INSUFFICIENT_STOCK
+    };
+  }
+
+  const stock = product.totalStock || 0;
+  const available = stock >= alreadyRequested + quantity;
+  return {
+    available,
+    availableStock: stock,
+    sized: false,
+    reason: available ? null : REASONS.INSUFFICIENT_STOCK
+  };
+};
+
+// Check every cart line against already loaded products (Map of id ->
+// product). Lines for the same product and size share that stock.
+const checkCart = (lines, productsById) => {
+  const requested = new Map();
+  return lines.map(line => {
+    const product = productsById.get(String(line.productId));
+    const sized = Boolean(product) && requiresSize(product, line.size);
+    const key = `${line.productId}:${sized ? line.size : ''}`;
+    const result = checkLine(product, line, requested.get(key) || 0);
+    if (result.available) {
+      requested.set(key, (requested.get(key) || 0) + line.quantity);
+    }
+    return result;
+  });
+};
+
+const failureMessage = (product, line, reason) => {
+  switch (reason) {
+    case REASONS.NOT_FOUND:
+      return `Product not found: ${line.productId}`;
+    case REASONS.SIZE_REQUIRED:
+      return `Size is required for ${product.name}`;
+    default:
+      return `Insufficient stock for ${product.name}${line.size ? ` (Size: ${line.size})` : ''}`;
+  }
+};
+
+module.exports = {
+  REASONS,
+  AVAILABILITY_PROJECTION,
+  requiresSize,
+  checkLine,
+  checkCart,
+  failureMessage
+};'''
+
 # Save route files
 with open('routes/auth.js', 'w') as f:
     f.write(auth_routes)
@@ -389,6 +1101,30 @@ with open('routes/auth.js', 'w') as f:
 with open('routes/products.js', 'w') as f:
     f.write(product_routes)
 
+with open('utils/pagination.js', 'w') as f:
+    f.write(pagination_utils)
+
+with open('utils/cacheStores.js', 'w') as f:
+    f.write(cache_stores_utils)
+
+with open('services/catalogCache.js', 'w') as f:
+    f.write(catalog_cache_service)
+
+with open('services/viewCounter.js', 'w') as f:
+    f.write(view_counter_service)
+
+with open('services/productResolver.js', 'w') as f:
+    f.write(product_resolver_service)
+
+with open('services/stockRules.js', 'w') as f:
+    f.write(stock_rules_service)
+
 print("Created API routes:")
 print("✅ routes/auth.js")
-print("✅ routes/products.js")
\ No newline at end of file
+print("✅ routes/products.js")
+print("✅ utils/pagination.js")
+print("✅ utils/cacheStores.js")
+print("✅ services/catalogCache.js")
+print("✅ services/viewCounter.js")
+print("✅ services/productResolver.js")
+print("✅ services/stockRules.js")
\ No newline at end of file
@@ -1,5 +1,13 @@
 # Create remaining routes and middleware
 
+import os
+
+# Create utils directory
+os.makedirs('utils', exist_ok=True)
+
+# Create services directory
+os.makedirs('services', exist_ok=True)
+
 # Admin routes for product management
 admin_routes = '''const express = require('express');
 const { body, validationResult } = require('express-validator');
@@ -8,6 +16,9 @@ const Order = require('../models/Order');
 const User = require('../models/User');
 const auth = require('../middleware/auth');
 const adminAuth = require('../middleware/adminAuth');
+const { paginate, PaginationError } = require('../utils/pagination');
+const dashboardStats = require('../services/dashboardStats');
+const catalogCache = require('../services/catalogCache');
 
 const router = express.Router();
 
@@ -18,34 +29,36 @@ router.use(adminAuth);
 // Dashboard statistics
 router.get('/dashboard', async (req, res) => {
   try {
-    const totalProducts = await Product.countDocuments({ isActive: true });
-    const totalOrders = await Order.countDocuments();
-    const totalCustomers = await User.countDocuments({ role: 'customer' });
-    const totalRevenue = await Order.aggregate([
-      { $match: { status: { $in: ['processing', 'shipped', 'delivered'] } } },
-      { $group: { _id: null, total: { $sum: '$total' } } }
+    // Counters come from the materialized stats document; the two lists
+    // still need live queries, so everything runs concurrently
+    const [stats, recentOrders, lowStockProducts] = await Promise.all([
+      req.query.refresh === 'true' ? dashboardStats.refresh() : dashboardStats.get(),
+      Order.find()
+        .populate('customer', 'username email')
+        .sort({ createdAt: -1 })
+        .limit(10)
+        .lean(),
+      Product.find({
+        isActive: true,
+        $or: [
+          { totalStock: { $lte: 5 } },
+          { 'variants.stock': { $lte: 5 } }
+        ]
+      })
+        .select(Product.projections.adminRow)
+        .limit(10)
+        .lean()
     ]);
 
-    const recentOrders = await Order.find()
-      .populate('customer', 'username email')
-      .sort({ createdAt: -1 })
-      .limit(10);
-
-    const lowStockProducts = await Product.find({
-      isActive: true,
-      $or: [
-        { totalStock: { $lte: 5 } },
-        { 'variants.stock': { $lte: 5 } }
-      ]
-    }).limit(10);
-
     res.json({
       statistics: {
-        totalProducts,
-        totalOrders,
-        totalCustomers,
-        totalRevenue: totalRevenue[0]?.total || 0
+        totalProducts: stats.totalProducts,
+        totalOrders: stats.totalOrders,
+        totalCustomers: stats.totalCustomers,
+        totalRevenue: stats.totalRevenue
       },
+      generatedAt: stats.generatedAt,
+      updatedAt: stats.updatedAt,
       recentOrders,
       lowStockProducts
     });
@@ -59,31 +72,33 @@ router.get('/dashboard', async (req, res) => {
 // Get all products (admin view with inactive products)
 router.get('/products', async (req, res) => {
   try {
-    const page = parseInt(req.query.page) || 1;
-    const limit = parseInt(req.query.limit) || 20;
-    const skip = (page - 1) * limit;
+    const limit = Math.min(parseInt(req.query.limit) || 20, 100);
 
     const filter = {};
     if (req.query.category) filter.category = req.query.category;
     if (req.query.status) filter.isActive = req.query.status === 'active';
 
-    const products = await Product.find(filter)
-      .sort({ createdAt: -1 })
-      .skip(skip)
-      .limit(limit);
-
-    const total = await Product.countDocuments(filter);
+    const { items: products, pagination } = await paginate(Product, {
+      filter,
+      sortKey: 'createdAt',
+      sortOrder: -1,
+      limit,
+      cursor: req.query.cursor,
+      page: parseInt(req.query.page) || undefined,
+      includeTotal: req.query.includeTotal !== 'false',
+      build: query => query.select(Product.projections.adminRow).lean()
+    });
 
+    const { total, ...rest } = pagination;
     res.json({
       products,
-      pagination: {
-        currentPage: page,
-        totalPages: Math.ceil(total / limit),
-        totalProducts: total
-      }
+      pagination: { ...rest, totalProducts: total }
     });
 
   } catch (error) {
+    if (error instanceof PaginationError) {
+      return res.status(400).json({ error: error.message });
+    }
     console.error('Admin products fetch error:', error);
     res.status(500).json({ error: 'Failed to fetch products' });
   }
@@ -115,6 +130,7 @@ router.post('/products', [
 
     const product = new Product(productData);
     await product.save();
+    await catalogCache.invalidate();
 
     res.status(201).json({
       message: 'Product created successfully',
@@ -155,6 +171,7 @@ router.put('/products/:id', [
     });
 
     await product.save();
+    await catalogCache.invalidate();
 
     res.json({
       message: 'Product updated successfully',
@@ -177,6 +194,7 @@ router.delete('/products/:id', async (req, res) => {
 
     product.isActive = false;
     await product.save();
+    await catalogCache.invalidate();
 
     res.json({ message: 'Product deleted successfully' });
 
@@ -217,6 +235,7 @@ router.put('/products/:id/stock', [
     }
 
     await product.save();
+    await catalogCache.invalidate();
 
     res.json({
       message: 'Stock updated successfully',
@@ -232,32 +251,35 @@ router.put('/products/:id/stock', [
 // Get all orders
 router.get('/orders', async (req, res) => {
   try {
-    const page = parseInt(req.query.page) || 1;
-    const limit = parseInt(req.query.limit) || 20;
-    const skip = (page - 1) * limit;
+    const limit = Math.min(parseInt(req.query.limit) || 20, 100);
 
     const filter = {};
     if (req.query.status) filter.status = req.query.status;
 
-    const orders = await Order.find(filter)
-      .populate('customer', 'username email')
-      .populate('items.product', 'name price')
-      .sort({ createdAt: -1 })
-      .skip(skip)
-      .limit(limit);
-
-    const total = await Order.countDocuments(filter);
+    const { items: orders, pagination } = await paginate(Order, {
+      filter,
+      sortKey: 'createdAt',
+      sortOrder: -1,
+      limit,
+      cursor: req.query.cursor,
+      page: parseInt(req.query.page) || undefined,
+      includeTotal: req.query.includeTotal !== 'false',
+      build: query => query
+        .populate('customer', 'username email')
+        .populate('items.product', 'name price')
+        .lean()
+    });
 
+    const { total, ...rest } = pagination;
     res.json({
       orders,
-      pagination: {
-        currentPage: page,
-        totalPages: Math.ceil(total / limit),
-        totalOrders: total
-      }
+      pagination: { ...rest, totalOrders: total }
     });
 
   } catch (error) {
+    if (error instanceof PaginationError) {
+      return res.status(400).json({ error: error.message });
+    }
     console.error('Orders fetch error:', error);
     res.status(500).json({ error: 'Failed to fetch orders' });
   }
@@ -302,16 +324,21 @@ module.exports = router;'''
 order_routes = '''const express = require('express');
 const { body, validationResult } = require('express-validator');
 const Order = require('../models/Order');
-const Product = require('../models/Product');
 const auth = require('../middleware/auth');
+const stockReservation = require('../services/stockReservation');
+const orderItems = require('../services/orderItems');
+const productQueue = require('../services/productQueue');
+const idempotency = require('../middleware/idempotency');
+const { paginate, PaginationError } = require('../utils/pagination');
 
 const router = express.Router();
 
 // Apply authentication to all routes
 router.use(auth);
 
-// Create new order
-router.post('/', [
+// Create new order. Clients may send an Idempotency-Key header so a retried
+// submission returns the original response instead of placing a second order.
+router.post('/', idempotency(), [
   body('items').isArray({ min: 1 }).withMessage('Order must contain at least one item'),
   body('items.*.productId').isMongoId().withMessage('Valid product ID required'),
   body('items.*.quantity').isInt({ min: 1 }).withMessage('Valid quantity required'),
@@ -331,94 +358,83 @@ router.post('/', [
 
     const { items, shippingAddress, billingAddress, paymentMethod } = req.body;
 
-    // Validate and calculate order total
-    let subtotal = 0;
-    const orderItems = [];
-
-    for (const item of items) {
-      const product = await Product.findById(item.productId);
-      if (!product || !product.isActive) {
-        return res.status(400).json({ error: `Product not found: ${item.productId}` });
+    // Validate and price every line from one batched product lookup
+    let resolved;
+    try {
+      resolved = await orderItems.resolve(items);
+    } catch (error) {
+      if (error instanceof orderItems.OrderItemError) {
+        return res.status(400).json({ error: error.message });
       }
-
-      // Check stock availability
-      let available = false;
-      if (product.category === 'T-Shirts' || item.size) {
-        if (!item.size) {
-          return res.status(400).json({ 
-            error: `Size is required for ${product.name}` 
-          });
-        }
-        const variant = product.variants.find(v => v.size === item.size);
-        if (variant && variant.stock >= item.quantity) {
-          available = true;
-        }
-      } else {
-        if (product.totalStock >= item.quantity) {
-          available = true;
-        }
-      }
-
-      if (!available) {
-        return res.status(400).json({ 
-          error: `Insufficient stock for ${product.name}${item.size ? ` (Size: ${item.size})` : ''}` 
-        });
-      }
-
-      const itemTotal = product.price * item.quantity;
-      subtotal += itemTotal;
-
-      orderItems.push({
-        product: product._id,
-        name: product.name,
-        price: product.price,
-        quantity: item.quantity,
-        size: item.size || null,
-        sku: item.size ? product.variants.find(v => v.size === item.size)?.sku : null
-      });
+      throw error;
     }
+    const { subtotal, productsById } = resolved;
 
     // Calculate totals (simplified - add tax/shipping logic as needed)
     const tax = subtotal * 0.08; // 8% tax
     const shipping = subtotal > 50 ? 0 : 9.99; // Free shipping over $50
     const total = subtotal + tax + shipping;
 
-    // Create order
-    const order = new Order({
-      customer: req.user.userId,
-      items: orderItems,
-      subtotal,
-      tax,
-      shipping,
-      total,
-      shippingAddress,
-      billingAddress: billingAddress || shippingAddress,
-      paymentMethod
-    });
-
-    await order.save();
+    // Reserve stock atomically before the order exists, so concurrent
+    // checkouts can't oversell a variant
+    const reservation = resolved.items.map(item => ({
+      productId: item.product,
+      name: item.name,
+      quantity: item.quantity,
+      size: item.size
+    }));
+
+    // Checkouts that share a product run one at a time in this process
+    // instead of contending for the same documents
+    let order;
+    try {
+      order = await productQueue.run(reservation.map(line => line.productId), async () => {
+        await stockReservation.reserve(reservation);
+
+        // Create order
+        const created = new Order({
+          customer: req.user.userId,
+          items: resolved.items,
+          subtotal,
+          tax,
+          shipping,
+          total,
+          shippingAddress,
+          billingAddress: billingAddress || shippingAddress,
+          paymentMethod
+        });
 
-    // Update product stock
-    for (const item of items) {
-      const product = await Product.findById(item.productId);
-      if (item.size) {
-        const variant = product.variants.find(v => v.size === item.size);
-        if (variant) {
-          variant.stock -= item.quantity;
+        try {
+          await created.save();
+        } catch (error) {
+          await stockReservation.release(reservation);
+          throw error;
         }
-      } else {
-        product.totalStock -= item.quantity;
+        return created;
+      });
+    } catch (error) {
+      if (error instanceof stockReservation.StockReservationError) {
+        return res.status(400).json({ error: error.message });
       }
-      product.sales += item.quantity;
-      await product.save();
+      throw error;
     }
 
-    await order.populate('customer', 'username email');
-    await order.populate('items.product', 'name price');
+    // Same shape the populated order used to have, built from data already
+    // in hand instead of two more queries
+    const response = order.toObject();
+    response.customer = {
+      _id: req.user.userId,
+      username: req.user.username,
+      email: req.user.email
+    };
+    response.items.forEach(item => {
+      const product = productsById.get(String(item.product));
+      item.product = { _id: product._id, name: product.name, price: product.price };
+    });
 
     res.status(201).json({
       message: 'Order created successfully',
-      order
+      order: response
     });
 
   } catch (error) {
@@ -430,28 +446,29 @@ router.post('/', [
 // Get user's orders
 router.get('/my-orders', async (req, res) => {
   try {
-    const page = parseInt(req.query.page) || 1;
-    const limit = parseInt(req.query.limit) || 10;
-    const skip = (page - 1) * limit;
-
-    const orders = await Order.find({ customer: req.user.userId })
-      .populate('items.product', 'name price images')
-      .sort({ createdAt: -1 })
-      .skip(skip)
-      .limit(limit);
-
-    const total = await Order.countDocuments({ customer: req.user.userId });
+    const limit = Math.min(parseInt(req.query.limit) || 10, 50);
+
+    const { items: orders, pagination } = await paginate(Order, {
+      filter: { customer: req.user.userId },
+      sortKey: 'createdAt',
+      sortOrder: -1,
+      limit,
+      cursor: req.query.cursor,
+      page: parseInt(req.query.page) || undefined,
+      includeTotal: req.query.includeTotal !== 'false',
+      build: query => query.populate('items.product', 'name price images').lean()
+    });
 
+    const { total, ...rest } = pagination;
     res.json({
       orders,
-      pagination: {
-        currentPage: page,
-        totalPages: Math.ceil(total / limit),
-        totalOrders: total
-      }
+      pagination: { ...rest, totalOrders: total }
     });
 
   } catch (error) {
+    if (error instanceof PaginationError) {
+      return res.status(400).json({ error: error.message });
+    }
     console.error('Orders fetch error:', error);
     res.status(500).json({ error: 'Failed to fetch orders' });
   }
@@ -481,6 +498,916 @@ router.get('/:id', async (req, res) => {
 
 module.exports = router;'''
 
+# Atomic stock reservation used by order creation
+stock_reservation_service = '''const crypto = require('crypto');
+const Product = require('../models/Product');
+const catalogCache = require('./catalogCache');
+
+// Reserve stock for a set of order lines.
+//
+// Every line becomes a conditional $inc that only matches while enough stock
+// is left, so two buyers racing for the last unit can never push a variant
+// below zero. All lines go out in one unordered bulkWrite; nothing is ever
+// inserted. When every line matched, one follow-up update recomputes the
+// derived stock fields. A bulkWrite only reports how many lines matched, so
+// each line also pushes a token onto its product: if some line came up
+// short, or a write failed, one read of those tokens shows which lines
+// applied and only those are given back. The follow-up update clears the
+// tokens. Reserving and releasing change what the catalog shows
+// (availableStock, inStock), so cached catalog responses are dropped
+// afterwards.
+
+class StockReservationError extends Error {
+  constructor(line) {
+    super(`Insufficient stock for ${line.name || line.productId}${line.size ? ` (Size: ${line.size})` : ''}`);
+    this.name = 'StockReservationError';
+    this.line = line;
+  }
+}
+
+const reserveOp = (line, token) => {
+  const [filter, inc] = line.size
+    ? [
+      { _id: line.productId, isActive: true, variants: { $elemMatch: { size: line.size, stock: { $gte: line.quantity } } } },
+      { 'variants.$.stock': -line.quantity, sales: line.quantity }
+    ]
+    : [
+      { _id: line.productId, isActive: true, totalStock: { $gte: line.quantity } },
+      { totalStock: -line.quantity, sales: line.quantity }
+    ];
+
+  return {
+    updateOne: {
+      filter,
+      update: { $inc: inc, $set: { updatedAt: new Date() }, $push: { reservationTokens: token } }
+    }
+  };
+};
+
+const releaseOp = (line) => {
+  if (line.size) {
+    return {
+      updateOne: {
+        filter: { _id: line.productId, 'variants.size': line.size },
+        update: { $inc: { 'variants.$.stock': line.quantity, sales: -line.quantity } }
+      }
+    };
+  }
+
+  return {
+    updateOne: {
+      filter: { _id: line.productId },
+      update: { $inc: { totalStock: line.quantity, sales: -line.quantity } }
+    }
+  };
+};
+
+const productIds = (lines) => [...new Set(lines.map(line => String(line.productId)))];
+
+// Positional $inc can't also recompute availableStock/inStock, so the
+// touched products get one follow-up pipeline update, which also drops
+// `tokens`. The stock itself has already changed either way: a failed sync
+// is logged, and the derived fields catch up on the product's next stock
+// write (or `npm run migrate:stock-fields`).
+const syncStockFields = async (lines, tokens) => {
+  try {
+    await Product.syncStockFields({ _id: { $in: productIds(lines) } }, tokens);
+  } catch (error) {
+    console.error('Stock field sync error:', error);
+  }
+  // A cache that can't be reached only means listings stay stale until
+  // their TTL
+  await catalogCache.invalidate().catch(error => console.error('Catalog cache invalidation error:', error));
+};
+
+// Give back stock for lines that were already reserved
+const release = async (lines, tokens) => {
+  if (lines.length === 0) return;
+  await Product.bulkWrite(lines.map(releaseOp), { ordered: false });
+  await syncStockFields(lines, tokens);
+};
+
+// Tokens among `tokens` that made it onto their products
+const appliedTokens = async (lines, tokens) => {
+  const products = await Product.find({ _id: { $in: productIds(lines) }, reservationTokens: { $in: tokens } })
+    .select('reservationTokens')
+    .lean();
+  return new Set(products.flatMap(product => product.reservationTokens));
+};
+
+// lines: [{ productId, quantity, size, name }]
+const reserve = async (lines) => {
+  if (lines.length === 0) return;
+
+  const tokens = lines.map(() => crypto.randomUUID());
+  let failure = null;
+  try {
+    const result = await Product.bulkWrite(lines.map((line, index) => reserveOp(line, tokens[index])), { ordered: false });
+    if (result.matchedCount === lines.length) {
+      await syncStockFields(lines, tokens);
+      return;
+    }
+  } catch (error) {
+    // A failed write (cast error, lost connection) is not a stock problem
+    failure = error;
+  }
+
+  let applied;
+  try {
+    applied = await appliedTokens(lines, tokens);
+  } catch (error) {
+    console.error('Stock reservation lookup error:', error);
+    throw failure || error;
+  }
+  await release(lines.filter((line, index) => applied.has(tokens[index])), tokens);
+
+  if (failure) {
+    throw failure;
+  }
+  throw new StockReservationError(lines.find((line, index) => !applied.has(tokens[index])));
+};
+
+module.exports = {
+  reserve,
+  release,
+  StockReservationError
+};'''
+
+# Batched order item resolution
+order_items_service = '''const Product = require('../models/Product');
+const stockRules = require('./stockRules');
+
+// Turn the cart lines of a new order into priced order items.
+//
+// Every product in the cart is loaded with a single projected $in query and
+// kept in a Map, then one pass checks stock and prices each line, so the cost
+// of a checkout no longer grows with the number of lines.
+
+const ORDER_ITEM_PROJECTION = `name price ${stockRules.AVAILABILITY_PROJECTION}`;
+
+class OrderItemError extends Error {
+  constructor(message, line) {
+    super(message);
+    this.name = 'OrderItemError';
+    this.line = line;
+  }
+}
+
+const loadProducts = async (lines) => {
+  const ids = [...new Set(lines.map(line => String(line.productId)))];
+  const products = await Product.find({ _id: { $in: ids } })
+    .select(ORDER_ITEM_PROJECTION)
+    .lean();
+  return new Map(products.map(product => [String(product._id), product]));
+};
+
+// Resolves to { items, subtotal, productsById }; throws OrderItemError on the
+// first line that can't be fulfilled
+const resolve = async (lines) => {
+  const cart = lines.map(line => ({
+    productId: line.productId,
+    size: line.size || null,
+    quantity: parseInt(line.quantity)
+  }));
+
+  const productsById = await loadProducts(cart);
+  const results = stockRules.checkCart(cart, productsById);
+
+  let subtotal = 0;
+  const items = cart.map((line, index) => {
+    const product = productsById.get(String(line.productId));
+    const result = results[index];
+    if (!result.available) {
+      throw new OrderItemError(stockRules.failureMessage(product, line, result.reason), line);
+    }
+
+    subtotal += product.price * line.quantity;
+    return {
+      product: product._id,
+      name: product.name,
+      price: product.price,
+      quantity: line.quantity,
+      size: result.sized ? line.size : null,
+      sku: result.sized ? result.variant.sku : null
+    };
+  });
+
+  return { items, subtotal, productsById };
+};
+
+module.exports = {
+  resolve,
+  OrderItemError
+};'''
+
+# Per-key task queue
+keyed_queue_util = '''// Run async tasks one at a time per key.
+//
+// A task names every key it touches and starts once the previous task on
+// each of those keys has finished. All keys are taken in the same
+// synchronous step, so two tasks sharing several keys always queue in
+// arrival order and can't deadlock. Tasks on unrelated keys run in parallel.
+
+const createKeyedQueue = () => {
+  // key -> promise that settles when the last queued task on it finishes
+  const tails = new Map();
+  let running = 0;
+  let waiting = 0;
+
+  const run = async (keys, task) => {
+    const unique = [...new Set(keys.map(String))];
+    let release;
+    const done = new Promise(resolve => { release = resolve; });
+    const previous = unique.map(key => tails.get(key)).filter(Boolean);
+    unique.forEach(key => tails.set(key, done));
+
+    waiting++;
+    try {
+      await Promise.all(previous);
+      waiting--;
+      running++;
+      try {
+        return await task();
+      } finally {
+        running--;
+      }
+    } finally {
+      release();
+      unique.forEach(key => {
+        if (tails.get(key) === done) tails.delete(key);
+      });
+    }
+  };
+
+  const stats = () => ({
+    keys: tails.size,
+    running,
+    waiting
+  });
+
+  return { run, stats };
+};
+
+module.exports = createKeyedQueue;'''
+
+# Per-product checkout queue
+product_queue_service = '''const createKeyedQueue = require('../utils/keyedQueue');
+
+// Checkouts that touch the same product run one after another in this
+// process instead of racing each other on the product document. The stock
+// reservation itself stays atomic, so other processes remain safe.
+
+const queue = createKeyedQueue();
+
+module.exports = {
+  run: (productIds, task) => queue.run(productIds, task),
+  stats: () => queue.stats()
+};'''
+
+# Idempotency record stores
+idempotency_store_service = '''const IdempotencyKey = require('../models/IdempotencyKey');
+const createLruCache = require('../utils/lruCache');
+
+// Where idempotent request outcomes are kept. Both stores expose:
+//   claim(id, fingerprint) -> null when the caller now owns the key,
+//                             otherwise the existing record
+//   complete(id, responseStatus, responseBody, ttlMs)
+//   abandon(id)  (lets a retry run again after a failure)
+//
+// A claim is a short lease (IDEMPOTENCY_LEASE_MS). If the process dies
+// mid-request nothing abandons it, so once the lease runs out the next
+// retry takes the key over instead of getting 409 until the record
+// expires. complete() keeps the outcome for ttlMs (IDEMPOTENCY_TTL_MS).
+//
+// The Mongo store works across processes and expires records with a TTL
+// index. IDEMPOTENCY_STORE=memory keeps them in process for a single node,
+// in an LRU bounded by IDEMPOTENCY_MEMORY_MAX_KEYS.
+
+const TTL_MS = parseInt(process.env.IDEMPOTENCY_TTL_MS) || 24 * 60 * 60 * 1000;
+const LEASE_MS = parseInt(process.env.IDEMPOTENCY_LEASE_MS) || 60 * 1000;
+const MEMORY_MAX_KEYS = parseInt(process.env.IDEMPOTENCY_MEMORY_MAX_KEYS) || 10000;
+
+const createMongoStore = () => {
+  const claim = async (id, fingerprint) => {
+    const leaseUntil = new Date(Date.now() + LEASE_MS);
+    try {
+      await IdempotencyKey.create({ _id: id, fingerprint, expiresAt: leaseUntil });
+      return null;
+    } catch (error) {
+      if (error.code !== 11000) throw error;
+    }
+
+    // A lapsed lease, or an outcome the TTL monitor hasn't removed yet:
+    // take it over as a fresh claim
+    const takenOver = await IdempotencyKey.findOneAndUpdate(
+      { _id: id, expiresAt: { $lte: new Date() } },
+      {
+        $set: { fingerprint, status: 'pending', expiresAt: leaseUntil },
+        $unset: { responseStatus: 1, responseBody: 1 }
+      }
+    ).lean();
+    if (takenOver) return null;
+
+    const existing = await IdempotencyKey.findById(id).lean();
+    // Expired between the insert and the read: claim it again
+    return existing || claim(id, fingerprint);
+  };
+
+  return {
+    name: 'mongo',
+    claim,
+    complete: async (id, responseStatus, responseBody, ttlMs = TTL_MS) => {
+      await IdempotencyKey.updateOne(
+        { _id: id },
+        { $set: { status: 'completed', responseStatus, responseBody, expiresAt: new Date(Date.now() + ttlMs) } }
+      );
+    },
+    abandon: async (id) => {
+      await IdempotencyKey.deleteOne({ _id: id, status: 'pending' });
+    }
+  };
+};
+
+const createMemoryStore = ({ maxKeys = MEMORY_MAX_KEYS } = {}) => {
+  // Expired entries read as missing, so a lapsed lease is simply claimed again
+  const records = createLruCache({ maxEntries: maxKeys, ttlMs: LEASE_MS });
+
+  return {
+    name: 'memory',
+    claim: async (id, fingerprint) => {
+      const existing = records.get(id);
+      if (existing) {
+        return existing;
+      }
+      records.set(id, { _id: id, fingerprint, status: 'pending' }, LEASE_MS);
+      return null;
+    },
+    complete: async (id, responseStatus, responseBody, ttlMs = TTL_MS) => {
+      const record = records.get(id);
+      if (record) records.set(id, { ...record, status: 'completed', responseStatus, responseBody }, ttlMs);
+    },
+    abandon: async (id) => {
+      const record = records.get(id);
+      if (record && record.status === 'pending') records.delete(id);
+    }
+  };
+};
+
+const createStoreFromEnv = () =>
+  (process.env.IDEMPOTENCY_STORE === 'memory' ? createMemoryStore() : createMongoStore());
+
+module.exports = {
+  createMongoStore,
+  createMemoryStore,
+  createStoreFromEnv
+};'''
+
+# Per-worker health
+cluster_status_service = '''const cluster = require('cluster');
+
+// Per-worker health when running under cluster.js.
+//
+// Each worker reports a heartbeat to the primary every
+// CLUSTER_HEARTBEAT_MS; the primary sends the collected heartbeats back to
+// every worker, so whichever worker answers /api/health can describe the
+// whole cluster. Outside cluster mode this reports the single process.
+
+const HEARTBEAT_MS = parseInt(process.env.CLUSTER_HEARTBEAT_MS) || 5 * 1000;
+
+let latest = [];
+let timer = null;
+
+const heartbeat = () => {
+  const memory = process.memoryUsage();
+  return {
+    id: cluster.isWorker ? cluster.worker.id : 0,
+    pid: process.pid,
+    uptime: Math.round(process.uptime()),
+    rss: memory.rss,
+    heapUsed: memory.heapUsed,
+    reportedAt: new Date().toISOString()
+  };
+};
+
+const start = () => {
+  if (!cluster.isWorker || timer) return;
+
+  process.on('message', (message) => {
+    if (message && message.type === 'cluster-status') {
+      latest = message.workers;
+    }
+  });
+
+  const send = () => process.send({ type: 'heartbeat', worker: heartbeat() });
+  send();
+  timer = setInterval(send, HEARTBEAT_MS);
+  timer.unref();
+};
+
+const stop = () => {
+  if (timer) clearInterval(timer);
+  timer = null;
+};
+
+const stats = () => {
+  if (!cluster.isWorker) {
+    return { mode: 'single', worker: heartbeat() };
+  }
+  return { mode: 'cluster', worker: heartbeat(), workers: latest };
+};
+
+module.exports = {
+  HEARTBEAT_MS,
+  start,
+  stop,
+  stats
+};'''
+
+# Database connection module
+database_service = '''const mongoose = require('mongoose');
+
+// MongoDB connection, readiness and pool metrics.
+//
+// Pool size and timeouts come from the environment. Until the first
+// connection succeeds, and while the driver is disconnected from the
+// deployment, the process reports not-ready, so server.js can hold back
+// traffic instead of letting requests queue behind a dead connection. A
+// primary stepping down does not change readyState: writes and primary
+// reads wait for the next election, up to serverSelectionTimeoutMS.
+//
+// Reads that tolerate a little replication lag (dashboard analytics) go
+// through readPreference() and are sent to a secondary when the deployment
+// has one. Catalog reads stay on the primary by default: they fill the
+// catalog cache right after invalidate(), and a lagging secondary would put
+// pre-write data under the new generation for the whole TTL. Everything
+// touching stock or orders, including product pages, reads the primary.
+
+const MONGODB_URI = process.env.MONGODB_URI || 'mongodb://localhost:27017/dripnest';
+const RETRY_DELAY_MS = parseInt(process.env.MONGO_CONNECT_RETRY_MS) || 5 * 1000;
+
+const connectionOptions = () => ({
+  maxPoolSize: parseInt(process.env.MONGO_MAX_POOL_SIZE) || 20,
+  minPoolSize: parseInt(process.env.MONGO_MIN_POOL_SIZE) || 0,
+  maxIdleTimeMS: parseInt(process.env.MONGO_MAX_IDLE_MS) || 60 * 1000,
+  waitQueueTimeoutMS: parseInt(process.env.MONGO_WAIT_QUEUE_TIMEOUT_MS) || 5 * 1000,
+  serverSelectionTimeoutMS: parseInt(process.env.MONGO_SERVER_SELECTION_TIMEOUT_MS) || 5 * 1000,
+  connectTimeoutMS: parseInt(process.env.MONGO_CONNECT_TIMEOUT_MS) || 10 * 1000,
+  socketTimeoutMS: parseInt(process.env.MONGO_SOCKET_TIMEOUT_MS) || 45 * 1000
+});
+
+const READ_PREFERENCES = {
+  catalog: process.env.MONGO_CATALOG_READ_PREFERENCE || 'primary',
+  analytics: process.env.MONGO_ANALYTICS_READ_PREFERENCE || 'secondaryPreferred'
+};
+
+// Read preference for a class of reads ('catalog' or 'analytics');
+// anything else ('stock', 'orders') reads from the primary
+const readPreference = (kind) => READ_PREFERENCES[kind] || 'primary';
+
+// Pool counters, fed by the driver's CMAP events
+const pool = {
+  open: 0,
+  inUse: 0,
+  waiting: 0,
+  created: 0,
+  closed: 0,
+  checkouts: 0,
+  checkoutFailures: 0,
+  waitTotalMs: 0,
+  waitMaxMs: 0
+};
+const waitStarts = [];
+
+const recordWait = (event) => {
+  // Newer drivers report the wait; otherwise pair with the oldest waiter,
+  // which is who the FIFO pool serves first
+  const started = waitStarts.shift();
+  const waitedMs = event.durationMS !== undefined
+    ? event.durationMS
+    : started !== undefined ? Date.now() - started : 0;
+  pool.waitTotalMs += waitedMs;
+  pool.waitMaxMs = Math.max(pool.waitMaxMs, waitedMs);
+};
+
+const watchPool = (client) => {
+  client.on('connectionCreated', () => { pool.open++; pool.created++; });
+  client.on('connectionClosed', () => { pool.open = Math.max(0, pool.open - 1); pool.closed++; });
+  client.on('connectionCheckOutStarted', () => {
+    pool.waiting++;
+    waitStarts.push(Date.now());
+  });
+  client.on('connectionCheckedOut', (event) => {
+    pool.waiting = Math.max(0, pool.waiting - 1);
+    pool.inUse++;
+    pool.checkouts++;
+    recordWait(event);
+  });
+  client.on('connectionCheckOutFailed', () => {
+    pool.waiting = Math.max(0, pool.waiting - 1);
+    pool.checkoutFailures++;
+    waitStarts.shift();
+  });
+  client.on('connectionCheckedIn', () => { pool.inUse = Math.max(0, pool.inUse - 1); });
+};
+
+let connecting = null;
+const events = { connects: 0, disconnects: 0, reconnects: 0, errors: 0 };
+
+const isReady = () => mongoose.connection.readyState === 1;
+
+mongoose.connection.on('connected', () => { events.connects++; });
+mongoose.connection.on('reconnected', () => { events.reconnects++; });
+mongoose.connection.on('disconnected', () => { events.disconnects++; });
+mongoose.connection.on('error', (error) => {
+  events.errors++;
+  console.error('MongoDB connection error:', error.message);
+});
+
+// Connect, retrying until the server is reachable. Resolves once ready.
+const connect = () => {
+  if (connecting) return connecting;
+
+  connecting = (async () => {
+    while (true) {
+      try {
+        await mongoose.connect(MONGODB_URI, connectionOptions());
+        watchPool(mongoose.connection.getClient());
+        return mongoose.connection;
+      } catch (error) {
+        console.error(`MongoDB connection failed, retrying in ${RETRY_DELAY_MS}ms:`, error.message);
+        await new Promise(resolve => setTimeout(resolve, RETRY_DELAY_MS));
+      }
+    }
+  })();
+  return connecting;
+};
+
+const disconnect = () => mongoose.disconnect();
+
+// Hold back API traffic while the database is unreachable
+const requireReady = (req, res, next) => {
+  if (isReady()) {
+    return next();
+  }
+  res.set('Retry-After', '5');
+  res.status(503).json({ error: 'Service temporarily unavailable' });
+};
+
+const stats = () => {
+  const options = connectionOptions();
+  return {
+    ready: isReady(),
+    state: mongoose.STATES[mongoose.connection.readyState],
+    ...events,
+    pool: {
+      ...pool,
+      maxPoolSize: options.maxPoolSize,
+      waitAvgMs: pool.checkouts === 0 ? 0 : pool.waitTotalMs / pool.checkouts
+    },
+    readPreferences: READ_PREFERENCES
+  };
+};
+
+module.exports = {
+  connect,
+  disconnect,
+  isReady,
+  requireReady,
+  readPreference,
+  stats
+};'''
+
+# Metrics registry
+metrics_util = '''// Minimal Prometheus-style metrics registry.
+//
+// Counters, gauges and histograms keyed by label values, rendered in the
+// Prometheus text exposition format. Recording is a Map lookup plus a few
+// additions, so it is cheap enough for every request and query. Gauges can
+// take a collect() callback that reads the current value at scrape time.
+
+const DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+const escapeLabel = (value) => String(value).replace(/\\\\/g, '\\\\\\\\').replace(/\\n/g, '\\\\n').replace(/"/g, '\\\\"');
+
+const formatLabels = (names, values, extra = '') => {
+  const pairs = names.map((name, i) => `${name}="${escapeLabel(values[i])}"`);
+  if (extra) pairs.push(extra);
+  return pairs.length === 0 ? '' : `{${pairs.join(',')}}`;
+};
+
+const formatValue = (value) => {
+  if (value === Infinity) return '+Inf';
+  if (value === -Infinity) return '-Inf';
+  return String(value);
+};
+
+const createRegistry = () => {
+  const metrics = [];
+
+  // Series are stored per joined label values; labels(...) returns a bound
+  // child so hot paths can skip the join
+  const register = (metric) => {
+    metrics.push(metric);
+    return metric;
+  };
+
+  const counter = ({ name, help, labelNames = [] }) => {
+    const series = new Map();
+    const child = (values) => {
+      const key = values.join('\\u0000');
+      let entry = series.get(key);
+      if (!entry) {
+        entry = { values, value: 0 };
+        series.set(key, entry);
+      }
+      return { inc: (amount = 1) => { entry.value += amount; } };
+    };
+
+    return register({
+      name,
+      help,
+      type: 'counter',
+      labels: (...values) => child(values),
+      inc: (amount = 1) => child([]).inc(amount),
+      render: () => [...series.values()].map(entry =>
+        `${name}${formatLabels(labelNames, entry.values)} ${formatValue(entry.value)}`)
+    });
+  };
+
+  const gauge = ({ name, help, labelNames = [], collect }) => {
+    const series = new Map();
+    const set = (values, value) => {
+      series.set(values.join('\\u0000'), { values, value });
+    };
+
+    const metric = register({
+      name,
+      help,
+      type: 'gauge',
+      set: (value) => set([], value),
+      labels: (...values) => ({ set: value => set(values, value) }),
+      render: () => {
+        if (collect) collect(metric);
+        return [...series.values()].map(entry =>
+          `${name}${formatLabels(labelNames, entry.values)} ${formatValue(entry.value)}`);
+      }
+    });
+    return metric;
+  };
+
+  const histogram = ({ name, help, labelNames = [], buckets = DEFAULT_BUCKETS }) => {
+    const series = new Map();
+    const child = (values) => {
+      const key = values.join('\\u0000');
+      let entry = series.get(key);
+      if (!entry) {
+        entry = { values, counts: new Array(buckets.length).fill(0), sum: 0, count: 0 };
+        series.set(key, entry);
+      }
+      return {
+        observe: (value) => {
+          // Non-cumulative here; made cumulative when rendered
+          let i = 0;
+          while (i < buckets.length && value > buckets[i]) i++;
+          if (i < buckets.length) entry.counts[i]++;
+          entry.sum += value;
+          entry.count++;
+        }
+      };
+    };
+
+    return register({
+      name,
+      help,
+      type: 'histogram',
+      labels: (...values) => child(values),
+      observe: (value) => child([]).observe(value),
+      render: () => {
+        const lines = [];
+        series.forEach(entry => {
+          let cumulative = 0;
+          buckets.forEach((bound, i) => {
+            cumulative += entry.counts[i];
+            lines.push(`${name}_bucket${formatLabels(labelNames, entry.values, `le="${bound}"`)} ${cumulative}`);
+          });
+          lines.push(`${name}_bucket${formatLabels(labelNames, entry.values, 'le="+Inf"')} ${entry.count}`);
+          lines.push(`${name}_sum${formatLabels(labelNames, entry.values)} ${entry.sum}`);
+          lines.push(`${name}_count${formatLabels(labelNames, entry.values)} ${entry.count}`);
+        });
+        return lines;
+      }
+    });
+  };
+
+  const render = () => metrics
+    .map(metric => [
+      `# HELP ${metric.name} ${metric.help}`,
+      `# TYPE ${metric.name} ${metric.type}`,
+      ...metric.render()
+    ].join('\\n'))
+    .join('\\n') + '\\n';
+
+  return { counter, gauge, histogram, render };
+};
+
+module.exports = {
+  createRegistry,
+  DEFAULT_BUCKETS,
+  CONTENT_TYPE: 'text/plain; version=0.0.4; charset=utf-8'
+};'''
+
+# Instrumentation
+metrics_service = '''const { monitorEventLoopDelay } = require('perf_hooks');
+const { createRegistry, CONTENT_TYPE } = require('../utils/metrics');
+const principalCache = require('./principalCache');
+const catalogCache = require('./catalogCache');
+const slugCache = require('./slugCache');
+const database = require('./database');
+
+// Process-wide instrumentation served at GET /metrics:
+//   - request latency per route, method and status (httpMetrics middleware)
+//   - MongoDB operation latency per model and operation (queryMetrics plugin)
+//   - event-loop delay, memory, cache hit ratios and connection pool state,
+//     read when /metrics is scraped
+// In cluster mode every worker keeps its own numbers; scrape each worker or
+// aggregate by the `pid` the process metrics carry.
+
+const registry = createRegistry();
+
+const httpDuration = registry.histogram({
+  name: 'http_request_duration_seconds',
+  help: 'HTTP request latency by route, method and status',
+  labelNames: ['method', 'route', 'status']
+});
+
+const mongoDuration = registry.histogram({
+  name: 'mongodb_operation_duration_seconds',
+  help: 'MongoDB operation latency by model and operation',
+  labelNames: ['model', 'operation', 'outcome'],
+  buckets: [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5]
+});
+
+// Sampled continuously; each scrape reports the interval since the last one
+const loopDelay = monitorEventLoopDelay({ resolution: 10 });
+loopDelay.enable();
+
+registry.gauge({
+  name: 'nodejs_eventloop_lag_seconds',
+  help: 'Event-loop delay since the previous scrape',
+  labelNames: ['quantile'],
+  collect: (gauge) => {
+    gauge.labels('0.5').set(loopDelay.percentile(50) / 1e9);
+    gauge.labels('0.99').set(loopDelay.percentile(99) / 1e9);
+    gauge.labels('max').set(loopDelay.max / 1e9);
+    loopDelay.reset();
+  }
+});
+
+registry.gauge({
+  name: 'nodejs_memory_bytes',
+  help: 'Process memory usage',
+  labelNames: ['pid', 'type'],
+  collect: (gauge) => {
+    const memory = process.memoryUsage();
+    ['rss', 'heapTotal', 'heapUsed', 'external'].forEach(type => gauge.labels(process.pid, type).set(memory[type]));
+  }
+});
+
+const caches = {
+  principals: principalCache.stats,
+  catalog: catalogCache.stats,
+  slugs: slugCache.stats
+};
+
+registry.gauge({
+  name: 'cache_hit_ratio',
+  help: 'Hits over lookups since start, per cache',
+  labelNames: ['cache'],
+  collect: (gauge) => {
+    Object.entries(caches).forEach(([name, stats]) => gauge.labels(name).set(stats().hitRatio));
+  }
+});
+
+registry.gauge({
+  name: 'cache_lookups_total',
+  help: 'Cache lookups since start, per cache and result',
+  labelNames: ['cache', 'result'],
+  collect: (gauge) => {
+    Object.entries(caches).forEach(([name, stats]) => {
+      const { hits, misses } = stats();
+      gauge.labels(name, 'hit').set(hits);
+      gauge.labels(name, 'miss').set(misses);
+    });
+  }
+});
+
+registry.gauge({
+  name: 'mongodb_pool_connections',
+  help: 'Connection pool state',
+  labelNames: ['state'],
+  collect: (gauge) => {
+    const { pool } = database.stats();
+    gauge.labels('open').set(pool.open);
+    gauge.labels('in_use').set(pool.inUse);
+    gauge.labels('waiting').set(pool.waiting);
+    gauge.labels('max').set(pool.maxPoolSize);
+  }
+});
+
+registry.gauge({
+  name: 'mongodb_pool_checkout_wait_seconds',
+  help: 'Connection checkout wait since start',
+  labelNames: ['stat'],
+  collect: (gauge) => {
+    const { pool } = database.stats();
+    gauge.labels('avg').set(pool.waitAvgMs / 1000);
+    gauge.labels('max').set(pool.waitMaxMs / 1000);
+    gauge.labels('total').set(pool.waitTotalMs / 1000);
+  }
+});
+
+registry.gauge({
+  name: 'mongodb_ready',
+  help: '1 when the database connection is usable',
+  collect: (gauge) => gauge.set(database.isReady() ? 1 : 0)
+});
+
+// Route template (e.g. /api/products/:identifier) rather than the raw URL,
+// so the number of series stays bounded
+const routeOf = (req, res) => {
+  if (req.route) return `${req.baseUrl}${req.route.path === '/' && req.baseUrl ? '' : req.route.path}`;
+  return res.statusCode === 404 ? '<unmatched>' : '<middleware>';
+};
+
+const httpMetrics = (req, res, next) => {
+  const started = process.hrtime.bigint();
+  res.once('finish', () => {
+    const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+    httpDuration.labels(req.method, routeOf(req, res), res.statusCode).observe(seconds);
+  });
+  next();
+};
+
+const QUERY_OPERATIONS = [
+  'find', 'findOne', 'countDocuments', 'estimatedDocumentCount', 'distinct',
+  'updateOne', 'updateMany', 'findOneAndUpdate', 'findOneAndDelete',
+  'deleteOne', 'deleteMany', 'replaceOne'
+];
+
+// Mongoose plugin: schema.plugin(queryMetrics, { model: 'Product' })
+const queryMetrics = (schema, { model }) => {
+  // Documents keep the start time in $locals; queries and aggregates on
+  // the object itself
+  const timings = (target) => target.$locals || target;
+  const start = function() {
+    timings(this).$metricsStart = process.hrtime.bigint();
+  };
+  const record = (target, operation, outcome) => {
+    const started = timings(target).$metricsStart;
+    if (!started) return;
+    const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+    mongoDuration.labels(model, operation, outcome).observe(seconds);
+  };
+
+  schema.pre(QUERY_OPERATIONS, start);
+  schema.post(QUERY_OPERATIONS, function() { record(this, this.op, 'ok'); });
+  schema.post(QUERY_OPERATIONS, function(error, result, next) {
+    record(this, this.op, 'error');
+    next(error);
+  });
+
+  schema.pre('aggregate', start);
+  schema.post('aggregate', function() { record(this, 'aggregate', 'ok'); });
+  schema.post('aggregate', function(error, result, next) {
+    record(this, 'aggregate', 'error');
+    next(error);
+  });
+
+  schema.pre('save', start);
+  schema.post('save', function() { record(this, 'save', 'ok'); });
+  schema.post('save', function(error, doc, next) {
+    record(this, 'save', 'error');
+    next(error);
+  });
+};
+
+// GET /metrics; set METRICS_TOKEN to require `Authorization: Bearer <token>`
+const endpoint = (req, res) => {
+  const token = process.env.METRICS_TOKEN;
+  if (token && req.get('Authorization') !== `Bearer ${token}`) {
+    return res.status(401).json({ error: 'Unauthorized' });
+  }
+  res.set('Content-Type', CONTENT_TYPE);
+  res.send(registry.render());
+};
+
+module.exports = {
+  registry,
+  httpMetrics,
+  queryMetrics,
+  endpoint
+};'''
+
 # Save additional route files
 with open('routes/admin.js', 'w') as f:
     f.write(admin_routes)
@@ -488,6 +1415,42 @@ with open('routes/admin.js', 'w') as f:
 with open('routes/orders.js', 'w') as f:
     f.write(order_routes)
 
+with open('services/stockReservation.js', 'w') as f:
+    f.write(stock_reservation_service)
+
+with open('services/orderItems.js', 'w') as f:
+    f.write(order_items_service)
+
+with open('utils/keyedQueue.js', 'w') as f:
+    f.write(keyed_queue_util)
+
+with open('services/productQueue.js', 'w') as f:
+    f.write(product_queue_service)
+
+with open('services/idempotencyStore.js', 'w') as f:
+    f.write(idempotency_store_service)
+
+with open('services/clusterStatus.js', 'w') as f:
+    f.write(cluster_status_service)
+
+with open('services/database.js', 'w') as f:
+    f.write(database_service)
+
+with open('utils/metrics.js', 'w') as f:
+    f.write(metrics_util)
+
+with open('services/metrics.js', 'w') as f:
+    f.write(metrics_service)
+
 print("Created additional API routes:")
 print("✅ routes/admin.js")
-print("✅ routes/orders.js")
\ No newline at end of file
+print("✅ routes/orders.js")
+print("✅ services/stockReservation.js")
+print("✅ services/orderItems.js")
+print("✅ utils/keyedQueue.js")
+print("✅ services/productQueue.js")
+print("✅ services/idempotencyStore.js")
+print("✅ services/clusterStatus.js")
+print("✅ services/database.js")
+print("✅ utils/metrics.js")
+print("✅ services/metrics.js")
\ No newline at end of file
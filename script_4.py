@@ -2,12 +2,16 @@
 
 import os
 
+# Create utils directory
+os.makedirs('utils', exist_ok=True)
+
 # Create middleware directory
 os.makedirs('middleware', exist_ok=True)
 
 # Authentication middleware
 auth_middleware = '''const jwt = require('jsonwebtoken');
 const User = require('../models/User');
+const principalCache = require('../services/principalCache');
 
 const auth = async (req, res, next) => {
   try {
@@ -21,20 +25,29 @@ const auth = async (req, res, next) => {
 
     // Verify token
     const decoded = jwt.verify(token, process.env.JWT_SECRET);
-    
-    // Check if user still exists and is active
-    const user = await User.findById(decoded.userId).select('-password');
-    if (!user || !user.isActive) {
-      return res.status(401).json({ error: 'Invalid token - user not found' });
+
+    // Reuse a recently verified principal before going to the database
+    let principal = principalCache.get(decoded.userId);
+    if (!principal) {
+      // Check if user still exists and is active
+      const user = await User.findById(decoded.userId)
+        .select('username email role isActive')
+        .lean();
+      if (!user || !user.isActive) {
+        return res.status(401).json({ error: 'Invalid token - user not found' });
+      }
+
+      principal = {
+        userId: user._id,
+        username: user.username,
+        email: user.email,
+        role: user.role
+      };
+      principalCache.set(decoded.userId, principal);
     }
 
     // Add user info to request
-    req.user = {
-      userId: user._id,
-      username: user.username,
-      email: user.email,
-      role: user.role
-    };
+    req.user = { ...principal };
 
     next();
   } catch (error) {
@@ -44,7 +57,7 @@ const auth = async (req, res, next) => {
     if (error.name === 'TokenExpiredError') {
       return res.status(401).json({ error: 'Token expired' });
     }
-    
+
     console.error('Auth middleware error:', error);
     res.status(500).json({ error: 'Authentication failed' });
   }
@@ -134,21 +147,27 @@ router.post('/confirm-payment', auth, async (req, res) => {
     const paymentIntent = await stripe.paymentIntents.retrieve(paymentIntentId);
 
     if (paymentIntent.status === 'succeeded') {
-      // Update order payment status
-      const order = await Order.findOneAndUpdate(
-        { 
-          _id: orderId,
-          customer: req.user.userId,
-          'paymentDetails.paymentIntentId': paymentIntentId
-        },
-        {
-          paymentStatus: 'completed',
-          status: 'processing',
-          'paymentDetails.transactionId': paymentIntent.id,
-          'paymentDetails.receiptUrl': paymentIntent.charges.data[0]?.receipt_url
-        },
+      // Update order payment status. Only a pending order moves to
+      // processing, so this and the webhook can't both count its revenue.
+      const filter = {
+        _id: orderId,
+        customer: req.user.userId,
+        'paymentDetails.paymentIntentId': paymentIntentId
+      };
+      const payment = {
+        paymentStatus: 'completed',
+        'paymentDetails.transactionId': paymentIntent.id,
+        'paymentDetails.receiptUrl': paymentIntent.charges.data[0]?.receipt_url
+      };
+      let order = await Order.findOneAndUpdate(
+        { ...filter, status: 'pending' },
+        { ...payment, status: 'processing' },
         { new: true }
       );
+      if (!order) {
+        // Already moved on, e.g. by the webhook; record the payment details
+        order = await Order.findOneAndUpdate(filter, payment, { new: true });
+      }
 
       if (!order) {
         return res.status(404).json({ error: 'Order not found' });
@@ -188,11 +207,14 @@ router.post('/stripe-webhook', express.raw({ type: 'application/json' }), async
         const paymentIntent = event.data.object;
         const orderId = paymentIntent.metadata.orderId;
 
-        // Update order status
-        await Order.findByIdAndUpdate(orderId, {
+        // Update order status; confirm-payment may have got there first
+        const moved = await Order.findOneAndUpdate({ _id: orderId, status: 'pending' }, {
           paymentStatus: 'completed',
           status: 'processing'
         });
+        if (!moved) {
+          await Order.findByIdAndUpdate(orderId, { paymentStatus: 'completed' });
+        }
 
         console.log(`Payment succeeded for order: ${orderId}`);
         break;
@@ -254,6 +276,270 @@ router.get('/payment-methods', auth, async (req, res) => {
 
 module.exports = router;'''
 
+# Idempotency-Key middleware
+idempotency_middleware = '''const crypto = require('crypto');
+const { createStoreFromEnv } = require('../services/idempotencyStore');
+
+// Idempotency-Key support for non-repeatable writes (order submission).
+//
+// The first request with a key claims it and its response is stored; a retry
+// with the same key and body gets that stored response back without running
+// the handler again. Keys are scoped to the authenticated user, so this must
+// run after the auth middleware. Server errors release the key so the client
+// can retry for real.
+
+const MAX_KEY_LENGTH = 255;
+
+const fingerprintOf = (req) => crypto
+  .createHash('sha256')
+  .update(`${req.method} ${req.baseUrl}${req.path} ${JSON.stringify(req.body || {})}`)
+  .digest('hex');
+
+const idempotency = ({ store = createStoreFromEnv(), ttlMs } = {}) => async (req, res, next) => {
+  const key = req.get('Idempotency-Key');
+  if (!key) {
+    return next();
+  }
+  if (key.length > MAX_KEY_LENGTH) {
+    return res.status(400).json({ error: `Idempotency-Key must be at most ${MAX_KEY_LENGTH} characters` });
+  }
+
+  const id = `${req.user.userId}:${key}`;
+  const fingerprint = fingerprintOf(req);
+
+  try {
+    const existing = await store.claim(id, fingerprint);
+
+    if (existing) {
+      if (existing.fingerprint !== fingerprint) {
+        return res.status(422).json({ error: 'Idempotency-Key was already used for a different request' });
+      }
+      if (existing.status !== 'completed') {
+        return res.status(409).json({ error: 'A request with this Idempotency-Key is still being processed' });
+      }
+      res.set('Idempotent-Replayed', 'true');
+      return res.status(existing.responseStatus).json(existing.responseBody);
+    }
+  } catch (error) {
+    console.error('Idempotency check error:', error);
+    return res.status(500).json({ error: 'Failed to process request' });
+  }
+
+  let settled = false;
+  const settle = (action) => {
+    settled = true;
+    action.catch(error => console.error('Idempotency store error:', error));
+  };
+
+  const json = res.json.bind(res);
+  res.json = (body) => {
+    if (!settled) {
+      settle(res.statusCode >= 500
+        ? store.abandon(id)
+        : store.complete(id, res.statusCode, JSON.parse(JSON.stringify(body)), ttlMs));
+    }
+    return json(body);
+  };
+
+  // Handler ended without a JSON response (client gone, crash): free the key
+  res.on('close', () => {
+    if (!settled) settle(store.abandon(id));
+  });
+
+  next();
+};
+
+module.exports = idempotency;'''
+
+# Token bucket stores
+rate_limit_stores = '''const createLruCache = require('./lruCache');
+const { getRedisClient } = require('./cacheStores');
+
+// Token bucket stores for the rate limiter. Both expose:
+//   take(key, { capacity, refillPerMs }) -> { allowed, remaining, retryAfterMs }
+//   stats() -> object
+//
+// A bucket holds up to `capacity` tokens and refills continuously at
+// `refillPerMs`; each request takes one token. Only the token count and the
+// time of the last refill are stored per key.
+
+// How long a bucket needs to refill completely; after that it is
+// indistinguishable from a new one and can be dropped
+const fullAfterMs = (tokens, capacity, refillPerMs) => Math.ceil((capacity - tokens) / refillPerMs);
+
+const retryAfter = (tokens, refillPerMs) => Math.ceil((1 - tokens) / refillPerMs);
+
+// In-process buckets, bounded by an LRU so memory can't grow with the
+// number of distinct clients
+const createMemoryStore = ({ maxEntries = 100000 } = {}) => {
+  const buckets = createLruCache({ maxEntries });
+
+  return {
+    name: 'memory',
+    take: async (key, { capacity, refillPerMs }) => {
+      const now = Date.now();
+      const bucket = buckets.get(key);
+      let tokens = bucket
+        ? Math.min(capacity, bucket.tokens + (now - bucket.updatedAt) * refillPerMs)
+        : capacity;
+
+      const allowed = tokens >= 1;
+      if (allowed) tokens -= 1;
+      buckets.set(key, { tokens, updatedAt: now }, fullAfterMs(tokens, capacity, refillPerMs) + 1);
+
+      return {
+        allowed,
+        remaining: Math.floor(tokens),
+        retryAfterMs: allowed ? 0 : retryAfter(tokens, refillPerMs)
+      };
+    },
+    stats: () => {
+      const { size, maxEntries: max, evictions } = buckets.stats();
+      return { buckets: size, maxEntries: max, evictions };
+    }
+  };
+};
+
+// Shared buckets in Redis (or anything speaking its protocol with Lua
+// support). The refill and take run in one script, timed by the server
+// clock, so every process sees the same bucket.
+const TAKE_SCRIPT = `
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / refill) + 1000)
+return { allowed, tostring(tokens) }
+`;
+
+const createRedisStore = (client, { prefix = 'dripnest:ratelimit:' } = {}) => {
+  if (!client.dripnestTakeToken) {
+    client.defineCommand('dripnestTakeToken', { numberOfKeys: 1, lua: TAKE_SCRIPT });
+  }
+
+  return {
+    name: 'redis',
+    take: async (key, { capacity, refillPerMs }) => {
+      const [allowed, rawTokens] = await client.dripnestTakeToken(prefix + key, capacity, refillPerMs);
+      const tokens = parseFloat(rawTokens);
+      return {
+        allowed: allowed === 1,
+        remaining: Math.floor(tokens),
+        retryAfterMs: allowed === 1 ? 0 : retryAfter(tokens, refillPerMs)
+      };
+    },
+    stats: () => ({ status: client.status })
+  };
+};
+
+// RATE_LIMIT_STORE=redis with REDIS_URL shares buckets across processes
+const createStoreFromEnv = () => {
+  if (process.env.RATE_LIMIT_STORE === 'redis' && process.env.REDIS_URL) {
+    return createRedisStore(getRedisClient());
+  }
+  return createMemoryStore({ maxEntries: parseInt(process.env.RATE_LIMIT_MAX_KEYS) || 100000 });
+};
+
+module.exports = {
+  createMemoryStore,
+  createRedisStore,
+  createStoreFromEnv
+};'''
+
+# Tiered rate limiter
+rate_limit_middleware = '''const { createStoreFromEnv } = require('../utils/rateLimitStores');
+
+// Tiered token-bucket rate limiting for /api.
+//
+// Every request is matched to a tier with its own budget, written as
+// "capacity/seconds": a client may burst up to `capacity` requests, and the
+// bucket refills evenly over `seconds`. Buckets are keyed by tier and client
+// IP (set TRUST_PROXY behind a load balancer so req.ip is the real client).
+// Health and readiness probes and the Stripe webhook are never limited.
+
+const parseBudget = (value) => {
+  const [capacity, seconds] = String(value).split('/').map(Number);
+  return { capacity, refillPerMs: capacity / (seconds * 1000) };
+};
+
+const TIERS = {
+  // Login and registration attempts
+  auth: parseBudget(process.env.RATE_LIMIT_AUTH || '10/900'),
+  // Order placement and payment calls
+  checkout: parseBudget(process.env.RATE_LIMIT_CHECKOUT || '20/60'),
+  // Catalog browsing
+  catalog: parseBudget(process.env.RATE_LIMIT_CATALOG || '300/60'),
+  // Everything else under /api
+  api: parseBudget(process.env.RATE_LIMIT_API || '100/60')
+};
+
+const EXEMPT = new Set(['/health', '/ready', '/payment/stripe-webhook']);
+
+// Paths are relative to the /api mount point
+const tierFor = (req) => {
+  const path = req.path.replace(/\\/+$/, '') || '/';
+  if (EXEMPT.has(path)) return null;
+
+  if (req.method === 'POST' && path.startsWith('/auth/') && path !== '/auth/logout') return 'auth';
+  if (req.method === 'POST' && (path === '/orders' || path.startsWith('/payment/'))) return 'checkout';
+  if (req.method === 'GET' && path.startsWith('/products')) return 'catalog';
+  return 'api';
+};
+
+const rateLimit = ({
+  store = createStoreFromEnv(),
+  tiers = TIERS,
+  enabled = process.env.RATE_LIMIT_ENABLED !== 'false'
+} = {}) => {
+  const counters = { allowed: 0, limited: 0, storeErrors: 0 };
+
+  const middleware = async (req, res, next) => {
+    const tier = enabled ? tierFor(req) : null;
+    if (!tier) {
+      return next();
+    }
+
+    const budget = tiers[tier];
+    let result;
+    try {
+      result = await store.take(`${tier}:${req.ip}`, budget);
+    } catch (error) {
+      // Fail open: an unreachable shared store shouldn't take the API down
+      counters.storeErrors++;
+      console.error('Rate limit store error:', error);
+      return next();
+    }
+
+    res.set('RateLimit-Limit', String(budget.capacity));
+    res.set('RateLimit-Remaining', String(result.remaining));
+    if (!result.allowed) {
+      counters.limited++;
+      res.set('Retry-After', String(Math.ceil(result.retryAfterMs / 1000)));
+      return res.status(429).json({ error: 'Too many requests, please try again later' });
+    }
+
+    counters.allowed++;
+    next();
+  };
+
+  middleware.stats = () => ({ store: store.name, ...counters, ...store.stats() });
+  return middleware;
+};
+
+module.exports = rateLimit;
+module.exports.TIERS = TIERS;
+module.exports.tierFor = tierFor;'''
+
 # Save middleware and payment routes
 with open('middleware/auth.js', 'w') as f:
     f.write(auth_middleware)
@@ -264,7 +550,19 @@ with open('middleware/adminAuth.js', 'w') as f:
 with open('routes/payment.js', 'w') as f:
     f.write(payment_routes)
 
+with open('middleware/idempotency.js', 'w') as f:
+    f.write(idempotency_middleware)
+
+with open('utils/rateLimitStores.js', 'w') as f:
+    f.write(rate_limit_stores)
+
+with open('middleware/rateLimit.js', 'w') as f:
+    f.write(rate_limit_middleware)
+
 print("Created middleware and payment routes:")
 print("✅ middleware/auth.js")
 print("✅ middleware/adminAuth.js")
-print("✅ routes/payment.js")
\ No newline at end of file
+print("✅ routes/payment.js")
+print("✅ middleware/idempotency.js")
+print("✅ utils/rateLimitStores.js")
+print("✅ middleware/rateLimit.js")
\ No newline at end of file
@@ -0,0 +1,506 @@
+# Generate synthetic production-scale data for the Dripnest MongoDB database
+#
+# Usage: python script_5.py --users 1000000 --products 100000 --orders 3000000
+#        python script_5.py --uri mongodb://localhost:27017/dripnest --drop --seed 7
+#
+# Inserts customers, products with size variants and an order history that
+# follows the schemas written by script_1.py. Product and customer
+# popularity follow a Zipf distribution, and orders are spread over
+# --days days with weekend, sale-season and Black Friday / holiday peaks.
+# Documents are streamed to insert_many(ordered=False) in --batch-size
+# batches, so memory stays flat apart from a compact product table.
+# The same --seed always produces the same documents and ObjectIds.
+#
+# Requires pymongo (pip install pymongo). bcrypt is optional. With it, every
+# generated customer can log in with --password; without it, their password
+# hashes are unusable.
+#
+# Indexes are not created here. Start the API once (Mongoose builds them on
+# startup) or run syncIndexes after loading. The dashboard snapshot is dropped
+# so it is rebuilt from the new data.
+
+import argparse
+import bisect
+import itertools
+import os
+import random
+import re
+import struct
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+try:
+    from bson import ObjectId
+    from pymongo import MongoClient, UpdateOne
+except ImportError:
+    sys.exit('pymongo is required: pip install pymongo')
+
+# Matches the schema enums in script_1.py
+CATEGORIES = {
+    'T-Shirts': ['XS', 'S', 'M', 'L', 'XL', 'XXL'],
+    'Hoodies': ['S', 'M', 'L', 'XL', 'XXL'],
+    'Jeans': ['28', '30', '32', '34', '36'],
+    'Shoes': ['38', '40', '42'],
+    'Accessories': []
+}
+CATEGORY_WEIGHTS = [40, 20, 15, 15, 10]
+PRICE_RANGES = {
+    'T-Shirts': (12, 45),
+    'Hoodies': (35, 95),
+    'Jeans': (40, 120),
+    'Shoes': (55, 180),
+    'Accessories': (8, 60)
+}
+# Middle sizes sell (and are stocked) most
+SIZE_WEIGHTS = {
+    'XS': 3, 'S': 12, 'M': 30, 'L': 30, 'XL': 18, 'XXL': 7,
+    '28': 8, '30': 22, '32': 32, '34': 26, '36': 12,
+    '38': 25, '40': 45, '42': 30
+}
+NOUNS = {
+    'T-Shirts': ['Tee', 'Crewneck', 'Pocket Tee', 'Graphic Tee', 'Henley'],
+    'Hoodies': ['Hoodie', 'Zip Hoodie', 'Sweatshirt', 'Fleece'],
+    'Jeans': ['Jeans', 'Denim', 'Chinos', 'Cargo Pants'],
+    'Shoes': ['Sneakers', 'Runners', 'Boots', 'High Tops'],
+    'Accessories': ['Cap', 'Wallet', 'Tote', 'Beanie', 'Socks', 'Belt']
+}
+ADJECTIVES = ['Classic', 'Premium', 'Slim', 'Relaxed', 'Vintage', 'Organic', 'Oversized',
+              'Washed', 'Heavyweight', 'Cropped', 'Essential', 'Urban', 'Retro', 'Tech']
+COLORS = ['Black', 'White', 'Navy', 'Olive', 'Sand', 'Grey', 'Red', 'Indigo', 'Rust', 'Cream']
+BRANDS = ['Dripnest', 'Northline', 'Kaito', 'Loom & Co', 'Fieldwork', 'Studio 9']
+MATERIALS = ['Cotton', 'Organic Cotton', 'Denim', 'Fleece', 'Leather', 'Polyester Blend']
+
+FIRST_NAMES = ['Aarav', 'Emma', 'Liam', 'Olivia', 'Noah', 'Ava', 'Mia', 'Lucas', 'Isha', 'Ethan',
+               'Sofia', 'Leo', 'Zara', 'Kabir', 'Chloe', 'Mateo', 'Aisha', 'Ryan', 'Nora', 'Arjun']
+LAST_NAMES = ['Sharma', 'Smith', 'Patel', 'Garcia', 'Chen', 'Kim', 'Brown', 'Singh', 'Lopez',
+              'Nguyen', 'Wilson', 'Khan', 'Martin', 'Rossi', 'Silva', 'Müller', 'Jones', 'Das']
+CITIES = [('New York', 'NY'), ('Los Angeles', 'CA'), ('Chicago', 'IL'), ('Houston', 'TX'),
+          ('Seattle', 'WA'), ('Austin', 'TX'), ('Boston', 'MA'), ('Denver', 'CO'),
+          ('Atlanta', 'GA'), ('Miami', 'FL'), ('Portland', 'OR'), ('Phoenix', 'AZ')]
+STREETS = ['Main St', 'Oak Ave', 'Maple Dr', 'Cedar Ln', 'Park Blvd', 'Pine St', 'Elm St', 'Lake Rd']
+GENDERS = ['male', 'female', 'other']
+
+# Same rates as the orders route
+TAX_RATE = 0.08
+FREE_SHIPPING_THRESHOLD = 50
+SHIPPING_FEE = 9.99
+PAYMENT_METHODS = ['stripe', 'paypal', 'cod']
+PAYMENT_WEIGHTS = [70, 20, 10]
+# Share of hours in the day, local shopping pattern peaking in the evening
+HOUR_WEIGHTS = [2, 1, 1, 1, 1, 1, 2, 3, 4, 5, 6, 6, 7, 6, 6, 6, 6, 7, 8, 9, 10, 9, 7, 4]
+
+
+# Lowercased, de-duplicated word tokens, as utils/search.js tokenize()
+def tokenize(*values):
+    tokens = []
+    seen = set()
+    for value in values:
+        for item in (value if isinstance(value, (list, tuple)) else [value]):
+            if not item:
+                continue
+            for token in re.split(r'[^a-z0-9]+', str(item).lower()):
+                if token and token not in seen:
+                    seen.add(token)
+                    tokens.append(token)
+    return tokens
+
+
+# Same format as services/orderNumbers.js format()
+def order_number(seq):
+    return 'DN' + str(seq).zfill(10)
+
+
+# ObjectIds carry the document's creation time, like ones made by the driver,
+# but the remaining 8 bytes come from the seeded generator
+def object_id(rng, created_at):
+    return ObjectId(struct.pack('>I', int(created_at.timestamp())) + rng.getrandbits(64).to_bytes(8, 'big'))
+
+
+class ZipfSampler:
+    """Draws indexes in [0, n) where the k-th most popular has weight 1 / k^s.
+
+    Ranks are shuffled over the indexes, so popular items are spread
+    through the collection instead of being the first ones inserted.
+    """
+
+    def __init__(self, rng, n, exponent):
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, n + 1)))
+        self.total = self.cumulative[-1]
+        self.ranked = list(range(n))
+        rng.shuffle(self.ranked)
+
+    def __call__(self):
+        rank = bisect.bisect_left(self.cumulative, self.rng.random() * self.total)
+        return self.ranked[min(rank, len(self.ranked) - 1)]
+
+
+def black_friday(year):
+    november_first = datetime(year, 11, 1, tzinfo=timezone.utc)
+    first_thursday = november_first + timedelta(days=(3 - november_first.weekday()) % 7)
+    return (first_thursday + timedelta(days=22)).date()
+
+
+# Relative order volume for one day: weekly cycle, sale seasons, the
+# Black Friday to Cyber Monday spike, holiday shopping and steady growth
+def day_weight(day, progress):
+    weight = 1.0
+    if day.weekday() >= 5:
+        weight *= 1.25
+    friday = black_friday(day.year)
+    if friday <= day <= friday + timedelta(days=3):
+        weight *= 4.0 if day == friday else 2.5
+    elif day.month == 11 and day > friday - timedelta(days=7):
+        weight *= 1.5
+    elif day.month == 12 and day.day <= 22:
+        weight *= 1.8
+    elif day.month == 12 and day.day >= 26:
+        weight *= 1.4
+    elif day.month == 1 and day.day <= 14:
+        weight *= 1.4
+    elif day.month == 7 and 10 <= day.day <= 20:
+        weight *= 1.6
+    elif day.month == 2 and day.day <= 10:
+        weight *= 0.8
+    return weight * (1 + 0.3 * progress)
+
+
+# Split `total` orders over the days by weight, keeping the exact total
+def orders_per_day(days, total):
+    weights = [day_weight(day, i / max(1, len(days) - 1)) for i, day in enumerate(days)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    remainders = sorted(range(len(days)), key=lambda i: counts[i] - weights[i] * scale)
+    for i in remainders[:total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+# Profile fields are derived from the customer index so orders can reuse
+# the address without keeping every customer in memory
+def customer_profile(seed, index):
+    rng = random.Random(seed * 1000003 + index)
+    city, state = rng.choice(CITIES)
+    return {
+        'firstName': rng.choice(FIRST_NAMES),
+        'lastName': rng.choice(LAST_NAMES),
+        'phone': '555-%04d' % rng.randrange(10000),
+        'gender': rng.choice(GENDERS),
+        'street': '%d %s' % (rng.randint(1, 9999), rng.choice(STREETS)),
+        'city': city,
+        'state': state,
+        'zipCode': '%05d' % rng.randrange(1, 100000)
+    }
+
+
+def password_hash(password):
+    try:
+        import bcrypt
+    except ImportError:
+        print('bcrypt not installed; generated customers cannot log in')
+        return '!synthetic'
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(10)).decode()
+
+
+class BatchWriter:
+    """Buffers documents and flushes them with insert_many(ordered=False)."""
+
+    def __init__(self, collection, batch_size, total):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.total = total
+        self.buffer = []
+        self.inserted = 0
+        self.started = time.time()
+
+    def add(self, document):
+        self.buffer.append(document)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        result = self.collection.insert_many(self.buffer, ordered=False)
+        self.inserted += len(result.inserted_ids)
+        self.buffer = []
+        rate = self.inserted / max(time.time() - self.started, 1e-6)
+        print('  %s: %d/%d (%.0f docs/s)' % (self.collection.name, self.inserted, self.total, rate), end='\r')
+
+    def close(self):
+        self.flush()
+        print()
+
+
+def generate_users(db, options, start, now):
+    rng = random.Random(options.seed)
+    hashed = password_hash(options.password)
+    writer = BatchWriter(db.users, options.batch_size, options.users)
+    ids = []
+    span = (now - start).total_seconds()
+    for i in range(options.users):
+        # Sign-ups spread over the window, with some accounts older than it
+        created_at = start + timedelta(seconds=span * (rng.random() * 1.2 - 0.2))
+        profile = customer_profile(options.seed, i)
+        _id = object_id(rng, created_at)
+        ids.append(_id)
+        writer.add({
+            '_id': _id,
+            'username': 'user%d' % i,
+            'email': 'user%d@example.com' % i,
+            'password': hashed,
+            'role': 'customer',
+            'profile': {
+                'firstName': profile['firstName'],
+                'lastName': profile['lastName'],
+                'phone': profile['phone'],
+                'gender': profile['gender']
+            },
+            'address': {
+                'street': profile['street'],
+                'city': profile['city'],
+                'state': profile['state'],
+                'zipCode': profile['zipCode'],
+                'country': 'US'
+            },
+            'isActive': rng.random() > 0.01,
+            'createdAt': created_at,
+            'updatedAt': created_at,
+            '__v': 0
+        })
+    writer.close()
+    return ids
+
+
+def generate_products(db, options, start, now):
+    rng = random.Random(options.seed + 1)
+    writer = BatchWriter(db.products, options.batch_size, options.products)
+    # Compact table the order generator needs: (_id, name, price, sizes, sku prefix)
+    catalog = []
+    span = (now - start).total_seconds()
+    categories = list(CATEGORIES)
+    for i in range(options.products):
+        category = rng.choices(categories, CATEGORY_WEIGHTS)[0]
+        color = rng.choice(COLORS)
+        adjective = rng.choice(ADJECTIVES)
+        brand = rng.choice(BRANDS)
+        name = '%s %s %s %d' % (adjective, color, rng.choice(NOUNS[category]), i)
+        low, high = PRICE_RANGES[category]
+        price = round(rng.uniform(low, high)) - 0.01
+        tags = [color.lower(), adjective.lower(), category.lower()]
+        sizes = CATEGORIES[category]
+        sku = 'DN%s%06d' % (re.sub(r'[^A-Z]', '', category.upper())[:2], i)
+        # A tail of sold-out sizes and products
+        variants = [{
+            '_id': object_id(rng, now),
+            'size': size,
+            'stock': 0 if rng.random() < 0.08 else int(rng.expovariate(1 / SIZE_WEIGHTS[size]) * 4),
+            'sku': '%s-%s' % (sku, size)
+        } for size in sizes]
+        total_stock = 0 if sizes else (0 if rng.random() < 0.05 else rng.randint(5, 500))
+        available = sum(variant['stock'] for variant in variants) if sizes else total_stock
+        created_at = start + timedelta(seconds=span * rng.random() * 0.9)
+        _id = object_id(rng, created_at)
+        slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+        catalog.append((_id, name, price, sizes, sku))
+        writer.add({
+            '_id': _id,
+            'name': name,
+            'description': 'The %s %s from %s, made for everyday wear.' % (adjective.lower(), name.split(' ', 2)[2], brand),
+            'category': category,
+            'price': price,
+            'images': [{'url': '/uploads/%s.jpg' % slug, 'alt': name, 'isPrimary': True}],
+            'variants': variants,
+            'totalStock': total_stock,
+            'availableStock': available,
+            'inStock': available > 0,
+            'isActive': rng.random() > 0.03,
+            'slug': slug,
+            'tags': tags,
+            'searchTokens': tokenize(name, tags, brand),
+            'brand': brand,
+            'material': rng.choice(MATERIALS),
+            'views': 0,
+            'sales': 0,
+            'rating': {'average': round(rng.uniform(3, 5), 1), 'count': rng.randint(0, 400)},
+            'createdAt': created_at,
+            'updatedAt': created_at,
+            '__v': 0
+        })
+    writer.close()
+    return catalog
+
+
+def order_status(rng, age_days):
+    roll = rng.random()
+    if roll < 0.04:
+        return 'cancelled'
+    if roll < 0.05:
+        return 'refunded'
+    if age_days < 1:
+        return 'pending' if roll < 0.6 else 'processing'
+    if age_days < 4:
+        return rng.choice(['processing', 'shipped', 'shipped'])
+    if age_days < 8:
+        return 'shipped' if roll < 0.4 else 'delivered'
+    return 'delivered'
+
+
+def payment_status(method, status):
+    if status == 'refunded':
+        return 'refunded'
+    if status == 'cancelled':
+        return 'failed' if method != 'cod' else 'pending'
+    if method == 'cod':
+        return 'completed' if status == 'delivered' else 'pending'
+    return 'completed'
+
+
+def generate_orders(db, options, customers, catalog, start, now):
+    rng = random.Random(options.seed + 2)
+    pick_product = ZipfSampler(rng, len(catalog), options.zipf)
+    pick_customer = ZipfSampler(rng, len(customers), options.customer_zipf)
+    writer = BatchWriter(db.orders, options.batch_size, options.orders)
+    sales = [0] * len(catalog)
+    revenue = 0.0
+
+    days = [(start + timedelta(days=i)).date() for i in range(options.days)]
+    hours = list(itertools.accumulate(HOUR_WEIGHTS))
+    seq = 0
+    for day, count in zip(days, orders_per_day(days, options.orders)):
+        midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        # Sorted within the day so order numbers follow creation time
+        offsets = sorted(
+            bisect.bisect_left(hours, rng.random() * hours[-1]) * 3600 + rng.random() * 3600
+            for _ in range(count)
+        )
+        for offset in offsets:
+            seq += 1
+            created_at = midnight + timedelta(seconds=offset)
+            lines = min(1 + int(rng.expovariate(0.9)), 6)
+            items = []
+            seen = set()
+            for _ in range(lines):
+                index = pick_product()
+                _id, name, price, sizes, sku = catalog[index]
+                size = rng.choices(sizes, [SIZE_WEIGHTS[s] for s in sizes])[0] if sizes else None
+                if (index, size) in seen:
+                    continue
+                seen.add((index, size))
+                quantity = 1 if rng.random() < 0.85 else rng.randint(2, 3)
+                sales[index] += quantity
+                items.append({
+                    '_id': object_id(rng, created_at),
+                    'product': _id,
+                    'name': name,
+                    'price': price,
+                    'quantity': quantity,
+                    'size': size,
+                    'sku': '%s-%s' % (sku, size) if size else sku
+                })
+
+            subtotal = round(sum(item['price'] * item['quantity'] for item in items), 2)
+            tax = round(subtotal * TAX_RATE, 2)
+            shipping = 0 if subtotal > FREE_SHIPPING_THRESHOLD else SHIPPING_FEE
+            total = round(subtotal + tax + shipping, 2)
+            method = rng.choices(PAYMENT_METHODS, PAYMENT_WEIGHTS)[0]
+            status = order_status(rng, (now - created_at).total_seconds() / 86400)
+            customer = pick_customer()
+            profile = customer_profile(options.seed, customer)
+            address = {
+                'firstName': profile['firstName'],
+                'lastName': profile['lastName'],
+                'street': profile['street'],
+                'city': profile['city'],
+                'state': profile['state'],
+                'zipCode': profile['zipCode'],
+                'country': 'US'
+            }
+            if status not in ('cancelled', 'refunded'):
+                revenue += total
+            writer.add({
+                '_id': object_id(rng, created_at),
+                'orderNumber': order_number(seq),
+                'customer': customers[customer],
+                'items': items,
+                'subtotal': subtotal,
+                'tax': tax,
+                'shipping': shipping,
+                'total': total,
+                'status': status,
+                'shippingAddress': dict(address, phone=profile['phone']),
+                'billingAddress': address,
+                'paymentMethod': method,
+                'paymentStatus': payment_status(method, status),
+                'createdAt': created_at,
+                'updatedAt': created_at,
+                '__v': 0
+            })
+    writer.close()
+    return sales, revenue
+
+
+def apply_sales(db, catalog, sales, batch_size):
+    updates = []
+    for (_id, *_), sold in zip(catalog, sales):
+        if sold:
+            # Views are roughly proportional to sales, with a conversion rate around 3%
+            updates.append(UpdateOne({'_id': _id}, {'$set': {'sales': sold, 'views': sold * 33}}))
+        if len(updates) >= batch_size:
+            db.products.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        db.products.bulk_write(updates, ordered=False)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate synthetic Dripnest data')
+    parser.add_argument('--uri', default=os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/dripnest'))
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--orders', type=int, default=3000000)
+    parser.add_argument('--days', type=int, default=730, help='length of the order history')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--zipf', type=float, default=1.1, help='product popularity exponent')
+    parser.add_argument('--customer-zipf', type=float, default=0.8, help='repeat-customer exponent')
+    parser.add_argument('--password', default='password123', help='login password for generated customers')
+    parser.add_argument('--drop', action='store_true', help='clear users, products, orders and counters first')
+    options = parser.parse_args()
+    if min(options.users, options.products, options.days) < 1 or options.orders < 0:
+        parser.error('--users, --products and --days must be at least 1, --orders at least 0')
+    return options
+
+
+def main():
+    options = parse_args()
+    db = MongoClient(options.uri).get_default_database()
+    # Fixed end date, so reruns produce identical timestamps
+    now = datetime(2024, 12, 31, 23, 59, tzinfo=timezone.utc)
+    start = now - timedelta(days=options.days)
+
+    if options.drop:
+        for name in ('users', 'products', 'orders', 'counters'):
+            db[name].delete_many({})
+
+    print('Generating users=%d products=%d orders=%d seed=%d into %s'
+          % (options.users, options.products, options.orders, options.seed, db.name))
+    started = time.time()
+    customers = generate_users(db, options, start, now)
+    catalog = generate_products(db, options, start, now)
+    sales, revenue = generate_orders(db, options, customers, catalog, start, now)
+    apply_sales(db, catalog, sales, options.batch_size)
+
+    # New orders continue after the generated history
+    db.counters.update_one({'_id': 'orderNumber'}, {'$max': {'seq': options.orders}}, upsert=True)
+    # Rebuilt by services/dashboardStats.js on the next read
+    db.dashboardstats.delete_many({})
+
+    print('✅ Generated %d users, %d products, %d orders (revenue %.2f) in %.0fs'
+          % (len(customers), len(catalog), options.orders, revenue, time.time() - started))
+    print('Start the API once (or run syncIndexes) to build the indexes.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+// Dripnest Service Worker
+// - App shell (index.html, style.css, app.js) precached on install. Built
+//   shells (npm run build:storefront) have content-hashed file names, which
+//   are served from the cache without asking the network; an unbuilt tree
+//   is served network-first so edits show up on reload.
+// - Catalog responses (/products listings and details) and images kept in
+//   runtime caches with least-recently-used eviction.
+// - Checkouts posted while offline queued in IndexedDB and sent again by
+//   Background Sync, or when the page reports it is back online or signed
+//   in. The queue keeps no token; an open page lends its current one.
+
+// Replaced by backend/scripts/buildStorefront.js
+const SHELL_VERSION = 'dev';
+const SHELL_FILES = ['index.html', 'style.css', 'app.js'];
+
+const SHELL_CACHE = `dripnest-shell-${SHELL_VERSION}`;
+const RUNTIME_CACHES = {
+    api: { name: 'dripnest-api', maxEntries: 100 },
+    images: { name: 'dripnest-images', maxEntries: 200 }
+};
+
+// Registered as sw.js?api=<API base URL>; empty when the storefront runs on local data
+const API_BASE_URL = new URL(self.location.href).searchParams.get('api') || '';
+
+const CHECKOUT_SYNC_TAG = 'dripnest-checkout';
+const QUEUE_DB_NAME = 'dripnest-sync';
+const QUEUE_STORE = 'checkout';
+const TOKEN_REQUEST_TIMEOUT_MS = 3000;
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(cache => cache.addAll(SHELL_FILES))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    const current = [SHELL_CACHE, RUNTIME_CACHES.api.name, RUNTIME_CACHES.images.name];
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(names
+                .filter(name => name.startsWith('dripnest-') && !current.includes(name))
+                .map(name => caches.delete(name))))
+            .then(() => self.clients.claim())
+            .then(() => replayCheckouts().catch(() => {}))
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+
+    if (request.method === 'POST' && isApiPath(url, '/orders')) {
+        event.respondWith(submitCheckout(request));
+        return;
+    }
+    if (request.method !== 'GET') return;
+
+    if (request.mode === 'navigate' && url.origin === self.location.origin) {
+        event.respondWith(shellResponse(new URL('index.html', self.registration.scope).href, request));
+    } else if (isShellFile(url)) {
+        event.respondWith(shellResponse(url.href, request));
+    } else if (isApiPath(url, '/products') && !url.pathname.includes('/check-availability')) {
+        event.respondWith(catalogResponse(event, request));
+    } else if (request.destination === 'image') {
+        event.respondWith(imageResponse(event, request));
+    }
+});
+
+self.addEventListener('sync', event => {
+    if (event.tag === CHECKOUT_SYNC_TAG) {
+        event.waitUntil(replayCheckouts());
+    }
+});
+
+// Browsers without Background Sync: the page asks when it comes back online.
+// After an admin write the page has the cached catalog dropped.
+self.addEventListener('message', event => {
+    if (event.data && event.data.type === 'replay-checkouts') {
+        event.waitUntil(replayCheckouts().catch(() => {}));
+    } else if (event.data && event.data.type === 'purge-catalog') {
+        event.waitUntil(caches.delete(RUNTIME_CACHES.api.name));
+    }
+});
+
+function isApiPath(url, path) {
+    if (!API_BASE_URL) return false;
+    const base = new URL(API_BASE_URL, self.location.href);
+    return url.origin === base.origin && url.pathname.startsWith(base.pathname.replace(/\/$/, '') + path);
+}
+
+function isShellFile(url) {
+    if (url.origin !== self.location.origin) return false;
+    const file = url.pathname.slice(new URL(self.registration.scope).pathname.length);
+    return SHELL_FILES.includes(file);
+}
+
+// Shell
+
+function shellResponse(cacheUrl, request) {
+    // A new build is a new version of this file, which precaches it afresh
+    if (SHELL_VERSION !== 'dev') {
+        return caches.match(cacheUrl).then(cached => cached || fetch(request));
+    }
+    return fetch(request)
+        .then(response => {
+            if (response.ok) {
+                const copy = response.clone();
+                caches.open(SHELL_CACHE).then(cache => cache.put(cacheUrl, copy));
+            }
+            return response;
+        })
+        .catch(() => caches.match(cacheUrl).then(cached => cached || Response.error()));
+}
+
+// Runtime caches
+
+// Listings and details are answered from the cache and refreshed behind it.
+// When the page revalidates with If-None-Match its own copy is already on
+// screen, and a `cache: 'reload'` fetch follows a write the page made, so
+// those requests go to the network and the cache only answers if the
+// network can't.
+function catalogResponse(event, request) {
+    const settings = RUNTIME_CACHES.api;
+    const fromNetwork = fetch(request).then(response => {
+        if (response.status === 200) {
+            event.waitUntil(putAndTrim(settings, request, response.clone()));
+        }
+        return response;
+    });
+
+    if (request.headers.has('If-None-Match') || request.cache === 'reload') {
+        return fromNetwork.catch(() => cachedOrError(event, settings, request));
+    }
+    return caches.open(settings.name)
+        .then(cache => cache.match(request))
+        .then(cached => {
+            if (!cached) return fromNetwork;
+            event.waitUntil(fromNetwork.catch(() => {}));
+            return cached;
+        });
+}
+
+function imageResponse(event, request) {
+    const settings = RUNTIME_CACHES.images;
+    return caches.open(settings.name)
+        .then(cache => cache.match(request))
+        .then(cached => {
+            if (cached) {
+                event.waitUntil(touch(settings, request, cached.clone()));
+                return cached;
+            }
+            return fetch(request).then(response => {
+                // Cross-origin images without CORS come back opaque (status 0)
+                if (response.ok || response.type === 'opaque') {
+                    event.waitUntil(putAndTrim(settings, request, response.clone()));
+                }
+                return response;
+            });
+        });
+}
+
+function cachedOrError(event, settings, request) {
+    return caches.open(settings.name)
+        .then(cache => cache.match(request))
+        .then(cached => {
+            if (!cached) return Response.error();
+            event.waitUntil(touch(settings, request, cached.clone()));
+            return cached;
+        });
+}
+
+// Cache.keys() lists entries in insertion order, so writing an entry again
+// moves it to the end and the front of the list is the least recently used
+function touch(settings, request, response) {
+    return caches.open(settings.name).then(cache => cache.put(request, response));
+}
+
+async function putAndTrim(settings, request, response) {
+    const cache = await caches.open(settings.name);
+    await cache.put(request, response);
+    const keys = await cache.keys();
+    const excess = keys.length - settings.maxEntries;
+    for (let i = 0; i < excess; i++) {
+        await cache.delete(keys[i]);
+    }
+}
+
+// Checkout queue
+
+// Offline checkouts get a 202 and wait in IndexedDB. Each one carries an
+// Idempotency-Key, so a replay that reaches the server twice still places
+// one order. The bearer token is not stored, since it may have expired by
+// the time the entry is sent; the entry records whose order it is instead.
+async function submitCheckout(request) {
+    const headers = new Headers(request.headers);
+    if (!headers.has('Idempotency-Key')) {
+        headers.set('Idempotency-Key', self.crypto.randomUUID());
+    }
+    const body = await request.text();
+
+    try {
+        return await fetch(request.url, { method: 'POST', headers: headers, body: body });
+    } catch (error) {
+        const userId = tokenUserId((headers.get('Authorization') || '').replace(/^Bearer /, ''));
+        headers.delete('Authorization');
+        await queueRequest('add', {
+            url: request.url,
+            headers: [...headers.entries()],
+            body: body,
+            userId: userId,
+            queuedAt: Date.now()
+        });
+        if (self.registration.sync) {
+            await self.registration.sync.register(CHECKOUT_SYNC_TAG).catch(() => {});
+        }
+        return new Response(JSON.stringify({
+            queued: true,
+            message: 'You are offline. Your order will be placed when the connection is back.'
+        }), { status: 202, headers: { 'Content-Type': 'application/json' } });
+    }
+}
+
+// Sync, online and sign-in can all ask at once; one replay runs at a time
+let replaying = null;
+
+function replayCheckouts() {
+    if (!replaying) {
+        replaying = sendQueuedCheckouts().finally(() => { replaying = null; });
+    }
+    return replaying;
+}
+
+// Oldest first, with the token of the page's signed-in user; entries of
+// other users wait for them to sign in. Stops at the first network failure,
+// or without a token, so a sync retry resumes there. A 401 leaves the entry
+// for the next sign-in. Any other response from the server settles the
+// entry, including errors, which are passed on to open pages.
+async function sendQueuedCheckouts() {
+    const entries = await queueRequest('getAll');
+    if (entries.length === 0) return;
+
+    const token = await requestToken();
+    if (!token) {
+        throw new Error('No signed-in page to send queued checkouts with');
+    }
+    const userId = tokenUserId(token);
+
+    for (const entry of entries.filter(entry => entry.userId === userId)) {
+        const headers = new Headers(entry.headers);
+        headers.set('Authorization', `Bearer ${token}`);
+        const response = await fetch(entry.url, { method: 'POST', headers: headers, body: entry.body });
+        if (response.status === 401) return;
+        await queueRequest('delete', entry.key);
+        const result = await response.json().catch(() => ({}));
+        await notifyClients({ type: 'checkout-replayed', ok: response.ok, status: response.status, result: result });
+    }
+}
+
+// The current token of the first open page that has one
+async function requestToken() {
+    const clients = await self.clients.matchAll({ type: 'window' });
+    for (const client of clients) {
+        const token = await new Promise(resolve => {
+            const channel = new MessageChannel();
+            const timer = setTimeout(() => resolve(null), TOKEN_REQUEST_TIMEOUT_MS);
+            channel.port1.onmessage = event => {
+                clearTimeout(timer);
+                resolve(event.data && event.data.token);
+            };
+            client.postMessage({ type: 'token-request' }, [channel.port2]);
+        });
+        if (token) return token;
+    }
+    return null;
+}
+
+// The backend's JWT payload is { userId, role }; only read here, the
+// server still verifies the token
+function tokenUserId(token) {
+    try {
+        const payload = token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/');
+        return JSON.parse(atob(payload)).userId || null;
+    } catch (error) {
+        return null;
+    }
+}
+
+function notifyClients(message) {
+    return self.clients.matchAll({ type: 'window' })
+        .then(clients => clients.forEach(client => client.postMessage(message)));
+}
+
+function queueRequest(operation, value) {
+    return new Promise((resolve, reject) => {
+        const open = indexedDB.open(QUEUE_DB_NAME, 1);
+        open.onupgradeneeded = () => {
+            open.result.createObjectStore(QUEUE_STORE, { keyPath: 'key', autoIncrement: true });
+        };
+        open.onerror = () => reject(open.error);
+        open.onsuccess = () => {
+            const db = open.result;
+            const transaction = db.transaction(QUEUE_STORE, operation === 'getAll' ? 'readonly' : 'readwrite');
+            const request = transaction.objectStore(QUEUE_STORE)[operation](value);
+            transaction.oncomplete = () => {
+                db.close();
+                resolve(request.result);
+            };
+            transaction.onerror = () => {
+                db.close();
+                reject(transaction.error);
+            };
+        };
+    });
+}